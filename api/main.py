@@ -1,23 +1,125 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 import json
 from pathlib import Path
 import sys
 import os
-import httpx
 import asyncio
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
 
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.models.data_models import Project
-from src.models.cms_transformer import transform_cms_to_internal, validate_cms_data, get_cms_transformation_summary
+from src.models.cms_compiler import CMSValidationError
+from src.models.json_codec import load_json_file
 from src.optimization.scenario_generator import ScenarioGenerator
 from src.optimization.pareto_optimizer import ParetoOptimizer
+from src.optimization.parameter_sweep import SweepParameter, variant_count
+from src.optimization.incremental import IncrementalSession
+from src.services.compute_pool import ComputePool, ComputePoolBusy, ComputeTimeout, TaskCancelled
+from src.services.optimization_tasks import (
+    apply_direct_constraints, encode_json, optimize_process_file, optimize_cms_data,
+    optimize_custom, run_parameter_sweep, validate_constraints, stream_process_file, stream_cms_data,
+    analysis_job_request, analysis_job_key, cms_request_key, run_analysis_job
+)
+from src.services.job_store import JobStore, COMPLETED, FAILED
+from src.services.result_cache import FileFingerprints, ResultCache
+from src.services.cms_client import CMSClient, CMSConfig, CMSError, CMSUnavailable
+from src.services.cms_cache import CMSProcessCache
+from src.services.bulk_optimization import list_process_ids, run_bulk
+from src.services.project_registry import preloaded_projects
+from src.services.single_flight import SingleFlight
+
+# CPU-bound optimization runs in a bounded process pool so the event loop
+# keeps serving other requests; sizes and the time limit come from the
+# environment
+COMPUTE_WORKERS = int(os.environ.get("WHATIF_COMPUTE_WORKERS", os.cpu_count() or 1))
+COMPUTE_QUEUE_DEPTH = int(os.environ.get("WHATIF_COMPUTE_QUEUE", 2 * COMPUTE_WORKERS))
+COMPUTE_TIMEOUT_SECONDS = float(os.environ.get("WHATIF_COMPUTE_TIMEOUT", 120))
+
+compute_pool = ComputePool(
+    workers=COMPUTE_WORKERS,
+    max_queue=COMPUTE_QUEUE_DEPTH,
+    timeout=COMPUTE_TIMEOUT_SECONDS
+)
+
+# Encoded /optimize/{process_name} responses keyed by the project file's
+# content hash; bump the version when the response of unchanged files changes
+OPTIMIZE_CACHE_VERSION = 1
+optimize_cache = ResultCache(
+    max_bytes=int(os.environ.get("WHATIF_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    disk_dir=os.environ.get("WHATIF_CACHE_DIR") or None
+)
+project_fingerprints = FileFingerprints()
+
+# Identical optimization requests arriving together (say a team opening the
+# dashboard at once) await one computation, whatever the cache keeps
+optimize_flights = SingleFlight()
+cms_flights = SingleFlight()
+
+# Parameter sweeps run inside one compute pool worker; these bound how many
+# processes of its own a sweep may use and how many variants it may ask for
+SWEEP_MAX_WORKERS = int(os.environ.get("WHATIF_SWEEP_WORKERS", 1))
+SWEEP_MAX_VARIANTS = int(os.environ.get("WHATIF_SWEEP_MAX_VARIANTS", 4096))
+
+# Long analyses (RL included) run as /jobs in a pool of their own and
+# report progress and results through a SQLite store
+JOB_DB_PATH = os.environ.get("WHATIF_JOB_DB", str(Path(__file__).parent.parent / "output" / "jobs.db"))
+JOB_TTL_SECONDS = float(os.environ.get("WHATIF_JOB_TTL", 24 * 3600))
+JOB_WORKERS = int(os.environ.get("WHATIF_JOB_WORKERS", 1))
+JOB_QUEUE_DEPTH = int(os.environ.get("WHATIF_JOB_QUEUE", 64))
 
-app = FastAPI(title="What-If Analysis API", version="1.0.0")
+job_store = JobStore(JOB_DB_PATH, ttl_seconds=JOB_TTL_SECONDS)
+job_pool = ComputePool(workers=JOB_WORKERS, max_queue=JOB_QUEUE_DEPTH, timeout=None)
+JOB_TASKS: set = set()
+
+# One pooled, authenticated CMS connection for the application's lifetime;
+# base URL and credentials come from the WHATIF_CMS_* variables
+cms_client = CMSClient(CMSConfig.from_env())
+
+# CMS processes are served from a local cache refreshed in the background,
+# so listing does not wait on the CMS once the startup warm-up has run
+cms_cache = CMSProcessCache(cms_client, ttl=float(os.environ.get("WHATIF_CMS_CACHE_TTL", 60)))
+
+# Bulk runs append their records to one JSONL file per run id, so posting
+# the same run id again resumes an interrupted run
+BULK_OUTPUT_DIR = Path(os.environ.get("WHATIF_BULK_DIR", str(Path(__file__).parent.parent / "output" / "bulk")))
+BULK_RUN_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+BULK_RUNS: set = set()
+
+# The pre-forked server (api/server.py) recovers jobs once in its parent
+# process and clears this, so its workers do not fail each other's jobs
+RECOVER_JOBS_ON_STARTUP = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Before the pools fork their workers, so they inherit the projects
+    preload_projects()
+    compute_pool.start()
+    job_pool.start()
+    if RECOVER_JOBS_ON_STARTUP:
+        recover_jobs()
+    job_store.evict_expired()
+    cms_cache.warm_up()
+    yield
+    for task in list(JOB_TASKS):
+        task.cancel()
+    await asyncio.gather(*JOB_TASKS, return_exceptions=True)
+    job_pool.shutdown()
+    compute_pool.shutdown()
+    await cms_cache.close()
+    await cms_client.aclose()
+
+app = FastAPI(title="What-If Analysis API", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -49,11 +151,38 @@ PROCESS_FILES = {
 # Explicitly exclude cms-process from being handled by generic endpoint
 EXCLUDED_PROCESS_NAMES = {"cms-process"}
 
+def preload_projects() -> int:
+    """Parse and compile the local process files not preloaded yet"""
+    base_path = Path(__file__).parent.parent
+    paths = [base_path / name for name in sorted(set(PROCESS_FILES.values()))]
+    return preloaded_projects.preload(str(path) for path in paths if path.exists())
+
+def recover_jobs() -> int:
+    """Fail the jobs a previous server left unfinished; they can never complete"""
+    return job_store.fail_unfinished("Interrupted by a server restart")
+
+# Incremental /optimize/custom sessions, most recently used last
+CUSTOM_SESSIONS: "OrderedDict[str, IncrementalSession]" = OrderedDict()
+CUSTOM_SESSIONS_LOCK = threading.Lock()
+MAX_CUSTOM_SESSIONS = 32
+
 
 @app.get("/")
 async def root():
     return {"message": "What-If Analysis API is running"}
 
+@app.get("/stats")
+async def get_stats():
+    """Cache and request coalescing counters of this server process"""
+    return {
+        "optimize_cache": optimize_cache.stats(),
+        "cms_cache": cms_cache.stats(),
+        "coalescing": {
+            "optimize": optimize_flights.stats(),
+            "cms_process": cms_flights.stats()
+        }
+    }
+
 @app.get("/processes")
 async def get_available_processes():
     """Get list of available processes including CMS processes"""
@@ -82,8 +211,7 @@ async def get_available_processes():
         full_path = base_path / file_path
         if full_path.exists():
             try:
-                with open(full_path, 'r') as f:
-                    data = json.load(f)
+                data = load_json_file(full_path)
                 processes.append({
                     "id": process_id,
                     "name": data.get("name", process_id),
@@ -105,51 +233,117 @@ async def get_available_processes():
     raise HTTPException(status_code=404, detail="This endpoint has been removed. Use /optimize/cms-process/{process_id} instead")
 
 @app.post("/optimize/cms-process/{process_id}")
-async def optimize_cms_process_by_id(process_id: int):
-    """Fetch CMS process by ID and optimize it"""
+async def optimize_cms_process_by_id(process_id: int, http_request: Request, format: str = "full"):
+    """
+    Fetch CMS process by ID and optimize it
+    
+    With `?format=compact` scenarios are sent as deltas against the baseline
+    (see src/models/scenario_codec.py).
+    """
+    check_response_format(format)
     try:
         # Fetch process data from CMS API
         cms_data = await get_cms_process_by_id(process_id)
         if not cms_data:
             raise HTTPException(status_code=404, detail=f"Process with ID {process_id} not found")
         
-        # Validate CMS data structure
-        if not validate_cms_data(cms_data):
-            raise HTTPException(status_code=400, detail="Invalid CMS data format")
-        
-        # Transform CMS to internal format
-        internal_data = transform_cms_to_internal(cms_data)
-        
-        # Create project from internal data
-        project = Project.from_json(internal_data)
-        
-        # Initialize scenario generator
-        generator = ScenarioGenerator(project)
-        
-        # Create CMS baseline scenario (preserves existing assignments)
-        cms_baseline = generator.create_cms_baseline_scenario(cms_data)
-        
-        # Generate optimized scenarios from CMS baseline
-        scenarios = generator.generate_cms_optimization_scenarios(cms_baseline, cms_data)
+        # Compile the CMS data and generate the baseline and optimized
+        # scenarios in the compute pool, once for concurrent equal requests
+        response = await cms_flights.run(
+            cms_request_key(cms_data, format),
+            lambda abandoned: run_compute(http_request, optimize_cms_data, cms_data, format, disconnected=abandoned),
+            disconnected=http_request.is_disconnected
+        )
         
         return {
-            "scenarios": [scenario.to_dict() for scenario in scenarios],
-            "baseline": cms_baseline.to_dict(),
+            **response,
             "process_info": {
                 "process_id": cms_data['process_id'],
                 "process_name": cms_data['process_name'],
                 "company": cms_data.get('company', {}).get('name', 'Unknown')
             }
         }
+    except HTTPException:
+        raise
+    except CMSValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CMS data format: {e}")
     except Exception as e:
         print(f"Error optimizing CMS process {process_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/optimize/cms-processes/bulk")
+async def optimize_cms_processes_bulk(request: dict):
+    """
+    Optimize many CMS processes, streaming one JSON line per process
+    
+    Payload: {"process_ids": [7, 8]} or {"company": "..."} (all processes
+    when neither is given), plus optional "format": "full"|"compact" and
+    "run_id". Records are also appended to output/bulk/{run_id}.jsonl;
+    posting the same run_id again skips processes that already succeeded.
+    The stream ends with a {"summary": {...}} line holding the throughput.
+    """
+    format = request.get('format', 'full')
+    check_response_format(format)
+    run_id = str(request.get('run_id') or uuid.uuid4().hex)
+    if not BULK_RUN_ID.fullmatch(run_id):
+        raise HTTPException(status_code=400, detail="run_id may only contain letters, digits, '-' and '_'")
+    if run_id in BULK_RUNS:
+        raise HTTPException(status_code=409, detail=f"Bulk run {run_id} is already running")
+    
+    if request.get('process_ids') is not None:
+        try:
+            process_ids = [int(process_id) for process_id in request['process_ids']]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="process_ids must be a list of integers")
+    else:
+        try:
+            process_ids = await list_process_ids(cms_client, request.get('company'))
+        except RuntimeError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+    
+    records: asyncio.Queue = asyncio.Queue()
+    
+    async def produce():
+        try:
+            summary = await run_bulk(
+                cms_client, compute_pool, process_ids, str(BULK_OUTPUT_DIR / f"{run_id}.jsonl"),
+                response_format=format, on_record=lambda record, _: records.put_nowait(record)
+            )
+            records.put_nowait({"summary": {"run_id": run_id, **summary.to_dict()}})
+        except Exception as e:
+            records.put_nowait({"error": f"Bulk optimization failed: {str(e)}"})
+        finally:
+            records.put_nowait(None)
+    
+    async def stream() -> AsyncIterator[str]:
+        # The run id is taken only once the body is being sent, so a response
+        # whose body is never read cannot keep it
+        if run_id in BULK_RUNS:
+            yield json.dumps({"error": f"Bulk run {run_id} is already running"}) + "\n"
+            return
+        BULK_RUNS.add(run_id)
+        task = asyncio.create_task(produce())
+        try:
+            while (record := await records.get()) is not None:
+                yield json.dumps(record) + "\n"
+        finally:
+            # A disconnected client stops the run; its file can be resumed
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            BULK_RUNS.discard(run_id)
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"X-Bulk-Run-Id": run_id})
+
 
 @app.post("/optimize/custom")
-async def optimize_with_custom_constraints(request: dict):
-    """Optimize with custom constraints - accepts direct constraint payload"""
+async def optimize_with_custom_constraints(request: dict, http_request: Request):
+    """
+    Optimize with custom constraints - accepts direct constraint payload
+    
+    With a `session_id` the last schedule is kept between calls and only the
+    part affected by changed resources or task durations is recomputed.
+    """
     print(f"DEBUG: Received custom optimization request")
     print(f"DEBUG: Request keys: {list(request.keys())}")
     
@@ -157,6 +351,13 @@ async def optimize_with_custom_constraints(request: dict):
     resources = request.get('resources', {})
     tasks = request.get('tasks', {})
     preferences = request.get('preferences', {})
+    session_id = request.get('session_id')
+    capacity_aware = bool(request.get('capacity_aware', False))
+    
+    try:
+        validate_constraints(resources)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid constraints: {str(e)}")
     
     # Use process "7" as default for custom optimization
     process_name = "7"
@@ -165,74 +366,171 @@ async def optimize_with_custom_constraints(request: dict):
         raise HTTPException(status_code=404, detail=f"Process not found: {process_name}")
     
     try:
-        # Load base project
-        base_path = Path(__file__).parent.parent
-        file_path = base_path / PROCESS_FILES[process_name]
-        
-        with open(file_path, 'r') as f:
-            project_data = json.load(f)
-        
-        # Apply custom constraints directly from request
-        if resources or tasks:
-            # Create a constraints object from the direct request data
-            constraint_data = {
-                'resources': resources,
-                'tasks': tasks,
-                'preferences': preferences
-            }
-            project_data = apply_direct_constraints(project_data, constraint_data)
-        
-        # Create temporary project with constraints
-        project = Project.from_json(project_data)
-        
-        # Generate optimized scenario based on preferences and constraints
-        generator = ScenarioGenerator(project)
-        
         # Check if any tasks have parallel execution enabled
-        has_parallel_tasks = False
-        task_constraints = {}
-        if tasks:
-            for task_id, constraint in tasks.items():
-                task_constraints[task_id] = constraint
-                if constraint.get('allow_parallel', False):
-                    has_parallel_tasks = True
+        has_parallel_tasks = any(
+            constraint.get('allow_parallel', False) for constraint in (tasks or {}).values()
+        )
         
         # Choose optimization type based on preferences
         time_pref = preferences.get('time_priority', 0.33)
         cost_pref = preferences.get('cost_priority', 0.33)
         quality_pref = preferences.get('quality_priority', 0.34)
         
-        # Use custom parallel scenario if parallel tasks are configured
         if has_parallel_tasks:
-            scenario = generator.generate_custom_parallel_scenario(task_constraints)
+            strategy = None
         elif time_pref > cost_pref and time_pref > quality_pref:
-            scenario = generator.generate_parallel_scenario()
+            strategy = 'parallel'
         elif cost_pref > time_pref and cost_pref > quality_pref:
-            scenario = generator.generate_cost_optimized_scenario()
+            strategy = 'cost'
         else:
-            scenario = generator.generate_balanced_scenario()
+            strategy = 'balanced'
         
-        # Evaluate scenario
-        optimizer = ParetoOptimizer(project)
-        metrics = optimizer.evaluate_scenario(scenario)
+        base_path = Path(__file__).parent.parent
+        file_path = base_path / PROCESS_FILES[process_name]
         
-        result = {
-            'scenario': scenario.to_dict(),
-            'metrics': metrics.to_dict()
-        }
+        if session_id and strategy is not None:
+            # Incremental path: reuse the session's schedules. Sessions live in
+            # this process, so loading and updating them runs in the threadpool
+            try:
+                return await run_in_threadpool(
+                    optimize_custom_session, session_id, file_path, strategy, capacity_aware, resources, tasks
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid constraints: {str(e)}")
         
+        return await run_compute(
+            http_request, optimize_custom, str(file_path), resources, tasks, preferences,
+            strategy, capacity_aware
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Custom optimization failed: {str(e)}")
+
+def get_custom_session(session_id: str, file_path: Path, strategy: str, capacity_aware: bool) -> IncrementalSession:
+    """Session for a client, recreated when its strategy or mode changes"""
+    with CUSTOM_SESSIONS_LOCK:
+        session = CUSTOM_SESSIONS.get(session_id)
+        if session is None or session.strategy != strategy or session.capacity_aware != capacity_aware:
+            session = IncrementalSession(load_json_file(file_path), strategy, capacity_aware)
+            CUSTOM_SESSIONS[session_id] = session
+        
+        # Least recently used sessions are dropped first
+        CUSTOM_SESSIONS.move_to_end(session_id)
+        while len(CUSTOM_SESSIONS) > MAX_CUSTOM_SESSIONS:
+            CUSTOM_SESSIONS.popitem(last=False)
+        return session
+
+def optimize_custom_session(
+    session_id: str, file_path: Path, strategy: str, capacity_aware: bool, resources: Dict, tasks: Dict
+) -> Dict:
+    """Look up or build a client's session, apply the constraints and evaluate its scenario"""
+    session = get_custom_session(session_id, file_path, strategy, capacity_aware)
+    with session.lock:
+        incremental = session.update(resources, tasks)
+        scenario = session.scenario()
+        metrics = ParetoOptimizer(session.project).evaluate_scenario(scenario)
         return {
             "success": True,
-            "scenario": result,
-            "project_data": project_data
+            "scenario": {
+                'scenario': scenario.to_dict(),
+                'metrics': metrics.to_dict()
+            },
+            "project_data": session.project_data,
+            "incremental": incremental
         }
-        
+
+@app.post("/optimize/sweep")
+async def optimize_parameter_sweep(request: dict, http_request: Request):
+    """
+    Sweep ranges of rates, hours per day, durations and availability
+
+    Payload: {"process_name": "7", "parameters": [{"field": "hourly_rate",
+    "ids": ["r1"], "low": 50, "high": 90, "steps": 3}, ...], "method":
+    "grid" | "lhs", "samples": 64, "seed": 0, "strategy": "balanced",
+    "capacity_aware": false, "workers": 1}
+    
+    `workers` is capped by WHATIF_SWEEP_WORKERS and sweeps of more than
+    WHATIF_SWEEP_MAX_VARIANTS variants are refused.
+    """
+    process_name = request.get('process_name', '7')
+    if process_name not in PROCESS_FILES:
+        raise HTTPException(status_code=404, detail=f"Process not found: {process_name}")
+    
+    try:
+        parameters = [SweepParameter.from_dict(p) for p in request.get('parameters', [])]
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sweep parameters: {str(e)}")
+    
+    try:
+        samples = int(request.get('samples', 64))
+        count = variant_count(parameters, request.get('method', 'grid'), samples)
+        workers = int(request.get('workers', 1))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sweep options: {str(e)}")
+    if workers < 1:
+        raise HTTPException(status_code=400, detail="Invalid sweep options: workers must be at least 1")
+    if samples < 1 or count > SWEEP_MAX_VARIANTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep has {count} variants; between 1 and {SWEEP_MAX_VARIANTS} are allowed"
+        )
+    
+    try:
+        base_path = Path(__file__).parent.parent
+        result = await run_compute(
+            http_request, run_parameter_sweep, str(base_path / PROCESS_FILES[process_name]), request,
+            min(workers, SWEEP_MAX_WORKERS), SWEEP_MAX_VARIANTS
+        )
+        return {"success": True, "process_name": process_name, **result}
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Custom optimization failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Parameter sweep failed: {str(e)}")
+
+@app.get("/optimize/cms-process/{process_id}/stream")
+async def stream_cms_process_optimization(process_id: int):
+    """Server-Sent Events variant of /optimize/cms-process/{process_id}"""
+    cms_data = await get_cms_process_by_id(process_id)
+    if not cms_data:
+        raise HTTPException(status_code=404, detail=f"Process with ID {process_id} not found")
+    
+    # Compilation, the baseline and the scenarios all run in the compute pool
+    return await open_event_stream(stream_cms_data, cms_data)
+
+@app.get("/optimize/{process_name}/stream")
+async def stream_process_optimization(process_name: str, include_rl: bool = False):
+    """
+    Server-Sent Events variant of /optimize/{process_name}
+    
+    Emits `start`, then one `scenario` event per heuristic scenario, then
+    `summary`. RL scenarios train for too long to stream and are only
+    available through /jobs.
+    """
+    if process_name in EXCLUDED_PROCESS_NAMES or process_name not in PROCESS_FILES:
+        raise HTTPException(status_code=404, detail="Process not found")
+    if include_rl:
+        raise HTTPException(status_code=400, detail="RL scenarios are not streamed; submit a /jobs analysis instead")
+    
+    file_path = Path(__file__).parent.parent / PROCESS_FILES[process_name]
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Process file not found")
+    
+    return await open_event_stream(stream_process_file, str(file_path), process_name)
 
 @app.post("/optimize/{process_name}")
-async def optimize_process(process_name: str):
-    """Optimize a process and return the best scenario"""
+async def optimize_process(process_name: str, http_request: Request, format: str = "full"):
+    """
+    Optimize a process and return the best scenario
+    
+    With `?format=compact` all scenarios are sent as deltas against the
+    baseline and the best one as an index into them.
+    """
+    check_response_format(format)
     # Block cms-process completely
     if process_name == "cms-process":
         raise HTTPException(status_code=404, detail="Endpoint not found. Use /optimize/cms-process/{process_id} instead")
@@ -252,77 +550,192 @@ async def optimize_process(process_name: str):
         if not file_path.exists():
             raise HTTPException(status_code=404, detail="Process file not found")
         
-        # Load and parse project
-        project = Project.from_json_file(str(file_path))
+        # The heuristics are deterministic, so an unchanged file with the same
+        # options always gets the same response bytes
+        digest, replaced = project_fingerprints.digest(str(file_path))
+        if replaced:
+            optimize_cache.discard_prefix(replaced)
+        key = f"{digest}-{format}-v{OPTIMIZE_CACHE_VERSION}"
         
-        # Generate scenarios
-        generator = ScenarioGenerator(project)
-        scenarios = [
-            generator.generate_baseline_scenario(),
-            generator.generate_parallel_scenario(),
-            generator.generate_cost_optimized_scenario(),
-            generator.generate_balanced_scenario(),
-            generator.generate_critical_path_scenario(),
-            generator.generate_resource_leveling_scenario()
-        ]
-        
-        # Find best scenario using Pareto optimization
-        optimizer = ParetoOptimizer(project)
-        pareto_scenarios = []
-        
-        for scenario in scenarios:
-            metrics = optimizer.evaluate_scenario(scenario)
-            pareto_scenarios.append({
-                'scenario': scenario.to_dict(),
-                'metrics': metrics.to_dict()
-            })
-        
-        # Select best overall scenario (highest overall score)
-        best_scenario = max(pareto_scenarios, key=lambda x: x['metrics']['overall_score'])
-        
-        # Load raw project data for frontend
-        with open(file_path, 'r') as f:
-            project_data = json.load(f)
-        
-        return {
-            "success": True,
-            "best_scenario": best_scenario,
-            "project_data": project_data,
-            "constraints": extract_constraints(project_data),
-            "all_scenarios": pareto_scenarios
-        }
+        body = optimize_cache.get(key)
+        cache_status = "hit"
+        if body is None:
+            async def compute(abandoned):
+                body = await run_compute(
+                    http_request, encode_json, optimize_process_file, str(file_path), format,
+                    disconnected=abandoned
+                )
+                optimize_cache.put(key, body)
+                return body
+
+            body = await optimize_flights.run(key, compute, disconnected=http_request.is_disconnected)
+            cache_status = "miss"
+        return Response(content=body, media_type="application/json", headers={"X-Cache": cache_status})
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
 
-def extract_constraints(project_data: Dict) -> Dict:
-    """Extract current constraints from project data"""
-    return {
-        "resources": {
-            resource["id"]: {
-                "hourly_rate": resource["hourly_rate"],
-                "max_hours_per_day": resource["max_hours_per_day"],
-                "available": True,
-                "skills": resource["skills"]
-            }
-            for resource in project_data["resources"]
-        },
-        "tasks": {
-            task["id"]: {
-                "duration_hours": task["duration_hours"],
-                "priority": 3,  # Default normal priority
-                "allow_parallel": False,
-                "required_skills": task["required_skills"],
-                "order": task["order"]
-            }
-            for task in project_data["tasks"]
-        },
-        "preferences": {
-            "time_priority": 0.33,
-            "cost_priority": 0.33,
-            "quality_priority": 0.34
-        }
-    }
+async def run_compute(http_request: Request, fn, *args, disconnected=None):
+    """
+    Run an optimization job in the compute pool on behalf of a request
+    
+    The job is cancelled when the client disconnects or the time limit
+    passes; a full backlog is reported as 503 so clients can retry. A job
+    shared by coalesced requests passes `disconnected` to be cancelled only
+    once all of them are gone.
+    """
+    with compute_errors():
+        return await compute_pool.run(fn, *args, disconnected=disconnected or http_request.is_disconnected)
+
+@contextmanager
+def compute_errors():
+    """Report compute pool failures as HTTP errors"""
+    try:
+        yield
+    except ComputePoolBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Optimization queue is full, try again shortly",
+            headers={"Retry-After": "5"}
+        )
+    except ComputeTimeout:
+        raise HTTPException(
+            status_code=504,
+            detail=f"Optimization exceeded {COMPUTE_TIMEOUT_SECONDS:g}s time limit"
+        )
+    except TaskCancelled:
+        # Nobody is left to receive a response
+        raise HTTPException(status_code=499, detail="Client closed request")
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: dict):
+    """
+    Queue a full what-if analysis, RL scenarios included
+    
+    Payload: {"process_name": "software_project"} or {"project": {...}},
+    plus optional "constraints": {"resources": {...}, "tasks": {...}},
+    "include_rl": true, "capacity_aware": false, "uncertainty_samples": 0 and
+    "report_sections" (any of summary, best_scenarios, all_scenarios_ranked,
+    pareto_frontier; all by default), which limits what the report computes.
+    Identical submissions share one job while it is queued, running or
+    completed and unexpired.
+    """
+    if 'project' in request:
+        project_data = request['project']
+        try:
+            Project.from_json(project_data)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid project: {str(e)}")
+    else:
+        process_name = request.get('process_name')
+        if process_name not in PROCESS_FILES:
+            raise HTTPException(status_code=404, detail=f"Process not found: {process_name}")
+        project_data = load_json_file(Path(__file__).parent.parent / PROCESS_FILES[process_name])
+    
+    try:
+        job_request = analysis_job_request(project_data, request)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid job options: {str(e)}")
+    
+    job_store.evict_expired()
+    key = analysis_job_key(job_request)
+    existing = job_store.get_live(key)
+    if existing is None and len(JOB_TASKS) >= job_pool.workers + job_pool.max_queue:
+        raise HTTPException(status_code=503, detail="Job queue is full, try again later",
+                            headers={"Retry-After": "30"})
+    
+    job, created = job_store.submit(key, job_request)
+    if created:
+        task = asyncio.create_task(run_job(job.id, job_request))
+        JOB_TASKS.add(task)
+        task.add_done_callback(JOB_TASKS.discard)
+    
+    return {**job_response(job), "deduplicated": not created}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress of a job"""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job_response(job)
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Report of a completed job"""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=f"Job failed: {job.error}")
+    if job.status != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status} ({job.progress:.0%})")
+    
+    result = await run_in_threadpool(job_store.result, job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return {"job_id": job_id, **result}
+
+def job_response(job) -> Dict:
+    response = job.to_dict()
+    response["status_url"] = f"/jobs/{job.id}"
+    if job.status == COMPLETED:
+        response["result_url"] = f"/jobs/{job.id}/result"
+    return response
+
+async def run_job(job_id: str, job_request: Dict):
+    """Run a job in the job pool; the worker records progress and the result"""
+    try:
+        await job_pool.run(run_analysis_job, job_store.path, job_store.ttl_seconds, job_id, job_request)
+    except asyncio.CancelledError:
+        job_store.fail(job_id, "Cancelled by server shutdown")
+        raise
+    except Exception as e:
+        print(f"Job {job_id} failed: {e}")
+        job_store.fail(job_id, str(e))
+
+def sse_event(event: str, data: Dict) -> str:
+    """One Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def open_event_stream(fn, *args) -> StreamingResponse:
+    """
+    Stream the (event, data) pairs a compute pool job publishes as SSE
+    
+    The job is admitted and its `start` event awaited before responding,
+    so a full backlog, the time limit or invalid CMS data still get a
+    status code; later failures end the stream with an `error` event. The
+    job is cancelled when the client goes away.
+    """
+    with compute_errors():
+        try:
+            events = compute_pool.stream(fn, *args)
+            first = await events.__anext__()
+        except CMSValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CMS data format: {e}")
+    
+    async def relay() -> AsyncIterator[str]:
+        try:
+            yield sse_event(*first)
+            async for event, data in events:
+                yield sse_event(event, data)
+        except ComputeTimeout:
+            yield sse_event("error", {"detail": f"Optimization exceeded {COMPUTE_TIMEOUT_SECONDS:g}s time limit"})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Optimization failed: {str(e)}"})
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(relay(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def check_response_format(format: str):
+    """Reject unknown `format` query values"""
+    if format not in ("full", "compact"):
+        raise HTTPException(status_code=400, detail=f"Unknown response format: {format}")
 
 def apply_constraints(project_data, constraints):
     """Apply custom constraints to project data"""
@@ -350,99 +763,23 @@ def apply_constraints(project_data, constraints):
     
     return project_data
 
-def apply_direct_constraints(project_data, constraint_data):
-    """Apply constraints from direct dictionary format"""
-    # Apply resource constraints
-    resources = constraint_data.get('resources', {})
-    for resource_id, resource_constraint in resources.items():
-        for resource in project_data.get('resources', []):
-            if resource['id'] == resource_id:
-                if 'hourly_rate' in resource_constraint:
-                    resource['hourly_rate'] = resource_constraint['hourly_rate']
-                if 'max_hours_per_day' in resource_constraint:
-                    resource['max_hours_per_day'] = resource_constraint['max_hours_per_day']
-                if 'available' in resource_constraint:
-                    resource['available'] = resource_constraint['available']
-    
-    # Apply task constraints
-    tasks = constraint_data.get('tasks', {})
-    for task_id, task_constraint in tasks.items():
-        for task in project_data.get('tasks', []):
-            if task['id'] == task_id:
-                if 'duration_hours' in task_constraint:
-                    task['duration_hours'] = task_constraint['duration_hours']
-                if 'priority' in task_constraint:
-                    task['priority'] = task_constraint['priority']
-    
-    return project_data
-
 async def get_cms_processes():
-    """Fetch processes from CMS API"""
-    try:
-        # Authenticate with CMS
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            auth_response = await client.post(
-                "https://server-digitaltwin-enterprise-production.up.railway.app/auth/login",
-                json={
-                    "email": "superadmin@example.com",
-                    "password": "ChangeMe123!"
-                }
-            )
-            
-            if auth_response.status_code in [200, 201]:
-                auth_data = auth_response.json()
-                access_token = auth_data['access_token']
-                
-                # Fetch processes
-                processes_response = await client.get(
-                    "https://server-digitaltwin-enterprise-production.up.railway.app/process/with-relations",
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
-                
-                if processes_response.status_code == 200:
-                    return processes_response.json()
-                    
-    except Exception as e:
-        print(f"CMS API error: {e}")
-        return None
-    
-    return None
+    """Processes from the CMS, served from the local cache"""
+    return await cms_cache.get_processes()
 
 async def get_cms_process_by_id(process_id: int):
-    """Fetch a specific process from CMS API by ID"""
+    """
+    A specific CMS process by ID, served from the local cache
+    
+    A CMS failure is reported as 503 when the CMS is unavailable and 502
+    otherwise, rather than as a missing process.
+    """
     try:
-        # Authenticate with CMS
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            auth_response = await client.post(
-                "https://server-digitaltwin-enterprise-production.up.railway.app/auth/login",
-                json={
-                    "email": "superadmin@example.com",
-                    "password": "ChangeMe123!"
-                }
-            )
-            
-            if auth_response.status_code in [200, 201]:
-                auth_data = auth_response.json()
-                access_token = auth_data['access_token']
-                
-                # Fetch specific process
-                process_response = await client.get(
-                    f"https://server-digitaltwin-enterprise-production.up.railway.app/process/{process_id}/with-relations",
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
-                
-                if process_response.status_code == 200:
-                    return process_response.json()
-                else:
-                    print(f"Failed to fetch process {process_id}: {process_response.status_code} - {process_response.text}")
-                    return None
-            else:
-                print(f"Authentication failed: {auth_response.status_code} - {auth_response.text}")
-                return None
-                    
-    except Exception as e:
-        print(f"CMS API error for process {process_id}: {e}")
-        return None
+        return await cms_cache.get_process(process_id)
+    except CMSUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"CMS unavailable: {e}", headers={"Retry-After": "10"})
+    except CMSError as e:
+        raise HTTPException(status_code=502, detail=f"CMS request failed: {e}")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,166 @@
+"""
+Pre-forked production server for the What-If Analysis API
+
+The parent process imports the application, preloads and compiles the
+local project files, fails the jobs a previous server left unfinished
+and binds the listening socket, then forks `--workers` uvicorn workers
+that accept on that socket. The workers share the parent's read-only
+project data copy-on-write; the parent only restarts workers that die
+and forwards SIGINT/SIGTERM to them.
+
+Each worker gets its own compute pool, sized so the pools together use
+about one process per core, and torch, OpenMP and BLAS are limited to
+`--threads` threads per process so the workers do not oversubscribe the
+cores.
+
+Usage:
+    python -m api.server --workers 4
+    python -m api.server --workers 8 --threads 1 --port 8002
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Read by numpy's BLAS, OpenMP runtimes and torch when they first load
+THREAD_LIMIT_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+# A worker that dies sooner than this after starting is restarted after a
+# pause, so a worker that cannot start does not fork in a tight loop
+MIN_WORKER_LIFETIME = 5.0
+
+
+def limit_threads(threads: int):
+    """
+    Cap native thread pools of this process and the processes it forks
+
+    Environment variables set before numpy or torch load take effect for
+    both; variables set explicitly by the operator win. Takes effect
+    directly on torch if it is already loaded.
+    """
+    for name in THREAD_LIMIT_VARS:
+        os.environ.setdefault(name, str(threads))
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, threads: int, log_level: str):
+    """Serve `app` on the inherited socket until uvicorn is told to stop"""
+    import uvicorn
+
+    # Undo the parent's handlers; uvicorn installs its own while serving
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    limit_threads(threads)
+    config = uvicorn.Config(app, log_level=log_level, timeout_graceful_shutdown=30)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host: str, port: int, workers: int, threads: int, log_level: str = "info"):
+    limit_threads(threads)
+    # The compute pools of all workers together get about one process per core
+    os.environ.setdefault("WHATIF_COMPUTE_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+
+    import api.main
+
+    preloaded = api.main.preload_projects()
+    recovered = api.main.recover_jobs()
+    api.main.RECOVER_JOBS_ON_STARTUP = False
+    sock = bind_socket(host, port)
+    print(f"Preloaded {preloaded} project files, failed {recovered} interrupted jobs")
+    print(f"Serving on http://{host}:{port} with {workers} workers, {threads} threads each")
+
+    # Objects alive now are never collected, so collections in the workers
+    # do not write to (and un-share) the pages holding them
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                run_worker(api.main.app, sock, threads, log_level)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                status = 1
+            finally:
+                os._exit(status)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+        if time.monotonic() - started < MIN_WORKER_LIFETIME:
+            time.sleep(1.0)
+        if not stopping:
+            spawn()
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("WHATIF_SERVER_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--threads", type=int,
+                        default=int(os.environ.get("WHATIF_THREADS_PER_WORKER", 1)),
+                        help="torch/OpenMP/BLAS threads per process")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    if args.workers < 1 or args.threads < 1:
+        parser.error("--workers and --threads must be at least 1")
+    serve(args.host, args.port, args.workers, args.threads, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
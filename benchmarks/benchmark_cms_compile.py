@@ -0,0 +1,99 @@
+"""
+Benchmark CMS ingestion: validate + transform + Project.from_json + summary
+against the single-pass compile_cms_process
+
+Usage:
+    python benchmarks/benchmark_cms_compile.py --tasks 20000 --jobs 200
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.models.cms_compiler import compile_cms_process
+from src.models.cms_transformer import (
+    get_cms_transformation_summary, transform_cms_to_internal, validate_cms_data
+)
+from src.models.data_models import Project
+from src.optimization.scenario_generator import ScenarioGenerator
+
+
+def synthetic_cms_process(n_tasks: int, n_jobs: int, seed: int = 0) -> dict:
+    """Build a random CMS process document"""
+    rng = random.Random(seed)
+    jobs = [
+        {
+            "job_id": j,
+            "jobCode": f"J-{j}",
+            "name": f"Job {j}",
+            "description": "",
+            "hourlyRate": rng.choice([45, 60, 75, 90, 120]),
+            "maxHoursPerDay": rng.choice([6, 8])
+        }
+        for j in range(n_jobs)
+    ]
+    return {
+        "process_id": 1,
+        "process_name": "Synthetic Process",
+        "process_overview": "Generated for benchmarking",
+        "company": {"name": "Benchmark"},
+        "process_tasks": [
+            {
+                "order": rng.randint(1, n_tasks // 10 + 1),
+                "task": {
+                    "task_id": i,
+                    "task_name": f"Task {i}",
+                    "task_overview": "",
+                    "task_capacity_minutes": rng.choice([15, 30, 60, 120, 240]),
+                    "jobTasks": [{"job": job} for job in rng.sample(jobs, rng.randint(1, 3))]
+                }
+            }
+            for i in range(n_tasks)
+        ]
+    }
+
+
+def best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def legacy_ingest(cms_data: dict):
+    assert validate_cms_data(cms_data)
+    project = Project.from_json(transform_cms_to_internal(cms_data))
+    return project, get_cms_transformation_summary(cms_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    cms_data = synthetic_cms_process(args.tasks, args.jobs)
+    print(f"CMS process: {args.tasks} tasks, {args.jobs} jobs")
+
+    legacy = best_of(args.repeats, lambda: legacy_ingest(cms_data))
+    single = best_of(args.repeats, lambda: compile_cms_process(cms_data))
+    print(f"  validate + transform + from_json + summary: {legacy * 1000:8.1f} ms")
+    print(f"  compile_cms_process:                        {single * 1000:8.1f} ms  ({legacy / single:.1f}x)")
+
+    def scenarios(compiled):
+        generator = ScenarioGenerator(compiled.project)
+        baseline = generator.create_cms_baseline_scenario(compiled)
+        return generator.generate_cms_optimization_scenarios(baseline, compiled)
+
+    end_to_end = best_of(args.repeats, lambda: scenarios(compile_cms_process(cms_data)))
+    print(f"  compile + CMS baseline and scenarios:       {end_to_end * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
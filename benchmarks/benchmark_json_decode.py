@@ -0,0 +1,75 @@
+"""
+Benchmark decoding a large project file: json.load + Project.from_json
+against json_codec with each available backend
+
+Usage:
+    python benchmarks/benchmark_json_decode.py --tasks 200000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+from benchmark_list_scheduler import synthetic_project_data
+from src.models import json_codec
+from src.models.data_models import Project
+
+
+def best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def legacy_load(path: str) -> Project:
+    with open(path) as f:
+        return Project.from_json(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    data = synthetic_project_data(args.tasks, args.resources, n_levels=1000)
+    for task in data["tasks"]:
+        task["description"] = f"Synthetic work package for {task['name']}, " * 2
+    fd, path = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        del data
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"Project file: {args.tasks} tasks, {args.resources} resources, {size_mb:.1f} MB")
+
+        expected = asdict(legacy_load(path))
+        legacy = best_of(args.repeats, lambda: legacy_load(path))
+        print(f"  {'json.load + Project.from_json':<36}{legacy * 1000:8.0f} ms  {size_mb / legacy:6.1f} MB/s")
+
+        backends = [name for name in ("msgspec", "orjson") if getattr(json_codec, name) is not None] + ["json"]
+        for backend in backends:
+            json_codec.JSON_BACKEND = backend
+            assert asdict(json_codec.load_project(path)) == expected
+            for label, fn in [("load_project", json_codec.load_project),
+                              ("load_project_document", json_codec.load_project_document)]:
+                elapsed = best_of(args.repeats, lambda: fn(path))
+                print(f"  {f'{label} ({backend})':<36}{elapsed * 1000:8.0f} ms  "
+                      f"{size_mb / elapsed:6.1f} MB/s  ({legacy / elapsed:.1f}x)")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
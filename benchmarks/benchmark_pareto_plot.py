@@ -0,0 +1,87 @@
+"""
+Benchmark headless Pareto plot rendering for many scenarios
+
+Compares import time of the optimizer with and without matplotlib,
+render time and file size of rasterized against vector scatter layers,
+and how soon a background render hands control back.
+
+Usage:
+    python benchmarks/benchmark_pareto_plot.py --points 100000
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.optimization import pareto_plot
+from src.optimization.pareto_plot import ParetoPlotData, render_pareto_plot, render_pareto_plot_async
+
+ROOT = Path(__file__).parent.parent
+
+
+def import_seconds(statement: str, repeats: int = 3) -> float:
+    """Best wall time of running `statement` in a fresh interpreter"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def synthetic_data(n: int) -> ParetoPlotData:
+    rng = np.random.default_rng(0)
+    times = rng.uniform(10, 60, n)
+    costs = 1e6 / times + rng.normal(0, 2000, n)
+    pareto = np.zeros(n, dtype=bool)
+    pareto[np.argsort(times)[:100]] = True
+    return ParetoPlotData(times, costs, rng.uniform(0.6, 1.2, n), ["sweep"] * n, pareto)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=100000)
+    args = parser.parse_args()
+
+    baseline = import_seconds("pass")
+    optimizer = import_seconds("import src.optimization.pareto_optimizer")
+    with_pyplot = import_seconds("import matplotlib.pyplot, src.optimization.pareto_optimizer")
+    print("Import time (fresh interpreter, minus startup):")
+    print(f"  pareto_optimizer:             {(optimizer - baseline) * 1000:8.0f} ms")
+    print(f"  pareto_optimizer + pyplot:    {(with_pyplot - baseline) * 1000:8.0f} ms")
+
+    data = synthetic_data(args.points)
+    render_pareto_plot(synthetic_data(10))  # load matplotlib and fonts once
+    workdir = tempfile.mkdtemp()
+    try:
+        print(f"Render {args.points} scenarios:")
+        for label, threshold in (("vector", args.points + 1), ("rasterized", pareto_plot.RASTERIZE_ABOVE)):
+            pareto_plot.RASTERIZE_ABOVE = threshold
+            for suffix in ("png", "svg"):
+                path = os.path.join(workdir, f"{label}.{suffix}")
+                start = time.perf_counter()
+                render_pareto_plot(data, save_path=path)
+                elapsed = time.perf_counter() - start
+                print(f"  {label + ' ' + suffix:<30}{elapsed * 1000:8.0f} ms  {os.path.getsize(path) / 1e6:8.2f} MB")
+
+        path = os.path.join(workdir, "background.png")
+        start = time.perf_counter()
+        future = render_pareto_plot_async(data, save_path=path)
+        returned = time.perf_counter() - start
+        future.result()
+        finished = time.perf_counter() - start
+        print(f"  background: returned after    {returned * 1000:8.1f} ms, finished after {finished * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark /optimize/{process_name} throughput of the pre-forked server
+
+Starts `python -m api.server` with each worker count in turn, with the
+response cache disabled so every request is optimized, and keeps
+`--clients` concurrent clients posting for `--duration` seconds.
+Throughput should grow with the worker count up to the number of cores.
+
+Usage:
+    python benchmarks/benchmark_preforked_server.py --workers 1 2 4 --clients 16
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.load_test import free_port, wait_ready
+
+ROOT = Path(__file__).parent.parent
+
+
+def start_server(port: int, workers: int, threads: int, job_db: str) -> subprocess.Popen:
+    env = dict(os.environ, WHATIF_CACHE_MAX_BYTES="0", WHATIF_JOB_DB=job_db)
+    env.pop("WHATIF_CACHE_DIR", None)
+    return subprocess.Popen(
+        [sys.executable, "-m", "api.server", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--threads", str(threads), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+
+
+async def client_loop(client: httpx.AsyncClient, url: str, end: float, latencies: List[float], errors: List[int]):
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        response = await client.post(url)
+        if response.status_code == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            errors.append(response.status_code)
+            await asyncio.sleep(0.05)
+
+
+async def measure(workers: int, args) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as workdir:
+        server = start_server(port, workers, args.threads, os.path.join(workdir, "jobs.db"))
+        try:
+            limits = httpx.Limits(max_connections=args.clients + 1)
+            async with httpx.AsyncClient(timeout=httpx.Timeout(300.0), limits=limits) as client:
+                await wait_ready(client, base)
+                url = f"{base}/optimize/{args.process}"
+                await client.post(url)  # warm up
+                latencies: List[float] = []
+                errors: List[int] = []
+                start = time.perf_counter()
+                await asyncio.gather(*(
+                    client_loop(client, url, start + args.duration, latencies, errors)
+                    for _ in range(args.clients)
+                ))
+                elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait()
+    values = np.asarray(latencies or [np.nan])
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": np.percentile(values, 50),
+        "p99": np.percentile(values, 99),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=1, help="torch/OpenMP/BLAS threads per process")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--process", default="software_project")
+    args = parser.parse_args()
+
+    print(f"POST /optimize/{args.process}, {args.clients} clients, {args.duration:g}s per run, "
+          f"{os.cpu_count()} cores")
+    baseline = None
+    for workers in args.workers:
+        result = asyncio.run(measure(workers, args))
+        baseline = baseline or result["rps"]
+        print(f"  workers={workers:<3} {result['rps']:8.1f} req/s ({result['rps'] / baseline:4.2f}x)  "
+              f"p50={result['p50']:7.1f}ms  p99={result['p99']:7.1f}ms  errors={result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark peak memory and time of loading a large project file whole
+against streaming it into column storage
+
+Every loader runs in a fresh interpreter so each peak RSS is its own
+(read from /proc, so Linux only).
+
+Usage:
+    python benchmarks/benchmark_project_stream.py --tasks 200000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+LOADERS = {
+    "json.load + Project.from_json": "legacy",
+    "Project.from_json_file": "load_project",
+    "stream_project": "stream_project",
+}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss would carry over the parent's peak across fork and exec
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not found in /proc/self/status")
+
+
+def measure(loader: str, path: str):
+    """Load `path` once and print elapsed seconds and peak RSS growth in MB"""
+    from src.models.data_models import Project
+    from src.models.json_codec import load_project
+    from src.models.project_stream import stream_project
+
+    functions = {
+        "legacy": lambda: Project.from_json(json.load(open(path))),
+        "load_project": lambda: load_project(path),
+        "stream_project": lambda: stream_project(path),
+    }
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    project = functions[loader]()
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    assert len(project.tasks) > 0
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak - before}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--measure", nargs=2, metavar=("LOADER", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    from benchmark_list_scheduler import synthetic_project_data
+
+    data = synthetic_project_data(args.tasks, args.resources, n_levels=1000)
+    for task in data["tasks"]:
+        task["description"] = f"Synthetic work package for {task['name']}"
+    fd, path = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        del data
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"Project file: {args.tasks} tasks, {args.resources} resources, {size_mb:.1f} MB")
+        for label, loader in LOADERS.items():
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", loader, path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output)
+            print(f"  {label:<32}{result['seconds'] * 1000:8.0f} ms  peak +{result['peak_mb']:7.1f} MB")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark building and writing the analysis report in each layout and compression
+
+Usage:
+    python benchmarks/benchmark_report_writer.py --tasks 20000 --resources 50
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+from benchmark_list_scheduler import synthetic_project_data
+from src.models.data_models import Project
+from src.models.report_writer import LAYOUTS, write_report, zstd
+from src.optimization.pareto_optimizer import ParetoOptimizer
+from src.optimization.scenario_generator import ScenarioGenerator
+
+
+def legacy_report(optimizer: ParetoOptimizer, scenarios) -> dict:
+    """generate_report as it was: every section evaluates and converts anew"""
+    def entry(best):
+        return {'scenario': best[0].to_dict() if best else None, 'metrics': best[1].to_dict() if best else None}
+
+    ranked = optimizer.rank_scenarios(scenarios)
+    pareto = optimizer.find_pareto_frontier(scenarios)
+    return {
+        'summary': {
+            'total_scenarios_evaluated': len(scenarios),
+            'pareto_optimal_scenarios': len(pareto),
+            'estimated_budget': optimizer.project.metadata.estimated_budget
+        },
+        'best_scenarios': {
+            key: entry(optimizer.get_best_scenario_by_objective(scenarios, objective))
+            for key, objective in (('fastest', 'time'), ('cheapest', 'cost'),
+                                   ('highest_quality', 'quality'), ('best_balanced', 'balanced'))
+        },
+        'all_scenarios_ranked': [
+            {'rank': i + 1, 'scenario': s.to_dict(), 'metrics': m.to_dict()}
+            for i, (s, m) in enumerate(ranked)
+        ],
+        'pareto_frontier': [
+            {'scenario': s.to_dict(), 'metrics': optimizer.evaluate_scenario(s).to_dict()}
+            for s in pareto
+        ]
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--resources", type=int, default=50)
+    args = parser.parse_args()
+
+    project = Project.from_json(synthetic_project_data(args.tasks, args.resources, n_levels=200))
+    scenarios = ScenarioGenerator(project).generate_all_scenarios(include_rl=False)
+    optimizer = ParetoOptimizer(project)
+    print(f"Project: {args.tasks} tasks, {args.resources} resources, {len(scenarios)} scenarios")
+
+    _, legacy_seconds = timed(lambda: legacy_report(optimizer, scenarios))
+    report, seconds = timed(lambda: optimizer.generate_report(scenarios))
+    print(f"  build report (legacy):        {legacy_seconds * 1000:8.0f} ms")
+    print(f"  build report:                 {seconds * 1000:8.0f} ms  ({legacy_seconds / seconds:.1f}x)")
+
+    workdir = tempfile.mkdtemp()
+    try:
+        target = os.path.join(workdir, "legacy.json")
+
+        def legacy_write():
+            with open(target, 'w') as f:
+                json.dump(report, f, indent=2)
+
+        _, baseline = timed(legacy_write)
+        print(f"  json.dump(indent=2):          {baseline * 1000:8.0f} ms  {os.path.getsize(target) / 1e6:8.1f} MB")
+        for layout in LAYOUTS:
+            for suffix in ('', '.gz') + (('.zst',) if zstd is not None else ()):
+                path = os.path.join(workdir, f"report-{layout}.json{suffix}")
+                size, seconds = timed(lambda: write_report(report, path, layout=layout))
+                label = f"{layout}{suffix}:"
+                print(f"  {label:<30}{seconds * 1000:8.0f} ms  {size / 1e6:8.1f} MB  ({baseline / seconds:.1f}x)")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark loading a compiled project from a binary snapshot against
+parsing and compiling its JSON, and measure how much of a snapshot
+several worker processes share
+
+Usage:
+    python benchmarks/benchmark_snapshot.py --tasks 100000 --resources 200 --workers 4
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+
+def memory_mb() -> dict:
+    """Rss, Pss and shared/private pages of this process (Linux only)"""
+    with open("/proc/self/smaps_rollup") as f:
+        fields = dict(line.split(":", 1) for line in f if line[0].isupper())
+    kb = {name: int(value.split()[0]) for name, value in fields.items()}
+    return {
+        "rss": kb["Rss"] / 1024,
+        "pss": kb["Pss"] / 1024,
+        "shared": (kb["Shared_Clean"] + kb["Shared_Dirty"]) / 1024,
+        "private": (kb["Private_Clean"] + kb["Private_Dirty"]) / 1024,
+    }
+
+
+def worker(directory: str):
+    """Map the snapshot, read every score, then report memory once all workers have"""
+    from src.models.snapshot import load_snapshot
+
+    snapshot = load_snapshot(directory)
+    float(snapshot.index.skill_scores.sum())
+    print("ready", flush=True)
+    sys.stdin.readline()
+    print(json.dumps(memory_mb()), flush=True)
+    sys.stdin.read()
+
+
+def best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--worker", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker)
+        return
+
+    from benchmark_list_scheduler import synthetic_project_data
+    from src.models.json_codec import load_project
+    from src.models.project_index import ProjectIndex
+    from src.models.snapshot import load_scenarios, load_snapshot, save_scenarios, save_snapshot
+    from src.optimization.scenario_generator import ScenarioGenerator
+
+    workdir = tempfile.mkdtemp()
+    try:
+        source = os.path.join(workdir, "project.json")
+        with open(source, "w") as f:
+            json.dump(synthetic_project_data(args.tasks, args.resources, n_levels=500), f)
+        directory = os.path.join(workdir, "snapshot")
+        print(f"Project: {args.tasks} tasks, {args.resources} resources, "
+              f"{os.path.getsize(source) / 1e6:.1f} MB JSON")
+
+        start = time.perf_counter()
+        project = load_project(source)
+        index = ProjectIndex.from_project(project)
+        compiled = time.perf_counter() - start
+        generator = ScenarioGenerator(project, index=index)
+        start = time.perf_counter()
+        scenarios = [generator.generate_parallel_scenario(), generator.generate_cost_optimized_scenario()]
+        generated = time.perf_counter() - start
+
+        start = time.perf_counter()
+        save_snapshot(directory, project, index, source_path=source)
+        save_scenarios(directory, "default", scenarios)
+        saved = time.perf_counter() - start
+        size_mb = sum(path.stat().st_size for path in Path(directory).rglob("*") if path.is_file()) / 1e6
+
+        loaded = best_of(args.repeats, lambda: load_snapshot(directory))
+        loaded_scenarios = best_of(args.repeats, lambda: load_scenarios(directory, "default"))
+        print(f"  parse JSON + compile index:   {compiled * 1000:8.0f} ms")
+        print(f"  generate 2 heuristic scenarios: {generated * 1000:6.0f} ms")
+        print(f"  write snapshot:               {saved * 1000:8.0f} ms  ({size_mb:.1f} MB)")
+        print(f"  load snapshot:                {loaded * 1000:8.0f} ms  ({compiled / loaded:.0f}x)")
+        print(f"  load 2 scenarios:             {loaded_scenarios * 1000:8.0f} ms  ({generated / loaded_scenarios:.1f}x)")
+
+        # Workers that all map the same snapshot share its pages
+        processes = [
+            subprocess.Popen([sys.executable, __file__, "--worker", directory],
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            for _ in range(args.workers)
+        ]
+        for process in processes:
+            assert process.stdout.readline().strip() == "ready"
+        # Every worker still holds its mapping while any of them reports
+        for process in processes:
+            process.stdin.write("\n")
+            process.stdin.flush()
+        reports = [json.loads(process.stdout.readline()) for process in processes]
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+        print(f"  {args.workers} workers mapping the snapshot (MB per worker):")
+        for k, report in enumerate(reports):
+            print(f"    worker {k}: rss {report['rss']:7.1f}  pss {report['pss']:7.1f}  "
+                  f"shared {report['shared']:7.1f}  private {report['private']:7.1f}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
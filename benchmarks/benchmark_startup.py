@@ -0,0 +1,90 @@
+"""
+Benchmark import time and memory of the API and CLI entry points
+
+Each module is imported in a fresh interpreter under `python -X importtime`.
+The run fails (exit status 1) when an import exceeds its time or RSS
+threshold, or loads torch, gymnasium or matplotlib, which only RL runs
+and plotting need.
+
+Usage:
+    python benchmarks/benchmark_startup.py
+    python benchmarks/benchmark_startup.py --scale 2   # slower machine
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Module -> (max import ms, max RSS MB) on one core of a typical server
+THRESHOLDS = {
+    "api.main": (1500, 160),
+    "main": (600, 120),
+    "src.optimization.scenario_generator": (400, 90),
+    "src.optimization.pareto_optimizer": (400, 90),
+}
+HEAVY_MODULES = ("torch", "gymnasium", "gym", "matplotlib")
+
+REPORT_RSS = (
+    "import sys\n"
+    "with open('/proc/self/status') as f:\n"
+    "    rss = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))\n"
+    "print(rss / 1024)\n"
+)
+
+
+def measure(module: str) -> dict:
+    """Import time (ms), RSS (MB) and heavy modules loaded by importing `module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}\n{REPORT_RSS}"],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    )
+    total_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):  # top-level import, not a nested one
+            total_us += int(cumulative)
+        loaded.add(name.strip().split(".")[0])
+    return {
+        "ms": total_us / 1000,
+        "rss_mb": float(result.stdout.strip().splitlines()[-1]),
+        "heavy": sorted(loaded.intersection(HEAVY_MODULES)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the time thresholds by this")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<38}{'import':>10}{'limit':>8}{'RSS':>10}{'limit':>8}  heavy modules")
+    for module, (max_ms, max_rss) in THRESHOLDS.items():
+        runs = [measure(module) for _ in range(args.repeats)]
+        best = min(runs, key=lambda run: run["ms"])
+        limit_ms = max_ms * args.scale
+        heavy = sorted(set().union(*(run["heavy"] for run in runs)))
+        print(f"{module:<38}{best['ms']:8.0f}ms{limit_ms:6.0f}ms{best['rss_mb']:8.1f}MB{max_rss:6.0f}MB  "
+              f"{', '.join(heavy) or '-'}")
+        if best["ms"] > limit_ms:
+            failures.append(f"{module} imports in {best['ms']:.0f} ms (limit {limit_ms:.0f} ms)")
+        if best["rss_mb"] > max_rss:
+            failures.append(f"{module} uses {best['rss_mb']:.1f} MB after import (limit {max_rss} MB)")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)}")
+
+    if failures:
+        print("\nStartup regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nAll imports within thresholds")
+
+
+if __name__ == "__main__":
+    main()
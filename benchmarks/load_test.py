@@ -0,0 +1,155 @@
+"""
+Load test: latency of lightweight endpoints while heavy optimizations run
+
+Probes lightweight endpoints at a fixed rate, first on an idle server and
+then while `--heavy` clients keep the optimization endpoints busy, and
+reports p50/p99 latency for both phases. Without `--url` a local uvicorn
+server is started for the run.
+
+Usage:
+    python benchmarks/load_test.py --duration 10 --heavy 4
+    python benchmarks/load_test.py --url http://localhost:8002 --probe / --probe /processes
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY_REQUESTS = {
+    "optimize": ("POST", "/optimize/software_project", {}),
+    "sweep": ("POST", "/optimize/sweep", {
+        "process_name": "software_project",
+        "parameters": [
+            {"field": "hourly_rate", "low": 30, "high": 120, "steps": 8},
+            {"field": "duration_hours", "low": 0.7, "high": 1.5, "steps": 8, "mode": "scale"}
+        ],
+        "workers": 1
+    }),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: Optional[int]) -> subprocess.Popen:
+    env = dict(os.environ)
+    if workers:
+        env["WHATIF_COMPUTE_WORKERS"] = str(workers)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get(url + "/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+
+async def probe(client: httpx.AsyncClient, url: str, paths: List[str], rate: float,
+                duration: float) -> List[float]:
+    """Latencies in ms of GET requests sent every 1/rate seconds"""
+    latencies = []
+    interval = 1.0 / rate
+    end = time.perf_counter() + duration
+    k = 0
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        await client.get(url + paths[k % len(paths)])
+        latencies.append((time.perf_counter() - start) * 1000)
+        k += 1
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - start)))
+    return latencies
+
+
+async def heavy_client(client: httpx.AsyncClient, url: str, kind: str, stop: asyncio.Event,
+                       counts: Dict[int, int]):
+    method, path, body = HEAVY_REQUESTS[kind]
+    while not stop.is_set():
+        response = await client.request(method, url + path, json=body)
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        if response.status_code == 503:
+            await asyncio.sleep(0.1)
+
+
+def summarize(name: str, latencies: List[float]):
+    values = np.asarray(latencies)
+    print(f"  {name:<8} n={len(values):<5} p50={np.percentile(values, 50):7.2f}ms  "
+          f"p99={np.percentile(values, 99):7.2f}ms  max={values.max():7.2f}ms")
+
+
+async def run(args):
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = start_server(port, args.compute_workers)
+
+    timeout = httpx.Timeout(300.0)
+    limits = httpx.Limits(max_connections=args.heavy + 8)
+    try:
+        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            await wait_ready(client, url)
+            paths = args.probe or ["/"]
+
+            idle = await probe(client, url, paths, args.rate, args.duration)
+
+            stop = asyncio.Event()
+            counts: Dict[int, int] = {}
+            heavy = [
+                asyncio.create_task(heavy_client(client, url, args.kind, stop, counts))
+                for _ in range(args.heavy)
+            ]
+            await asyncio.sleep(0.5)  # let the heavy requests get going
+            loaded = await probe(client, url, paths, args.rate, args.duration)
+            stop.set()
+            await asyncio.gather(*heavy)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"Probing {', '.join(paths)} at {args.rate:g}/s for {args.duration:g}s per phase")
+    summarize("idle", idle)
+    summarize("loaded", loaded)
+    print(f"  heavy '{args.kind}' responses over the loaded phase: "
+          + ", ".join(f"{status}: {n}" for status, n in sorted(counts.items())))
+    ratio = np.percentile(loaded, 99) / max(np.percentile(idle, 99), 1e-9)
+    print(f"  p99 loaded/idle: {ratio:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of lightweight endpoints under optimization load")
+    parser.add_argument("--url", help="Running server; a local one is started when omitted")
+    parser.add_argument("--probe", action="append", help="Lightweight path to probe (repeatable)")
+    parser.add_argument("--rate", type=float, default=20.0, help="Probe requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per phase")
+    parser.add_argument("--heavy", type=int, default=4, help="Concurrent heavy clients")
+    parser.add_argument("--kind", choices=sorted(HEAVY_REQUESTS), default="sweep")
+    parser.add_argument("--compute-workers", type=int, help="Compute pool size of the local server")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
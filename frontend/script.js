@@ -1,6 +1,61 @@
 // Script updated: 2025-09-08 04:11:00 - Force reload
 console.log('JavaScript file loaded at:', new Date().toISOString());
 console.log('Cache buster active - file should be fresh');
+
+// Decoder for `?format=compact` responses (see src/models/scenario_codec.py).
+// Scenarios arrive as id tables plus columnar or baseline-delta assignments
+// and are expanded back into the regular response shape.
+function decodeCompactColumns(columns, tasks, resources) {
+    const assignments = new Array(columns.task.length);
+    for (let i = 0; i < columns.task.length; i++) {
+        assignments[i] = {
+            task_id: tasks[columns.task[i]],
+            resource_id: resources[columns.resource[i]],
+            start_time: columns.start[i],
+            end_time: columns.end[i],
+            hours_allocated: columns.hours[i]
+        };
+    }
+    return assignments;
+}
+
+function decodeCompactScenario(encoded, tasks, resources, baseAssignments) {
+    const { columns, delta, ...scenario } = encoded;
+    let assignments;
+    if (columns) {
+        assignments = decodeCompactColumns(columns, tasks, resources);
+    } else {
+        const byTask = new Map(baseAssignments.map(a => [a.task_id, a]));
+        delta.removed.forEach(task => byTask.delete(tasks[task]));
+        const changed = decodeCompactColumns(delta.changed, tasks, resources);
+        const newIds = changed.filter(a => !byTask.has(a.task_id)).map(a => a.task_id);
+        changed.forEach(a => byTask.set(a.task_id, a));
+        const order = delta.order
+            ? delta.order.map(task => tasks[task])
+            : baseAssignments.map(a => a.task_id).filter(id => byTask.has(id)).concat(newIds);
+        assignments = order.map(id => ({ ...byTask.get(id) }));
+    }
+    return { ...scenario, assignments };
+}
+
+function decodeCompactResponse(result) {
+    if (!result || result.format !== 'compact-v1') {
+        return result;
+    }
+    const { format, tasks, resources, baseline, ...rest } = result;
+    const decodedBaseline = decodeCompactScenario(baseline, tasks, resources, null);
+    const decode = encoded => decodeCompactScenario(encoded, tasks, resources, decodedBaseline.assignments);
+
+    if (rest.all_scenarios) {
+        // /optimize/{process_name}
+        const { best_scenario_index, ...others } = rest;
+        const allScenarios = rest.all_scenarios.map(entry => ({ ...entry, scenario: decode(entry.scenario) }));
+        return { ...others, all_scenarios: allScenarios, best_scenario: allScenarios[best_scenario_index] };
+    }
+    // /optimize/cms-process/{process_id}
+    return { ...rest, baseline: decodedBaseline, scenarios: rest.scenarios.map(decode) };
+}
+
 class WhatIfDashboard {
     constructor() {
         console.log('WhatIfDashboard constructor called - script loaded successfully');
@@ -12,6 +67,8 @@ class WhatIfDashboard {
         this.impactPreviewScenario = null; // Separate scenario for Impact Preview
         this.projectData = null;
         this.constraints = null;
+        // Lets the API keep our last schedule and only recompute what an edit affects
+        this.customSessionId = `session-${Date.now()}-${Math.random().toString(36).slice(2, 10)}`;
         
         this.initializeEventListeners();
         this.authenticateAndLoadProcesses();
@@ -184,8 +241,14 @@ class WhatIfDashboard {
         // Show loading
         document.getElementById('loadingSpinner').classList.remove('hidden');
         document.getElementById('optimizeBtn').disabled = true;
-        
+
         try {
+            // Stream scenarios as they are generated; fall back to the single
+            // POST below when the stream is unavailable
+            if (window.EventSource && await this.streamOptimization(selectedOption)) {
+                return;
+            }
+
             let response;
             
             // Check if this is a CMS process (has process_data)
@@ -197,7 +260,7 @@ class WhatIfDashboard {
                 console.log('Making CMS API call to:', `${this.apiBaseUrl}/optimize/cms-process/${processId}`);
                 console.log('Process data:', processData);
                 
-                response = await fetch(`${this.apiBaseUrl}/optimize/cms-process/${processId}`, {
+                response = await fetch(`${this.apiBaseUrl}/optimize/cms-process/${processId}?format=compact`, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -205,7 +268,7 @@ class WhatIfDashboard {
                 });
             } else {
                 // Use standard endpoint for local processes
-                response = await fetch(`${this.apiBaseUrl}/optimize/${selectedOption.value}`, {
+                response = await fetch(`${this.apiBaseUrl}/optimize/${selectedOption.value}?format=compact`, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -223,7 +286,7 @@ class WhatIfDashboard {
                 
                 let result;
                 try {
-                    result = JSON.parse(responseText);
+                    result = decodeCompactResponse(JSON.parse(responseText));
                     console.log('Parsed API Response data:', result);
                 } catch (parseError) {
                     console.error('JSON parse error:', parseError);
@@ -259,11 +322,92 @@ class WhatIfDashboard {
             console.error('Response object:', typeof response !== 'undefined' ? response : 'undefined');
             alert(`Error optimizing process: ${error.message}. Check console for details.`);
         } finally {
-            document.getElementById('loadingSpinner').classList.add('hidden');
+            const spinner = document.getElementById('loadingSpinner');
+            spinner.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Analyzing scenarios...';
+            spinner.classList.add('hidden');
             document.getElementById('optimizeBtn').disabled = false;
         }
     }
-    
+
+    streamOptimization(selectedOption) {
+        // Server-Sent Events from /optimize/.../stream: the display is updated
+        // after every `scenario` event instead of after the whole set.
+        // Resolves false when nothing arrived, so the caller can fall back.
+        let url;
+        const isCMS = Boolean(selectedOption.dataset.processData);
+        if (isCMS) {
+            const processData = JSON.parse(selectedOption.dataset.processData);
+            const processId = processData.process_id || processData.id || selectedOption.value;
+            url = `${this.apiBaseUrl}/optimize/cms-process/${processId}/stream`;
+        } else {
+            url = `${this.apiBaseUrl}/optimize/${selectedOption.value}/stream`;
+        }
+        console.log('Streaming optimization from:', url);
+
+        const spinner = document.getElementById('loadingSpinner');
+        const entries = [];
+        let expected = null;
+        let best = null;
+
+        return new Promise(resolve => {
+            const source = new EventSource(url);
+            const finish = streamed => {
+                source.close();
+                resolve(streamed);
+            };
+
+            source.addEventListener('start', event => {
+                expected = JSON.parse(event.data).expected_scenarios || null;
+            });
+
+            source.addEventListener('scenario', event => {
+                const entry = JSON.parse(event.data);
+                entries.push(entry);
+                spinner.innerHTML = `<i class="fas fa-spinner fa-spin"></i> Analyzing scenarios... (${entries.length}${expected ? '/' + expected : ''})`;
+
+                if (isCMS) {
+                    const scenarios = entries.map(e => e.scenario);
+                    this.displayCMSScenarios({ scenarios, baseline: scenarios[0] });
+                } else if (!best || entry.metrics.overall_score > best.metrics.overall_score) {
+                    best = { scenario: entry.scenario, metrics: entry.metrics };
+                    this.displayScenario(best);
+                    this.originalScenario = best;
+                    this.currentScenario = best;
+                }
+            });
+
+            source.addEventListener('summary', event => {
+                const summary = JSON.parse(event.data);
+                console.log('Stream summary:', summary);
+                if (isCMS) {
+                    const scenarios = entries.map(e => e.scenario);
+                    const baseline = scenarios.find(s => s.id === summary.baseline_id) || scenarios[0];
+                    this.displayCMSScenarios({ scenarios, baseline, process_info: summary.process_info });
+                } else {
+                    const chosen = entries.find(e => e.scenario.id === summary.best_scenario_id);
+                    if (chosen && chosen !== best) {
+                        best = { scenario: chosen.scenario, metrics: chosen.metrics };
+                        this.displayScenario(best);
+                        this.originalScenario = best;
+                        this.currentScenario = best;
+                    }
+                    this.allScenarios = entries;
+                }
+                finish(true);
+            });
+
+            // `error` is both the server's event and the transport failure
+            source.addEventListener('error', event => {
+                if (event.data) {
+                    console.error('Stream error:', JSON.parse(event.data).detail);
+                } else {
+                    console.warn('Stream connection failed');
+                }
+                finish(entries.length > 0);
+            });
+        });
+    }
+
     displayCMSScenarios(result) {
         // Display the best scenario from CMS results
         const bestScenario = result.scenarios.reduce((best, current) => {
@@ -1024,6 +1168,7 @@ class WhatIfDashboard {
         
         // Collect current constraint values
         const updatedConstraints = this.collectConstraints();
+        updatedConstraints.session_id = this.customSessionId;
         
         try {
             // Call API to re-optimize with new constraints
@@ -1,17 +1,28 @@
 """
 Main execution script for RL-based What-If Analysis Agent
 """
-import json
 import argparse
+import asyncio
 import os
+import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
 from src.models.data_models import Project
+from src.models.json_codec import load_project
+from src.models.project_stream import stream_project
+from src.models.report_writer import COMPRESSIONS, LAYOUTS, write_report
+from src.models.snapshot import (
+    load_scenarios, load_snapshot, save_scenarios, save_snapshot, snapshot_is_current
+)
 from src.optimization.scenario_generator import ScenarioGenerator
-from src.optimization.pareto_optimizer import ParetoOptimizer
+from src.optimization.pareto_optimizer import REPORT_SECTIONS, ParetoOptimizer
+from src.optimization.monte_carlo import DurationModel
+from src.services.bulk_optimization import list_process_ids, run_bulk
+from src.services.cms_client import CMSClient, CMSConfig
+from src.services.compute_pool import ComputePool
 
 
 def print_scenario_summary(title: str, metrics: Dict[str, Any]):
@@ -20,10 +31,14 @@ def print_scenario_summary(title: str, metrics: Dict[str, Any]):
     print(f"    Duration: {metrics['total_time_days']:.1f} days")
     print(f"    Cost: ${metrics['total_cost']:,.2f}")
     print(f"    Quality: {metrics['quality_score']:.2%}")
+    if 'time_p80_days' in metrics:
+        print(f"    Risk (P50/P80/P95): {metrics['time_p50_days']:.1f} / "
+              f"{metrics['time_p80_days']:.1f} / {metrics['time_p95_days']:.1f} days, "
+              f"${metrics['cost_p50']:,.0f} / ${metrics['cost_p80']:,.0f} / ${metrics['cost_p95']:,.0f}")
     print(f"    Constraints Met: {'Yes' if metrics.get('constraints_satisfied', True) else 'No'}")
 
 
-def print_allocation_details(scenario: Dict[str, Any], project_data: Dict):
+def print_allocation_details(scenario: Dict[str, Any], project: Project):
     """Print detailed resource-to-task allocation"""
     print("\n    Resource Allocation Details:")
     print("    " + "-" * 70)
@@ -31,8 +46,8 @@ def print_allocation_details(scenario: Dict[str, Any], project_data: Dict):
     print("    " + "-" * 70)
     
     # Create lookup dictionaries
-    tasks = {t['id']: t['name'] for t in project_data['tasks']}
-    resources = {r['id']: r for r in project_data['resources']}
+    tasks = {t.id: t.name for t in project.tasks}
+    resources = {r.id: r for r in project.resources}
     
     # Get assignments from scenario
     assignments = scenario.get('assignments', [])
@@ -56,9 +71,9 @@ def print_allocation_details(scenario: Dict[str, Any], project_data: Dict):
             hours = getattr(assignment, 'hours_allocated', 0)
         
         task_name = tasks.get(task_id, task_id or 'Unknown')
-        resource = resources.get(resource_id, {})
-        resource_name = resource.get('name', resource_id or 'Unknown')
-        cost = hours * resource.get('hourly_rate', 0)
+        resource = resources.get(resource_id)
+        resource_name = resource.name if resource else resource_id or 'Unknown'
+        cost = hours * (resource.hourly_rate if resource else 0)
         total_cost += cost
         total_hours += hours
         
@@ -74,7 +89,10 @@ def print_allocation_details(scenario: Dict[str, Any], project_data: Dict):
     print(f"    Total Work Days: {total_days:.1f} days | Total Cost: ${total_cost:,.0f}")
 
 
-def run_analysis(json_file_path: str, include_rl: bool = True, visualize: bool = False):
+def run_analysis(json_file_path: str, include_rl: bool = True, visualize: bool = False,
+                 capacity_aware: bool = False, uncertainty_samples: int = 0, stream: bool = False,
+                 snapshot_dir: Optional[str] = None, report_layout: str = 'full',
+                 report_compression: Optional[str] = None):
     """
     Run complete what-if analysis on project data
     
@@ -82,19 +100,27 @@ def run_analysis(json_file_path: str, include_rl: bool = True, visualize: bool =
         json_file_path: Path to JSON file with project data
         include_rl: Whether to include RL-optimized scenarios
         visualize: Whether to generate visualization plots
+        capacity_aware: Respect each resource's max_hours_per_day in the heuristics
+        uncertainty_samples: Monte Carlo samples of task durations per scenario (0 disables)
+        stream: Parse the file incrementally into compact column storage
+        snapshot_dir: Binary snapshot to reuse the compiled project and scenarios
+            from while it matches the JSON file, and to write otherwise
+        report_layout: 'full', or 'referenced'/'columnar' to store each scenario once
+        report_compression: 'gzip' or 'zstd' to compress the saved report
     """
     print("\n" + "="*80)
     print("  RL-BASED WHAT-IF ANALYSIS AGENT FOR PROCESS OPTIMIZATION")
     print("="*80)
     
     # Load project data
-    print(f"\n[Loading] Project data from: {json_file_path}")
-    project = Project.from_json_file(json_file_path)
-    
-    # Load raw JSON data for allocation details
-    import json
-    with open(json_file_path, 'r') as f:
-        project_data = json.load(f)
+    snapshot = None
+    if snapshot_dir and snapshot_is_current(snapshot_dir, json_file_path):
+        print(f"\n[Loading] Project snapshot from: {snapshot_dir}")
+        snapshot = load_snapshot(snapshot_dir)
+        project = snapshot.project
+    else:
+        print(f"\n[Loading] Project data from: {json_file_path}")
+        project = stream_project(json_file_path) if stream else load_project(json_file_path)
     
     print(f"\n[Project Overview]")
     print(f"  - Name: {project.name}")
@@ -104,30 +130,53 @@ def run_analysis(json_file_path: str, include_rl: bool = True, visualize: bool =
     
     # Generate scenarios
     print("\n[Generating What-If Scenarios]")
-    generator = ScenarioGenerator(project)
-    
-    print("  > Generating baseline scenario...")
-    print("  > Generating parallel execution scenario...")
-    print("  > Generating cost-optimized scenario...")
-    print("  > Generating balanced scenario...")
-    
-    if include_rl:
-        print("  > Training RL agents for optimization...")
+    generator = ScenarioGenerator(
+        project,
+        capacity_aware=capacity_aware,
+        index=snapshot.index if snapshot else None
+    )
     
-    scenarios = generator.generate_all_scenarios(include_rl=include_rl)
-    print(f"\n[Success] Generated {len(scenarios)} scenarios")
+    # Scenarios depend on the generation options as well as the project
+    scenario_key = f"{'capacity' if capacity_aware else 'default'}-{'rl' if include_rl else 'no-rl'}"
+    scenarios = load_scenarios(snapshot_dir, scenario_key) if snapshot else None
+    if scenarios is not None:
+        print(f"  > Reusing {len(scenarios)} scenarios from the snapshot")
+    else:
+        print("  > Generating baseline scenario...")
+        print("  > Generating parallel execution scenario...")
+        print("  > Generating cost-optimized scenario...")
+        print("  > Generating balanced scenario...")
+        
+        if include_rl:
+            print("  > Training RL agents for optimization...")
+        
+        scenarios = generator.generate_all_scenarios(include_rl=include_rl)
+        print(f"\n[Success] Generated {len(scenarios)} scenarios")
+        
+        if snapshot_dir:
+            if snapshot is None:
+                save_snapshot(snapshot_dir, project, generator.index, source_path=json_file_path)
+            save_scenarios(snapshot_dir, scenario_key, scenarios)
+            print(f"  - Saved snapshot to: {snapshot_dir}")
     
     # Evaluate scenarios
     print("\n[Evaluating] Scenarios with Pareto Optimization...")
-    optimizer = ParetoOptimizer(project)
+    if uncertainty_samples > 0:
+        optimizer = ParetoOptimizer(
+            project,
+            uncertainty=DurationModel(),
+            uncertainty_samples=uncertainty_samples
+        )
+    else:
+        optimizer = ParetoOptimizer(project)
+    
+    # Report sections are computed on first use from one evaluation of each scenario
+    report = optimizer.report(scenarios)
     
     # Find Pareto frontier
-    pareto_scenarios = optimizer.find_pareto_frontier(scenarios)
+    pareto_scenarios = report.pareto
     print(f"  - Found {len(pareto_scenarios)} Pareto-optimal scenarios")
     
-    # Generate report
-    report = optimizer.generate_report(scenarios)
-    
     # Display results
     print("\n" + "="*80)
     print("  OPTIMIZATION RESULTS")
@@ -143,7 +192,7 @@ def run_analysis(json_file_path: str, include_rl: bool = True, visualize: bool =
         )
         print_allocation_details(
             report['best_scenarios']['fastest']['scenario'],
-            project_data
+            project
         )
     
     # Best Cost
@@ -154,7 +203,7 @@ def run_analysis(json_file_path: str, include_rl: bool = True, visualize: bool =
         )
         print_allocation_details(
             report['best_scenarios']['cheapest']['scenario'],
-            project_data
+            project
         )
     
     # Best Quality
@@ -165,7 +214,7 @@ def run_analysis(json_file_path: str, include_rl: bool = True, visualize: bool =
         )
         print_allocation_details(
             report['best_scenarios']['highest_quality']['scenario'],
-            project_data
+            project
         )
     
     # Best Balanced
@@ -176,7 +225,7 @@ def run_analysis(json_file_path: str, include_rl: bool = True, visualize: bool =
         )
         print_allocation_details(
             report['best_scenarios']['best_balanced']['scenario'],
-            project_data
+            project
         )
     
     # Pareto Frontier
@@ -239,28 +288,129 @@ def run_analysis(json_file_path: str, include_rl: bool = True, visualize: bool =
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
     
-    report_file = output_dir / "analysis_report.json"
-    with open(report_file, 'w') as f:
-        json.dump(report, f, indent=2)
+    suffix = {compression: suffix for suffix, compression in COMPRESSIONS.items()}.get(report_compression, '')
+    report_file = output_dir / f"analysis_report.json{suffix}"
+    report_data = report.to_dict(REPORT_SECTIONS)
+    write_report(report_data, str(report_file), layout=report_layout, compression=report_compression)
     
     print(f"\n[Saved] Full report to: {report_file}")
     
-    # Visualize if requested
+    # Visualize if requested, finishing in the background
     if visualize:
         print("\n[Generating] Visualization...")
         viz_file = output_dir / "pareto_frontier.png"
-        optimizer.visualize_pareto_frontier(scenarios, save_path=str(viz_file))
-        print(f"   Visualization saved to: {viz_file}")
+        plot = optimizer.visualize_pareto_frontier(
+            scenarios, save_path=str(viz_file), report=report, background=True
+        )
+        if plot is not None:
+            plot.add_done_callback(lambda done: print(
+                f"   Visualization saved to: {viz_file}" if done.exception() is None
+                else f"[Error] During visualization: {done.exception()}"
+            ))
     
     print("\n" + "="*80)
     print("  ANALYSIS COMPLETE")
     print("="*80)
     
-    return report
+    return report_data
+
+
+async def run_bulk_optimization(args) -> None:
+    """Optimize CMS processes into a JSONL file, printing progress and throughput"""
+    client = CMSClient(CMSConfig.from_env())
+    pool = ComputePool(workers=args.workers, niceness=0)
+    try:
+        if args.process_ids:
+            process_ids = args.process_ids
+        else:
+            print(f"\n[Listing] CMS processes{' of ' + args.company if args.company else ''}...")
+            process_ids = await list_process_ids(client, args.company)
+        print(f"[Bulk] {len(process_ids)} processes -> {args.output} "
+              f"({pool.workers} workers, {args.fetch_concurrency} concurrent fetches)")
+        
+        def report(record, summary):
+            status = 'ok' if record['status'] == 'ok' else f"error: {record['error']}"
+            print(f"  [{summary.processed}/{summary.total - summary.skipped}] "
+                  f"process {record['process_id']} {status} ({record['elapsed_ms']:.0f} ms)")
+        
+        summary = await run_bulk(
+            client, pool, process_ids, args.output,
+            response_format=args.format,
+            fetch_concurrency=args.fetch_concurrency,
+            resume=not args.no_resume,
+            on_record=report
+        )
+    finally:
+        pool.shutdown()
+        await client.aclose()
+    
+    if summary.skipped:
+        print(f"\n[Resumed] Skipped {summary.skipped} processes already in {args.output}")
+    print(f"[Done] {summary.succeeded} succeeded, {summary.failed} failed in "
+          f"{summary.elapsed_seconds:.1f}s ({summary.processes_per_second:.2f} processes/sec)")
+
+
+def bulk_main(argv):
+    """Entry point of `python main.py bulk ...`"""
+    parser = argparse.ArgumentParser(
+        prog="main.py bulk",
+        description="Optimize many CMS processes at once into a resumable JSONL file"
+    )
+    parser.add_argument(
+        "--output",
+        default="output/bulk_results.jsonl",
+        help="JSONL file with one record per process (default: output/bulk_results.jsonl)"
+    )
+    parser.add_argument(
+        "--process-id",
+        dest="process_ids",
+        type=int,
+        action="append",
+        help="CMS process to optimize; repeat for several (default: every process)"
+    )
+    parser.add_argument(
+        "--company",
+        help="Only optimize processes of this company"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Optimization worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--fetch-concurrency",
+        type=int,
+        default=8,
+        help="CMS requests in flight at once (default: 8)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["full", "compact"],
+        default="full",
+        help="Scenario encoding of each record (default: full)"
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Start the output file over instead of skipping processes already in it"
+    )
+    
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run_bulk_optimization(args))
+    except KeyboardInterrupt:
+        print(f"\n[Interrupted] Run again to resume from {args.output}")
+    except Exception as e:
+        print(f"\n[Error] During bulk optimization: {str(e)}")
 
 
 def main():
     """Main entry point"""
+    if len(sys.argv) > 1 and sys.argv[1] == "bulk":
+        bulk_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         description="RL-based What-If Analysis Agent for Process Optimization"
     )
@@ -280,6 +430,40 @@ def main():
         action="store_true",
         help="Generate visualization plots"
     )
+    parser.add_argument(
+        "--capacity-aware",
+        action="store_true",
+        help="Schedule on resource calendars that respect max hours per day"
+    )
+    parser.add_argument(
+        "--uncertainty-samples",
+        type=int,
+        default=0,
+        help="Monte Carlo samples of task durations per scenario for P50/P80/P95 risk (default: off)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse the project file incrementally into compact storage, for files too large to load whole"
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="DIR",
+        help="Reuse the compiled project and scenarios saved in DIR while they match the JSON file; "
+             "save them there otherwise"
+    )
+    
+    parser.add_argument(
+        "--report-layout",
+        choices=LAYOUTS,
+        default="full",
+        help="Layout of the saved report: 'referenced' and 'columnar' store each scenario once (default: full)"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=sorted(COMPRESSIONS.values()),
+        help="Compress the saved report (zstd needs Python 3.14 or the zstandard package)"
+    )
     
     args = parser.parse_args()
     
@@ -293,7 +477,13 @@ def main():
         run_analysis(
             args.json_file,
             include_rl=not args.no_rl,
-            visualize=args.visualize
+            visualize=args.visualize,
+            capacity_aware=args.capacity_aware,
+            uncertainty_samples=args.uncertainty_samples,
+            stream=args.stream,
+            snapshot_dir=args.snapshot,
+            report_layout=args.report_layout,
+            report_compression=args.compress
         )
     except Exception as e:
         print(f"\n[Error] During analysis: {str(e)}")
@@ -4,17 +4,16 @@ Reinforcement Learning Environment for Task Scheduling Optimization
 import numpy as np
 from typing import List, Dict, Tuple, Optional, Any
 from dataclasses import dataclass
+import heapq
+import math
 
 import gymnasium as gym
 from gymnasium import spaces
 from copy import deepcopy
 import random
 
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
-
-from models.data_models import Project, Task, Resource, TaskAssignment, Scenario
+from src.models.data_models import Project, Task, Resource, TaskAssignment, Scenario
+from src.models.project_index import ProjectIndex
 
 
 class TaskSchedulingEnv(gym.Env):
@@ -24,24 +23,51 @@ class TaskSchedulingEnv(gym.Env):
     State: Current assignments, resource availability, task completion status
     Action: Assign resource to task or skip
     Reward: Based on time, cost, and constraint satisfaction
+    
+    Time model: by default the environment is event driven. Every assignment
+    schedules a release event on a heap and the clock jumps straight to the
+    next release (or to the next working day when resources are out of daily
+    hours), so the number of steps per episode scales with the number of
+    tasks instead of with the calendar length. Actions that cannot start at
+    the current time are mapped to the nearest assignable task-resource pair,
+    so every step either starts work or moves the clock. Passing
+    ``event_driven=False`` restores the legacy model that ticks forward one
+    8-hour day at a time.
     """
     
-    def __init__(self, project: Project, optimization_mode: str = 'balanced'):
+    HOURS_PER_DAY = 8.0
+    
+    def __init__(self, project: Project, optimization_mode: str = 'balanced', event_driven: bool = True):
         """
         Initialize the environment
         
         Args:
             project: Project data
             optimization_mode: 'time', 'cost', or 'balanced'
+            event_driven: Use the event-queue time model instead of fixed daily ticks
         """
         super().__init__()
         self.project = project
         self.optimization_mode = optimization_mode
+        self.event_driven = event_driven
         
         # Define action and observation spaces
         self.n_tasks = len(project.tasks)
         self.n_resources = len(project.resources)
         
+        # Lookup tables so that steps do not rescan the project lists
+        self._task_by_id = {task.id: task for task in project.tasks}
+        self._resource_by_id = {res.id: res for res in project.resources}
+        self._sorted_tasks = sorted(project.tasks, key=lambda t: t.id)
+        self._sorted_resources = sorted(project.resources, key=lambda r: r.id)
+        self._capable_resources = {
+            task.id: [res.id for res in project.resources if res.available and task.can_be_done_by(res)]
+            for task in project.tasks
+        }
+        self._task_position = {task.id: i for i, task in enumerate(project.tasks)}
+        self._resource_index = {res.id: i for i, res in enumerate(project.resources)}
+        self._graph = ProjectIndex.from_project(project).graph
+        
         # Action space: (task_id, resource_id, hours_to_allocate)
         # Simplified: discrete choice of task-resource pairs plus no-op
         self.action_space = spaces.Discrete(self.n_tasks * self.n_resources + 1)
@@ -52,6 +78,9 @@ class TaskSchedulingEnv(gym.Env):
             low=0, high=1, shape=(obs_dim,), dtype=np.float32
         )
         
+        # Episode length limit for agents
+        self.max_steps = max(100, 4 * self.n_tasks)
+        
         # Initialize state
         self.reset()
     
@@ -64,6 +93,15 @@ class TaskSchedulingEnv(gym.Env):
         self.resource_availability = {res.id: res.max_hours_per_day for res in self.project.resources}
         self.resource_daily_hours = {res.id: 0.0 for res in self.project.resources}
         self.completed_tasks = set()
+        self._pending_predecessors = [len(preds) for preds in self._graph.predecessors]
+        
+        # Event-driven state: pending release events and what they hold
+        self._events = []  # heap of (time, sequence, resource_id, task_id)
+        self._event_seq = 0
+        self._busy_resources = set()
+        self._running_tasks = set()
+        self._current_day = 0
+        self._stalled = False
         
         return self._get_observation()
     
@@ -72,14 +110,16 @@ class TaskSchedulingEnv(gym.Env):
         obs = []
         
         # Task completion status
-        for task in sorted(self.project.tasks, key=lambda t: t.id):
+        for task in self._sorted_tasks:
             obs.append(self.task_completion[task.id])
             # Task order as priority proxy
             obs.append(1.0 / (task.order + 1))  # Earlier tasks have higher priority
         
         # Resource availability and efficiency
-        for resource in sorted(self.project.resources, key=lambda r: r.id):
-            obs.append(self.resource_availability[resource.id] / 8.0)  # Normalize
+        for resource in self._sorted_resources:
+            # A resource that is still busy with an earlier assignment is unavailable
+            availability = 0.0 if resource.id in self._busy_resources else self.resource_availability[resource.id]
+            obs.append(availability / 8.0)  # Normalize
             obs.append(resource.hourly_rate / 200.0)  # Normalize cost
         
         # Time and cost progress with constraint ratios
@@ -213,52 +253,74 @@ class TaskSchedulingEnv(gym.Env):
         decoded = self._decode_action(action)
         action_taken = False
         
+        if self.event_driven and not self._is_executable(decoded):
+            # Invalid actions are not free: they start the closest valid
+            # assignment instead, or wait when nothing can start
+            decoded = self._nearest_assignable(action)
+        
         if decoded:
             task_id, resource_id = decoded
             
             # Check if action is valid
-            task = next((t for t in self.project.tasks if t.id == task_id), None)
-            resource = next((r for r in self.project.resources if r.id == resource_id), None)
+            task = self._task_by_id.get(task_id)
+            resource = self._resource_by_id.get(resource_id)
             
-            if task and resource and task_id not in self.completed_tasks:
-                # Check if resource can do the task
-                if task.can_be_done_by(resource):
-                    # Check if there are predecessor dependencies
-                    can_start = self._check_dependencies(task)
+            if task and resource and self._is_assignable(task, resource):
+                remaining_hours = task.duration_hours * (1 - self.task_completion[task_id])
+                
+                if self.event_driven:
+                    # Allocate all remaining work at once and let the resource's
+                    # daily capacity stretch it over as many days as needed
+                    hours_to_allocate = remaining_hours
+                    hours_today = min(
+                        self.resource_availability[resource_id],
+                        remaining_hours,
+                        self._hours_left_today()
+                    )
+                    end_time = self._work_end_time(resource, hours_to_allocate, hours_today)
+                else:
+                    # Allocate resource to task
+                    hours_to_allocate = min(
+                        self.resource_availability[resource_id],
+                        remaining_hours
+                    )
+                    hours_today = hours_to_allocate
+                    end_time = self.current_time + hours_to_allocate
+                
+                if hours_to_allocate > 0:
+                    # Create assignment
+                    assignment = TaskAssignment(
+                        task_id=task_id,
+                        resource_id=resource_id,
+                        start_time=self.current_time,
+                        end_time=end_time,
+                        hours_allocated=hours_to_allocate
+                    )
+                    self.assignments.append(assignment)
                     
-                    if can_start and self.resource_availability[resource_id] > 0:
-                        # Allocate resource to task
-                        hours_to_allocate = min(
-                            self.resource_availability[resource_id],
-                            task.duration_hours * (1 - self.task_completion[task_id])
-                        )
-                        
-                        if hours_to_allocate > 0:
-                            # Create assignment
-                            assignment = TaskAssignment(
-                                task_id=task_id,
-                                resource_id=resource_id,
-                                start_time=self.current_time,
-                                end_time=self.current_time + hours_to_allocate,
-                                hours_allocated=hours_to_allocate
-                            )
-                            self.assignments.append(assignment)
-                            
-                            # Update state
-                            self.task_completion[task_id] += hours_to_allocate / task.duration_hours
-                            self.resource_availability[resource_id] -= hours_to_allocate
-                            self.resource_daily_hours[resource_id] += hours_to_allocate
-                            self.current_cost += hours_to_allocate * resource.hourly_rate
-                            
-                            # Mark task as completed if done
-                            if self.task_completion[task_id] >= 0.999:
-                                self.completed_tasks.add(task_id)
-                                self.task_completion[task_id] = 1.0
-                            
-                            action_taken = True
-        
+                    # Update state
+                    self.task_completion[task_id] += hours_to_allocate / task.duration_hours
+                    self.resource_availability[resource_id] -= hours_today
+                    self.resource_daily_hours[resource_id] += hours_today
+                    self.current_cost += hours_to_allocate * resource.hourly_rate
+                    
+                    if self.event_driven:
+                        # The resource is held until the work is finished
+                        self._schedule_release(assignment)
+                    elif self.task_completion[task_id] >= 0.999:
+                        # Mark task as completed if done
+                        self._complete_task(task_id)
+                    
+                    action_taken = True
+        
+        if self.event_driven:
+            # A no-op waits for the next release; otherwise the clock only moves
+            # once nothing more can be started at the current time
+            wait_requested = decoded is None and bool(self._events)
+            if wait_requested or not self._has_assignable_action():
+                self._advance_to_next_event()
         # Advance time if all resources are utilized or no valid actions
-        if not action_taken or all(avail <= 0.1 for avail in self.resource_availability.values()):
+        elif not action_taken or all(avail <= 0.1 for avail in self.resource_availability.values()):
             self._advance_time()
         
         # Calculate reward with constraint awareness
@@ -267,7 +329,10 @@ class TaskSchedulingEnv(gym.Env):
         reward = base_reward - constraint_penalty
         
         # Check if episode is done
-        done = len(self.completed_tasks) == self.n_tasks or self.current_time > 1000
+        if self.event_driven:
+            done = len(self.completed_tasks) == self.n_tasks or self._stalled
+        else:
+            done = len(self.completed_tasks) == self.n_tasks or self.current_time > 1000
         
         # Prepare info
         info = {
@@ -279,14 +344,143 @@ class TaskSchedulingEnv(gym.Env):
         
         return self._get_observation(), reward, done, info
     
+    def _is_assignable(self, task: Task, resource: Resource) -> bool:
+        """Check if a resource can start working on a task at the current time"""
+        if task.id in self.completed_tasks or task.id in self._running_tasks:
+            return False
+        if resource.id in self._busy_resources or self.resource_availability[resource.id] <= 0:
+            return False
+        return resource.available and task.can_be_done_by(resource) and self._check_dependencies(task)
+    
+    def _is_executable(self, decoded: Optional[Tuple[str, str]]) -> bool:
+        """Check if a decoded action starts work, or is a no-op with a release to wait for"""
+        if decoded is None:
+            return bool(self._events)
+        task_id, resource_id = decoded
+        return self._is_assignable(self._task_by_id[task_id], self._resource_by_id[resource_id])
+    
+    def _nearest_assignable(self, action: int) -> Optional[Tuple[str, str]]:
+        """
+        Assignable (task_id, resource_id) pair closest to an action
+        
+        The requested task on the nearest free resource is preferred, then the
+        requested resource on the nearest ready task, then the pair whose
+        action index is closest. None when nothing can start now.
+        """
+        task_idx, resource_idx = divmod(action, self.n_resources)
+        best, best_key = None, None
+        for t, task in enumerate(self.project.tasks):
+            if task.id in self.completed_tasks or task.id in self._running_tasks:
+                continue
+            if not self._check_dependencies(task):
+                continue
+            for resource_id in self._capable_resources[task.id]:
+                if resource_id in self._busy_resources or self.resource_availability[resource_id] <= 0:
+                    continue
+                r = self._resource_index[resource_id]
+                if t == task_idx:
+                    key = (0, abs(r - resource_idx))
+                elif r == resource_idx:
+                    key = (1, abs(t - task_idx))
+                else:
+                    key = (2, abs(t * self.n_resources + r - action))
+                if best_key is None or key < best_key:
+                    best, best_key = (task.id, resource_id), key
+        return best
+    
+    def _has_assignable_action(self) -> bool:
+        """Check if any task-resource pair could be started at the current time"""
+        for task in self.project.tasks:
+            if task.id in self.completed_tasks or task.id in self._running_tasks:
+                continue
+            if not self._check_dependencies(task):
+                continue
+            for resource_id in self._capable_resources[task.id]:
+                if resource_id not in self._busy_resources and self.resource_availability[resource_id] > 0:
+                    return True
+        return False
+    
+    def _hours_left_today(self) -> float:
+        """Hours until the end of the current working day"""
+        day_end = (math.floor(self.current_time / self.HOURS_PER_DAY) + 1) * self.HOURS_PER_DAY
+        return day_end - self.current_time
+    
+    def _work_end_time(self, resource: Resource, hours: float, hours_today: float) -> float:
+        """Calendar time at which `hours` of work started now are finished"""
+        remaining = hours - hours_today
+        if remaining <= 1e-9:
+            return self.current_time + hours_today
+        
+        # Whatever is left runs from the start of the next day at daily capacity
+        capacity = min(resource.max_hours_per_day, self.HOURS_PER_DAY)
+        next_day = self.current_time + self._hours_left_today()
+        full_days = math.ceil(remaining / capacity) - 1
+        return next_day + full_days * self.HOURS_PER_DAY + (remaining - full_days * capacity)
+    
+    def _schedule_release(self, assignment: TaskAssignment):
+        """Hold the resource and task until the assignment finishes"""
+        self._busy_resources.add(assignment.resource_id)
+        self._running_tasks.add(assignment.task_id)
+        heapq.heappush(
+            self._events,
+            (assignment.end_time, self._event_seq, assignment.resource_id, assignment.task_id)
+        )
+        self._event_seq += 1
+    
+    def _advance_to_next_event(self):
+        """Move the clock to the next release event or working-day boundary"""
+        next_time = self._events[0][0] if self._events else None
+        
+        # Idle resources that used up their daily hours wait for the next day
+        exhausted = any(
+            res_id not in self._busy_resources and avail <= 0
+            for res_id, avail in self.resource_availability.items()
+        )
+        if exhausted:
+            next_day = (math.floor(self.current_time / self.HOURS_PER_DAY) + 1) * self.HOURS_PER_DAY
+            next_time = next_day if next_time is None else min(next_time, next_day)
+        
+        if next_time is None:
+            # Nothing is running and nothing can start: the episode cannot progress
+            self._stalled = True
+            return
+        
+        self.current_time = max(self.current_time, next_time)
+        
+        # Reset daily resource availability when a new working day starts
+        day = math.floor(self.current_time / self.HOURS_PER_DAY)
+        if day > self._current_day:
+            self._current_day = day
+            for resource in self.project.resources:
+                self.resource_availability[resource.id] = resource.max_hours_per_day
+                self.resource_daily_hours[resource.id] = 0.0
+        
+        # Release everything that finished by now
+        while self._events and self._events[0][0] <= self.current_time:
+            _, _, resource_id, task_id = heapq.heappop(self._events)
+            self._busy_resources.discard(resource_id)
+            self._running_tasks.discard(task_id)
+            if self.task_completion[task_id] >= 0.999:
+                self._complete_task(task_id)
+    
     def _check_dependencies(self, task: Task) -> bool:
         """Check if task dependencies are satisfied"""
-        # Check if all tasks with lower order are completed
-        for other_task in self.project.tasks:
-            if other_task.order < task.order:
-                if other_task.id not in self.completed_tasks:
-                    return False
-        return True
+        # All predecessors in the dependency graph must be completed
+        return self._pending_predecessors[self._task_position[task.id]] == 0
+    
+    def _complete_task(self, task_id: str):
+        """Mark a task completed and release its dependency graph successors"""
+        self.completed_tasks.add(task_id)
+        self.task_completion[task_id] = 1.0
+        
+        # Milestones between order levels complete as soon as their last task does
+        nodes = [self._task_position[task_id]]
+        while nodes:
+            node = nodes.pop()
+            for succ in self._graph.successors[node]:
+                self._pending_predecessors[succ] -= 1
+                if self._pending_predecessors[succ] == 0 and self._graph.is_milestone(succ):
+                    nodes.append(succ)
     
     def _check_constraints_violation(self) -> float:
         """Calculate penalty for constraint violations"""
@@ -347,8 +541,8 @@ class TaskSchedulingEnv(gym.Env):
         
         total_score = 0.0
         for assignment in self.assignments:
-            task = next((t for t in self.project.tasks if t.id == assignment.task_id), None)
-            resource = next((r for r in self.project.resources if r.id == assignment.resource_id), None)
+            task = self._task_by_id.get(assignment.task_id)
+            resource = self._resource_by_id.get(assignment.resource_id)
             
             if task and resource:
                 skill_score = task.skill_match_score(resource)
@@ -0,0 +1,226 @@
+"""
+Single-pass compiler from CMS process data to a Project
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from src.models.data_models import (
+    Project, ProjectConstraints, ProjectMetadata, Resource, Skill, Task
+)
+from src.models.json_codec import gc_paused
+
+# CMS does not provide skills; every task and resource gets this one
+DEFAULT_SKILL = ("general", 3)
+NUMBER = (int, float)
+_NUMBER_TYPES = {int, float}
+
+
+class CMSValidationError(ValueError):
+    """
+    CMS process data that cannot be compiled
+
+    `path` locates the offending value, e.g.
+    `process_tasks[3].task.jobTasks[0].job.hourlyRate`.
+    """
+
+    def __init__(self, message: str, path: str = ""):
+        super().__init__(message, path)
+        self.message = message
+        self.path = path
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}" if self.path else self.message
+
+
+@dataclass
+class CMSJob:
+    """A CMS job assigned to a task, as the resource it becomes"""
+    resource_id: str
+    hourly_rate: float
+
+
+@dataclass
+class CMSTask:
+    """One process task with the values the CMS scenarios need"""
+    task_id: str
+    order: int
+    duration_minutes: float
+    duration_hours: float
+    jobs: List[CMSJob]
+
+
+@dataclass
+class CompiledCMSProcess:
+    """
+    A validated CMS process: its Project, its tasks in CMS order and the
+    transformation summary
+
+    `tasks` is sorted by `order` (ties keep their CMS position), which is
+    the order every CMS scenario walks them in.
+    """
+    process_id: int
+    process_name: str
+    company: str
+    project: Project
+    tasks: List[CMSTask]
+    summary: Dict
+
+
+def _field(data: Any, key: str, path: str, kind=None) -> Any:
+    """`data[key]`, raising CMSValidationError if it is missing or of the wrong kind"""
+    if not isinstance(data, dict):
+        raise CMSValidationError(f"expected an object, got {type(data).__name__}", path)
+    where = f"{path}.{key}" if path else key
+    if key not in data:
+        raise CMSValidationError("missing required field", where)
+    value = data[key]
+    if kind is not None and (not isinstance(value, kind) or isinstance(value, bool)):
+        expected = {int: "an integer", list: "a list"}.get(kind, "a number")
+        raise CMSValidationError(f"expected {expected}, got {type(value).__name__}", where)
+    return value
+
+
+def _diagnose(cms_data: Any):
+    """Walk malformed CMS data again, raising CMSValidationError at the first bad value"""
+    _field(cms_data, 'process_id', '', int)
+    for key in ('process_name', 'process_overview'):
+        _field(cms_data, key, '')
+    for i, process_task in enumerate(_field(cms_data, 'process_tasks', '', list)):
+        path = f"process_tasks[{i}]"
+        _field(process_task, 'order', path, NUMBER)
+        task_data = _field(process_task, 'task', path)
+        path += ".task"
+        _field(task_data, 'task_id', path, int)
+        _field(task_data, 'task_capacity_minutes', path, NUMBER)
+        for key in ('task_name', 'task_overview'):
+            _field(task_data, key, path)
+        for j, job_task in enumerate(_field(task_data, 'jobTasks', path, list)):
+            job_path = f"{path}.jobTasks[{j}]"
+            job = _field(job_task, 'job', job_path)
+            job_path += ".job"
+            _field(job, 'job_id', job_path, int)
+            _field(job, 'hourlyRate', job_path, NUMBER)
+            _field(job, 'maxHoursPerDay', job_path, NUMBER)
+            for key in ('name', 'description'):
+                _field(job, key, job_path)
+
+
+def compile_cms_process(cms_data: Dict) -> CompiledCMSProcess:
+    """
+    Validate CMS process data and build its Project in one traversal
+
+    Replaces `validate_cms_data` + `transform_cms_to_internal` +
+    `Project.from_json` + `get_cms_transformation_summary`, with the same
+    results, and without the intermediate internal-format dict. Every task
+    and job is visited once, with the garbage collector paused; only
+    malformed data is walked a second time, to find the path of the
+    offending value.
+
+    Raises:
+        CMSValidationError: a required field is missing or has the wrong type
+    """
+    try:
+        with gc_paused():
+            return _compile(cms_data)
+    except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+        _diagnose(cms_data)
+        raise CMSValidationError(f"malformed CMS data ({type(e).__name__}: {e})")
+
+
+def _compile(cms_data: Dict) -> CompiledCMSProcess:
+    numbers = _NUMBER_TYPES
+    process_id = cms_data['process_id']
+    process_tasks = cms_data['process_tasks']
+    if type(process_id) is not int or type(process_tasks) is not list:
+        raise TypeError("process_id or process_tasks")
+
+    tasks: List[Task] = []
+    resources: List[Resource] = []
+    cms_tasks: List[CMSTask] = []
+    resource_ids: Dict[int, str] = {}
+    estimated_budget = 0
+    total_minutes = 0
+    last_order = None
+    in_order = True
+
+    for process_task in process_tasks:
+        order = process_task['order']
+        task_data = process_task['task']
+        task_id = task_data['task_id']
+        minutes = task_data['task_capacity_minutes']
+        job_tasks = task_data['jobTasks']
+        if type(order) not in numbers or type(task_id) is not int \
+                or type(minutes) not in numbers or type(job_tasks) is not list:
+            raise TypeError("process task")
+
+        task_id = f"task_{task_id:03d}"
+        duration_hours = minutes / 60.0
+        tasks.append(Task(
+            id=task_id,
+            name=task_data['task_name'],
+            description=task_data['task_overview'],
+            duration_hours=duration_hours,
+            required_skills=[Skill(*DEFAULT_SKILL)],
+            order=order,
+            dependencies=[]
+        ))
+        total_minutes += minutes
+
+        jobs = []
+        for job_task in job_tasks:
+            job = job_task['job']
+            job_id = job['job_id']
+            hourly_rate = job['hourlyRate']
+            max_hours_per_day = job['maxHoursPerDay']
+            if type(job_id) is not int or type(hourly_rate) not in numbers \
+                    or type(max_hours_per_day) not in numbers:
+                raise TypeError("job")
+
+            resource_id = resource_ids.get(job_id)
+            if resource_id is None:
+                resource_id = resource_ids[job_id] = f"resource_{job_id:03d}"
+                resources.append(Resource(
+                    id=resource_id,
+                    name=job['name'],
+                    description=job['description'],
+                    skills=[Skill(*DEFAULT_SKILL)],
+                    hourly_rate=hourly_rate,
+                    max_hours_per_day=max_hours_per_day
+                ))
+                estimated_budget += hourly_rate * max_hours_per_day * 30
+            jobs.append(CMSJob(resource_id, hourly_rate))
+
+        if last_order is not None and order < last_order:
+            in_order = False
+        last_order = order
+        cms_tasks.append(CMSTask(task_id, order, minutes, duration_hours, jobs))
+
+    if not in_order:
+        cms_tasks.sort(key=lambda task: task.order)
+
+    process_name = cms_data['process_name']
+    project = Project(
+        id=f"project_{process_id:03d}",
+        name=process_name,
+        description=cms_data['process_overview'],
+        tasks=tasks,
+        resources=resources,
+        constraints=ProjectConstraints(quality_gates=True, max_budget=None, max_duration_days=None),
+        metadata=ProjectMetadata(
+            project_type="cms_import",
+            complexity="medium",
+            team_size=len(resources),
+            estimated_budget=estimated_budget
+        )
+    )
+    company = (cms_data.get('company') or {}).get('name', 'Unknown')
+    summary = {
+        "process_id": process_id,
+        "process_name": process_name,
+        "total_tasks": len(tasks),
+        "total_duration_hours": total_minutes / 60.0,
+        "total_duration_days": (total_minutes / 60.0) / 8,
+        "unique_resources": len(resources),
+        "company": company
+    }
+    return CompiledCMSProcess(process_id, process_name, company, project, cms_tasks, summary)
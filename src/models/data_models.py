@@ -61,6 +61,7 @@ class Resource:
     skills: List[Skill]
     hourly_rate: float
     max_hours_per_day: float
+    available: bool = True
     
     def daily_cost(self) -> float:
         """Calculate maximum daily cost for this resource"""
@@ -124,7 +125,8 @@ class Project:
                 description=res_data['description'],
                 skills=skills,
                 hourly_rate=res_data['hourly_rate'],
-                max_hours_per_day=res_data['max_hours_per_day']
+                max_hours_per_day=res_data['max_hours_per_day'],
+                available=res_data.get('available', True)
             )
             resources.append(resource)
         
@@ -157,10 +159,9 @@ class Project:
     
     @classmethod
     def from_json_file(cls, filepath: str) -> 'Project':
-        """Load project from JSON file"""
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-        return cls.from_json(data)
+        """Load project from JSON file, with the fastest available decoder"""
+        from src.models.json_codec import load_project
+        return load_project(filepath)
 
 
 @dataclass
@@ -0,0 +1,185 @@
+"""
+Task dependency graph with topological ordering and Critical Path Method analysis
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Sequence
+import numpy as np
+
+
+@dataclass
+class CriticalPathAnalysis:
+    """Result of a CPM forward and backward pass over the tasks"""
+    earliest_start: np.ndarray   # (tasks,)
+    earliest_finish: np.ndarray  # (tasks,)
+    latest_start: np.ndarray     # (tasks,)
+    latest_finish: np.ndarray    # (tasks,)
+    slack: np.ndarray            # (tasks,) latest_start - earliest_start
+    makespan: float
+    critical_path: List[int]     # task positions from project start to end
+
+    @property
+    def critical_tasks(self) -> np.ndarray:
+        """Positions of all tasks with zero slack"""
+        return np.flatnonzero(self.slack <= 1e-9)
+
+
+class DependencyGraph:
+    """
+    Precedence graph over a project's tasks
+
+    Nodes `0 .. n_tasks - 1` are the tasks in project order. When tasks
+    declare explicit `dependencies` those are the edges. Otherwise every
+    task depends on all tasks with a lower `order`; that relation is
+    encoded with one zero-duration milestone node per order level
+    (nodes `n_tasks ..`), so it costs O(tasks) edges instead of O(tasks^2).
+    """
+
+    def __init__(self, n_tasks: int, predecessors: List[List[int]], explicit: bool):
+        self.n_tasks = n_tasks
+        self.n_nodes = len(predecessors)
+        self.explicit = explicit
+        self.predecessors = predecessors
+        self.successors = [[] for _ in range(self.n_nodes)]
+        for node, preds in enumerate(predecessors):
+            for pred in preds:
+                self.successors[pred].append(node)
+        self.topological_order = self._topological_sort()
+
+    @classmethod
+    def from_orders(cls, orders: Sequence[int]) -> 'DependencyGraph':
+        """Every task depends on all tasks with a lower order"""
+        n_tasks = len(orders)
+        levels = {}
+        for task, order in enumerate(orders):
+            levels.setdefault(order, []).append(task)
+
+        predecessors = [[] for _ in range(n_tasks)]
+        previous_milestone = None
+        for order in sorted(levels):
+            level_tasks = levels[order]
+            if previous_milestone is not None:
+                for task in level_tasks:
+                    predecessors[task].append(previous_milestone)
+            # Milestone reached once every task of this level is finished
+            predecessors.append(list(level_tasks))
+            previous_milestone = len(predecessors) - 1
+
+        return cls(n_tasks, predecessors, explicit=False)
+
+    @classmethod
+    def from_dependencies(cls, dependencies: Sequence[Sequence[int]]) -> 'DependencyGraph':
+        """Edges taken from each task's explicit predecessor positions"""
+        return cls(len(dependencies), [list(deps) for deps in dependencies], explicit=True)
+
+    @classmethod
+    def build(cls, orders: Sequence[int], dependencies: Sequence[Sequence[int]]) -> 'DependencyGraph':
+        """Explicit dependencies when any task declares one, order levels otherwise"""
+        if any(dependencies):
+            return cls.from_dependencies(dependencies)
+        return cls.from_orders(orders)
+
+    def is_milestone(self, node: int) -> bool:
+        return node >= self.n_tasks
+
+    def _topological_sort(self) -> List[int]:
+        """Kahn's algorithm; raises ValueError on cycles"""
+        remaining = [len(preds) for preds in self.predecessors]
+        queue = deque(node for node in range(self.n_nodes) if remaining[node] == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for succ in self.successors[node]:
+                remaining[succ] -= 1
+                if remaining[succ] == 0:
+                    queue.append(succ)
+
+        if len(order) != self.n_nodes:
+            raise ValueError("Task dependencies contain a cycle")
+        return order
+
+    def _node_durations(self, durations: Sequence[float]) -> List[float]:
+        return list(durations) + [0.0] * (self.n_nodes - self.n_tasks)
+
+    def forward_pass(self, durations: Sequence[float]) -> List[float]:
+        """Earliest finish time of every node"""
+        node_durations = self._node_durations(durations)
+        earliest_finish = [0.0] * self.n_nodes
+        for node in self.topological_order:
+            start = 0.0
+            for pred in self.predecessors[node]:
+                if earliest_finish[pred] > start:
+                    start = earliest_finish[pred]
+            earliest_finish[node] = start + node_durations[node]
+        return earliest_finish
+
+    def backward_pass(self, durations: Sequence[float], project_end: float) -> List[float]:
+        """Latest finish time of every node that does not delay `project_end`"""
+        node_durations = self._node_durations(durations)
+        latest_finish = [project_end] * self.n_nodes
+        for node in reversed(self.topological_order):
+            finish = project_end
+            for succ in self.successors[node]:
+                succ_start = latest_finish[succ] - node_durations[succ]
+                if succ_start < finish:
+                    finish = succ_start
+            latest_finish[node] = finish
+        return latest_finish
+
+    def analyze(self, durations: Sequence[float]) -> CriticalPathAnalysis:
+        """Forward and backward pass, slack and one critical path"""
+        node_durations = self._node_durations(durations)
+        earliest_finish = self.forward_pass(durations)
+        makespan = max(earliest_finish[:self.n_tasks], default=0.0)
+        latest_finish = self.backward_pass(durations, makespan)
+
+        n = self.n_tasks
+        duration_array = np.asarray(node_durations[:n], dtype=np.float64)
+        ef = np.asarray(earliest_finish[:n], dtype=np.float64)
+        lf = np.asarray(latest_finish[:n], dtype=np.float64)
+        es = ef - duration_array
+        ls = lf - duration_array
+
+        return CriticalPathAnalysis(
+            earliest_start=es,
+            earliest_finish=ef,
+            latest_start=ls,
+            latest_finish=lf,
+            slack=ls - es,
+            makespan=makespan,
+            critical_path=self._trace_critical_path(earliest_finish, latest_finish, node_durations, makespan)
+        )
+
+    def _trace_critical_path(
+        self,
+        earliest_finish: List[float],
+        latest_finish: List[float],
+        node_durations: List[float],
+        makespan: float
+    ) -> List[int]:
+        """Walk back from the last finishing task along zero-slack predecessors"""
+        tol = 1e-9
+        end_tasks = [
+            task for task in range(self.n_tasks)
+            if abs(earliest_finish[task] - makespan) <= tol
+        ]
+        if not end_tasks:
+            return []
+
+        path = []
+        node = end_tasks[0]
+        while node is not None:
+            if not self.is_milestone(node):
+                path.append(node)
+            start = earliest_finish[node] - node_durations[node]
+            node = next(
+                (
+                    pred for pred in self.predecessors[node]
+                    if abs(earliest_finish[pred] - start) <= tol
+                    and abs(latest_finish[pred] - earliest_finish[pred]) <= tol
+                ),
+                None
+            )
+        path.reverse()
+        return path
@@ -0,0 +1,250 @@
+"""
+Fast decoding of project and CMS JSON documents, and encoding of reports
+
+Uses msgspec when it is installed (typed decoding straight into schema
+structs), else orjson, else the standard library; all three produce the
+same Project and the same plain data. WHATIF_JSON_BACKEND=json|orjson
+forces a slower backend.
+"""
+import gc
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+from src.models.data_models import (
+    Project, ProjectConstraints, ProjectMetadata, Resource, Skill, Task
+)
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_AVAILABLE = [name for name, module in (('msgspec', msgspec), ('orjson', orjson)) if module is not None]
+JSON_BACKEND = os.environ.get("WHATIF_JSON_BACKEND") or (_AVAILABLE[0] if _AVAILABLE else 'json')
+if JSON_BACKEND not in _AVAILABLE + ['json']:
+    JSON_BACKEND = 'json'
+
+
+# The collector switch is process-wide, so overlapping pauses from several
+# threads share one: the first in disables it, the last out restores it
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def gc_paused():
+    """
+    Hold off the cyclic garbage collector
+
+    Decoding a large document allocates millions of objects, which would
+    otherwise trigger repeated collections that rescan everything decoded
+    so far; decoded documents form no reference cycles. Safe to nest and
+    to use from several threads at once.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode a JSON document into plain dicts and lists
+
+    Raises:
+        ValueError: the document is not valid JSON, whatever the backend
+    """
+    with gc_paused():
+        if JSON_BACKEND == 'msgspec':
+            try:
+                return msgspec.json.decode(data)
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+        if JSON_BACKEND == 'orjson':
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+def load_json_file(path: str) -> Any:
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def _plain(obj: Any) -> Any:
+    # numpy scalars (e.g. Monte Carlo percentiles), which json accepts as floats
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Encode plain data as UTF-8 JSON
+
+    With `indent` the layout is that of `json.dumps(obj, indent=2)`.
+    Non-ASCII text is written as UTF-8 rather than escaped, and the fast
+    backends may spell some floats differently (`1e16` for `1e+16`);
+    the decoded values are the same.
+    """
+    if JSON_BACKEND == 'orjson':
+        return orjson.dumps(obj, default=_plain, option=orjson.OPT_INDENT_2 if indent else 0)
+    if JSON_BACKEND == 'msgspec':
+        encoded = msgspec.json.encode(obj, enc_hook=_plain)
+        return msgspec.json.format(encoded, indent=2) if indent else encoded
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_plain).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_plain).encode('utf-8')
+
+
+if msgspec is not None:
+    # Schema of the fields Project.from_json reads. Numbers stay int or
+    # float as written, so results match the untyped path exactly.
+    Number = Union[int, float]
+
+    class SkillSpec(msgspec.Struct):
+        name: str
+        level: Number
+
+    class TaskSpec(msgspec.Struct):
+        id: str
+        name: str
+        description: str
+        duration_hours: Number
+        required_skills: List[SkillSpec]
+        order: Number
+        dependencies: List[str] = []
+
+    class ResourceSpec(msgspec.Struct):
+        id: str
+        name: str
+        description: str
+        skills: List[SkillSpec]
+        hourly_rate: Number
+        max_hours_per_day: Number
+        available: bool = True
+
+    class ConstraintsSpec(msgspec.Struct, frozen=True):
+        quality_gates: bool = True
+        max_budget: Optional[Number] = None
+        max_duration_days: Optional[Number] = None
+
+    class MetadataSpec(msgspec.Struct):
+        project_type: str
+        complexity: str
+        team_size: int
+        estimated_budget: Number
+
+    class ProjectSpec(msgspec.Struct):
+        id: str
+        name: str
+        description: str
+        tasks: List[TaskSpec]
+        resources: List[ResourceSpec]
+        metadata: MetadataSpec
+        constraints: ConstraintsSpec = ConstraintsSpec()
+
+    _project_decoder = msgspec.json.Decoder(ProjectSpec)
+
+
+def _project_from_spec(spec) -> Project:
+    return Project(
+        id=spec.id,
+        name=spec.name,
+        description=spec.description,
+        tasks=[
+            Task(
+                id=task.id,
+                name=task.name,
+                description=task.description,
+                duration_hours=task.duration_hours,
+                required_skills=[Skill(skill.name, skill.level) for skill in task.required_skills],
+                order=task.order,
+                dependencies=task.dependencies
+            )
+            for task in spec.tasks
+        ],
+        resources=[
+            Resource(
+                id=resource.id,
+                name=resource.name,
+                description=resource.description,
+                skills=[Skill(skill.name, skill.level) for skill in resource.skills],
+                hourly_rate=resource.hourly_rate,
+                max_hours_per_day=resource.max_hours_per_day,
+                available=resource.available
+            )
+            for resource in spec.resources
+        ],
+        constraints=ProjectConstraints(
+            quality_gates=spec.constraints.quality_gates,
+            max_budget=spec.constraints.max_budget,
+            max_duration_days=spec.constraints.max_duration_days
+        ),
+        metadata=ProjectMetadata(
+            project_type=spec.metadata.project_type,
+            complexity=spec.metadata.complexity,
+            team_size=spec.metadata.team_size,
+            estimated_budget=spec.metadata.estimated_budget
+        )
+    )
+
+
+def decode_project(data: Union[bytes, str]) -> Project:
+    """
+    Project from a JSON document
+
+    With msgspec the document is decoded against the project schema with
+    no intermediate dicts. A document the schema rejects (e.g. a null
+    where a list is expected) goes through Project.from_json instead, so
+    it is accepted or fails exactly as before.
+    """
+    if JSON_BACKEND == 'msgspec':
+        try:
+            with gc_paused():
+                return _project_from_spec(_project_decoder.decode(data))
+        except msgspec.DecodeError:
+            pass  # also raised for invalid JSON, which loads() reports
+    project_data = loads(data)
+    with gc_paused():
+        return Project.from_json(project_data)
+
+
+def load_project(path: str) -> Project:
+    with open(path, 'rb') as f:
+        return decode_project(f.read())
+
+
+@dataclass
+class ProjectDocument:
+    """A project file parsed once: its plain data and its Project"""
+    data: Dict
+    project: Project
+
+
+def load_project_document(path: str) -> ProjectDocument:
+    """
+    Parse a project file once for callers that need both the raw data
+    (e.g. to echo it in a response) and the Project
+    """
+    data = load_json_file(path)
+    with gc_paused():
+        return ProjectDocument(data, Project.from_json(data))
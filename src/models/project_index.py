@@ -0,0 +1,160 @@
+"""
+Compiled, array-backed index of a project for fast scheduling
+"""
+from dataclasses import InitVar, dataclass, field
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+from src.models.data_models import Project
+from src.models.dependency_graph import DependencyGraph
+
+
+@dataclass
+class ProjectIndex:
+    """
+    Dense arrays describing a project's tasks and resources
+
+    Tasks and resources keep the positions they have in the project lists,
+    so `task_ids[i]` is `project.tasks[i].id` and likewise for resources.
+    The capability and skill-match matrices are computed once so that
+    schedulers never call `Task.can_be_done_by` in their inner loops.
+    Unavailable resources keep their rows in `capable` but are left out of
+    `capable_resources`, which is what the schedulers draw candidates from.
+    Callers that already have those lists in flat form (e.g. a snapshot)
+    pass them as `capable_resource_csr` instead of having them derived.
+    """
+    task_ids: List[str]
+    resource_ids: List[str]
+    durations: np.ndarray          # (tasks,) hours of work per task
+    orders: np.ndarray             # (tasks,) task order values
+    hourly_rates: np.ndarray       # (resources,)
+    max_hours_per_day: np.ndarray  # (resources,)
+    capable: np.ndarray            # (tasks, resources) bool
+    skill_scores: np.ndarray       # (tasks, resources) skill match, 0 if incapable
+    dependencies: List[List[int]]  # explicit predecessor positions per task
+    available: Optional[np.ndarray] = None  # (resources,) bool, all True if omitted
+    task_position: Dict[str, int] = field(init=False, repr=False)
+    resource_position: Dict[str, int] = field(init=False, repr=False)
+    capable_resources: List[np.ndarray] = field(init=False, repr=False)
+    _graph: Optional[DependencyGraph] = field(init=False, repr=False, default=None)
+    # (resource positions of all tasks, per-task offsets into them)
+    capable_resource_csr: InitVar[Optional[Tuple[np.ndarray, np.ndarray]]] = None
+
+    def __post_init__(self, capable_resource_csr):
+        self.task_position = {task_id: i for i, task_id in enumerate(self.task_ids)}
+        self.resource_position = {res_id: j for j, res_id in enumerate(self.resource_ids)}
+        if self.available is None:
+            self.available = np.ones(len(self.resource_ids), dtype=bool)
+        if capable_resource_csr is None:
+            self.refresh_capable_resources()
+        else:
+            self._split_capable_resources(*capable_resource_csr)
+
+    def refresh_capable_resources(self):
+        """Recompute per-task candidate lists after `capable` or `available` change"""
+        usable = self.capable & self.available
+        # One nonzero over the matrix, sliced into per-task views of it
+        tasks, resources = np.nonzero(usable)
+        self._split_capable_resources(resources, np.searchsorted(tasks, np.arange(len(usable) + 1)))
+
+    def _split_capable_resources(self, resources: np.ndarray, offsets: np.ndarray):
+        bounds = offsets.tolist()
+        self.capable_resources = [resources[a:b] for a, b in zip(bounds, bounds[1:])]
+
+    def capable_resource_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """`capable_resources` in flat form, as taken by `capable_resource_csr`"""
+        lengths = [len(resources) for resources in self.capable_resources]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        flat = np.concatenate(self.capable_resources) if lengths else np.zeros(0, dtype=np.int64)
+        return flat, offsets
+
+    @property
+    def graph(self) -> DependencyGraph:
+        """Dependency graph of the tasks, built on first use"""
+        if self._graph is None:
+            self._graph = DependencyGraph.build(self.orders.tolist(), self.dependencies)
+        return self._graph
+
+    @property
+    def n_tasks(self) -> int:
+        return len(self.task_ids)
+
+    @property
+    def n_resources(self) -> int:
+        return len(self.resource_ids)
+
+    @classmethod
+    def from_project(cls, project: Project) -> 'ProjectIndex':
+        """Compile a project into its array representation"""
+        n_tasks = len(project.tasks)
+        n_resources = len(project.resources)
+
+        # Skill vocabulary shared by tasks and resources
+        skill_position = {}
+
+        # Resource skill levels; -1 marks a missing skill. `Task.can_be_done_by`
+        # accepts any matching entry while `Task.skill_match_score` scores the
+        # first one, so both views are kept.
+        resource_rows = []
+        for resource in project.resources:
+            levels = {}
+            for skill in resource.skills:
+                skill_position.setdefault(skill.name, len(skill_position))
+                first, best = levels.get(skill.name, (skill.level, skill.level))
+                levels[skill.name] = (first, max(best, skill.level))
+            resource_rows.append(levels)
+
+        # One entry per task requirement, in task order
+        entry_task, entry_skill, entry_level = [], [], []
+        requirement_counts = np.zeros(n_tasks)
+        for i, task in enumerate(project.tasks):
+            for skill in task.required_skills:
+                entry_task.append(i)
+                entry_skill.append(skill_position.setdefault(skill.name, len(skill_position)))
+                entry_level.append(skill.level)
+            requirement_counts[i] = len(task.required_skills)
+
+        first_level = np.full((len(skill_position), n_resources), -1.0)
+        best_level = np.full((len(skill_position), n_resources), -1.0)
+        for j, levels in enumerate(resource_rows):
+            for name, (first, best) in levels.items():
+                first_level[skill_position[name], j] = first
+                best_level[skill_position[name], j] = best
+
+        entry_task = np.asarray(entry_task, dtype=np.int64)
+        entry_skill = np.asarray(entry_skill, dtype=np.int64)
+        entry_level = np.asarray(entry_level, dtype=np.float64)[:, None]
+
+        # A task is doable when every requirement is met by some resource skill
+        unmet = np.zeros((n_tasks, n_resources), dtype=np.int64)
+        np.add.at(unmet, entry_task, (best_level[entry_skill] < entry_level).astype(np.int64))
+        capable = unmet == 0
+
+        # Skill match: 1 + 0.2 per level of overqualification, averaged
+        score_sum = np.zeros((n_tasks, n_resources))
+        np.add.at(score_sum, entry_task, 1.0 + (first_level[entry_skill] - entry_level) * 0.2)
+        skill_scores = np.where(capable, score_sum / np.maximum(requirement_counts, 1)[:, None], 0.0)
+
+        # Explicit dependencies as task positions
+        task_position = {task.id: i for i, task in enumerate(project.tasks)}
+        dependencies = []
+        for task in project.tasks:
+            task_dependencies = task.dependencies or []
+            unknown = [dep for dep in task_dependencies if dep not in task_position]
+            if unknown:
+                raise ValueError(f"Task {task.id} depends on unknown task(s): {', '.join(unknown)}")
+            dependencies.append([task_position[dep] for dep in task_dependencies])
+
+        return cls(
+            task_ids=[task.id for task in project.tasks],
+            resource_ids=[res.id for res in project.resources],
+            durations=np.array([task.duration_hours for task in project.tasks], dtype=np.float64),
+            orders=np.array([task.order for task in project.tasks], dtype=np.int64),
+            hourly_rates=np.array([res.hourly_rate for res in project.resources], dtype=np.float64),
+            max_hours_per_day=np.array([res.max_hours_per_day for res in project.resources], dtype=np.float64),
+            capable=capable,
+            skill_scores=skill_scores,
+            dependencies=dependencies,
+            available=np.array([res.available for res in project.resources], dtype=bool)
+        )
@@ -0,0 +1,412 @@
+"""
+Streaming loader for project files too large to hold as a JSON tree
+
+`stream_project` reads the file in fixed-size chunks and decodes the
+`tasks` and `resources` arrays one element at a time, appending each to a
+column store as it goes. No whole-document tree and no per-row objects are
+ever held, so peak memory stays close to the size of the compact tables.
+"""
+import json
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, List, TextIO, Tuple
+
+from src.models.data_models import (
+    Project, ProjectConstraints, ProjectMetadata, Resource, Skill, Task
+)
+from src.models.json_codec import gc_paused
+
+CHUNK_SIZE = 1 << 20
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+NUMBER = (int, float)
+_NUMBER_TYPES = {int, float}
+
+
+class NumberColumn:
+    """
+    Numbers packed as doubles, given back as the int or float they were
+
+    Integers too large for a double to hold exactly are kept aside as they are.
+    """
+
+    def __init__(self):
+        self.values = array('d')
+        self.is_int = bytearray()
+        self.exact: Dict[int, int] = {}
+
+    def append(self, value):
+        """Store an int or float (the caller has checked which)"""
+        if type(value) is int:
+            packed = float(value)
+            if packed != value:
+                self.exact[len(self.values)] = value
+            self.values.append(packed)
+            self.is_int.append(1)
+        else:
+            self.values.append(value)
+            self.is_int.append(0)
+
+    @classmethod
+    def from_arrays(cls, values, is_int, exact: Dict[int, int]) -> 'NumberColumn':
+        """Column over existing storage, e.g. memory-mapped arrays"""
+        column = cls.__new__(cls)
+        column.values, column.is_int, column.exact = values, is_int, exact
+        return column
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i: int):
+        if self.is_int[i]:
+            return self.exact.get(i, int(self.values[i])) if self.exact else int(self.values[i])
+        return float(self.values[i])
+
+    def tolist(self) -> list:
+        values = self.values.tolist()
+        for i, flag in enumerate(bytes(self.is_int)):
+            if flag:
+                values[i] = int(values[i])
+        for i, value in self.exact.items():
+            values[i] = value
+        return values
+
+
+class SkillVocabulary(list):
+    """Skill names in order of first appearance, shared by a project's tables"""
+
+    def __init__(self):
+        super().__init__()
+        self._position: Dict[str, int] = {}
+
+    def position(self, name: str) -> int:
+        position = self._position.get(name)
+        if position is None:
+            position = self._position[name] = len(self)
+            self.append(name)
+        return position
+
+
+class SkillColumn:
+    """Per-row skill lists, stored as offsets into flat name and level columns"""
+
+    def __init__(self, vocabulary: SkillVocabulary):
+        self.vocabulary = vocabulary
+        self.offsets = array('q', [0])
+        self.names = array('I')
+        self.levels = NumberColumn()
+
+    @classmethod
+    def from_columns(cls, vocabulary: List[str], offsets, names, levels: NumberColumn) -> 'SkillColumn':
+        """Column over existing storage, e.g. memory-mapped arrays"""
+        column = cls.__new__(cls)
+        column.vocabulary, column.offsets, column.names, column.levels = vocabulary, offsets, names, levels
+        return column
+
+    def append(self, skills: List[Dict]):
+        """Store one row's skills; TypeError or KeyError if they are malformed"""
+        if type(skills) is not list:
+            raise TypeError("skills")
+        position, names, levels = self.vocabulary.position, self.names, self.levels
+        for skill in skills:
+            name = skill['name']
+            level = skill['level']
+            if type(name) is not str or type(level) not in _NUMBER_TYPES:
+                raise TypeError("skill")
+            names.append(position(name))
+            levels.append(level)
+        self.offsets.append(len(names))
+
+    def __getitem__(self, i: int) -> List[Skill]:
+        vocabulary, names, levels = self.vocabulary, self.names, self.levels
+        return [Skill(vocabulary[names[k]], levels[k]) for k in range(self.offsets[i], self.offsets[i + 1])]
+
+
+class _Table(Sequence):
+    """
+    Read-only sequence of rows rebuilt from columns on access
+
+    Subclasses name their JSON array and list its required fields with the
+    kind of value each must hold (None for any).
+    """
+    name: str
+    fields: List[Tuple[str, Any]]
+    skills_field: str
+
+    @classmethod
+    def from_columns(cls, **columns) -> '_Table':
+        """Table over existing columns, e.g. memory-mapped arrays"""
+        table = cls.__new__(cls)
+        table.__dict__.update(columns)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(k) for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return self._row(i)
+
+    def __iter__(self):
+        return (self._row(i) for i in range(len(self)))
+
+    def append(self, data: Dict, i: int):
+        """
+        Store element `i` of the array
+
+        Raises:
+            ValueError: a field is missing or holds the wrong kind of value
+        """
+        try:
+            self._append(data)
+        except (KeyError, TypeError, AttributeError):
+            self._diagnose(data, f"{self.name}[{i}]")
+            raise ValueError(f"{self.name}[{i}]: malformed {self.name[:-1]}") from None
+
+    def _diagnose(self, data: Any, path: str):
+        """Check a malformed row field by field, raising ValueError at the first bad value"""
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: expected an object, got {type(data).__name__}")
+        for key, kind in self.fields:
+            if key not in data:
+                raise ValueError(f"{path}.{key}: missing required field")
+            value = data[key]
+            if kind is NUMBER and type(value) not in _NUMBER_TYPES:
+                raise ValueError(f"{path}.{key}: expected a number, got {type(value).__name__}")
+            if kind is list and type(value) is not list:
+                raise ValueError(f"{path}.{key}: expected a list, got {type(value).__name__}")
+        for k, skill in enumerate(data[self.skills_field]):
+            where = f"{path}.{self.skills_field}[{k}]"
+            if not isinstance(skill, dict) or 'name' not in skill or 'level' not in skill:
+                raise ValueError(f"{where}: expected an object with name and level")
+            if type(skill['name']) is not str:
+                raise ValueError(f"{where}.name: expected a string, got {type(skill['name']).__name__}")
+            if type(skill['level']) not in _NUMBER_TYPES:
+                raise ValueError(f"{where}.level: expected a number, got {type(skill['level']).__name__}")
+        dependencies = data.get('dependencies')
+        if dependencies is not None and type(dependencies) is not list:
+            raise ValueError(f"{path}.dependencies: expected a list, got {type(dependencies).__name__}")
+
+
+class TaskTable(_Table):
+    """
+    A project's tasks as columns
+
+    Behaves as the list of Task objects Project.from_json would build, but
+    each Task is created when it is read and not kept, so edits to one are
+    lost; load with Project.from_json_file to modify a project.
+    """
+    name = 'tasks'
+    fields = [('id', None), ('name', None), ('description', None),
+              ('duration_hours', NUMBER), ('order', NUMBER), ('required_skills', list)]
+    skills_field = 'required_skills'
+
+    def __init__(self, vocabulary: SkillVocabulary):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.descriptions: List[str] = []
+        self.durations = NumberColumn()
+        self.orders = NumberColumn()
+        self.skills = SkillColumn(vocabulary)
+        self.dependency_offsets = array('q', [0])
+        self.dependencies: List[str] = []
+
+    def _append(self, data: Dict):
+        task_id, name, description = data['id'], data['name'], data['description']
+        duration, order = data['duration_hours'], data['order']
+        dependencies = data.get('dependencies') or []
+        if type(duration) not in _NUMBER_TYPES or type(order) not in _NUMBER_TYPES \
+                or type(dependencies) is not list:
+            raise TypeError("task")
+        self.skills.append(data['required_skills'])
+        self.ids.append(task_id)
+        self.names.append(name)
+        self.descriptions.append(description)
+        self.durations.append(duration)
+        self.orders.append(order)
+        self.dependencies.extend(dependencies)
+        self.dependency_offsets.append(len(self.dependencies))
+
+    def _row(self, i: int) -> Task:
+        return Task(
+            id=self.ids[i],
+            name=self.names[i],
+            description=self.descriptions[i],
+            duration_hours=self.durations[i],
+            required_skills=self.skills[i],
+            order=self.orders[i],
+            dependencies=self.dependencies[self.dependency_offsets[i]:self.dependency_offsets[i + 1]]
+        )
+
+
+class ResourceTable(_Table):
+    """A project's resources as columns; see TaskTable"""
+    name = 'resources'
+    fields = [('id', None), ('name', None), ('description', None),
+              ('hourly_rate', NUMBER), ('max_hours_per_day', NUMBER), ('skills', list)]
+    skills_field = 'skills'
+
+    def __init__(self, vocabulary: SkillVocabulary):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.descriptions: List[str] = []
+        self.skills = SkillColumn(vocabulary)
+        self.hourly_rates = NumberColumn()
+        self.max_hours_per_day = NumberColumn()
+        self.available = bytearray()
+
+    def _append(self, data: Dict):
+        resource_id, name, description = data['id'], data['name'], data['description']
+        hourly_rate, max_hours_per_day = data['hourly_rate'], data['max_hours_per_day']
+        if type(hourly_rate) not in _NUMBER_TYPES or type(max_hours_per_day) not in _NUMBER_TYPES:
+            raise TypeError("resource")
+        self.skills.append(data['skills'])
+        self.ids.append(resource_id)
+        self.names.append(name)
+        self.descriptions.append(description)
+        self.hourly_rates.append(hourly_rate)
+        self.max_hours_per_day.append(max_hours_per_day)
+        self.available.append(bool(data.get('available', True)))
+
+    def _row(self, i: int) -> Resource:
+        return Resource(
+            id=self.ids[i],
+            name=self.names[i],
+            description=self.descriptions[i],
+            skills=self.skills[i],
+            hourly_rate=self.hourly_rates[i],
+            max_hours_per_day=self.max_hours_per_day[i],
+            available=bool(self.available[i])
+        )
+
+
+class _Reader:
+    """JSON values read one at a time from a text stream"""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # Read at least as much again as is buffered, so a value larger
+        # than a chunk is retried a logarithmic number of times
+        more = self.f.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not more:
+            self.eof = True
+        self.buffer = self.buffer[self.pos:] + more
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Next non-whitespace character, '' at the end of the file"""
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer) or self.eof:
+                return buffer[pos] if pos < len(buffer) else ''
+            self._fill()
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid project JSON: expected {' or '.join(repr(c) for c in chars)}, "
+                             f"found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"Invalid project JSON: {e.msg}") from None
+            else:
+                # A number running to the end of the buffer may continue
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            self._fill()
+
+
+def stream_project(path: str, chunk_size: int = CHUNK_SIZE) -> Project:
+    """
+    Load a project file element by element into column-backed tables
+
+    The result is a Project whose `tasks` and `resources` are a TaskTable
+    and a ResourceTable. Other top-level values are decoded whole.
+
+    Raises:
+        ValueError: the file is not valid JSON or a task or resource is
+            missing a field or has a non-numeric number
+    """
+    vocabulary = SkillVocabulary()
+    tables = {'tasks': TaskTable(vocabulary), 'resources': ResourceTable(vocabulary)}
+    fields: Dict[str, Any] = {}
+
+    with open(path, encoding='utf-8') as f, gc_paused():
+        reader = _Reader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            reader.expect('}')
+        else:
+            while True:
+                key = reader.value()
+                if type(key) is not str:
+                    raise ValueError("Invalid project JSON: expected a property name")
+                reader.expect(':')
+                table = tables.get(key)
+                if table is None:
+                    fields[key] = reader.value()
+                else:
+                    reader.expect('[')
+                    if reader.peek() == ']':
+                        reader.expect(']')
+                    else:
+                        i = 0
+                        while True:
+                            table.append(reader.value(), i)
+                            i += 1
+                            if reader.expect(',]') == ']':
+                                break
+                    fields[key] = table
+                if reader.expect(',}') == '}':
+                    break
+        if reader.peek():
+            raise ValueError("Invalid project JSON: extra data after the project object")
+
+    for key in ('id', 'name', 'description', 'tasks', 'resources', 'metadata'):
+        if key not in fields:
+            raise ValueError(f"Project file has no '{key}'")
+
+    constraints_data = fields.get('constraints', {})
+    metadata_data = fields['metadata']
+    return Project(
+        id=fields['id'],
+        name=fields['name'],
+        description=fields['description'],
+        tasks=tables['tasks'],
+        resources=tables['resources'],
+        constraints=ProjectConstraints(
+            quality_gates=constraints_data.get('quality_gates', True),
+            max_budget=constraints_data.get('max_budget'),
+            max_duration_days=constraints_data.get('max_duration_days')
+        ),
+        metadata=ProjectMetadata(
+            project_type=metadata_data['project_type'],
+            complexity=metadata_data['complexity'],
+            team_size=metadata_data['team_size'],
+            estimated_budget=metadata_data['estimated_budget']
+        )
+    )
+
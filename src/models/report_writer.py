@@ -0,0 +1,183 @@
+"""
+Compact layouts and fast writing of analysis reports
+
+`ParetoOptimizer.generate_report` returns the full layout, where every
+scenario's `to_dict()` appears once per place it is listed (best by
+objective, ranking, Pareto frontier). The compact layouts hold each
+scenario and its metrics once, keyed by scenario id, and list ids
+elsewhere:
+
+- referenced: scenarios keep their assignment lists
+- columnar: assignments are columns of task and resource positions into
+  the report's `tasks` and `resources` id tables (see scenario_codec)
+
+`expand_report` restores the full layout from either. Reports are
+written with the fast JSON encoder and gzip- or zstd-compressed when the
+path ends in .gz or .zst.
+"""
+import gzip
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.models.json_codec import dumps, loads
+from src.models.scenario_codec import ScenarioCodec, decode_scenario
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+LAYOUTS = ('full', 'referenced', 'columnar')
+COMPRESSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+BEST_KEYS = ('fastest', 'cheapest', 'highest_quality', 'best_balanced')
+
+# Favour speed: reports are rewritten on every run
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def compact_report(report: Dict, layout: str = 'referenced') -> Dict:
+    """
+    A full report in the referenced or columnar layout
+
+    Raises:
+        ValueError: unknown layout, or two different scenarios share an id
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown report layout '{layout}', expected one of {', '.join(LAYOUTS)}")
+    if layout == 'full':
+        return report
+
+    scenarios: Dict[str, Dict] = {}
+    metrics: Dict[str, Dict] = {}
+
+    def reference(entry: Optional[Dict]) -> Optional[str]:
+        if entry is None or entry['scenario'] is None:
+            return None
+        scenario = entry['scenario']
+        scenario_id = scenario['id']
+        known = scenarios.get(scenario_id)
+        if known is None:
+            scenarios[scenario_id] = scenario
+            metrics[scenario_id] = entry['metrics']
+        elif known is not scenario and known != scenario:
+            raise ValueError(f"Report lists two different scenarios with id '{scenario_id}'")
+        return scenario_id
+
+    # Ranked first so that scenarios keep their ranking order
+    ranked = [reference(entry) for entry in report['all_scenarios_ranked']]
+    best = {key: reference(report['best_scenarios'][key]) for key in BEST_KEYS}
+    pareto = [reference(entry) for entry in report['pareto_frontier']]
+
+    compact = {'layout': layout, 'summary': report['summary']}
+    if layout == 'columnar':
+        codec = ScenarioCodec()
+        encoded = {scenario_id: codec.encode(scenario) for scenario_id, scenario in scenarios.items()}
+        compact['tasks'] = codec.task_ids
+        compact['resources'] = codec.resource_ids
+        scenarios = encoded
+    compact.update({
+        'scenarios': scenarios,
+        'metrics': metrics,
+        'best_scenarios': best,
+        'all_scenarios_ranked': ranked,
+        'pareto_frontier': pareto,
+    })
+    return compact
+
+
+def expand_report(report: Dict) -> Dict:
+    """The full layout of a report in any layout"""
+    layout = report.get('layout', 'full')
+    if layout == 'full':
+        return report
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown report layout '{layout}'")
+
+    scenarios = report['scenarios']
+    if layout == 'columnar':
+        tasks, resources = report['tasks'], report['resources']
+        scenarios = {
+            scenario_id: decode_scenario(encoded, tasks, resources)
+            for scenario_id, encoded in scenarios.items()
+        }
+    metrics = report['metrics']
+
+    def entry(scenario_id: Optional[str]) -> Dict:
+        if scenario_id is None:
+            return {'scenario': None, 'metrics': None}
+        return {'scenario': scenarios[scenario_id], 'metrics': metrics[scenario_id]}
+
+    return {
+        'summary': report['summary'],
+        'best_scenarios': {key: entry(report['best_scenarios'][key]) for key in BEST_KEYS},
+        'all_scenarios_ranked': [
+            {'rank': i + 1, **entry(scenario_id)}
+            for i, scenario_id in enumerate(report['all_scenarios_ranked'])
+        ],
+        'pareto_frontier': [entry(scenario_id) for scenario_id in report['pareto_frontier']],
+    }
+
+
+def _compression(path: Path, compression: Optional[str]) -> Optional[str]:
+    if compression is None:
+        compression = COMPRESSIONS.get(path.suffix)
+    if compression not in (None, 'gzip', 'zstd'):
+        raise ValueError(f"Unknown compression '{compression}', expected gzip or zstd")
+    if compression == 'zstd' and zstd is None:
+        raise ValueError("zstd compression needs Python 3.14 or the zstandard package")
+    return compression
+
+
+def _compress(data: bytes, compression: Optional[str]) -> bytes:
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if compression == 'zstd':
+        return zstd.compress(data, level=ZSTD_LEVEL)
+    return data
+
+
+def _decompress(data: bytes, compression: Optional[str]) -> bytes:
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'zstd':
+        return zstd.decompress(data)
+    return data
+
+
+def write_report(
+    report: Dict,
+    path: str,
+    layout: str = 'full',
+    compression: Optional[str] = None,
+    indent: bool = True
+) -> int:
+    """
+    Write a full report to `path` in the given layout
+
+    Args:
+        report: Output of `ParetoOptimizer.generate_report`
+        layout: 'full', 'referenced' or 'columnar'
+        compression: 'gzip' or 'zstd'; taken from a .gz/.zst suffix when omitted
+        indent: Indent like `json.dump(report, f, indent=2)`
+
+    Returns:
+        Number of bytes written
+    """
+    path = Path(path)
+    compression = _compression(path, compression)
+    data = _compress(dumps(compact_report(report, layout), indent=indent), compression)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def read_report(path: str, compression: Optional[str] = None) -> Dict:
+    """Read a report written by `write_report`, in the full layout"""
+    path = Path(path)
+    compression = _compression(path, compression)
+    with open(path, 'rb') as f:
+        return expand_report(loads(_decompress(f.read(), compression)))
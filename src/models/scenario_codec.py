@@ -0,0 +1,178 @@
+"""
+Compact encoding of scenario sets for API responses
+
+Scenarios of one project share most of their assignments with the
+baseline, so a set is sent as id tables, the baseline's assignments in
+columnar form, and every other scenario either as a per-task delta
+against the baseline or, when most rows differ, as columns of its own.
+`decode_scenario_set` (and `decodeCompactScenarios` in the frontend)
+restores the exact `Scenario.to_dict()` output.
+"""
+from typing import Dict, List, Optional
+
+COMPACT_FORMAT = 'compact-v1'
+COLUMNS = ('task', 'resource', 'start', 'end', 'hours')
+
+# A delta is only sent when it is clearly smaller than the full columns
+DELTA_MAX_FRACTION = 0.6
+
+
+class ScenarioCodec:
+    """Encoder holding the task and resource id tables of one response"""
+
+    def __init__(self):
+        self.task_ids: List[str] = []
+        self.resource_ids: List[str] = []
+        self._task_position: Dict[str, int] = {}
+        self._resource_position: Dict[str, int] = {}
+        self._base = None
+        self._base_rows: List[tuple] = []
+        self._base_by_task: Dict[int, tuple] = {}
+
+    def _task(self, task_id: str) -> int:
+        position = self._task_position.get(task_id)
+        if position is None:
+            position = self._task_position[task_id] = len(self.task_ids)
+            self.task_ids.append(task_id)
+        return position
+
+    def _resource(self, resource_id: str) -> int:
+        position = self._resource_position.get(resource_id)
+        if position is None:
+            position = self._resource_position[resource_id] = len(self.resource_ids)
+            self.resource_ids.append(resource_id)
+        return position
+
+    def _rows(self, assignments: List[Dict]) -> List[tuple]:
+        return [
+            (self._task(a['task_id']), self._resource(a['resource_id']),
+             a['start_time'], a['end_time'], a['hours_allocated'])
+            for a in assignments
+        ]
+
+    @staticmethod
+    def _columns(rows: List[tuple]) -> Dict[str, list]:
+        if not rows:
+            return {name: [] for name in COLUMNS}
+        return {name: list(column) for name, column in zip(COLUMNS, zip(*rows))}
+
+    def _delta(self, rows: List[tuple], base_rows: List[tuple], base_by_task: Dict[int, tuple]) -> Optional[Dict]:
+        """Per-task changes against the base, or None when columns are smaller"""
+        by_task = {row[0]: row for row in rows}
+        if len(by_task) != len(rows) or len(base_by_task) != len(base_rows):
+            return None  # tasks split over several assignments have no per-task delta
+
+        changed = [row for row in rows if base_by_task.get(row[0]) != row]
+        removed = [task for task in base_by_task if task not in by_task]
+
+        # Default order: base order without removed tasks, then new tasks
+        new_tasks = [row[0] for row in changed if row[0] not in base_by_task]
+        default_order = [row[0] for row in base_rows if row[0] in by_task] + new_tasks
+        order = [row[0] for row in rows]
+
+        delta = {'changed': self._columns(changed), 'removed': removed}
+        size = len(changed) + len(removed)
+        if order != default_order:
+            delta['order'] = order
+            size += len(order) / len(COLUMNS)
+        if rows and size > DELTA_MAX_FRACTION * len(rows):
+            return None
+        return delta
+
+    def encode(self, scenario: Dict, base: Optional[Dict] = None) -> Dict:
+        """Scenario dict with `assignments` replaced by `columns` or `delta`"""
+        encoded = {key: value for key, value in scenario.items() if key != 'assignments'}
+        rows = self._rows(scenario.get('assignments', []))
+        delta = None
+        if base is not None:
+            # The base's rows are reused across every scenario encoded against it
+            if self._base is not base:
+                self._base = base
+                self._base_rows = self._rows(base.get('assignments', []))
+                self._base_by_task = {row[0]: row for row in self._base_rows}
+            delta = self._delta(rows, self._base_rows, self._base_by_task)
+        if delta is not None:
+            encoded['delta'] = delta
+        else:
+            encoded['columns'] = self._columns(rows)
+        return encoded
+
+
+def encode_scenario_set(baseline: Dict, scenarios: List[Dict]) -> Dict:
+    """
+    Encode scenario dicts against a baseline
+
+    Returns:
+        {'format', 'tasks', 'resources', 'baseline', 'scenarios'}; the
+        baseline is always columnar, the scenarios keep their order
+    """
+    codec = ScenarioCodec()
+    encoded_baseline = codec.encode(baseline)
+    encoded = [codec.encode(scenario, baseline) for scenario in scenarios]
+    return {
+        'format': COMPACT_FORMAT,
+        'tasks': codec.task_ids,
+        'resources': codec.resource_ids,
+        'baseline': encoded_baseline,
+        'scenarios': encoded
+    }
+
+
+def _assignments_from_columns(columns: Dict[str, list], tasks: List[str], resources: List[str]) -> List[Dict]:
+    return [
+        {
+            'task_id': tasks[task],
+            'resource_id': resources[resource],
+            'start_time': start,
+            'end_time': end,
+            'hours_allocated': hours
+        }
+        for task, resource, start, end, hours in zip(*(columns[name] for name in COLUMNS))
+    ]
+
+
+def _decode(encoded: Dict, tasks: List[str], resources: List[str],
+            base_assignments: Optional[List[Dict]]) -> Dict:
+    scenario = {key: value for key, value in encoded.items() if key not in ('columns', 'delta')}
+    if 'columns' in encoded:
+        assignments = _assignments_from_columns(encoded['columns'], tasks, resources)
+    else:
+        delta = encoded['delta']
+        by_task = {a['task_id']: a for a in base_assignments}
+        for task in delta['removed']:
+            by_task.pop(tasks[task], None)
+        changed = _assignments_from_columns(delta['changed'], tasks, resources)
+        new_ids = [a['task_id'] for a in changed if a['task_id'] not in by_task]
+        by_task.update((a['task_id'], a) for a in changed)
+        if 'order' in delta:
+            order = [tasks[task] for task in delta['order']]
+        else:
+            order = [a['task_id'] for a in base_assignments if a['task_id'] in by_task] + new_ids
+        assignments = [dict(by_task[task_id]) for task_id in order]
+
+    # Keep the key order of Scenario.to_dict()
+    result = {}
+    for key, value in scenario.items():
+        result[key] = value
+        if key == 'num_assignments':
+            result['assignments'] = assignments
+    result.setdefault('assignments', assignments)
+    return result
+
+
+def decode_scenario(encoded: Dict, tasks: List[str], resources: List[str]) -> Dict:
+    """`Scenario.to_dict()` output of one scenario encoded without a base"""
+    return _decode(encoded, tasks, resources, None)
+
+
+def decode_scenario_set(payload: Dict) -> Dict:
+    """Inverse of encode_scenario_set: {'baseline': dict, 'scenarios': [dict, ...]}"""
+    tasks, resources = payload['tasks'], payload['resources']
+    baseline = decode_scenario(payload['baseline'], tasks, resources)
+    return {
+        'baseline': baseline,
+        'scenarios': [
+            _decode(encoded, tasks, resources, baseline['assignments'])
+            for encoded in payload['scenarios']
+        ]
+    }
@@ -0,0 +1,410 @@
+"""
+Binary snapshots of a compiled project and its generated scenarios
+
+A snapshot is a directory of `.npy` files plus `meta.json`. Arrays are
+opened with `np.load(mmap_mode='r')`, so loading maps the files instead of
+reading them, and every process that opens the same snapshot shares one
+read-only copy of its pages through the OS page cache. Strings are stored
+as a UTF-8 blob with byte offsets, numbers as float64 with an is-int flag,
+so a loaded project gives back exactly the values it was saved with.
+
+Layout:
+    meta.json              version, source file, project fields, skill names
+    tasks.*, resources.*   column tables (see project_stream)
+    index.*                ProjectIndex arrays
+    scenarios/<key>/       scenario tables written by save_scenarios
+"""
+import json
+import os
+import re
+import shutil
+import uuid
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.models.data_models import (
+    Project, ProjectConstraints, ProjectMetadata, Scenario, TaskAssignment
+)
+from src.models.project_index import ProjectIndex
+from src.models.project_stream import NumberColumn, ResourceTable, SkillColumn, TaskTable
+
+SNAPSHOT_VERSION = 1
+SCENARIO_KEY = re.compile(r'^[A-Za-z0-9_.-]+$')
+_SCENARIO_FIELDS = ('id', 'name', 'total_duration_hours', 'total_cost', 'quality_score',
+                    'constraints_satisfied', 'optimization_type')
+
+
+class StringColumn(Sequence):
+    """Strings kept as one UTF-8 blob and byte offsets, decoded on access"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[k] for k in range(start, stop, step)]
+            return self._decode(start, stop)
+        if i < 0:
+            i += len(self)
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def _decode(self, start: int, stop: int) -> List[str]:
+        if stop <= start:
+            return []
+        offsets = self.offsets[start:stop + 1].tolist()
+        base = offsets[0]
+        data = self.blob[base:offsets[-1]].tobytes()
+        return [data[a - base:b - base].decode('utf-8') for a, b in zip(offsets, offsets[1:])]
+
+    def tolist(self) -> List[str]:
+        return self._decode(0, len(self))
+
+
+@dataclass
+class ProjectSnapshot:
+    """A loaded snapshot; its arrays are read-only views of the files"""
+    directory: Path
+    source: Optional[Dict]
+    project: Project
+    index: ProjectIndex
+
+
+class _Writer:
+    """Writes named arrays into a snapshot directory"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.exact: Dict[str, Dict[str, int]] = {}
+
+    def array(self, name: str, values, dtype=None):
+        np.save(self.directory / f"{name}.npy", np.asarray(values, dtype=dtype))
+
+    def strings(self, name: str, strings: Iterable[str]):
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        self.array(f"{name}.offsets", offsets)
+        self.array(f"{name}.blob", np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    def numbers(self, name: str, values: List):
+        for i, value in enumerate(values):
+            if type(value) is not int and type(value) is not float:
+                raise ValueError(f"Cannot snapshot {name}[{i}] = {value!r}: not a number")
+        packed = np.array(values, dtype=np.float64)
+        is_int = np.array([type(value) is int for value in values], dtype=np.uint8)
+        exact = {str(i): value for i, value in enumerate(values) if type(value) is int and float(value) != value}
+        if exact:
+            self.exact[name] = exact
+        self.array(name, packed)
+        self.array(f"{name}.int", is_int)
+
+
+class _Reader:
+    """Memory-maps named arrays of a snapshot directory"""
+
+    def __init__(self, directory: Path, exact: Dict[str, Dict[str, int]]):
+        self.directory = directory
+        self.exact = exact
+
+    def array(self, name: str) -> np.ndarray:
+        # A plain read-only view of the mapping: slicing np.memmap objects
+        # costs far more, and the view keeps the mapping alive
+        return np.asarray(np.load(self.directory / f"{name}.npy", mmap_mode='r'))
+
+    def strings(self, name: str) -> StringColumn:
+        return StringColumn(self.array(f"{name}.blob"), self.array(f"{name}.offsets"))
+
+    def numbers(self, name: str) -> NumberColumn:
+        exact = {int(i): value for i, value in self.exact.get(name, {}).items()}
+        return NumberColumn.from_arrays(self.array(name), self.array(f"{name}.int"), exact)
+
+
+def _plain(value):
+    # Scenario totals may be NumPy scalars; they are stored as Python numbers
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _write_meta(directory: Path, meta: Dict):
+    with open(directory / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, default=_plain)
+
+
+def _read_meta(directory: Path) -> Dict:
+    with open(directory / 'meta.json', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot {directory} has version {meta.get('version')}, expected {SNAPSHOT_VERSION}")
+    return meta
+
+
+def _replace_directory(staging: Path, directory: Path):
+    """
+    Move a fully written staging directory into place
+
+    Processes that have the old snapshot mapped keep reading its (now
+    unlinked) files; new readers only ever see a complete snapshot.
+    """
+    old = None
+    if directory.exists():
+        old = directory.with_name(f".{directory.name}.old-{uuid.uuid4().hex}")
+        os.replace(directory, old)
+    os.replace(staging, directory)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _staging_directory(directory: Path) -> Path:
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = directory.with_name(f".{directory.name}.tmp-{uuid.uuid4().hex}")
+    staging.mkdir()
+    return staging
+
+
+def _source_stamp(source_path: str) -> Dict:
+    stat = os.stat(source_path)
+    return {'path': os.path.realpath(source_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _save_rows(writer: _Writer, prefix: str, rows, skills_attr: str, number_attrs: List[str],
+               vocabulary: Dict[str, int]):
+    """Write task or resource rows as columns in one pass over `rows`"""
+    strings = {'id': [], 'name': [], 'description': []}
+    numbers = {attr: [] for attr in number_attrs}
+    skill_offsets, skill_names, skill_levels = [0], [], []
+    dependency_offsets, dependencies, available = [0], [], []
+    for row in rows:
+        for attr, column in strings.items():
+            column.append(getattr(row, attr))
+        for attr, column in numbers.items():
+            column.append(getattr(row, attr))
+        for skill in getattr(row, skills_attr):
+            skill_names.append(vocabulary.setdefault(skill.name, len(vocabulary)))
+            skill_levels.append(skill.level)
+        skill_offsets.append(len(skill_names))
+        if prefix == 'tasks':
+            dependencies.extend(row.dependencies or [])
+            dependency_offsets.append(len(dependencies))
+        else:
+            available.append(row.available)
+
+    for attr, column in strings.items():
+        writer.strings(f"{prefix}.{attr}", column)
+    for attr, column in numbers.items():
+        writer.numbers(f"{prefix}.{attr}", column)
+    writer.array(f"{prefix}.skills.offsets", skill_offsets, np.int64)
+    writer.array(f"{prefix}.skills.names", skill_names, np.uint32)
+    writer.numbers(f"{prefix}.skills.levels", skill_levels)
+    if prefix == 'tasks':
+        writer.array("tasks.dependency_offsets", dependency_offsets, np.int64)
+        writer.strings("tasks.dependencies", dependencies)
+    else:
+        writer.array("resources.available", available, np.uint8)
+
+
+def save_snapshot(directory: str, project: Project, index: ProjectIndex,
+                  source_path: Optional[str] = None) -> Path:
+    """
+    Write a project and its compiled index as a snapshot, replacing any
+    snapshot (and its scenarios) already in `directory`
+
+    Args:
+        source_path: JSON file the project was loaded from, recorded so
+            `snapshot_is_current` can tell when it has changed
+    """
+    directory = Path(directory)
+    staging = _staging_directory(directory)
+    try:
+        writer = _Writer(staging)
+        vocabulary: Dict[str, int] = {}
+        _save_rows(writer, 'tasks', project.tasks, 'required_skills', ['duration_hours', 'order'], vocabulary)
+        _save_rows(writer, 'resources', project.resources, 'skills', ['hourly_rate', 'max_hours_per_day'], vocabulary)
+
+        writer.strings("index.task_ids", index.task_ids)
+        writer.strings("index.resource_ids", index.resource_ids)
+        for name in ('durations', 'orders', 'hourly_rates', 'max_hours_per_day',
+                     'capable', 'skill_scores', 'available'):
+            writer.array(f"index.{name}", getattr(index, name))
+        candidates, candidate_offsets = index.capable_resource_arrays()
+        writer.array("index.capable_resources", candidates)
+        writer.array("index.capable_resource_offsets", candidate_offsets)
+        writer.array("index.dependency_offsets", np.cumsum([0] + [len(deps) for deps in index.dependencies]), np.int64)
+        writer.array("index.dependencies", [dep for deps in index.dependencies for dep in deps], np.int64)
+
+        _write_meta(staging, {
+            'version': SNAPSHOT_VERSION,
+            'source': _source_stamp(source_path) if source_path else None,
+            'project': {'id': project.id, 'name': project.name, 'description': project.description},
+            'constraints': asdict(project.constraints),
+            'metadata': asdict(project.metadata),
+            'skills': list(vocabulary),
+            'exact': writer.exact
+        })
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _replace_directory(staging, directory)
+    return directory
+
+
+def snapshot_is_current(directory: str, source_path: str) -> bool:
+    """True when `directory` holds a snapshot of `source_path` as it is now"""
+    try:
+        meta = _read_meta(Path(directory))
+        return meta['source'] == _source_stamp(source_path)
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def _load_table(cls, reader: _Reader, prefix: str, vocabulary: List[str], **columns):
+    skills = SkillColumn.from_columns(
+        vocabulary,
+        reader.array(f"{prefix}.skills.offsets"),
+        reader.array(f"{prefix}.skills.names"),
+        reader.numbers(f"{prefix}.skills.levels")
+    )
+    return cls.from_columns(
+        ids=reader.strings(f"{prefix}.id"),
+        names=reader.strings(f"{prefix}.name"),
+        descriptions=reader.strings(f"{prefix}.description"),
+        skills=skills,
+        **columns
+    )
+
+
+def load_snapshot(directory: str) -> ProjectSnapshot:
+    """
+    Map a snapshot written by save_snapshot
+
+    The project's tasks and resources are a TaskTable and ResourceTable
+    over the mapped columns, and the index arrays are read-only mappings.
+
+    Raises:
+        FileNotFoundError: no snapshot in `directory`
+        ValueError: the snapshot was written by another format version
+    """
+    directory = Path(directory)
+    meta = _read_meta(directory)
+    reader = _Reader(directory, meta['exact'])
+    vocabulary = meta['skills']
+
+    tasks = _load_table(
+        TaskTable, reader, 'tasks', vocabulary,
+        durations=reader.numbers("tasks.duration_hours"),
+        orders=reader.numbers("tasks.order"),
+        dependency_offsets=reader.array("tasks.dependency_offsets"),
+        dependencies=reader.strings("tasks.dependencies")
+    )
+    resources = _load_table(
+        ResourceTable, reader, 'resources', vocabulary,
+        hourly_rates=reader.numbers("resources.hourly_rate"),
+        max_hours_per_day=reader.numbers("resources.max_hours_per_day"),
+        available=reader.array("resources.available")
+    )
+    project = Project(
+        tasks=tasks,
+        resources=resources,
+        constraints=ProjectConstraints(**meta['constraints']),
+        metadata=ProjectMetadata(**meta['metadata']),
+        **meta['project']
+    )
+
+    offsets = reader.array("index.dependency_offsets").tolist()
+    flat = reader.array("index.dependencies").tolist()
+    index = ProjectIndex(
+        task_ids=reader.strings("index.task_ids").tolist(),
+        resource_ids=reader.strings("index.resource_ids").tolist(),
+        durations=reader.array("index.durations"),
+        orders=reader.array("index.orders"),
+        hourly_rates=reader.array("index.hourly_rates"),
+        max_hours_per_day=reader.array("index.max_hours_per_day"),
+        capable=reader.array("index.capable"),
+        skill_scores=reader.array("index.skill_scores"),
+        dependencies=[flat[a:b] for a, b in zip(offsets, offsets[1:])],
+        available=reader.array("index.available"),
+        capable_resource_csr=(reader.array("index.capable_resources"),
+                              reader.array("index.capable_resource_offsets"))
+    )
+    return ProjectSnapshot(directory, meta['source'], project, index)
+
+
+def _scenario_directory(directory: str, key: str) -> Path:
+    if not SCENARIO_KEY.match(key):
+        raise ValueError(f"Invalid scenario key: {key!r}")
+    return Path(directory) / 'scenarios' / key
+
+
+def save_scenarios(directory: str, key: str, scenarios: List[Scenario]):
+    """
+    Store generated scenarios in the snapshot under `key`, e.g. the
+    generation options they depend on
+    """
+    target = _scenario_directory(directory, key)
+    staging = _staging_directory(target)
+    try:
+        writer = _Writer(staging)
+        task_ids: Dict[str, int] = {}
+        resource_ids: Dict[str, int] = {}
+        offsets = [0]
+        tasks, resources, starts, ends, hours = [], [], [], [], []
+        for scenario in scenarios:
+            for assignment in scenario.assignments:
+                tasks.append(task_ids.setdefault(assignment.task_id, len(task_ids)))
+                resources.append(resource_ids.setdefault(assignment.resource_id, len(resource_ids)))
+                starts.append(assignment.start_time)
+                ends.append(assignment.end_time)
+                hours.append(assignment.hours_allocated)
+            offsets.append(len(tasks))
+
+        writer.strings("task_ids", task_ids)
+        writer.strings("resource_ids", resource_ids)
+        writer.array("offsets", offsets, np.int64)
+        writer.array("tasks", tasks, np.int64)
+        writer.array("resources", resources, np.int64)
+        writer.numbers("start_time", starts)
+        writer.numbers("end_time", ends)
+        writer.numbers("hours_allocated", hours)
+        _write_meta(staging, {
+            'version': SNAPSHOT_VERSION,
+            'scenarios': [{name: getattr(scenario, name) for name in _SCENARIO_FIELDS} for scenario in scenarios],
+            'exact': writer.exact
+        })
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _replace_directory(staging, target)
+
+
+def load_scenarios(directory: str, key: str) -> Optional[List[Scenario]]:
+    """Scenarios saved under `key`, or None if there are none"""
+    target = _scenario_directory(directory, key)
+    try:
+        meta = _read_meta(target)
+    except (OSError, ValueError):
+        return None
+    reader = _Reader(target, meta['exact'])
+    task_ids = reader.strings("task_ids").tolist()
+    resource_ids = reader.strings("resource_ids").tolist()
+    offsets = reader.array("offsets").tolist()
+    rows = list(zip(
+        [task_ids[k] for k in reader.array("tasks").tolist()],
+        [resource_ids[k] for k in reader.array("resources").tolist()],
+        reader.numbers("start_time").tolist(),
+        reader.numbers("end_time").tolist(),
+        reader.numbers("hours_allocated").tolist()
+    ))
+    return [
+        Scenario(assignments=[TaskAssignment(*row) for row in rows[offsets[k]:offsets[k + 1]]], **fields)
+        for k, fields in enumerate(meta['scenarios'])
+    ]
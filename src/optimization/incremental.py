@@ -0,0 +1,196 @@
+"""
+Incremental re-scheduling of heuristic scenarios for interactive what-if edits
+"""
+import copy
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from src.models.data_models import Project, Scenario
+from src.optimization.list_scheduler import ScheduleResult, SchedulingRule
+from src.optimization.scenario_generator import ScenarioGenerator
+
+
+# Editable fields and the ProjectIndex array that holds each one
+RESOURCE_FIELDS = {
+    'hourly_rate': 'hourly_rates',
+    'max_hours_per_day': 'max_hours_per_day',
+    'available': 'available',
+}
+TASK_FIELDS = {
+    'duration_hours': 'durations',
+}
+
+
+class IncrementalSession:
+    """
+    Last computed schedules of one client, updated in place on each edit
+
+    A session owns its copy of the project (JSON, `Project` objects and the
+    compiled index) and the engine schedules behind one heuristic strategy.
+    Edits are diffed against what is currently applied, patched into all
+    three representations, and each schedule is resumed from the first
+    dispatch position the edits can affect: the edited task for duration
+    changes, the first task the edited resource could take for resource
+    changes. Rate edits under rules that ignore rates only change the cost,
+    which is recomputed from the patched rates when the scenario is built.
+    """
+
+    def __init__(self, project_data: Dict, strategy: str, capacity_aware: bool = False):
+        self.strategy = strategy
+        self.capacity_aware = capacity_aware
+        self.base_data = project_data
+        self.project_data = copy.deepcopy(project_data)
+        self.project = Project.from_json(self.project_data)
+        self.generator = ScenarioGenerator(self.project, capacity_aware=capacity_aware)
+        self.rules: List[SchedulingRule] = self.generator.heuristic_rules(strategy)
+
+        index = self.generator.index
+        self.schedules: List[ScheduleResult] = [self.generator.scheduler.run(rule) for rule in self.rules]
+
+        # Dispatch positions never change with edits, so they are computed once
+        self._task_position = [self._dispatch_positions(schedule) for schedule in self.schedules]
+        self._resource_position = [
+            np.where(index.capable, positions[:, None], len(positions)).min(axis=0, initial=len(positions))
+            for positions in self._task_position
+        ]
+
+        self._entities = {
+            'resource': {res['id']: res for res in self.project_data.get('resources', [])},
+            'task': {task['id']: task for task in self.project_data.get('tasks', [])},
+        }
+        self._objects = {
+            'resource': {res.id: res for res in self.project.resources},
+            'task': {task.id: task for task in self.project.tasks},
+        }
+        self._base = {
+            kind: {entity_id: copy.deepcopy(entity) for entity_id, entity in entities.items()}
+            for kind, entities in self._entities.items()
+        }
+        self._applied: Dict[Tuple[str, str, str], Any] = {}
+
+        # Held by callers across update() and scenario() when requests for
+        # one session may run on several threads
+        self.lock = threading.Lock()
+
+    def _dispatch_positions(self, schedule: ScheduleResult) -> np.ndarray:
+        positions = np.empty(len(schedule.dispatch_order), dtype=np.int64)
+        positions[schedule.dispatch_order] = np.arange(len(schedule.dispatch_order))
+        return positions
+
+    def update(self, resources: Dict[str, Dict], tasks: Dict[str, Dict]) -> Dict:
+        """
+        Apply the full set of custom constraints and re-schedule what changed
+
+        Args:
+            resources: resource_id -> {field: value}, as sent to /optimize/custom
+            tasks: task_id -> {field: value}
+
+        Returns:
+            Summary of the edits and how much of the schedule was recomputed
+
+        Raises:
+            ValueError: an edit is not a number, a rate is negative, a
+                duration or max_hours_per_day is not positive, or
+                `available` is not a boolean. Nothing is applied then.
+        """
+        targets = {}
+        for kind, constraints, fields in (('resource', resources, RESOURCE_FIELDS), ('task', tasks, TASK_FIELDS)):
+            for entity_id, constraint in (constraints or {}).items():
+                if entity_id not in self._entities[kind]:
+                    continue
+                for field in fields:
+                    if field in constraint:
+                        targets[(kind, entity_id, field)] = self._parse_edit(entity_id, field, constraint[field])
+
+        # Fields edited before but no longer sent go back to their base values
+        for key in self._applied:
+            if key not in targets:
+                targets[key] = self._base_value(key)
+
+        edits = [(key, value) for key, value in targets.items() if value != self._current_value(key)]
+        for key, value in edits:
+            self._apply(key, value)
+        self._applied = {key: value for key, value in targets.items() if value != self._base_value(key)}
+
+        resumed_from = None
+        if edits:
+            if any(field == 'available' for (_, _, field), _ in edits):
+                self.generator.index.refresh_capable_resources()
+            for i, rule in enumerate(self.rules):
+                position = self._resume_position(i, rule, edits)
+                if position is not None:
+                    self.schedules[i] = self.generator.scheduler.resume(rule, self.schedules[i], position)
+                    resumed_from = position if resumed_from is None else min(resumed_from, position)
+
+        n_tasks = self.generator.index.n_tasks
+        return {
+            'edits': len(edits),
+            'rescheduled_from': resumed_from,
+            'tasks_rescheduled': 0 if resumed_from is None else n_tasks - resumed_from,
+            'total_tasks': n_tasks
+        }
+
+    def scenario(self) -> Scenario:
+        """Scenario for the current schedules"""
+        if self.strategy == 'parallel':
+            return self.generator.generate_parallel_scenario(self.schedules[0])
+        if self.strategy == 'cost':
+            return self.generator.generate_cost_optimized_scenario(self.schedules[0])
+        return self.generator.generate_balanced_scenario(self.schedules)
+
+    def _resume_position(self, i: int, rule: SchedulingRule, edits) -> Optional[int]:
+        """First dispatch position of schedule `i` the edits can change, None if none"""
+        index = self.generator.index
+        positions = []
+        for (kind, entity_id, field), _ in edits:
+            if kind == 'task':
+                positions.append(int(self._task_position[i][index.task_position[entity_id]]))
+                continue
+            if field == 'hourly_rate' and not rule.uses_rates:
+                continue
+            if field == 'max_hours_per_day' and not self.capacity_aware:
+                continue
+            positions.append(int(self._resource_position[i][index.resource_position[entity_id]]))
+        return min(positions) if positions else None
+
+    @staticmethod
+    def _parse_edit(entity_id: str, field: str, value):
+        """Client edit as an applied value, refused when no schedule can honour it"""
+        if field == 'available':
+            if value not in (True, False):
+                raise ValueError(f"available of '{entity_id}' must be true or false")
+            return bool(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{field} of '{entity_id}' must be a number")
+        if field == 'hourly_rate' and not value >= 0:
+            raise ValueError(f"hourly_rate of '{entity_id}' must not be negative")
+        if field != 'hourly_rate' and not value > 0:
+            raise ValueError(f"{field} of '{entity_id}' must be positive")
+        return float(value)
+
+    @staticmethod
+    def _coerce(field: str, value):
+        return bool(value) if field == 'available' else float(value)
+
+    def _base_value(self, key: Tuple[str, str, str]):
+        kind, entity_id, field = key
+        return self._coerce(field, self._base[kind][entity_id].get(field, True))
+
+    def _current_value(self, key: Tuple[str, str, str]):
+        kind, entity_id, field = key
+        index = self.generator.index
+        if kind == 'task':
+            return float(index.durations[index.task_position[entity_id]])
+        return self._coerce(field, getattr(index, RESOURCE_FIELDS[field])[index.resource_position[entity_id]])
+
+    def _apply(self, key: Tuple[str, str, str], value):
+        """Patch one field into the JSON, the Project objects and the index"""
+        kind, entity_id, field = key
+        index = self.generator.index
+        self._entities[kind][entity_id][field] = value
+        setattr(self._objects[kind][entity_id], field, value)
+        if kind == 'task':
+            index.durations[index.task_position[entity_id]] = value
+        else:
+            getattr(index, RESOURCE_FIELDS[field])[index.resource_position[entity_id]] = value
@@ -0,0 +1,387 @@
+"""
+Heap-based list scheduling engine with pluggable dispatch rules
+"""
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from src.models.project_index import ProjectIndex
+from src.optimization.resource_calendar import ResourceCalendar
+
+
+@dataclass
+class ScheduleResult:
+    """Assignments produced by a scheduling run, in dispatch order"""
+    task_indices: np.ndarray
+    resource_indices: np.ndarray
+    start_times: np.ndarray
+    end_times: np.ndarray
+    dispatch_order: Optional[np.ndarray] = None  # every task in dispatch order, assigned or not
+    task_finish: Optional[np.ndarray] = None     # (tasks,) finish time, ready time if unassigned
+
+    def __len__(self) -> int:
+        return len(self.task_indices)
+
+    @property
+    def makespan(self) -> float:
+        return float(self.end_times.max()) if len(self) else 0.0
+
+
+class ResourcePool:
+    """
+    Resource free times with a lazy min-heap for earliest-available queries
+
+    `free_at[r]` is the time resource `r` finishes its last assignment. The
+    heap may hold stale entries; they are discarded when they surface.
+    """
+
+    def __init__(self, n_resources: int):
+        self.free_at = np.zeros(n_resources)
+        self._heap = [(0.0, r) for r in range(n_resources)]
+
+    def start_times(self, candidates: np.ndarray, ready_time: float) -> np.ndarray:
+        """Earliest start for each candidate resource given the task ready time"""
+        return np.maximum(self.free_at[candidates], ready_time)
+
+    def fit(self, candidates: np.ndarray, ready_time: float, hours: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(starts, ends) of `hours` of work on each candidate resource"""
+        starts = self.start_times(candidates, ready_time)
+        return starts, starts + hours
+
+    def earliest_free(self) -> Optional[Tuple[float, int]]:
+        """(free time, resource) of the resource that frees up first"""
+        while True:
+            free_time, resource = self._heap[0]
+            if free_time == self.free_at[resource]:
+                return free_time, resource
+            heapq.heappop(self._heap)
+
+    def reserve(self, resource: int, start_time: float, end_time: float):
+        """Occupy a resource until `end_time`"""
+        self.free_at[resource] = end_time
+        heapq.heappush(self._heap, (end_time, resource))
+
+    def restore(self, resources: np.ndarray, start_times: np.ndarray, end_times: np.ndarray):
+        """Replay earlier reservations, given in the order they were made"""
+        # Without calendars each reservation ends after the resource's previous one
+        np.maximum.at(self.free_at, resources, end_times)
+        self._heap = [(free_time, r) for r, free_time in enumerate(self.free_at.tolist())]
+        heapq.heapify(self._heap)
+
+
+class CalendarPool(ResourcePool):
+    """
+    Resource pool backed by one ResourceCalendar per resource
+
+    Work only happens within each resource's daily capacity, so a task on a
+    6-hour-per-day resource stretches across more timeline days, and a task
+    may be placed in an idle gap left before an earlier booking instead of
+    always after the resource's last assignment.
+    """
+
+    def __init__(self, max_hours_per_day: np.ndarray):
+        super().__init__(len(max_hours_per_day))
+        self.calendars = [ResourceCalendar(capacity) for capacity in max_hours_per_day]
+
+    def fit(self, candidates: np.ndarray, ready_time: float, hours: float) -> Tuple[np.ndarray, np.ndarray]:
+        starts = np.empty(len(candidates))
+        ends = np.empty(len(candidates))
+        for k, resource in enumerate(candidates):
+            starts[k], ends[k] = self.calendars[resource].earliest_fit(ready_time, hours)
+        return starts, ends
+
+    def earliest_free(self) -> Optional[Tuple[float, int]]:
+        # Gaps make the last booking's end a poor bound on availability
+        return None
+
+    def reserve(self, resource: int, start_time: float, end_time: float):
+        self.calendars[resource].reserve(start_time, end_time)
+        self.free_at[resource] = max(self.free_at[resource], end_time)
+
+    def restore(self, resources: np.ndarray, start_times: np.ndarray, end_times: np.ndarray):
+        for resource, start, end in zip(resources.tolist(), start_times.tolist(), end_times.tolist()):
+            self.reserve(resource, start, end)
+
+
+class SchedulingRule:
+    """
+    Dispatch policy for ListScheduler
+
+    `task_priority` orders the ready queue (smallest first) and
+    `select_resource` picks one of the capable resources, returning its
+    position in `candidates` or None to leave the task unassigned.
+    `uses_rates` marks rules whose choices depend on hourly rates.
+    """
+    name = 'rule'
+    uses_rates = False
+
+    def task_priority(self, index: ProjectIndex, task: int) -> tuple:
+        return (index.orders[task], task)
+
+    def select_resource(
+        self,
+        index: ProjectIndex,
+        task: int,
+        candidates: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        pool: ResourcePool,
+        ready_time: float
+    ) -> Optional[int]:
+        raise NotImplementedError
+
+
+class BestSkillRule(SchedulingRule):
+    """Highest skill match, earliest start among equally skilled resources"""
+    name = 'best_skill'
+
+    def select_resource(self, index, task, candidates, starts, ends, pool, ready_time):
+        scores = index.skill_scores[task, candidates]
+        best = scores.max()
+        if best <= 0:
+            return None
+        tied = np.flatnonzero(scores == best)
+        return int(tied[np.argmin(starts[tied])])
+
+
+class CheapestResourceRule(SchedulingRule):
+    """Lowest hourly rate, ties broken by resource position"""
+    name = 'cheapest'
+    uses_rates = True
+
+    def select_resource(self, index, task, candidates, starts, ends, pool, ready_time):
+        return int(np.argmin(index.hourly_rates[candidates]))
+
+
+class WeightedScoreRule(SchedulingRule):
+    """Weighted blend of start time, hourly rate and skill match"""
+    name = 'weighted'
+    uses_rates = True
+
+    def __init__(self, time_weight: float, cost_weight: float, skill_weight: float = 0.2):
+        self.time_weight = time_weight
+        self.cost_weight = cost_weight
+        self.skill_weight = skill_weight
+
+    def select_resource(self, index, task, candidates, starts, ends, pool, ready_time):
+        combined = (
+            self.time_weight * (1.0 / (1.0 + starts)) +
+            self.cost_weight * (1.0 / (1.0 + index.hourly_rates[candidates])) +
+            self.skill_weight * index.skill_scores[task, candidates]
+        )
+        return int(np.argmax(combined))
+
+
+class EarliestFinishRule(SchedulingRule):
+    """Resource that completes the task first, ties broken by position"""
+    name = 'earliest_finish'
+
+    def select_resource(self, index, task, candidates, starts, ends, pool, ready_time):
+        # With every resource eligible and all of them busy past the ready
+        # time, the heap top is the answer without touching the arrays
+        if len(candidates) == index.n_resources:
+            earliest = pool.earliest_free()
+            if earliest is not None and earliest[0] > ready_time:
+                return earliest[1]
+        return int(np.argmin(ends))
+
+
+class CriticalPathRule(SchedulingRule):
+    """
+    Least CPM slack first, each task on a preferred resource
+
+    Tasks on the critical path are dispatched before those that can wait,
+    ties going to the earlier CPM start. `choices` maps a task to the
+    position in its candidates of the resource it should run on; the
+    engine still starts it only once that resource is free.
+    """
+    name = 'critical_path'
+    uses_rates = True
+
+    def __init__(self, slack: np.ndarray, earliest_start: np.ndarray, choices: Dict[int, int]):
+        self.slack = slack
+        self.earliest_start = earliest_start
+        self.choices = choices
+
+    def task_priority(self, index, task):
+        # Rounded so float noise in the passes does not decide ties
+        return (round(float(self.slack[task]), 9), float(self.earliest_start[task]), index.orders[task], task)
+
+    def select_resource(self, index, task, candidates, starts, ends, pool, ready_time):
+        return self.choices.get(task)
+
+
+class _Dispatch:
+    """Accumulates assignments and dispatch order during a scheduling run"""
+
+    def __init__(self, tasks=None, resources=None, starts=None, ends=None, order=None):
+        self.tasks: List[int] = tasks or []
+        self.resources: List[int] = resources or []
+        self.starts: List[float] = starts or []
+        self.ends: List[float] = ends or []
+        self.order: List[int] = order or []
+
+    def add(self, task: int, resource: int, start: float, end: float):
+        self.tasks.append(task)
+        self.resources.append(resource)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def result(self, task_finish: List[float]) -> ScheduleResult:
+        return ScheduleResult(
+            task_indices=np.array(self.tasks, dtype=np.int64),
+            resource_indices=np.array(self.resources, dtype=np.int64),
+            start_times=np.array(self.starts, dtype=np.float64),
+            end_times=np.array(self.ends, dtype=np.float64),
+            dispatch_order=np.array(self.order, dtype=np.int64),
+            task_finish=np.array(task_finish, dtype=np.float64)
+        )
+
+
+class ListScheduler:
+    """
+    Greedy list scheduler over a compiled project
+
+    Tasks whose predecessors in the dependency graph have all been
+    dispatched sit in a priority queue ordered by the rule; each one is
+    placed on the resource the rule selects, at the later of its ready
+    time (latest predecessor finish) and the resource's free time. With
+    `calendars=True` each resource's daily capacity is respected and tasks
+    may backfill idle gaps in a resource's calendar.
+    """
+
+    def __init__(self, index: ProjectIndex, calendars: bool = False):
+        self.index = index
+        self.graph = index.graph
+        self.calendars = calendars
+
+    def _new_pool(self) -> ResourcePool:
+        if self.calendars:
+            return CalendarPool(self.index.max_hours_per_day)
+        return ResourcePool(self.index.n_resources)
+
+    def run(self, rule: SchedulingRule) -> ScheduleResult:
+        """Schedule every task with the given rule"""
+        index = self.index
+        graph = self.graph
+        pool = self._new_pool()
+
+        # Finish time of every graph node; a task that cannot be assigned
+        # finishes at its ready time so it does not hold up its successors
+        finish = [0.0] * graph.n_nodes
+        remaining = [len(preds) for preds in graph.predecessors]
+        ready_queue = []
+        released = [node for node in range(graph.n_nodes) if remaining[node] == 0]
+        dispatch = _Dispatch()
+
+        while released or ready_queue:
+            # Milestones complete as soon as they are released; tasks queue up
+            while released:
+                node = released.pop()
+                if graph.is_milestone(node):
+                    finish[node] = self._ready_time(node, finish)
+                    released.extend(self._release_successors(node, remaining))
+                else:
+                    heapq.heappush(ready_queue, (rule.task_priority(index, node), node))
+            if not ready_queue:
+                break
+
+            _, task = heapq.heappop(ready_queue)
+            finish[task] = self._place(rule, pool, task, self._ready_time(task, finish), dispatch)
+            released.extend(self._release_successors(task, remaining))
+
+        return dispatch.result(finish[:graph.n_tasks])
+
+    def resume(self, rule: SchedulingRule, previous: ScheduleResult, position: int) -> ScheduleResult:
+        """
+        Re-run only the part of a schedule from dispatch `position` onwards
+
+        Which task is dispatched next depends on the dependency graph and
+        the rule's task priorities, never on durations, rates or resource
+        choices, so after such an edit the dispatch order is unchanged and
+        everything dispatched before the first affected task keeps its
+        placement. Resource state is restored from that prefix and the
+        remaining tasks are placed again; the result equals a full `run`.
+        """
+        index = self.index
+        order = previous.dispatch_order
+        position = max(0, min(position, len(order)))
+        if position == len(order):
+            return previous
+
+        # Assignments are stored in dispatch order, so the prefix's
+        # assignments are the first `kept` of them
+        assigned = np.zeros(index.n_tasks, dtype=bool)
+        assigned[previous.task_indices] = True
+        kept = int(np.count_nonzero(assigned[order[:position]]))
+
+        pool = self._new_pool()
+        pool.restore(
+            previous.resource_indices[:kept], previous.start_times[:kept], previous.end_times[:kept]
+        )
+
+        finish: List[Optional[float]] = [None] * self.graph.n_nodes
+        for task in order[:position].tolist():
+            finish[task] = float(previous.task_finish[task])
+
+        dispatch = _Dispatch(
+            previous.task_indices[:kept].tolist(),
+            previous.resource_indices[:kept].tolist(),
+            previous.start_times[:kept].tolist(),
+            previous.end_times[:kept].tolist(),
+            order[:position].tolist()
+        )
+        for task in order[position:].tolist():
+            finish[task] = self._place(rule, pool, task, self._resume_ready_time(task, finish), dispatch)
+
+        return dispatch.result(finish[:self.graph.n_tasks])
+
+    def _place(self, rule: SchedulingRule, pool: ResourcePool, task: int, ready_time: float,
+               dispatch: '_Dispatch') -> float:
+        """Assign one task with the rule; returns its finish time"""
+        index = self.index
+        dispatch.order.append(task)
+        candidates = index.capable_resources[task]
+        if not len(candidates):
+            return ready_time
+
+        starts, ends = pool.fit(candidates, ready_time, index.durations[task])
+        choice = rule.select_resource(index, task, candidates, starts, ends, pool, ready_time)
+        if choice is None:
+            return ready_time
+
+        resource = int(candidates[choice])
+        start, end = float(starts[choice]), float(ends[choice])
+        pool.reserve(resource, start, end)
+        dispatch.add(task, resource, start, end)
+        return end
+
+    def _resume_ready_time(self, node: int, finish: List[Optional[float]]) -> float:
+        """Latest predecessor finish, filling in milestones on first use"""
+        ready = 0.0
+        for pred in self.graph.predecessors[node]:
+            pred_finish = finish[pred]
+            if pred_finish is None:
+                # Only milestones are missing; they finish when they are ready
+                pred_finish = finish[pred] = self._resume_ready_time(pred, finish)
+            if pred_finish > ready:
+                ready = pred_finish
+        return ready
+
+    def _ready_time(self, node: int, finish: List[float]) -> float:
+        """Latest finish among a node's predecessors"""
+        ready = 0.0
+        for pred in self.graph.predecessors[node]:
+            if finish[pred] > ready:
+                ready = finish[pred]
+        return ready
+
+    def _release_successors(self, node: int, remaining: List[int]) -> List[int]:
+        """Successors whose last outstanding predecessor was `node`"""
+        released = []
+        for succ in self.graph.successors[node]:
+            remaining[succ] -= 1
+            if remaining[succ] == 0:
+                released.append(succ)
+        return released
@@ -0,0 +1,258 @@
+"""
+Monte Carlo duration-uncertainty simulation of fixed assignment plans
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from src.models.project_index import ProjectIndex
+
+PERCENTILES = (50, 80, 95)
+
+
+@dataclass
+class DurationModel:
+    """
+    Per-task duration distributions around each task's point estimate
+
+    Every task gets a (low, mode, high) triple of `optimistic`,
+    1.0 and `pessimistic` times its `duration_hours`, unless `overrides`
+    gives explicit hours for it. `kind` is 'triangular', 'pert' or
+    'lognormal'; the lognormal has its median at the mode and spread `sigma`.
+    """
+    kind: str = 'pert'
+    optimistic: float = 0.8
+    pessimistic: float = 1.5
+    sigma: float = 0.25
+    overrides: Dict[str, Tuple[float, float, float]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.kind not in ('triangular', 'pert', 'lognormal'):
+            raise ValueError(f"Unknown duration distribution '{self.kind}'")
+
+    def bounds(self, index: ProjectIndex) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(low, mode, high) hours per task"""
+        mode = index.durations.copy()
+        low = mode * self.optimistic
+        high = mode * self.pessimistic
+        for task_id, (task_low, task_mode, task_high) in self.overrides.items():
+            i = index.task_position[task_id]
+            low[i], mode[i], high[i] = task_low, task_mode, task_high
+        return low, mode, high
+
+    def sample(self, index: ProjectIndex, samples: int, rng: np.random.Generator) -> np.ndarray:
+        """(tasks, samples) matrix of sampled durations in hours"""
+        low, mode, high = (bound[:, None] for bound in self.bounds(index))
+        shape = (index.n_tasks, samples)
+        width = high - low
+        degenerate = width <= 0
+
+        if self.kind == 'lognormal':
+            return mode * np.exp(self.sigma * rng.standard_normal(shape))
+
+        safe_width = np.where(degenerate, 1.0, width)
+        if self.kind == 'triangular':
+            # Inverse CDF, which unlike Generator.triangular accepts zero-width rows
+            u = rng.random(shape)
+            split = (mode - low) / safe_width
+            draws = np.where(
+                u < split,
+                low + np.sqrt(u * safe_width * (mode - low)),
+                high - np.sqrt((1.0 - u) * safe_width * (high - mode))
+            )
+        else:
+            alpha = 1.0 + 4.0 * (mode - low) / safe_width
+            beta = 1.0 + 4.0 * (high - mode) / safe_width
+            draws = low + rng.beta(
+                np.broadcast_to(alpha, shape), np.broadcast_to(beta, shape)
+            ) * width
+        return np.where(degenerate, mode, draws)
+
+
+@dataclass
+class MonteCarloResult:
+    """Sampled makespan and cost of one plan"""
+    makespan_hours: np.ndarray  # (samples,)
+    cost: np.ndarray            # (samples,)
+
+    def makespan_percentiles(self) -> Dict[int, float]:
+        values = np.percentile(self.makespan_hours, PERCENTILES)
+        return {p: float(v) for p, v in zip(PERCENTILES, values)}
+
+    def cost_percentiles(self) -> Dict[int, float]:
+        values = np.percentile(self.cost, PERCENTILES)
+        return {p: float(v) for p, v in zip(PERCENTILES, values)}
+
+    def to_dict(self) -> Dict:
+        makespan = self.makespan_percentiles()
+        cost = self.cost_percentiles()
+        result = {'samples': int(len(self.makespan_hours))}
+        for p in PERCENTILES:
+            result[f'time_p{p}_days'] = round(makespan[p] / 8, 2)
+            result[f'cost_p{p}'] = round(cost[p], 2)
+        return result
+
+
+@dataclass
+class _CompiledPlan:
+    """Assignment plan as a precedence DAG in evaluation order"""
+    order: List[int]
+    predecessors: List[np.ndarray]
+    node_task: np.ndarray        # task position whose sample drives the node, -1 for none
+    node_scale: np.ndarray       # elapsed hours per sampled hour of the task
+    finish_nodes: np.ndarray     # nodes whose finish bounds the makespan
+    cost_weights: np.ndarray     # (tasks,) cost per sampled hour
+
+
+class MonteCarloSimulator:
+    """
+    Re-time a fixed assignment plan under sampled task durations
+
+    The plan keeps its resource choices and the order in which each
+    resource works through its assignments; only durations change, and
+    elapsed time scales with them (so capacity-stretched assignments stay
+    stretched). Each assignment starts once the tasks it depends on are
+    complete and its resource's previous assignment is finished, which is
+    a longest-path computation over a DAG of assignments and
+    dependency-graph nodes. It is evaluated node by node in topological
+    order, with every node handling all samples at once as one NumPy row.
+    """
+
+    def __init__(self, index: ProjectIndex, chunk_cells: int = 20_000_000):
+        self.index = index
+        self.chunk_cells = chunk_cells
+
+    def simulate(
+        self,
+        scenario,
+        samples: int = 10000,
+        model: Optional[DurationModel] = None,
+        seed: Optional[int] = None
+    ) -> MonteCarloResult:
+        """Sample `samples` duration vectors and re-time the scenario's plan for each"""
+        model = model or DurationModel()
+        rng = np.random.default_rng(seed)
+        plan = self._compile(scenario)
+
+        # Bound memory by evaluating the samples in chunks
+        n_nodes = len(plan.predecessors)
+        chunk = max(1, self.chunk_cells // max(n_nodes + self.index.n_tasks, 1))
+        makespans, costs = [], []
+        for offset in range(0, samples, chunk):
+            count = min(chunk, samples - offset)
+            durations = model.sample(self.index, count, rng)
+            makespans.append(self._retime(plan, durations))
+            costs.append(plan.cost_weights @ durations)
+
+        return MonteCarloResult(
+            makespan_hours=np.concatenate(makespans) if makespans else np.empty(0),
+            cost=np.concatenate(costs) if costs else np.empty(0)
+        )
+
+    def _retime(self, plan: _CompiledPlan, durations: np.ndarray) -> np.ndarray:
+        """Makespan per sample of the compiled plan"""
+        count = durations.shape[1]
+        finish = np.zeros((len(plan.predecessors), count))
+        for node in plan.order:
+            preds = plan.predecessors[node]
+            if len(preds) == 0:
+                start = 0.0
+            elif len(preds) == 1:
+                start = finish[preds[0]]
+            else:
+                start = finish[preds].max(axis=0)
+
+            task = plan.node_task[node]
+            if task >= 0:
+                np.add(start, durations[task] * plan.node_scale[node], out=finish[node])
+            else:
+                finish[node] = start
+
+        if not len(plan.finish_nodes):
+            return np.zeros(count)
+        return finish[plan.finish_nodes].max(axis=0)
+
+    def _compile(self, scenario) -> _CompiledPlan:
+        index = self.index
+        graph = index.graph
+        n_graph = graph.n_nodes
+
+        # Assignments in planned start order; chunks of one task stay ordered too
+        assignments = sorted(
+            (
+                (a.start_time, a.end_time, a.hours_allocated,
+                 index.task_position[a.task_id], index.resource_position[a.resource_id])
+                for a in scenario.assignments
+            ),
+            key=lambda a: (a[0], a[1])
+        )
+        n_nodes = n_graph + len(assignments)
+        predecessors: List[List[int]] = [[] for _ in range(n_nodes)]
+        node_task = np.full(n_nodes, -1, dtype=np.int64)
+        node_scale = np.zeros(n_nodes)
+        cost_weights = np.zeros(index.n_tasks)
+
+        task_chunks: Dict[int, List[int]] = {}
+        last_on_resource: Dict[int, int] = {}
+        for k, (start, end, hours, task, resource) in enumerate(assignments):
+            node = n_graph + k
+            nominal = index.durations[task]
+            node_task[node] = task
+            node_scale[node] = (end - start) / nominal if nominal > 0 else 0.0
+            if nominal > 0:
+                cost_weights[task] += hours / nominal * index.hourly_rates[resource]
+
+            # Work queued behind the resource's previous assignment stays
+            # behind it; plans that overlap a resource keep the overlap
+            preds = predecessors[node]
+            preds.extend(graph.predecessors[task])
+            previous = last_on_resource.get(resource)
+            if previous is not None and assignments[previous - n_graph][1] <= start + 1e-9:
+                preds.append(previous)
+            last_on_resource[resource] = node
+
+            # A chunk that began after an earlier chunk ended stays behind it
+            chunks = task_chunks.setdefault(task, [])
+            if chunks and assignments[chunks[-1] - n_graph][1] <= start + 1e-9:
+                preds.append(chunks[-1])
+            chunks.append(node)
+
+        # Task completion nodes wait for their assignments, or just for their
+        # predecessors when the plan left the task unassigned
+        for task in range(index.n_tasks):
+            if task in task_chunks:
+                predecessors[task] = list(task_chunks[task])
+            else:
+                predecessors[task] = list(graph.predecessors[task])
+        for milestone in range(index.n_tasks, n_graph):
+            predecessors[milestone] = list(graph.predecessors[milestone])
+
+        return _CompiledPlan(
+            order=self._topological_order(predecessors),
+            predecessors=[np.asarray(preds, dtype=np.int64) for preds in predecessors],
+            node_task=node_task,
+            node_scale=node_scale,
+            finish_nodes=np.arange(n_graph, n_nodes, dtype=np.int64),
+            cost_weights=cost_weights
+        )
+
+    @staticmethod
+    def _topological_order(predecessors: List[List[int]]) -> List[int]:
+        successors = [[] for _ in predecessors]
+        remaining = [len(preds) for preds in predecessors]
+        for node, preds in enumerate(predecessors):
+            for pred in preds:
+                successors[pred].append(node)
+        queue = deque(node for node, count in enumerate(remaining) if count == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for succ in successors[node]:
+                remaining[succ] -= 1
+                if remaining[succ] == 0:
+                    queue.append(succ)
+        if len(order) != len(predecessors):
+            raise ValueError("Assignment plan contradicts the task dependencies")
+        return order
@@ -0,0 +1,369 @@
+"""
+Parameter sweeps over rates, durations and availability for what-if analysis
+"""
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+from src.models.data_models import Project
+from src.models.project_index import ProjectIndex
+from src.optimization.scenario_generator import ScenarioGenerator
+from src.services.compute_pool import check_cancelled
+
+
+# Sweepable fields and the ProjectIndex array each one patches
+RESOURCE_FIELDS = {
+    'hourly_rate': 'hourly_rates',
+    'max_hours_per_day': 'max_hours_per_day',
+    'available': 'available',
+}
+TASK_FIELDS = {
+    'duration_hours': 'durations',
+}
+
+# Heuristics that schedule purely from the index, so patched variants apply
+STRATEGIES = {
+    'parallel': 'generate_parallel_scenario',
+    'cost': 'generate_cost_optimized_scenario',
+    'balanced': 'generate_balanced_scenario',
+    'critical_path': 'generate_critical_path_scenario',
+    'resource_leveling': 'generate_resource_leveling_scenario',
+}
+
+# Fields with a continuous range, the only ones Latin-hypercube sampling covers
+NUMERIC_FIELDS = {'hourly_rate', 'max_hours_per_day', 'duration_hours'}
+
+METRIC_COLUMNS = ['total_time_days', 'total_cost', 'quality_score', 'constraints_satisfied']
+
+
+@dataclass
+class SweepParameter:
+    """
+    One swept dimension
+
+    Values come from `values` when given, otherwise from the [low, high]
+    range (`steps` evenly spaced points for grids, a continuous range for
+    Latin-hypercube sampling). With mode 'scale' a value multiplies each
+    entity's baseline instead of replacing it.
+
+    Rates must stay non-negative, durations and `max_hours_per_day`
+    positive (for 'scale' the factor, so every scaled baseline stays in
+    range), and `available` is swept over explicit 0/1 values only.
+    """
+    field: str
+    ids: List[str] = field(default_factory=list)  # empty means every task/resource
+    values: Optional[List[float]] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+    steps: int = 3
+    mode: str = 'set'
+
+    def __post_init__(self):
+        if self.field not in RESOURCE_FIELDS and self.field not in TASK_FIELDS:
+            raise ValueError(f"Cannot sweep field '{self.field}'")
+        if self.mode not in ('set', 'scale'):
+            raise ValueError(f"Unknown sweep mode '{self.mode}'")
+        if not self.values and (self.low is None or self.high is None):
+            raise ValueError(f"Sweep of '{self.field}' needs values or a low/high range")
+        points = self.values if self.values else [self.low, self.high]
+        if self.field == 'hourly_rate' and min(points) < 0:
+            raise ValueError("Sweep of 'hourly_rate' needs non-negative values")
+        if self.field in ('max_hours_per_day', 'duration_hours') and min(points) <= 0:
+            raise ValueError(f"Sweep of '{self.field}' needs positive values")
+        if self.field == 'available' and (self.mode != 'set' or not self.values or
+                                          any(value not in (0, 1) for value in self.values)):
+            raise ValueError("Sweep of 'available' needs values chosen from 0 and 1")
+
+    @property
+    def label(self) -> str:
+        target = ','.join(self.ids) if self.ids else '*'
+        return f"{self.field}[{target}]"
+
+    @property
+    def array_name(self) -> str:
+        return RESOURCE_FIELDS.get(self.field) or TASK_FIELDS[self.field]
+
+    def grid(self) -> np.ndarray:
+        """Points used for a Cartesian product sweep"""
+        if self.values:
+            return np.asarray(self.values, dtype=np.float64)
+        return np.linspace(self.low, self.high, max(self.steps, 1))
+
+    def sample(self, strata: np.ndarray) -> np.ndarray:
+        """Map Latin-hypercube positions in [0, 1) onto this parameter"""
+        if self.values:
+            values = np.asarray(self.values, dtype=np.float64)
+            return values[np.minimum((strata * len(values)).astype(np.int64), len(values) - 1)]
+        return self.low + strata * (self.high - self.low)
+
+    def positions(self, index: ProjectIndex) -> np.ndarray:
+        """Array positions of the swept tasks or resources"""
+        lookup = index.resource_position if self.field in RESOURCE_FIELDS else index.task_position
+        size = index.n_resources if self.field in RESOURCE_FIELDS else index.n_tasks
+        if not self.ids:
+            return np.arange(size)
+        unknown = [entity_id for entity_id in self.ids if entity_id not in lookup]
+        if unknown:
+            raise ValueError(f"Sweep of '{self.field}' targets unknown id(s): {', '.join(unknown)}")
+        return np.array([lookup[entity_id] for entity_id in self.ids], dtype=np.int64)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SweepParameter':
+        ids = data.get('ids', data.get('id', []))
+        return cls(
+            field=data['field'],
+            ids=[ids] if isinstance(ids, str) else list(ids),
+            values=data.get('values'),
+            low=data.get('low'),
+            high=data.get('high'),
+            steps=int(data.get('steps', 3)),
+            mode=data.get('mode', 'set')
+        )
+
+
+@dataclass
+class SweepResult:
+    """Metrics table of a sweep, one row per variant"""
+    parameters: List[str]
+    variants: np.ndarray          # (variants, parameters) swept values
+    metrics: np.ndarray           # (variants, len(METRIC_COLUMNS))
+    pareto_mask: np.ndarray       # (variants,) bool
+
+    def column(self, name: str) -> np.ndarray:
+        return self.metrics[:, METRIC_COLUMNS.index(name)]
+
+    @property
+    def pareto_indices(self) -> np.ndarray:
+        return np.flatnonzero(self.pareto_mask)
+
+    def to_dict(self) -> Dict:
+        rows = []
+        for i, (values, metrics) in enumerate(zip(self.variants.tolist(), self.metrics.tolist())):
+            row = {'variant': i, 'parameters': dict(zip(self.parameters, values))}
+            row.update({
+                'total_time_days': round(metrics[0], 2),
+                'total_cost': round(metrics[1], 2),
+                'quality_score': round(metrics[2], 3),
+                'constraints_satisfied': bool(metrics[3]),
+                'pareto_optimal': bool(self.pareto_mask[i])
+            })
+            rows.append(row)
+        return {
+            'parameters': self.parameters,
+            'variants': rows,
+            'pareto_frontier': self.pareto_indices.tolist()
+        }
+
+
+def variant_count(parameters: Sequence[SweepParameter], method: str = 'grid', samples: int = 64) -> int:
+    """
+    Number of variants a sweep evaluates, without building them
+
+    Raises:
+        ValueError: unknown method, or Latin-hypercube sampling of a
+            non-numeric parameter
+    """
+    if method == 'lhs':
+        for parameter in parameters:
+            if parameter.field not in NUMERIC_FIELDS:
+                raise ValueError(f"Latin-hypercube sampling cannot sweep '{parameter.field}'; use a grid")
+        return samples
+    if method != 'grid':
+        raise ValueError(f"Unknown sweep method '{method}'")
+    count = 1
+    for parameter in parameters:
+        count *= len(parameter.values) if parameter.values else max(parameter.steps, 1)
+    return count
+
+
+def pareto_front_mask(time: np.ndarray, cost: np.ndarray, quality: np.ndarray) -> np.ndarray:
+    """
+    Non-dominated rows when minimizing time and cost and maximizing quality
+
+    Uses the same dominance rule as ParetoOptimizer.find_pareto_frontier.
+    Rows are visited best-time first so each one is only compared against
+    the current frontier, not every other row.
+    """
+    n = len(time)
+    mask = np.zeros(n, dtype=bool)
+    if n == 0:
+        return mask
+    order = np.lexsort((-quality, cost, time))
+    front = np.empty(0, dtype=np.int64)
+    for i in order:
+        if len(front):
+            dominated = (
+                (time[front] <= time[i]) & (cost[front] <= cost[i]) & (quality[front] >= quality[i]) &
+                ((time[front] < time[i]) | (cost[front] < cost[i]) | (quality[front] > quality[i]))
+            )
+            if dominated.any():
+                continue
+        front = np.append(front, i)
+    mask[front] = True
+    return mask
+
+
+def patch_index(base: ProjectIndex, parameters: Sequence[SweepParameter], values: Sequence[float],
+                positions: Sequence[np.ndarray]) -> ProjectIndex:
+    """
+    Shallow copy of `base` with the swept arrays replaced
+
+    Only the arrays a variant touches are copied; the capability matrices,
+    lookup tables and dependency graph are shared with the base index.
+    """
+    variant = copy.copy(base)
+    copied = set()
+    for parameter, value, where in zip(parameters, values, positions):
+        name = parameter.array_name
+        if name not in copied:
+            setattr(variant, name, getattr(base, name).copy())
+            copied.add(name)
+        array = getattr(variant, name)
+        if parameter.mode == 'scale':
+            array[where] = getattr(base, name)[where] * value
+        else:
+            array[where] = value
+    if 'available' in copied:
+        variant.refresh_capable_resources()
+    return variant
+
+
+# Per-process sweep state, set once by the pool initializer
+_worker_state = None
+
+
+def _init_worker(project: Project, index: ProjectIndex, parameters: List[SweepParameter],
+                 strategy: str, capacity_aware: bool):
+    global _worker_state
+    positions = [parameter.positions(index) for parameter in parameters]
+    _worker_state = (project, index, parameters, positions, strategy, capacity_aware)
+
+
+def _evaluate_chunk(variants: np.ndarray) -> np.ndarray:
+    project, index, parameters, positions, strategy, capacity_aware = _worker_state
+    rows = np.empty((len(variants), len(METRIC_COLUMNS)))
+    for k, values in enumerate(variants):
+        check_cancelled()
+        variant = patch_index(index, parameters, values, positions)
+        generator = ScenarioGenerator(project, capacity_aware=capacity_aware, index=variant)
+        scenario = getattr(generator, STRATEGIES[strategy])()
+        rows[k] = (
+            scenario.total_duration_hours / 8,
+            scenario.total_cost,
+            scenario.quality_score,
+            float(scenario.constraints_satisfied)
+        )
+    return rows
+
+
+class ParameterSweep:
+    """
+    Evaluate many what-if variants of one project
+
+    The project is compiled to a ProjectIndex once; every variant is a
+    shallow copy with the swept arrays patched, scheduled by one of the
+    index-driven heuristics. Variants are spread over a process pool whose
+    workers receive the base index once through the pool initializer.
+    A cancelled compute pool job stops at the next variant, in whichever
+    process evaluates it.
+
+    Sweeping `max_hours_per_day` turns on capacity-aware scheduling, since
+    the other heuristics ignore daily hours and every variant would match.
+    """
+
+    def __init__(
+        self,
+        project: Project,
+        parameters: List[SweepParameter],
+        strategy: str = 'balanced',
+        capacity_aware: bool = False
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown sweep strategy '{strategy}'")
+        self.project = project
+        self.parameters = parameters
+        self.strategy = strategy
+        self.capacity_aware = capacity_aware or any(
+            parameter.field == 'max_hours_per_day' for parameter in parameters
+        )
+        self.index = ProjectIndex.from_project(project)
+        self.index.graph  # build once so variants share it
+        for parameter in parameters:
+            parameter.positions(self.index)  # fail fast on unknown ids
+
+    def grid_variants(self) -> np.ndarray:
+        """Cartesian product of every parameter's grid"""
+        if not self.parameters:
+            return np.empty((1, 0))
+        grids = np.meshgrid(*[parameter.grid() for parameter in self.parameters], indexing='ij')
+        return np.stack([grid.ravel() for grid in grids], axis=1)
+
+    def latin_hypercube_variants(self, samples: int, seed: Optional[int] = None) -> np.ndarray:
+        """`samples` variants with each parameter's range split into equal strata"""
+        rng = np.random.default_rng(seed)
+        columns = []
+        for parameter in self.parameters:
+            strata = (rng.permutation(samples) + rng.random(samples)) / samples
+            columns.append(parameter.sample(strata))
+        if not columns:
+            return np.empty((samples, 0))
+        return np.stack(columns, axis=1)
+
+    def run(
+        self,
+        method: str = 'grid',
+        samples: int = 64,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_variants: Optional[int] = None
+    ) -> SweepResult:
+        """
+        Schedule every variant and find the Pareto frontier
+
+        Args:
+            method: 'grid' for the Cartesian product, 'lhs' for Latin-hypercube sampling
+            samples: Number of variants for 'lhs'
+            seed: Random seed for 'lhs'
+            workers: Process count; 1 evaluates in this process
+            max_variants: Refuse sweeps with more variants than this
+
+        Raises:
+            ValueError: unknown method, `samples` below 1 or too many variants
+        """
+        if method == 'lhs' and samples < 1:
+            raise ValueError("samples must be at least 1")
+        count = variant_count(self.parameters, method, samples)
+        if max_variants is not None and count > max_variants:
+            raise ValueError(f"Sweep has {count} variants, more than the limit of {max_variants}")
+
+        if method == 'grid':
+            variants = self.grid_variants()
+        elif method == 'lhs':
+            variants = self.latin_hypercube_variants(samples, seed)
+        else:
+            raise ValueError(f"Unknown sweep method '{method}'")
+
+        metrics = self._evaluate(variants, workers)
+        mask = pareto_front_mask(metrics[:, 0], metrics[:, 1], metrics[:, 2])
+        return SweepResult(
+            parameters=[parameter.label for parameter in self.parameters],
+            variants=variants,
+            metrics=metrics,
+            pareto_mask=mask
+        )
+
+    def _evaluate(self, variants: np.ndarray, workers: Optional[int]) -> np.ndarray:
+        initargs = (self.project, self.index, self.parameters, self.strategy, self.capacity_aware)
+        workers = min(workers or os.cpu_count() or 1, len(variants))
+        if workers <= 1:
+            _init_worker(*initargs)
+            return _evaluate_chunk(variants)
+
+        # A few chunks per worker keeps the pool busy without per-variant overhead
+        chunks = np.array_split(variants, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            results = list(pool.map(_evaluate_chunk, [chunk for chunk in chunks if len(chunk)]))
+        return np.concatenate(results) if results else np.empty((0, len(METRIC_COLUMNS)))
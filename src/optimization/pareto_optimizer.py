@@ -3,7 +3,6 @@ Pareto Optimization and Evaluation Metrics for Scenarios
 """
 import numpy as np
 from typing import List, Dict, Tuple, Optional
-import matplotlib.pyplot as plt
 from dataclasses import dataclass
 import json
 
@@ -12,6 +11,15 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from models.data_models import Scenario, Project
+from src.models.json_codec import dumps
+from src.models.project_index import ProjectIndex
+from src.optimization.monte_carlo import MonteCarloSimulator, DurationModel
+from src.optimization.pareto_plot import ParetoPlotData, render_pareto_plot, render_pareto_plot_async
+
+# Sections of generate_report, in the order they are written
+REPORT_SECTIONS = ('summary', 'best_scenarios', 'all_scenarios_ranked', 'pareto_frontier')
+# Best-by-objective keys of the report and the objective each one selects by
+BEST_OBJECTIVES = {'fastest': 'time', 'cheapest': 'cost', 'highest_quality': 'quality', 'best_balanced': 'balanced'}
 
 
 @dataclass
@@ -26,10 +34,21 @@ class ScenarioMetrics:
     skill_match_score: float
     constraint_violations: int
     overall_score: float
+    # Duration-uncertainty percentiles, set when the optimizer runs Monte Carlo
+    time_p50_days: Optional[float] = None
+    time_p80_days: Optional[float] = None
+    time_p95_days: Optional[float] = None
+    cost_p50: Optional[float] = None
+    cost_p80: Optional[float] = None
+    cost_p95: Optional[float] = None
+    
+    @property
+    def has_risk(self) -> bool:
+        return self.time_p80_days is not None
     
     def to_dict(self) -> Dict:
         """Convert metrics to dictionary"""
-        return {
+        result = {
             'scenario_id': self.scenario_id,
             'total_time_days': round(self.total_time_days, 2),
             'total_cost': round(self.total_cost, 2),
@@ -40,16 +59,63 @@ class ScenarioMetrics:
             'constraint_violations': self.constraint_violations,
             'overall_score': round(self.overall_score, 3)
         }
+        if self.has_risk:
+            for p in (50, 80, 95):
+                result[f'time_p{p}_days'] = round(getattr(self, f'time_p{p}_days'), 2)
+                result[f'cost_p{p}'] = round(getattr(self, f'cost_p{p}'), 2)
+        return result
 
 
 class ParetoOptimizer:
     """Pareto optimization for multi-objective scenario evaluation"""
     
-    def __init__(self, project: Project):
-        """Initialize Pareto optimizer"""
+    def __init__(
+        self,
+        project: Project,
+        uncertainty: Optional[DurationModel] = None,
+        uncertainty_samples: int = 10000,
+        seed: Optional[int] = 0
+    ):
+        """
+        Initialize Pareto optimizer
+        
+        Args:
+            project: Project data
+            uncertainty: Duration distributions; when given every scenario is
+                also scored by Monte Carlo and P80 time and cost become extra
+                Pareto objectives
+            uncertainty_samples: Monte Carlo samples per scenario
+            seed: Random seed for the samples
+        """
         self.project = project
         self.pareto_frontier = []
         self.all_metrics = []
+        self.uncertainty = uncertainty
+        self.uncertainty_samples = uncertainty_samples
+        self.seed = seed
+        self._simulator = None
+        self._risk_cache = {}
+    
+    def _risk_percentiles(self, scenario: Scenario) -> Dict[str, float]:
+        """Monte Carlo time/cost percentiles, computed once per scenario object"""
+        cached = self._risk_cache.get(id(scenario))
+        if cached is not None and cached[0] is scenario:
+            return cached[1]
+        
+        if self._simulator is None:
+            self._simulator = MonteCarloSimulator(ProjectIndex.from_project(self.project))
+        result = self._simulator.simulate(
+            scenario, self.uncertainty_samples, self.uncertainty, seed=self.seed
+        )
+        makespan = result.makespan_percentiles()
+        cost = result.cost_percentiles()
+        percentiles = {}
+        for p in (50, 80, 95):
+            percentiles[f'time_p{p}_days'] = makespan[p] / 8
+            percentiles[f'cost_p{p}'] = cost[p]
+        
+        self._risk_cache[id(scenario)] = (scenario, percentiles)
+        return percentiles
     
     def evaluate_scenario(self, scenario: Scenario) -> ScenarioMetrics:
         """Calculate comprehensive metrics for a scenario"""
@@ -84,26 +150,6 @@ class ParetoOptimizer:
             constraint_violations
         )
         
-        scenario_data = {
-            'id': scenario.id,
-            'name': scenario.name,
-            'total_duration_days': scenario.total_duration_hours / 8,
-            'total_cost': scenario.total_cost,
-            'quality_score': scenario.quality_score,
-            'constraints_satisfied': scenario.constraints_satisfied,
-            'optimization_type': scenario.optimization_type,
-            'num_assignments': len(scenario.assignments),
-            'assignments': [
-                {
-                    'task_id': assignment.task_id,
-                    'resource_id': assignment.resource_id,
-                    'start_time': assignment.start_time,
-                    'end_time': assignment.end_time,
-                    'hours_allocated': assignment.hours_allocated
-                } for assignment in scenario.assignments
-            ]
-        }
-        
         return ScenarioMetrics(
             scenario_id=scenario.id,
             total_time_days=total_time_days,
@@ -113,7 +159,8 @@ class ParetoOptimizer:
             parallelization_factor=parallelization_factor,
             skill_match_score=skill_match_score,
             constraint_violations=constraint_violations,
-            overall_score=overall_score
+            overall_score=overall_score,
+            **(self._risk_percentiles(scenario) if self.uncertainty is not None else {})
         )
     
     def _calculate_resource_utilization(self, scenario: Scenario) -> float:
@@ -172,9 +219,16 @@ class ParetoOptimizer:
         total_match = 0.0
         count = 0
         
+        # First task/resource with each id, as a linear search would find
+        tasks, resources = {}, {}
+        for task in self.project.tasks:
+            tasks.setdefault(task.id, task)
+        for resource in self.project.resources:
+            resources.setdefault(resource.id, resource)
+        
         for assignment in scenario.assignments:
-            task = next((t for t in self.project.tasks if t.id == assignment.task_id), None)
-            resource = next((r for r in self.project.resources if r.id == assignment.resource_id), None)
+            task = tasks.get(assignment.task_id)
+            resource = resources.get(assignment.resource_id)
             
             if task and resource:
                 match_score = task.skill_match_score(resource)
@@ -236,7 +290,8 @@ class ParetoOptimizer:
     def find_pareto_frontier(self, scenarios: List[Scenario]) -> List[Scenario]:
         """
         Find Pareto optimal scenarios (non-dominated solutions)
-        Optimizing for: minimize time, minimize cost, maximize quality
+        Optimizing for: minimize time, minimize cost, maximize quality, and
+        minimize P80 time and cost when uncertainty is simulated
         """
         if not scenarios:
             return []
@@ -244,19 +299,21 @@ class ParetoOptimizer:
         # Evaluate all scenarios
         self.all_metrics = [self.evaluate_scenario(s) for s in scenarios]
         
-        # Find Pareto frontier
-        pareto_scenarios = []
+        self.pareto_frontier = [scenarios[i] for i in self._pareto_positions(self.all_metrics)]
+        return self.pareto_frontier
+    
+    @staticmethod
+    def _pareto_positions(all_metrics: List[ScenarioMetrics]) -> List[int]:
+        """Positions of the non-dominated entries of `all_metrics`, in order"""
+        positions = []
         
-        for i, scenario in enumerate(scenarios):
-            metrics_i = self.all_metrics[i]
+        for i, metrics_i in enumerate(all_metrics):
             is_dominated = False
             
-            for j, other_scenario in enumerate(scenarios):
+            for j, metrics_j in enumerate(all_metrics):
                 if i == j:
                     continue
                 
-                metrics_j = self.all_metrics[j]
-                
                 # Check if scenario j dominates scenario i
                 # (better in all objectives or equal in all and better in at least one)
                 time_better = metrics_j.total_time_days <= metrics_i.total_time_days
@@ -269,15 +326,23 @@ class ParetoOptimizer:
                     (metrics_j.quality_score > metrics_i.quality_score)
                 )
                 
+                # Risk objectives: P80 time and cost, when simulated
+                if metrics_i.has_risk and metrics_j.has_risk:
+                    time_better = time_better and metrics_j.time_p80_days <= metrics_i.time_p80_days
+                    cost_better = cost_better and metrics_j.cost_p80 <= metrics_i.cost_p80
+                    strictly_better = strictly_better or (
+                        metrics_j.time_p80_days < metrics_i.time_p80_days or
+                        metrics_j.cost_p80 < metrics_i.cost_p80
+                    )
+                
                 if time_better and cost_better and quality_better and strictly_better:
                     is_dominated = True
                     break
             
             if not is_dominated:
-                pareto_scenarios.append(scenario)
+                positions.append(i)
         
-        self.pareto_frontier = pareto_scenarios
-        return pareto_scenarios
+        return positions
     
     def rank_scenarios(self, scenarios: List[Scenario]) -> List[Tuple[Scenario, ScenarioMetrics]]:
         """Rank scenarios by overall score"""
@@ -301,139 +366,179 @@ class ParetoOptimizer:
         if not scenarios:
             return None
         
-        metrics_list = [(s, self.evaluate_scenario(s)) for s in scenarios]
+        all_metrics = [self.evaluate_scenario(s) for s in scenarios]
+        best = self._best_position(all_metrics, objective)
+        return (scenarios[best], all_metrics[best]) if best is not None else None
+    
+    @staticmethod
+    def _best_position(all_metrics: List[ScenarioMetrics], objective: str) -> Optional[int]:
+        """Position of the first best entry of `all_metrics` for an objective"""
+        if not all_metrics:
+            return None
         
+        positions = range(len(all_metrics))
         if objective == 'time':
-            return min(metrics_list, key=lambda x: x[1].total_time_days)
+            return min(positions, key=lambda i: all_metrics[i].total_time_days)
         elif objective == 'cost':
-            return min(metrics_list, key=lambda x: x[1].total_cost)
+            return min(positions, key=lambda i: all_metrics[i].total_cost)
         elif objective == 'quality':
-            return max(metrics_list, key=lambda x: x[1].quality_score)
+            return max(positions, key=lambda i: all_metrics[i].quality_score)
         elif objective == 'balanced':
-            return max(metrics_list, key=lambda x: x[1].overall_score)
+            return max(positions, key=lambda i: all_metrics[i].overall_score)
         
         return None
     
     def visualize_pareto_frontier(
         self,
         scenarios: List[Scenario],
-        save_path: Optional[str] = None
+        save_path: Optional[str] = None,
+        report: Optional['ScenarioReport'] = None,
+        background: bool = False
     ):
-        """Visualize Pareto frontier in 2D (time vs cost)"""
-        if not scenarios:
-            return
-        
-        # Get metrics
-        metrics = [self.evaluate_scenario(s) for s in scenarios]
-        
-        # Find Pareto frontier
-        pareto_scenarios = self.find_pareto_frontier(scenarios)
-        pareto_metrics = [self.evaluate_scenario(s) for s in pareto_scenarios]
-        
-        # Create plot
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Plot 1: Time vs Cost
-        all_times = [m.total_time_days for m in metrics]
-        all_costs = [m.total_cost for m in metrics]
-        pareto_times = [m.total_time_days for m in pareto_metrics]
-        pareto_costs = [m.total_cost for m in pareto_metrics]
-        
-        ax1.scatter(all_times, all_costs, alpha=0.5, label='All Scenarios')
-        ax1.scatter(pareto_times, pareto_costs, color='red', s=100, 
-                   label='Pareto Optimal', zorder=5)
-        
-        # Sort Pareto points and draw frontier line
-        if pareto_times:
-            pareto_points = sorted(zip(pareto_times, pareto_costs))
-            pareto_times_sorted = [p[0] for p in pareto_points]
-            pareto_costs_sorted = [p[1] for p in pareto_points]
-            ax1.plot(pareto_times_sorted, pareto_costs_sorted, 'r--', alpha=0.5)
-        
-        ax1.set_xlabel('Total Time (days)')
-        ax1.set_ylabel('Total Cost ($)')
-        ax1.set_title('Pareto Frontier: Time vs Cost')
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # Plot 2: Quality Score Distribution
-        quality_scores = [m.quality_score for m in metrics]
-        scenario_names = [s.optimization_type for s in scenarios]
-        
-        bars = ax2.bar(range(len(quality_scores)), quality_scores)
+        """
+        Visualize Pareto frontier in 2D (time vs cost)
         
-        # Color Pareto optimal scenarios
-        for i, scenario in enumerate(scenarios):
-            if scenario in pareto_scenarios:
-                bars[i].set_color('red')
+        Renders headless on an Agg canvas and never opens a window.
         
-        ax2.set_xlabel('Scenario')
-        ax2.set_ylabel('Quality Score')
-        ax2.set_title('Quality Scores by Scenario')
-        ax2.set_xticks(range(len(scenario_names)))
-        ax2.set_xticklabels(scenario_names, rotation=45, ha='right')
-        ax2.grid(True, alpha=0.3, axis='y')
+        Args:
+            scenarios: Scenarios to plot
+            save_path: Image file to write
+            report: Report of these scenarios whose metrics and frontier
+                are reused; they are evaluated here otherwise
+            background: Render on a worker thread and return at once
         
-        plt.tight_layout()
+        Returns:
+            The matplotlib Figure, or with `background` a Future of it;
+            None when there are no scenarios
+        """
+        if not scenarios:
+            return None
         
-        if save_path:
-            plt.savefig(save_path, dpi=100, bbox_inches='tight')
+        data = ParetoPlotData.from_report(report if report is not None else self.report(scenarios))
+        if background:
+            return render_pareto_plot_async(data, save_path)
+        return render_pareto_plot(data, save_path)
+    
+    def report(
+        self,
+        scenarios: List[Scenario],
+        metrics: Optional[List[ScenarioMetrics]] = None
+    ) -> 'ScenarioReport':
+        """
+        Report of `scenarios` whose sections are computed on first access
         
-        plt.show()
+        Args:
+            scenarios: Scenarios to report on
+            metrics: Their metrics when already evaluated, in the same order
+        """
+        return ScenarioReport(self, scenarios, metrics)
     
     def generate_report(self, scenarios: List[Scenario]) -> Dict:
         """Generate comprehensive report of scenario analysis"""
-        # Rank scenarios
-        ranked = self.rank_scenarios(scenarios)
-        
-        # Find Pareto frontier
-        pareto = self.find_pareto_frontier(scenarios)
-        
-        # Get best by objective
-        best_time = self.get_best_scenario_by_objective(scenarios, 'time')
-        best_cost = self.get_best_scenario_by_objective(scenarios, 'cost')
-        best_quality = self.get_best_scenario_by_objective(scenarios, 'quality')
-        best_balanced = self.get_best_scenario_by_objective(scenarios, 'balanced')
-        
-        report = {
-            'summary': {
-                'total_scenarios_evaluated': len(scenarios),
-                'pareto_optimal_scenarios': len(pareto),
-                'estimated_budget': self.project.metadata.estimated_budget
-            },
-            'best_scenarios': {
-                'fastest': {
-                    'scenario': best_time[0].to_dict() if best_time else None,
-                    'metrics': best_time[1].to_dict() if best_time else None
-                },
-                'cheapest': {
-                    'scenario': best_cost[0].to_dict() if best_cost else None,
-                    'metrics': best_cost[1].to_dict() if best_cost else None
-                },
-                'highest_quality': {
-                    'scenario': best_quality[0].to_dict() if best_quality else None,
-                    'metrics': best_quality[1].to_dict() if best_quality else None
-                },
-                'best_balanced': {
-                    'scenario': best_balanced[0].to_dict() if best_balanced else None,
-                    'metrics': best_balanced[1].to_dict() if best_balanced else None
-                }
-            },
-            'all_scenarios_ranked': [
-                {
-                    'rank': i + 1,
-                    'scenario': scenario.to_dict(),
-                    'metrics': metrics.to_dict()
-                }
-                for i, (scenario, metrics) in enumerate(ranked)
-            ],
-            'pareto_frontier': [
-                {
-                    'scenario': scenario.to_dict(),
-                    'metrics': self.evaluate_scenario(scenario).to_dict()
-                }
-                for scenario in pareto
-            ]
+        return self.report(scenarios).to_dict(REPORT_SECTIONS)
+
+
+class ScenarioReport:
+    """
+    Sections of a scenario analysis report, each computed on first access
+    
+    All sections read one metrics table, evaluated once per scenario when
+    first needed, and each scenario is converted to a dict at most once.
+    `report['pareto_frontier']` and the other REPORT_SECTIONS hold what
+    `generate_report` returns under those keys; `to_dict()` and `to_json()`
+    serialize only the sections accessed so far unless others are named.
+    """
+    
+    def __init__(
+        self,
+        optimizer: ParetoOptimizer,
+        scenarios: List[Scenario],
+        metrics: Optional[List[ScenarioMetrics]] = None
+    ):
+        self.optimizer = optimizer
+        self.scenarios = list(scenarios)
+        self._metrics = list(metrics) if metrics is not None else None
+        self._pareto_positions = None
+        self._best_positions = {}
+        self._entries = {}
+        self._sections = {}
+    
+    @property
+    def metrics(self) -> List[ScenarioMetrics]:
+        """Metrics of every scenario, in scenario order"""
+        if self._metrics is None:
+            self._metrics = [self.optimizer.evaluate_scenario(s) for s in self.scenarios]
+        return self._metrics
+    
+    def pareto_positions(self) -> List[int]:
+        """Positions of the Pareto-optimal scenarios, in scenario order"""
+        if self._pareto_positions is None:
+            self._pareto_positions = ParetoOptimizer._pareto_positions(self.metrics)
+        return self._pareto_positions
+    
+    @property
+    def pareto(self) -> List[Scenario]:
+        """Pareto-optimal scenarios, in scenario order"""
+        return [self.scenarios[i] for i in self.pareto_positions()]
+    
+    def best_position(self, objective: str) -> Optional[int]:
+        """Position of the best scenario for 'time', 'cost', 'quality' or 'balanced'"""
+        if objective not in self._best_positions:
+            self._best_positions[objective] = ParetoOptimizer._best_position(self.metrics, objective)
+        return self._best_positions[objective]
+    
+    def entry(self, position: int) -> Dict:
+        """{'scenario': ..., 'metrics': ...} dicts of one scenario"""
+        entry = self._entries.get(position)
+        if entry is None:
+            entry = self._entries[position] = {
+                'scenario': self.scenarios[position].to_dict(),
+                'metrics': self.metrics[position].to_dict()
+            }
+        return entry
+    
+    def entries(self) -> List[Dict]:
+        """Entries of all scenarios, in scenario order"""
+        return [self.entry(i) for i in range(len(self.scenarios))]
+    
+    def _summary(self) -> Dict:
+        return {
+            'total_scenarios_evaluated': len(self.scenarios),
+            'pareto_optimal_scenarios': len(self.pareto_positions()),
+            'estimated_budget': self.optimizer.project.metadata.estimated_budget
         }
-        
-        return report
+    
+    def _best_scenarios(self) -> Dict:
+        best = {}
+        for key, objective in BEST_OBJECTIVES.items():
+            position = self.best_position(objective)
+            best[key] = self.entry(position) if position is not None else {'scenario': None, 'metrics': None}
+        return best
+    
+    def _all_scenarios_ranked(self) -> List[Dict]:
+        # Stable sort by overall score (descending), as rank_scenarios does
+        ranked = sorted(range(len(self.scenarios)), key=lambda i: self.metrics[i].overall_score, reverse=True)
+        return [{'rank': rank + 1, **self.entry(i)} for rank, i in enumerate(ranked)]
+    
+    def _pareto_frontier(self) -> List[Dict]:
+        return [self.entry(i) for i in self.pareto_positions()]
+    
+    def __getitem__(self, section: str):
+        if section not in REPORT_SECTIONS:
+            raise KeyError(section)
+        if section not in self._sections:
+            self._sections[section] = getattr(self, f'_{section}')()
+        return self._sections[section]
+    
+    def to_dict(self, sections: Optional[List[str]] = None) -> Dict:
+        """The named sections, or those accessed so far, in report order"""
+        if sections is None:
+            sections = list(self._sections)
+        unknown = [section for section in sections if section not in REPORT_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown report section(s): {', '.join(unknown)}")
+        return {section: self[section] for section in REPORT_SECTIONS if section in sections}
+    
+    def to_json(self, sections: Optional[List[str]] = None, indent: bool = False) -> bytes:
+        """`to_dict(sections)` encoded with the fast JSON encoder"""
+        return dumps(self.to_dict(sections), indent=indent)
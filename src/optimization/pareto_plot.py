@@ -0,0 +1,124 @@
+"""
+Headless rendering of Pareto frontier plots
+
+Figures are drawn with matplotlib's object-oriented API on an Agg canvas:
+no GUI backend is loaded, nothing is shown and pyplot's global state is
+never touched, so a render can run on a worker thread while the caller
+carries on. matplotlib is imported on first render only.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+# Scatter layers with more points than this are drawn as one raster image
+# inside vector output (SVG, PDF), and with small markers
+RASTERIZE_ABOVE = 5000
+# Beyond this many scenarios the per-scenario quality bars become a histogram
+MAX_BARS = 60
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+@dataclass
+class ParetoPlotData:
+    """Plain copy of what the plot shows, safe to hand to another thread"""
+    times: np.ndarray      # total time in days per scenario
+    costs: np.ndarray      # total cost per scenario
+    qualities: np.ndarray  # quality score per scenario
+    labels: List[str]      # optimization type per scenario
+    pareto: np.ndarray     # bool, Pareto-optimal scenarios
+
+    @classmethod
+    def from_report(cls, report) -> 'ParetoPlotData':
+        """Data of a ScenarioReport, reusing its metrics and frontier"""
+        metrics = report.metrics
+        pareto = np.zeros(len(metrics), dtype=bool)
+        pareto[report.pareto_positions()] = True
+        return cls(
+            times=np.array([m.total_time_days for m in metrics], dtype=np.float64),
+            costs=np.array([m.total_cost for m in metrics], dtype=np.float64),
+            qualities=np.array([m.quality_score for m in metrics], dtype=np.float64),
+            labels=[scenario.optimization_type for scenario in report.scenarios],
+            pareto=pareto
+        )
+
+
+def _scatter(ax, x, y, **kwargs):
+    if len(x) > RASTERIZE_ABOVE:
+        kwargs.update(s=4, linewidths=0, rasterized=True)
+    ax.scatter(x, y, **kwargs)
+
+
+def render_pareto_plot(data: ParetoPlotData, save_path: Optional[str] = None, dpi: int = 100):
+    """
+    Draw time vs cost with the Pareto frontier, and quality per scenario
+
+    Returns:
+        The matplotlib Figure, also saved to `save_path` when given
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(15, 6))
+    FigureCanvasAgg(fig)
+    ax1, ax2 = fig.subplots(1, 2)
+
+    # Plot 1: Time vs Cost
+    pareto_times, pareto_costs = data.times[data.pareto], data.costs[data.pareto]
+    _scatter(ax1, data.times, data.costs, alpha=0.5, label='All Scenarios')
+    _scatter(ax1, pareto_times, pareto_costs, color='red', s=100, label='Pareto Optimal', zorder=5)
+
+    # Frontier line through the Pareto points sorted by time, then cost
+    if len(pareto_times):
+        order = np.lexsort((pareto_costs, pareto_times))
+        ax1.plot(pareto_times[order], pareto_costs[order], 'r--', alpha=0.5)
+
+    ax1.set_xlabel('Total Time (days)')
+    ax1.set_ylabel('Total Cost ($)')
+    ax1.set_title('Pareto Frontier: Time vs Cost')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # Plot 2: Quality scores, Pareto-optimal scenarios in red
+    if len(data.qualities) <= MAX_BARS:
+        colors = ['red' if pareto else 'C0' for pareto in data.pareto]
+        ax2.bar(range(len(data.qualities)), data.qualities, color=colors)
+        ax2.set_xlabel('Scenario')
+        ax2.set_ylabel('Quality Score')
+        ax2.set_title('Quality Scores by Scenario')
+        ax2.set_xticks(range(len(data.labels)))
+        ax2.set_xticklabels(data.labels, rotation=45, ha='right')
+    else:
+        bins = np.histogram_bin_edges(data.qualities, bins=50)
+        ax2.hist(data.qualities, bins=bins, alpha=0.6, label='All Scenarios')
+        ax2.hist(data.qualities[data.pareto], bins=bins, color='red', label='Pareto Optimal')
+        ax2.set_xlabel('Quality Score')
+        ax2.set_ylabel('Scenarios')
+        ax2.set_title('Quality Score Distribution')
+        ax2.legend()
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    fig.tight_layout()
+
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    return fig
+
+
+def render_pareto_plot_async(data: ParetoPlotData, save_path: Optional[str] = None, dpi: int = 100) -> Future:
+    """
+    `render_pareto_plot` on a background thread
+
+    Renders run one at a time on a single worker thread, which the
+    interpreter joins at exit, so a plot started just before the program
+    ends is still written.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pareto-plot')
+    return _executor.submit(render_pareto_plot, data, save_path, dpi)
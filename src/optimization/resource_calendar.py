@@ -0,0 +1,220 @@
+"""
+Per-resource booking calendars with daily capacity and gap-filling insertion
+"""
+import math
+import random
+from typing import List, Optional, Tuple
+
+HOURS_PER_DAY = 8.0
+_EPS = 1e-9
+
+
+class _Node:
+    """Treap node for one booked interval in work-time coordinates"""
+    __slots__ = ('start', 'end', 'gap', 'max_gap', 'priority', 'left', 'right')
+
+    def __init__(self, start: float, end: float, gap: float, priority: float):
+        self.start = start
+        self.end = end
+        self.gap = gap          # idle time between the previous booking's end and this start
+        self.max_gap = gap      # largest gap in this subtree
+        self.priority = priority
+        self.left = None
+        self.right = None
+
+
+def _update(node: _Node) -> _Node:
+    best = node.gap
+    if node.left is not None and node.left.max_gap > best:
+        best = node.left.max_gap
+    if node.right is not None and node.right.max_gap > best:
+        best = node.right.max_gap
+    node.max_gap = best
+    return node
+
+
+def _split(node: Optional[_Node], key: float) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split into (starts < key, starts >= key)"""
+    if node is None:
+        return None, None
+    if node.start < key:
+        node.right, right = _split(node.right, key)
+        return _update(node), right
+    left, node.left = _split(node.left, key)
+    return left, _update(node)
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+
+def _set_first_gap(node: _Node, previous_end: float) -> _Node:
+    """Recompute the gap of the leftmost booking in a subtree"""
+    if node.left is None:
+        node.gap = node.start - previous_end
+    else:
+        node.left = _set_first_gap(node.left, previous_end)
+    return _update(node)
+
+
+def _first_gap_after(node: Optional[_Node], key: float, hours: float) -> Optional[_Node]:
+    """Leftmost booking starting after `key` preceded by a gap of at least `hours`"""
+    if node is None or node.max_gap < hours - _EPS:
+        return None
+    if node.start <= key:
+        return _first_gap_after(node.right, key, hours)
+    found = _first_gap_after(node.left, key, hours)
+    if found is not None:
+        return found
+    if node.gap >= hours - _EPS:
+        return node
+    return _first_gap_after(node.right, key, hours)
+
+
+class ResourceCalendar:
+    """
+    Bookings of one resource, respecting its daily working capacity
+
+    The project timeline counts working hours with 8-hour days. A resource
+    that may work `c < 8` hours per day only works the first `c` hours of
+    each day, so bookings are stored in the resource's own work-time
+    coordinates (cumulative hours it could have worked) where capacity is
+    continuous, and converted back to timeline hours at the boundary.
+    Bookings live in a treap keyed by start and augmented with the largest
+    idle gap per subtree, so earliest-fit queries and insertions are
+    O(log n) and later tasks can backfill idle gaps.
+    """
+
+    def __init__(self, daily_capacity: float = HOURS_PER_DAY, seed: int = 0):
+        self.daily_capacity = min(float(daily_capacity), HOURS_PER_DAY)
+        if self.daily_capacity <= 0:
+            raise ValueError("daily_capacity must be positive")
+        self._root = None
+        self._horizon = 0.0  # end of the last booking, work time
+        self._count = 0
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ---- timeline <-> work time -------------------------------------------
+
+    def to_work_time(self, time: float) -> float:
+        """Work hours available between project start and `time`"""
+        if self.daily_capacity >= HOURS_PER_DAY:
+            return time
+        day = math.floor(time / HOURS_PER_DAY)
+        return day * self.daily_capacity + min(time - day * HOURS_PER_DAY, self.daily_capacity)
+
+    def to_start_time(self, work: float) -> float:
+        """Timeline hour at which work hour `work` begins"""
+        if self.daily_capacity >= HOURS_PER_DAY:
+            return work
+        day = math.floor(work / self.daily_capacity + _EPS)
+        return day * HOURS_PER_DAY + max(work - day * self.daily_capacity, 0.0)
+
+    def to_end_time(self, work: float) -> float:
+        """Timeline hour at which work hour `work` is completed"""
+        if self.daily_capacity >= HOURS_PER_DAY or work <= 0:
+            return work
+        day = math.ceil(work / self.daily_capacity - _EPS) - 1
+        return day * HOURS_PER_DAY + (work - day * self.daily_capacity)
+
+    # ---- queries ------------------------------------------------------------
+
+    @property
+    def free_at(self) -> float:
+        """Timeline hour at which the last booking ends"""
+        return self.to_end_time(self._horizon)
+
+    def earliest_fit(self, ready_time: float, hours: float) -> Tuple[float, float]:
+        """(start, end) timeline hours of the earliest slot of `hours` work at or after `ready_time`"""
+        work_start = self._earliest_fit_work(self.to_work_time(ready_time), hours)
+        return self.to_start_time(work_start), self.to_end_time(work_start + hours)
+
+    def _earliest_fit_work(self, ready: float, hours: float) -> float:
+        if self._root is None or ready >= self._horizon - _EPS:
+            return max(ready, self._horizon)
+
+        # Booking that covers `ready`, if any, pushes the candidate start back
+        candidate = ready
+        floor_node = self._floor(ready)
+        if floor_node is not None and floor_node.end > candidate:
+            candidate = floor_node.end
+
+        # The gap right after the candidate start
+        successor = self._successor(ready)
+        if successor is None:
+            return candidate
+        if successor.start - candidate >= hours - _EPS:
+            return candidate
+
+        # Otherwise the first later gap that is wide enough, else the end
+        node = _first_gap_after(self._root, successor.start, hours)
+        if node is not None:
+            return node.start - node.gap
+        return max(candidate, self._horizon)
+
+    def _floor(self, key: float) -> Optional[_Node]:
+        """Booking with the largest start <= key"""
+        node, best = self._root, None
+        while node is not None:
+            if node.start <= key:
+                best, node = node, node.right
+            else:
+                node = node.left
+        return best
+
+    def _successor(self, key: float) -> Optional[_Node]:
+        """Booking with the smallest start > key"""
+        node, best = self._root, None
+        while node is not None:
+            if node.start > key:
+                best, node = node, node.left
+            else:
+                node = node.right
+        return best
+
+    # ---- updates ------------------------------------------------------------
+
+    def reserve(self, start_time: float, end_time: float):
+        """Book the resource between two timeline hours"""
+        self._book_work(self.to_work_time(start_time), self.to_work_time(end_time))
+
+    def _book_work(self, work_start: float, work_end: float):
+        left, right = _split(self._root, work_start)
+
+        previous_end = 0.0
+        node = left
+        while node is not None:
+            previous_end = node.end
+            node = node.right
+
+        new = _Node(work_start, work_end, work_start - previous_end, self._rng.random())
+        if right is not None:
+            right = _set_first_gap(right, work_end)
+
+        self._root = _merge(_merge(left, new), right)
+        self._horizon = max(self._horizon, work_end)
+        self._count += 1
+
+    def bookings(self) -> List[Tuple[float, float]]:
+        """All bookings as (start, end) timeline hours, in time order"""
+        result = []
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            result.append((self.to_start_time(node.start), self.to_end_time(node.end)))
+            node = node.right
+        return result
@@ -2,7 +2,7 @@
 What-If Scenario Generator with various optimization strategies
 """
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterator
 from copy import deepcopy
 import random
 from dataclasses import dataclass
@@ -13,23 +13,53 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.models.data_models import Project, Task, Resource, Scenario, TaskAssignment
-from src.models.cms_transformer import validate_cms_data, get_cms_transformation_summary
-from environment.scheduling_env import TaskSchedulingEnv
-from agents.dqn_agent import DQNAgent
+from src.models.cms_compiler import CMSTask, CompiledCMSProcess, compile_cms_process
+from src.models.project_index import ProjectIndex
+from src.models.dependency_graph import CriticalPathAnalysis
+from src.optimization.list_scheduler import (
+    ListScheduler, ScheduleResult, SchedulingRule, BestSkillRule, CheapestResourceRule,
+    WeightedScoreRule, EarliestFinishRule, CriticalPathRule
+)
 
 
 class ScenarioGenerator:
     """Generate and evaluate what-if scenarios for project optimization"""
     
-    def __init__(self, project: Project):
+    def __init__(
+        self,
+        project: Project,
+        capacity_aware: bool = False,
+        index: Optional[ProjectIndex] = None
+    ):
         """
         Initialize scenario generator
         
         Args:
             project: Project data
+            capacity_aware: Schedule heuristics on per-resource calendars that
+                respect max_hours_per_day and backfill idle gaps
+            index: Precompiled (possibly patched) index to schedule from instead
+                of compiling the project
         """
         self.project = project
+        self.capacity_aware = capacity_aware
         self.scenarios = []
+        self._index = index
+        self._scheduler = None
+    
+    @property
+    def index(self) -> ProjectIndex:
+        """Compiled array view of the project, built on first use"""
+        if self._index is None:
+            self._index = ProjectIndex.from_project(self.project)
+        return self._index
+    
+    @property
+    def scheduler(self) -> ListScheduler:
+        """List scheduling engine shared by the heuristic generators"""
+        if self._scheduler is None:
+            self._scheduler = ListScheduler(self.index, calendars=self.capacity_aware)
+        return self._scheduler
         
     def generate_baseline_scenario(self) -> Scenario:
         """Generate baseline scenario with sequential task execution"""
@@ -46,7 +76,7 @@ class ScenarioGenerator:
             best_score = 0.0
             
             for resource in self.project.resources:
-                if task.can_be_done_by(resource):
+                if resource.available and task.can_be_done_by(resource):
                     score = task.skill_match_score(resource)
                     if score > best_score:
                         best_score = score
@@ -80,272 +110,63 @@ class ScenarioGenerator:
             optimization_type="baseline"
         )
     
-    def generate_parallel_scenario(self) -> Scenario:
-        """Generate scenario with maximum parallelization"""
-        assignments = []
-        total_cost = 0.0
-        
-        # Track resource schedules
-        resource_schedules = {res.id: [] for res in self.project.resources}
-        task_start_times = {}
-        task_end_times = {}
-        
-        # Group tasks by order for parallel execution
-        order_groups = {}
-        for task in self.project.tasks:
-            if task.order not in order_groups:
-                order_groups[task.order] = []
-            order_groups[task.order].append(task)
-        
-        # Process each order group
-        for order in sorted(order_groups.keys()):
-            group_tasks = order_groups[order]
-            
-            # Get earliest possible start time for this group
-            group_start_time = 0.0
-            if order > 1:
-                # Check dependencies from previous orders
-                prev_order_tasks = [t for t in self.project.tasks if t.order < order]
-                if prev_order_tasks:
-                    completed_times = [task_end_times.get(t.id, 0) for t in prev_order_tasks]
-                    group_start_time = max(completed_times) if completed_times else 0
-            
-            # For parallel execution, all tasks in the same order can start at the same time
-            # if resources are available
-            group_end_times = []
-            
-            # Assign tasks in parallel within the same order group
-            for task in group_tasks:
-                # Find available resource with best skill match
-                best_resource = None
-                best_start_time = group_start_time  # Start at group start time for parallel execution
-                best_score = 0.0
-                
-                for resource in self.project.resources:
-                    if task.can_be_done_by(resource):
-                        score = task.skill_match_score(resource)
-                        
-                        # Find earliest available time for this resource after group start
-                        resource_available_time = group_start_time
-                        for scheduled in resource_schedules[resource.id]:
-                            if scheduled['end'] > resource_available_time:
-                                resource_available_time = scheduled['end']
-                        
-                        # For parallel execution, prefer resources available at group start time
-                        if resource_available_time <= group_start_time:
-                            resource_available_time = group_start_time
-                        
-                        # Consider this resource if it has better skill match or is available sooner
-                        if score > best_score or (score == best_score and resource_available_time < best_start_time):
-                            best_resource = resource
-                            best_start_time = resource_available_time
-                            best_score = score
-                
-                if best_resource:
-                    # Create assignment
-                    start_time = best_start_time
-                    end_time = start_time + task.duration_hours
-                    
-                    assignment = TaskAssignment(
-                        task_id=task.id,
-                        resource_id=best_resource.id,
-                        start_time=start_time,
-                        end_time=end_time,
-                        hours_allocated=task.duration_hours
-                    )
-                    assignments.append(assignment)
-                    
-                    # Update schedules
-                    resource_schedules[best_resource.id].append({
-                        'start': start_time,
-                        'end': end_time,
-                        'task_id': task.id
-                    })
-                    task_start_times[task.id] = start_time
-                    task_end_times[task.id] = end_time
-                    group_end_times.append(end_time)
-                    
-                    # Update cost
-                    total_cost += task.duration_hours * best_resource.hourly_rate
-        
-        # Calculate total duration - maximum end time across all tasks
-        total_duration = max(task_end_times.values()) if task_end_times else 0
-        quality_score = self._calculate_quality_score(assignments)
+    def heuristic_rules(self, strategy: str) -> List[SchedulingRule]:
+        """
+        Engine rules behind an index-driven heuristic
         
-        return Scenario(
+        Args:
+            strategy: 'parallel', 'cost' or 'balanced'
+        """
+        if strategy == 'parallel':
+            # Best-skilled resource for each task, preferring whichever frees up first
+            return [BestSkillRule()]
+        if strategy == 'cost':
+            # Cheapest capable resource for each task
+            return [CheapestResourceRule()]
+        if strategy == 'balanced':
+            # Weighted scoring to balance time and cost
+            return [WeightedScoreRule(time_weight, 1 - time_weight) for time_weight in [0.3, 0.5, 0.7]]
+        raise ValueError(f"Unknown heuristic strategy '{strategy}'")
+    
+    def generate_parallel_scenario(self, schedule: Optional[ScheduleResult] = None) -> Scenario:
+        """Generate scenario with maximum parallelization"""
+        if schedule is None:
+            schedule = self.scheduler.run(self.heuristic_rules('parallel')[0])
+        return self._scenario_from_schedule(
+            schedule,
             id="parallel_execution",
             name="Maximum Parallel Execution",
-            assignments=assignments,
-            total_duration_hours=total_duration,
-            total_cost=total_cost,
-            quality_score=quality_score,
-            constraints_satisfied=self._check_constraints(total_cost, total_duration),
             optimization_type="time"
         )
     
-    def generate_cost_optimized_scenario(self) -> Scenario:
+    def generate_cost_optimized_scenario(self, schedule: Optional[ScheduleResult] = None) -> Scenario:
         """Generate scenario optimized for minimum cost"""
-        assignments = []
-        total_cost = 0.0
-        
-        # Sort resources by hourly rate (cheapest first)
-        sorted_resources = sorted(self.project.resources, key=lambda r: r.hourly_rate)
-        
-        # Sort tasks by order
-        sorted_tasks = sorted(self.project.tasks, key=lambda t: t.order)
-        
-        # Track resource schedules
-        resource_schedules = {res.id: 0.0 for res in self.project.resources}
-        
-        for task in sorted_tasks:
-            # Find cheapest capable resource
-            assigned = False
-            
-            for resource in sorted_resources:
-                if task.can_be_done_by(resource):
-                    # Get resource availability
-                    start_time = resource_schedules[resource.id]
-                    
-                    # Check dependencies
-                    for prev_task in sorted_tasks:
-                        if prev_task.order < task.order:
-                            prev_assignment = next(
-                                (a for a in assignments if a.task_id == prev_task.id), None
-                            )
-                            if prev_assignment:
-                                start_time = max(start_time, prev_assignment.end_time)
-                    
-                    # Create assignment
-                    assignment = TaskAssignment(
-                        task_id=task.id,
-                        resource_id=resource.id,
-                        start_time=start_time,
-                        end_time=start_time + task.duration_hours,
-                        hours_allocated=task.duration_hours
-                    )
-                    assignments.append(assignment)
-                    
-                    # Update schedule and cost
-                    resource_schedules[resource.id] = start_time + task.duration_hours
-                    total_cost += task.duration_hours * resource.hourly_rate
-                    assigned = True
-                    break
-            
-            if not assigned:
-                # Fallback to any capable resource
-                for resource in self.project.resources:
-                    if task.can_be_done_by(resource):
-                        start_time = resource_schedules[resource.id]
-                        assignment = TaskAssignment(
-                            task_id=task.id,
-                            resource_id=resource.id,
-                            start_time=start_time,
-                            end_time=start_time + task.duration_hours,
-                            hours_allocated=task.duration_hours
-                        )
-                        assignments.append(assignment)
-                        resource_schedules[resource.id] = start_time + task.duration_hours
-                        total_cost += task.duration_hours * resource.hourly_rate
-                        break
-        
-        # Calculate total duration
-        total_duration = max(a.end_time for a in assignments) if assignments else 0
-        quality_score = self._calculate_quality_score(assignments)
-        
-        return Scenario(
+        if schedule is None:
+            schedule = self.scheduler.run(self.heuristic_rules('cost')[0])
+        return self._scenario_from_schedule(
+            schedule,
             id="cost_optimized",
             name="Cost Optimized Execution",
-            assignments=assignments,
-            total_duration_hours=total_duration,
-            total_cost=total_cost,
-            quality_score=quality_score,
-            constraints_satisfied=self._check_constraints(total_cost, total_duration),
             optimization_type="cost"
         )
     
-    def generate_balanced_scenario(self) -> Scenario:
-        """Generate balanced scenario optimizing both time and cost"""
-        # Use weighted scoring to balance time and cost
+    def generate_balanced_scenario(self, schedules: Optional[List[ScheduleResult]] = None) -> Scenario:
+        """
+        Generate balanced scenario optimizing both time and cost
+        
+        Args:
+            schedules: Precomputed schedules, one per rule of heuristic_rules('balanced')
+        """
+        rules = self.heuristic_rules('balanced')
+        if schedules is None:
+            schedules = [self.scheduler.run(rule) for rule in rules]
         best_scenario = None
         best_score = float('-inf')
         
-        # Generate multiple candidate scenarios
-        for time_weight in [0.3, 0.5, 0.7]:
-            cost_weight = 1 - time_weight
-            
-            assignments = []
-            total_cost = 0.0
-            
-            # Track resource schedules
-            resource_schedules = {res.id: [] for res in self.project.resources}
-            
-            # Sort tasks by order
-            sorted_tasks = sorted(self.project.tasks, key=lambda t: t.order)
-            
-            for task in sorted_tasks:
-                # Score each resource based on time and cost
-                best_resource = None
-                best_score_local = float('-inf')
-                best_start_time = 0.0
-                
-                for resource in self.project.resources:
-                    if task.can_be_done_by(resource):
-                        # Calculate resource availability
-                        resource_end_times = [s['end'] for s in resource_schedules[resource.id]]
-                        resource_available = max(resource_end_times) if resource_end_times else 0
-                        
-                        # Check dependencies
-                        dep_time = 0.0
-                        for prev_task in sorted_tasks:
-                            if prev_task.order < task.order:
-                                prev_assignment = next(
-                                    (a for a in assignments if a.task_id == prev_task.id), None
-                                )
-                                if prev_assignment:
-                                    dep_time = max(dep_time, prev_assignment.end_time)
-                        
-                        start_time = max(resource_available, dep_time)
-                        
-                        # Score based on time and cost
-                        time_score = 1.0 / (1.0 + start_time)  # Earlier is better
-                        cost_score = 1.0 / (1.0 + resource.hourly_rate)  # Cheaper is better
-                        skill_score = task.skill_match_score(resource)
-                        
-                        combined_score = (
-                            time_weight * time_score +
-                            cost_weight * cost_score +
-                            0.2 * skill_score
-                        )
-                        
-                        if combined_score > best_score_local:
-                            best_resource = resource
-                            best_score_local = combined_score
-                            best_start_time = start_time
-                
-                if best_resource:
-                    # Create assignment
-                    assignment = TaskAssignment(
-                        task_id=task.id,
-                        resource_id=best_resource.id,
-                        start_time=best_start_time,
-                        end_time=best_start_time + task.duration_hours,
-                        hours_allocated=task.duration_hours
-                    )
-                    assignments.append(assignment)
-                    
-                    # Update schedule
-                    resource_schedules[best_resource.id].append({
-                        'start': best_start_time,
-                        'end': best_start_time + task.duration_hours,
-                        'task_id': task.id
-                    })
-                    
-                    # Update cost
-                    total_cost += task.duration_hours * best_resource.hourly_rate
-            
-            # Calculate metrics
-            total_duration = max(a.end_time for a in assignments) if assignments else 0
-            quality_score = self._calculate_quality_score(assignments)
+        # Pick the best of the candidate weightings
+        for rule, schedule in zip(rules, schedules):
+            time_weight, cost_weight = rule.time_weight, rule.cost_weight
+            total_duration, total_cost, quality_score = self._schedule_metrics(schedule)
             
             # Score the scenario
             scenario_score = self._calculate_scenario_score(
@@ -354,14 +175,10 @@ class ScenarioGenerator:
             
             if scenario_score > best_score:
                 best_score = scenario_score
-                best_scenario = Scenario(
+                best_scenario = self._scenario_from_schedule(
+                    schedule,
                     id=f"balanced_{time_weight}",
                     name=f"Balanced Optimization (Time: {time_weight:.1f}, Cost: {cost_weight:.1f})",
-                    assignments=assignments,
-                    total_duration_hours=total_duration,
-                    total_cost=total_cost,
-                    quality_score=quality_score,
-                    constraints_satisfied=self._check_constraints(total_cost, total_duration),
                     optimization_type="balanced"
                 )
         
@@ -370,11 +187,16 @@ class ScenarioGenerator:
     def generate_rl_optimized_scenario(
         self,
         optimization_mode: str = "balanced",
-        num_episodes: int = 100
+        num_episodes: int = 100,
+        event_driven: bool = True
     ) -> Scenario:
         """Generate scenario using trained RL agent"""
+        # Imported here so that only RL runs pay for loading torch and gymnasium
+        from src.environment.scheduling_env import TaskSchedulingEnv
+        from agents.dqn_agent import DQNAgent
+        
         print(f"    Training RL agent for {optimization_mode} optimization...")
-        env = TaskSchedulingEnv(self.project, optimization_mode)
+        env = TaskSchedulingEnv(self.project, optimization_mode, event_driven=event_driven)
         
         # Initialize DQN agent
         state_dim = env.observation_space.shape[0]
@@ -390,9 +212,8 @@ class ScenarioGenerator:
             total_reward = 0
             done = False
             step_count = 0
-            max_steps = 100  # Prevent infinite loops
             
-            while not done and step_count < max_steps:
+            while not done and step_count < env.max_steps:  # Prevent infinite loops
                 action = agent.select_action(state)
                 next_state, reward, done, info = env.step(action)
                 agent.store_experience(state, action, reward, next_state, done)
@@ -433,16 +254,74 @@ class ScenarioGenerator:
         if not assignments:
             return 0.0
         
+        index = self.index
         total_score = 0.0
         for assignment in assignments:
-            task = next((t for t in self.project.tasks if t.id == assignment.task_id), None)
-            resource = next((r for r in self.project.resources if r.id == assignment.resource_id), None)
+            task = index.task_position.get(assignment.task_id)
+            resource = index.resource_position.get(assignment.resource_id)
             
-            if task and resource:
-                skill_score = task.skill_match_score(resource)
-                total_score += skill_score
+            if task is not None and resource is not None:
+                total_score += index.skill_scores[task, resource]
+        
+        return float(total_score / len(assignments))
+    
+    def _schedule_metrics(self, schedule: ScheduleResult) -> Tuple[float, float, float]:
+        """Duration, cost and quality of an engine schedule"""
+        if not len(schedule):
+            return 0.0, 0.0, 0.0
+        
+        index = self.index
+        tasks = schedule.task_indices.tolist()
+        resources = schedule.resource_indices.tolist()
+        durations = index.durations[schedule.task_indices].tolist()
+        rates = index.hourly_rates[schedule.resource_indices].tolist()
+        
+        # Accumulate in dispatch order, the same way the scenarios report it
+        total_cost = 0.0
+        for hours, rate in zip(durations, rates):
+            total_cost += hours * rate
+        total_score = 0.0
+        for score in index.skill_scores[schedule.task_indices, schedule.resource_indices].tolist():
+            total_score += score
         
-        return total_score / len(assignments)
+        return schedule.makespan, total_cost, total_score / len(tasks)
+    
+    def _scenario_from_schedule(
+        self,
+        schedule: ScheduleResult,
+        id: str,
+        name: str,
+        optimization_type: str
+    ) -> Scenario:
+        """Wrap an engine schedule into a Scenario"""
+        index = self.index
+        assignments = [
+            TaskAssignment(
+                task_id=index.task_ids[task],
+                resource_id=index.resource_ids[resource],
+                start_time=start,
+                end_time=end,
+                hours_allocated=float(index.durations[task])
+            )
+            for task, resource, start, end in zip(
+                schedule.task_indices.tolist(),
+                schedule.resource_indices.tolist(),
+                schedule.start_times.tolist(),
+                schedule.end_times.tolist()
+            )
+        ]
+        total_duration, total_cost, quality_score = self._schedule_metrics(schedule)
+        
+        return Scenario(
+            id=id,
+            name=name,
+            assignments=assignments,
+            total_duration_hours=total_duration,
+            total_cost=total_cost,
+            quality_score=quality_score,
+            constraints_satisfied=self._check_constraints(total_cost, total_duration),
+            optimization_type=optimization_type
+        )
     
     def _check_constraints(self, cost: float, duration: float) -> bool:
         """Check if constraints are satisfied"""
@@ -480,134 +359,50 @@ class ScenarioGenerator:
     
     def generate_critical_path_scenario(self) -> Scenario:
         """Generate scenario using Critical Path Method (CPM) optimization"""
-        assignments = []
-        total_cost = 0.0
-        
-        # Build task dependency graph
-        task_dependencies = {}
-        for task in self.project.tasks:
-            predecessors = [t for t in self.project.tasks if t.order < task.order]
-            task_dependencies[task.id] = predecessors
-        
-        # Calculate earliest start and finish times
-        earliest_start = {}
-        earliest_finish = {}
-        
-        sorted_tasks = sorted(self.project.tasks, key=lambda t: t.order)
-        
-        for task in sorted_tasks:
-            # Find earliest start based on predecessors
-            if not task_dependencies[task.id]:
-                earliest_start[task.id] = 0
-            else:
-                max_pred_finish = max(
-                    earliest_finish.get(pred.id, 0) 
-                    for pred in task_dependencies[task.id]
+        index = self.index
+        
+        # Assign best resource for critical tasks: prioritize skill match and
+        # speed (assume higher rate = faster)
+        choices = {}
+        for task in range(index.n_tasks):
+            candidates = index.capable_resources[task]
+            if len(candidates):
+                combined = (
+                    index.skill_scores[task, candidates] * 0.7 +
+                    (1.0 / (index.hourly_rates[candidates] / 100)) * 0.3
                 )
-                earliest_start[task.id] = max_pred_finish
-            
-            # Assign best resource for critical tasks
-            best_resource = None
-            best_score = -1
-            
-            for resource in self.project.resources:
-                if task.can_be_done_by(resource):
-                    # Prioritize skill match and speed
-                    skill_score = task.skill_match_score(resource)
-                    speed_score = 1.0 / (resource.hourly_rate / 100)  # Assume higher rate = faster
-                    combined_score = skill_score * 0.7 + speed_score * 0.3
-                    
-                    if combined_score > best_score:
-                        best_score = combined_score
-                        best_resource = resource
-            
-            if best_resource:
-                assignment = TaskAssignment(
-                    task_id=task.id,
-                    resource_id=best_resource.id,
-                    start_time=earliest_start[task.id],
-                    end_time=earliest_start[task.id] + task.duration_hours,
-                    hours_allocated=task.duration_hours
-                )
-                assignments.append(assignment)
-                earliest_finish[task.id] = assignment.end_time
-                total_cost += task.duration_hours * best_resource.hourly_rate
-        
-        total_duration = max(earliest_finish.values()) if earliest_finish else 0
-        quality_score = self._calculate_quality_score(assignments)
-        
-        return Scenario(
+                choices[task] = int(np.argmax(combined))
+        
+        # Slack from a CPM pass over the dependency graph orders the tasks;
+        # unassigned tasks take no time
+        durations = [
+            float(index.durations[task]) if task in choices else 0.0
+            for task in range(index.n_tasks)
+        ]
+        analysis = index.graph.analyze(durations)
+        
+        # The engine starts each task once both its predecessors and its
+        # resource are done, so no resource holds two tasks at a time
+        schedule = self.scheduler.run(CriticalPathRule(analysis.slack, analysis.earliest_start, choices))
+        return self._scenario_from_schedule(
+            schedule,
             id="critical_path",
             name="Critical Path Optimized",
-            assignments=assignments,
-            total_duration_hours=total_duration,
-            total_cost=total_cost,
-            quality_score=quality_score,
-            constraints_satisfied=self._check_constraints(total_cost, total_duration),
             optimization_type="critical_path"
         )
     
+    def analyze_critical_path(self) -> CriticalPathAnalysis:
+        """Earliest/latest start, slack and critical path from task durations"""
+        return self.index.graph.analyze(self.index.durations.tolist())
+    
     def generate_resource_leveling_scenario(self) -> Scenario:
         """Generate scenario with resource leveling to avoid overallocation"""
-        assignments = []
-        total_cost = 0.0
-        
-        # Track resource availability per time unit
-        resource_calendar = {res.id: [] for res in self.project.resources}
-        sorted_tasks = sorted(self.project.tasks, key=lambda t: t.order)
-        
-        for task in sorted_tasks:
-            best_assignment = None
-            min_end_time = float('inf')
-            
-            # Try each capable resource
-            for resource in self.project.resources:
-                if task.can_be_done_by(resource):
-                    # Find earliest available slot for this resource
-                    if not resource_calendar[resource.id]:
-                        start_time = 0
-                    else:
-                        start_time = max(resource_calendar[resource.id])
-                    
-                    # Check dependencies
-                    for prev_task in self.project.tasks:
-                        if prev_task.order < task.order:
-                            prev_assignment = next(
-                                (a for a in assignments if a.task_id == prev_task.id), None
-                            )
-                            if prev_assignment:
-                                start_time = max(start_time, prev_assignment.end_time)
-                    
-                    end_time = start_time + task.duration_hours
-                    
-                    # Choose resource that can complete task earliest
-                    if end_time < min_end_time:
-                        min_end_time = end_time
-                        best_assignment = TaskAssignment(
-                            task_id=task.id,
-                            resource_id=resource.id,
-                            start_time=start_time,
-                            end_time=end_time,
-                            hours_allocated=task.duration_hours
-                        )
-                        best_resource = resource
-            
-            if best_assignment:
-                assignments.append(best_assignment)
-                resource_calendar[best_assignment.resource_id].append(best_assignment.end_time)
-                total_cost += task.duration_hours * best_resource.hourly_rate
-        
-        total_duration = max(a.end_time for a in assignments) if assignments else 0
-        quality_score = self._calculate_quality_score(assignments)
-        
-        return Scenario(
+        # Resource that can complete each task earliest
+        schedule = self.scheduler.run(EarliestFinishRule())
+        return self._scenario_from_schedule(
+            schedule,
             id="resource_leveling",
             name="Resource Leveling Optimized",
-            assignments=assignments,
-            total_duration_hours=total_duration,
-            total_cost=total_cost,
-            quality_score=quality_score,
-            constraints_satisfied=self._check_constraints(total_cost, total_duration),
             optimization_type="resource_leveling"
         )
     
@@ -638,18 +433,10 @@ class ScenarioGenerator:
         # Process groups in order
         sorted_groups = sorted(order_groups.items(), key=lambda x: float(str(x[0]).split('_')[0]))
         
+        # Finish times of dependency graph nodes, keyed by node position
+        node_finish = {}
+        
         for group_key, group_tasks in sorted_groups:
-            # Get earliest possible start time for this group
-            group_start_time = 0.0
-            
-            # Check dependencies from previous order groups
-            current_order = int(str(group_key).split('_')[0])
-            if current_order > 1:
-                prev_tasks = [t for t in self.project.tasks if t.order < current_order]
-                if prev_tasks:
-                    completed_times = [task_end_times.get(t.id, 0) for t in prev_tasks]
-                    group_start_time = max(completed_times) if completed_times else 0
-            
             # Check if this is a parallel group (multiple tasks with same order and parallel flag)
             is_parallel_group = len(group_tasks) > 1 and any(
                 task_constraints.get(t.id, {}).get('allow_parallel', False) for t in group_tasks
@@ -658,12 +445,14 @@ class ScenarioGenerator:
             if is_parallel_group:
                 # Parallel execution: assign tasks to different resources simultaneously
                 for task in group_tasks:
+                    # Earliest possible start once the task's predecessors are done
+                    group_start_time = self._graph_ready_time(self.index.task_position[task.id], node_finish)
                     best_resource = None
                     best_start_time = group_start_time
                     best_score = 0.0
                     
                     for resource in self.project.resources:
-                        if task.can_be_done_by(resource):
+                        if resource.available and task.can_be_done_by(resource):
                             score = task.skill_match_score(resource)
                             
                             # Find earliest available time for this resource
@@ -703,17 +492,22 @@ class ScenarioGenerator:
                         })
                         task_start_times[task.id] = best_start_time
                         task_end_times[task.id] = best_start_time + duration
+                        node_finish[self.index.task_position[task.id]] = best_start_time + duration
                         
                         total_cost += duration * best_resource.hourly_rate
             else:
                 # Sequential execution within the group
-                current_time = group_start_time
+                current_time = 0.0
                 for task in group_tasks:
+                    current_time = max(
+                        current_time,
+                        self._graph_ready_time(self.index.task_position[task.id], node_finish)
+                    )
                     best_resource = None
                     best_score = 0.0
                     
                     for resource in self.project.resources:
-                        if task.can_be_done_by(resource):
+                        if resource.available and task.can_be_done_by(resource):
                             score = task.skill_match_score(resource)
                             if score > best_score:
                                 best_resource = resource
@@ -734,6 +528,7 @@ class ScenarioGenerator:
                         
                         task_start_times[task.id] = current_time
                         task_end_times[task.id] = current_time + duration
+                        node_finish[self.index.task_position[task.id]] = current_time + duration
                         current_time += duration
                         
                         total_cost += duration * best_resource.hourly_rate
@@ -753,19 +548,27 @@ class ScenarioGenerator:
             optimization_type="custom"
         )
     
-    def generate_all_scenarios(self, include_rl: bool = True) -> List[Scenario]:
-        """Generate all scenario types"""
-        scenarios = []
-        
+    def _graph_ready_time(self, node: int, node_finish: Dict[int, float]) -> float:
+        """Latest finish among a node's dependency graph predecessors"""
+        graph = self.index.graph
+        ready = 0.0
+        for pred in graph.predecessors[node]:
+            if graph.is_milestone(pred) and pred not in node_finish:
+                node_finish[pred] = self._graph_ready_time(pred, node_finish)
+            ready = max(ready, node_finish.get(pred, 0.0))
+        return ready
+    
+    def iter_scenarios(self, include_rl: bool = True) -> Iterator[Scenario]:
+        """Generate all scenario types one at a time, fastest first"""
         # Generate different scenario types
-        scenarios.append(self.generate_baseline_scenario())
-        scenarios.append(self.generate_parallel_scenario())
-        scenarios.append(self.generate_cost_optimized_scenario())
-        scenarios.append(self.generate_balanced_scenario())
+        yield self.generate_baseline_scenario()
+        yield self.generate_parallel_scenario()
+        yield self.generate_cost_optimized_scenario()
+        yield self.generate_balanced_scenario()
         
         # Add new optimization strategies
-        scenarios.append(self.generate_critical_path_scenario())
-        scenarios.append(self.generate_resource_leveling_scenario())
+        yield self.generate_critical_path_scenario()
+        yield self.generate_resource_leveling_scenario()
         
         if include_rl:
             # Generate RL-optimized scenarios with improved training
@@ -773,29 +576,41 @@ class ScenarioGenerator:
             for mode in modes:
                 rl_scenario = self.generate_rl_optimized_scenario(mode, num_episodes=50)  # Reduced episodes
                 if rl_scenario:
-                    scenarios.append(rl_scenario)
-        
+                    yield rl_scenario
+    
+    def generate_all_scenarios(self, include_rl: bool = True) -> List[Scenario]:
+        """Generate all scenario types"""
+        scenarios = list(self.iter_scenarios(include_rl))
         self.scenarios = scenarios
         return scenarios
     
-    def create_cms_baseline_scenario(self, cms_data: Dict) -> Scenario:
-        """Create baseline scenario from CMS process structure"""
+    @staticmethod
+    def _cms_tasks(cms_data) -> List[CMSTask]:
+        """Tasks of a compiled process in CMS order, compiling raw CMS data first"""
+        if not isinstance(cms_data, CompiledCMSProcess):
+            cms_data = compile_cms_process(cms_data)
+        return cms_data.tasks
+    
+    def create_cms_baseline_scenario(self, cms_data) -> Scenario:
+        """
+        Create baseline scenario from CMS process structure
+        
+        `cms_data` (here and in the other CMS scenarios) is a
+        CompiledCMSProcess, or raw CMS process data that is compiled first.
+        """
         assignments = []
         current_time = 0.0
         total_cost = 0.0
         
         # Process tasks in CMS order
-        for process_task in sorted(cms_data['process_tasks'], key=lambda x: x['order']):
-            task = process_task['task']
-            duration_hours = task['task_capacity_minutes'] / 60.0
+        for task in self._cms_tasks(cms_data):
+            duration_hours = task.duration_hours
             
             # Use existing job assignments from CMS
-            for job_task in task['jobTasks']:
-                job = job_task['job']
-                
+            for job in task.jobs:
                 assignment = TaskAssignment(
-                    task_id=f"task_{task['task_id']:03d}",
-                    resource_id=f"resource_{job['job_id']:03d}",
+                    task_id=task.task_id,
+                    resource_id=job.resource_id,
                     start_time=current_time,
                     end_time=current_time + duration_hours,
                     hours_allocated=duration_hours
@@ -803,7 +618,7 @@ class ScenarioGenerator:
                 assignments.append(assignment)
                 
                 # Calculate cost using actual CMS rates
-                total_cost += duration_hours * job['hourlyRate']
+                total_cost += duration_hours * job.hourly_rate
             
             current_time += duration_hours  # Sequential by default
         
@@ -818,25 +633,27 @@ class ScenarioGenerator:
             optimization_type="cms_baseline"
         )
     
-    def generate_cms_optimization_scenarios(self, baseline: Scenario, cms_data: Dict) -> List[Scenario]:
-        """Generate optimized scenarios preserving CMS structure"""
-        scenarios = [baseline]  # CMS baseline is first scenario
+    def iter_cms_optimization_scenarios(self, baseline: Scenario, cms_data) -> Iterator[Scenario]:
+        """Generate optimized scenarios preserving CMS structure, one at a time"""
+        if not isinstance(cms_data, CompiledCMSProcess):
+            cms_data = compile_cms_process(cms_data)  # once for all scenarios
+        
+        yield baseline  # CMS baseline is first scenario
         
         # Parallel execution optimization (respects job assignments)
-        parallel_scenario = self.optimize_cms_parallel_tasks(baseline, cms_data)
-        scenarios.append(parallel_scenario)
+        yield self.optimize_cms_parallel_tasks(baseline, cms_data)
         
         # Resource efficiency optimization
-        efficient_scenario = self.optimize_cms_resource_utilization(baseline, cms_data)
-        scenarios.append(efficient_scenario)
+        yield self.optimize_cms_resource_utilization(baseline, cms_data)
         
         # Critical path optimization
-        critical_path_scenario = self.optimize_cms_critical_path(baseline, cms_data)
-        scenarios.append(critical_path_scenario)
-        
-        return scenarios
+        yield self.optimize_cms_critical_path(baseline, cms_data)
+    
+    def generate_cms_optimization_scenarios(self, baseline: Scenario, cms_data) -> List[Scenario]:
+        """Generate optimized scenarios preserving CMS structure"""
+        return list(self.iter_cms_optimization_scenarios(baseline, cms_data))
     
-    def optimize_cms_parallel_tasks(self, baseline: Scenario, cms_data: Dict) -> Scenario:
+    def optimize_cms_parallel_tasks(self, baseline: Scenario, cms_data) -> Scenario:
         """Optimize for parallel execution while keeping job assignments"""
         assignments = []
         total_cost = 0.0
@@ -846,14 +663,13 @@ class ScenarioGenerator:
         task_groups = []
         current_group = []
         
-        for process_task in sorted(cms_data['process_tasks'], key=lambda x: x['order']):
-            task = process_task['task']
+        for task in self._cms_tasks(cms_data):
             # Simple grouping: tasks with same or adjacent order can be parallel
-            if not current_group or process_task['order'] - current_group[-1]['order'] <= 1:
-                current_group.append(process_task)
+            if not current_group or task.order - current_group[-1].order <= 1:
+                current_group.append(task)
             else:
                 task_groups.append(current_group)
-                current_group = [process_task]
+                current_group = [task]
         
         if current_group:
             task_groups.append(current_group)
@@ -863,24 +679,21 @@ class ScenarioGenerator:
         for group in task_groups:
             group_max_duration = 0.0
             
-            for process_task in group:
-                task = process_task['task']
-                duration_hours = task['task_capacity_minutes'] / 60.0
+            for task in group:
+                duration_hours = task.duration_hours
                 group_max_duration = max(group_max_duration, duration_hours)
                 
                 # Keep original job assignment from CMS
-                for job_task in task['jobTasks']:
-                    job = job_task['job']
-                    
+                for job in task.jobs:
                     assignment = TaskAssignment(
-                        task_id=f"task_{task['task_id']:03d}",
-                        resource_id=f"resource_{job['job_id']:03d}",
+                        task_id=task.task_id,
+                        resource_id=job.resource_id,
                         start_time=current_time,
                         end_time=current_time + duration_hours,
                         hours_allocated=duration_hours
                     )
                     assignments.append(assignment)
-                    total_cost += duration_hours * job['hourlyRate']
+                    total_cost += duration_hours * job.hourly_rate
             
             current_time += group_max_duration
             max_end_time = current_time
@@ -896,7 +709,7 @@ class ScenarioGenerator:
             optimization_type="parallel"
         )
     
-    def optimize_cms_resource_utilization(self, baseline: Scenario, cms_data: Dict) -> Scenario:
+    def optimize_cms_resource_utilization(self, baseline: Scenario, cms_data) -> Scenario:
         """Optimize resource utilization within CMS constraints"""
         assignments = []
         total_cost = 0.0
@@ -904,27 +717,20 @@ class ScenarioGenerator:
         # Track resource availability
         resource_availability = {}
         
-        for process_task in sorted(cms_data['process_tasks'], key=lambda x: x['order']):
-            task = process_task['task']
-            duration_hours = task['task_capacity_minutes'] / 60.0
+        for task in self._cms_tasks(cms_data):
+            duration_hours = task.duration_hours
             
             # Find earliest available time for this task's resources
             earliest_start = 0.0
-            for job_task in task['jobTasks']:
-                job = job_task['job']
-                resource_id = f"resource_{job['job_id']:03d}"
-                
-                if resource_id in resource_availability:
-                    earliest_start = max(earliest_start, resource_availability[resource_id])
+            for job in task.jobs:
+                if job.resource_id in resource_availability:
+                    earliest_start = max(earliest_start, resource_availability[job.resource_id])
             
             # Assign task at earliest available time
-            for job_task in task['jobTasks']:
-                job = job_task['job']
-                resource_id = f"resource_{job['job_id']:03d}"
-                
+            for job in task.jobs:
                 assignment = TaskAssignment(
-                    task_id=f"task_{task['task_id']:03d}",
-                    resource_id=resource_id,
+                    task_id=task.task_id,
+                    resource_id=job.resource_id,
                     start_time=earliest_start,
                     end_time=earliest_start + duration_hours,
                     hours_allocated=duration_hours
@@ -932,8 +738,8 @@ class ScenarioGenerator:
                 assignments.append(assignment)
                 
                 # Update resource availability
-                resource_availability[resource_id] = earliest_start + duration_hours
-                total_cost += duration_hours * job['hourlyRate']
+                resource_availability[job.resource_id] = earliest_start + duration_hours
+                total_cost += duration_hours * job.hourly_rate
         
         # Calculate total duration
         total_duration = max(resource_availability.values()) if resource_availability else 0.0
@@ -949,7 +755,7 @@ class ScenarioGenerator:
             optimization_type="resource_optimized"
         )
     
-    def optimize_cms_critical_path(self, baseline: Scenario, cms_data: Dict) -> Scenario:
+    def optimize_cms_critical_path(self, baseline: Scenario, cms_data) -> Scenario:
         """Optimize critical path within CMS constraints"""
         assignments = []
         total_cost = 0.0
@@ -958,34 +764,28 @@ class ScenarioGenerator:
         critical_tasks = []
         non_critical_tasks = []
         
-        for process_task in sorted(cms_data['process_tasks'], key=lambda x: x['order']):
-            task = process_task['task']
-            duration_minutes = task['task_capacity_minutes']
-            
+        for task in self._cms_tasks(cms_data):
             # Consider tasks > 30 minutes as critical
-            if duration_minutes > 30:
-                critical_tasks.append(process_task)
+            if task.duration_minutes > 30:
+                critical_tasks.append(task)
             else:
-                non_critical_tasks.append(process_task)
+                non_critical_tasks.append(task)
         
         # Process critical tasks first
         current_time = 0.0
-        for process_task in critical_tasks:
-            task = process_task['task']
-            duration_hours = task['task_capacity_minutes'] / 60.0
+        for task in critical_tasks:
+            duration_hours = task.duration_hours
             
-            for job_task in task['jobTasks']:
-                job = job_task['job']
-                
+            for job in task.jobs:
                 assignment = TaskAssignment(
-                    task_id=f"task_{task['task_id']:03d}",
-                    resource_id=f"resource_{job['job_id']:03d}",
+                    task_id=task.task_id,
+                    resource_id=job.resource_id,
                     start_time=current_time,
                     end_time=current_time + duration_hours,
                     hours_allocated=duration_hours
                 )
                 assignments.append(assignment)
-                total_cost += duration_hours * job['hourlyRate']
+                total_cost += duration_hours * job.hourly_rate
             
             current_time += duration_hours
         
@@ -993,23 +793,20 @@ class ScenarioGenerator:
         parallel_start = current_time
         max_duration = 0.0
         
-        for process_task in non_critical_tasks:
-            task = process_task['task']
-            duration_hours = task['task_capacity_minutes'] / 60.0
+        for task in non_critical_tasks:
+            duration_hours = task.duration_hours
             max_duration = max(max_duration, duration_hours)
             
-            for job_task in task['jobTasks']:
-                job = job_task['job']
-                
+            for job in task.jobs:
                 assignment = TaskAssignment(
-                    task_id=f"task_{task['task_id']:03d}",
-                    resource_id=f"resource_{job['job_id']:03d}",
+                    task_id=task.task_id,
+                    resource_id=job.resource_id,
                     start_time=parallel_start,
                     end_time=parallel_start + duration_hours,
                     hours_allocated=duration_hours
                 )
                 assignments.append(assignment)
-                total_cost += duration_hours * job['hourlyRate']
+                total_cost += duration_hours * job.hourly_rate
         
         total_duration = current_time + max_duration
         
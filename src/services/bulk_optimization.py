@@ -0,0 +1,172 @@
+"""
+Bulk optimization of many CMS processes into a resumable JSONL file
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from src.services.cms_client import CMSClient
+from src.services.compute_pool import ComputePool, ComputePoolBusy
+from src.services.optimization_tasks import optimize_cms_record
+
+
+@dataclass
+class BulkSummary:
+    """Outcome of one bulk run"""
+    total: int = 0        # processes requested
+    skipped: int = 0      # already in the output file when resuming
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def processes_per_second(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            **asdict(self),
+            'processed': self.processed,
+            'processes_per_second': round(self.processes_per_second, 3)
+        }
+
+
+def completed_process_ids(output_path: str) -> Set[int]:
+    """
+    Process ids with a successful record in an existing output file
+
+    The file is the checkpoint: every record is one flushed line, so after
+    a crash at most the last line is incomplete. That line is cut off here
+    so appending continues on a clean line. Failed records are not counted
+    and their processes are retried.
+    """
+    path = Path(output_path)
+    if not path.exists():
+        return set()
+
+    done = set()
+    good_bytes = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            good_bytes += len(line)
+            if record.get('status') == 'ok':
+                done.add(record['process_id'])
+    if good_bytes < path.stat().st_size:
+        with open(path, 'r+b') as f:
+            f.truncate(good_bytes)
+    return done
+
+
+async def list_process_ids(client: CMSClient, company: Optional[str] = None) -> List[int]:
+    """Ids of every CMS process, optionally only those of one company"""
+    processes = await client.get_processes()
+    if processes is None:
+        raise RuntimeError("Could not list CMS processes")
+    return [
+        process['process_id'] for process in processes
+        if company is None or (process.get('company') or {}).get('name') == company
+    ]
+
+
+async def run_bulk(
+    client: CMSClient,
+    pool: ComputePool,
+    process_ids: Iterable[int],
+    output_path: str,
+    response_format: str = "full",
+    fetch_concurrency: int = 8,
+    resume: bool = True,
+    on_record: Optional[Callable[[Dict, BulkSummary], None]] = None
+) -> BulkSummary:
+    """
+    Fetch and optimize `process_ids`, appending one JSON line per process
+
+    Fetching and optimizing overlap: up to `fetch_concurrency` processes are
+    downloaded through the shared client while up to `pool.workers` are
+    optimized in the pool, and every record is written as soon as it is
+    done, so records are in completion order. With `resume`, processes that
+    already have a successful record in `output_path` are skipped;
+    otherwise the file is started over.
+
+    Args:
+        on_record: Called with each written record and the running summary
+    """
+    process_ids = list(dict.fromkeys(process_ids))
+    summary = BulkSummary(total=len(process_ids))
+    done = completed_process_ids(output_path) if resume else set()
+    pending = [process_id for process_id in process_ids if process_id not in done]
+    summary.skipped = len(process_ids) - len(pending)
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    queue: asyncio.Queue = asyncio.Queue()
+    for process_id in pending:
+        queue.put_nowait(process_id)
+
+    fetch_slots = asyncio.Semaphore(max(1, fetch_concurrency))
+    # Leave the pool's backlog to other users of the pool
+    compute_slots = asyncio.Semaphore(pool.workers)
+    start = time.perf_counter()
+
+    with open(output_path, 'a' if resume else 'w', encoding='utf-8') as output:
+        def write(record: Dict):
+            output.write(json.dumps(record, separators=(',', ':')) + '\n')
+            output.flush()
+            if record['status'] == 'ok':
+                summary.succeeded += 1
+            else:
+                summary.failed += 1
+            summary.elapsed_seconds = time.perf_counter() - start
+            if on_record is not None:
+                on_record(record, summary)
+
+        async def optimize(process_id: int) -> Dict:
+            async with fetch_slots:
+                cms_data = await client.get_process(process_id)
+            if not cms_data:
+                return {"process_id": process_id, "status": "error",
+                        "error": "Process not found or CMS unavailable"}
+            async with compute_slots:
+                while True:
+                    try:
+                        return await pool.run(optimize_cms_record, cms_data, response_format)
+                    except ComputePoolBusy:
+                        await asyncio.sleep(0.5)
+
+        async def worker():
+            while not queue.empty():
+                process_id = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    record = await optimize(process_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    record = {"process_id": process_id, "status": "error", "error": str(e)}
+                record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                write(record)
+
+        # Enough workers to keep both the fetch and the compute stage full
+        workers = [asyncio.create_task(worker())
+                   for _ in range(min(len(pending), fetch_concurrency + pool.workers))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    summary.elapsed_seconds = time.perf_counter() - start
+    return summary
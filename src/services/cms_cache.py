@@ -0,0 +1,195 @@
+"""
+Local cache of CMS processes with conditional refresh and
+stale-while-revalidate
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+import httpx
+
+from src.models.json_codec import loads
+from src.services.cms_client import CMSClient, CMSError, CMSUnavailable
+
+PROCESS_LIST = 'processes'
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    etag: Optional[str]
+    fetched_at: float
+    retry_after: float = 0.0  # no background refresh before this time after a failure
+
+
+class CMSProcessCache:
+    """
+    CMS process list and single processes, served locally
+
+    An entry younger than `ttl` is returned as is. An older entry is still
+    returned immediately while one background refresh per key brings it up
+    to date; if the CMS is slow or down the stale entry keeps being served
+    and the refresh is retried after `retry_backoff`. Refreshes are
+    conditional: a stored ETag is sent as If-None-Match and a 304 only
+    renews the entry, and processes in a refreshed list whose `updated_at`
+    did not change keep their objects from the previous list. Only a key
+    that was never fetched waits for the CMS.
+
+    Single processes are always fetched from the CMS's single-process
+    endpoint, never taken from the list, so /optimize/cms-process/{id}
+    optimizes exactly what that endpoint returns.
+    """
+
+    def __init__(self, client: CMSClient, ttl: float = 60.0, retry_backoff: float = 10.0,
+                 list_timeout: float = 2.0):
+        self.client = client
+        self.ttl = ttl
+        self.retry_backoff = retry_backoff
+        self.list_timeout = list_timeout
+        self._entries: Dict[Hashable, CacheEntry] = {}
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def get_processes(self) -> Optional[Any]:
+        """
+        Process list, or None when it was never fetched and the CMS does not
+        answer within `list_timeout` (the fetch keeps going in the background)
+        """
+        return await self._lookup(PROCESS_LIST, self.list_timeout)
+
+    async def get_process(self, process_id: int) -> Optional[Any]:
+        """
+        One process, None if the CMS does not have it
+
+        Raises:
+            CMSError: the process was never fetched and the CMS failed;
+                CMSUnavailable when it was unreachable or answered 503
+        """
+        return await self._lookup(('process', process_id), None, raise_errors=True)
+
+    def warm_up(self) -> asyncio.Task:
+        """Start loading the process list"""
+        return self._refresh(PROCESS_LIST)
+
+    async def close(self):
+        """Cancel background refreshes"""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'refreshing': len(self._refreshing)
+        }
+
+    async def _lookup(self, key: Hashable, timeout: Optional[float], raise_errors: bool = False) -> Optional[Any]:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            if now - entry.fetched_at < self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                if now >= entry.retry_after:
+                    self._refresh(key)
+            return entry.value
+
+        self.misses += 1
+        task = self._refresh(key)
+        try:
+            # Shielded so a caller giving up does not cancel the shared fetch
+            error = await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            return None
+        entry = self._entries.get(key)
+        if entry is None and error is not None and raise_errors:
+            raise error
+        return entry.value if entry is not None else None
+
+    def _refresh(self, key: Hashable) -> asyncio.Task:
+        """The in-flight refresh of `key`, started if there is none"""
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_refresh(key))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        return task
+
+    async def _run_refresh(self, key: Hashable) -> Optional[CMSError]:
+        """Refresh `key`; returns the failure for callers waiting on a miss"""
+        try:
+            if key == PROCESS_LIST:
+                await self._refresh_list()
+            else:
+                await self._refresh_process(key[1])
+        except (httpx.HTTPError, CMSError, KeyError, ValueError) as e:
+            print(f"CMS cache refresh of {key} failed: {e}")
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.retry_after = time.monotonic() + self.retry_backoff
+            if isinstance(e, CMSError):
+                return e
+            if isinstance(e, httpx.TransportError):
+                return CMSUnavailable(f"CMS unreachable: {e}")
+            return CMSError(f"Invalid CMS response: {e}")
+        return None
+
+    async def _conditional_get(self, path: str, key: Hashable, timeout: Optional[float] = None):
+        """(response, entry); a 304 renews and returns the cached entry"""
+        entry = self._entries.get(key)
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else None
+        response = await self.client.get(path, timeout=timeout, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.not_modified += 1
+            entry.fetched_at = time.monotonic()
+            entry.retry_after = 0.0
+            return response, entry
+        return response, None
+
+    async def _refresh_list(self):
+        response, renewed = await self._conditional_get("/process/with-relations", PROCESS_LIST, timeout=10.0)
+        if renewed is not None:
+            return
+        if response.status_code != 200:
+            raise CMSError(f"Failed to fetch processes: {response.status_code} - {response.text}")
+
+        previous = self._entries.get(PROCESS_LIST)
+        listed = {process['process_id']: process for process in previous.value} if previous else {}
+        processes = []
+        for process in loads(response.content):
+            cached = listed.get(process['process_id'])
+            updated_at = process.get('updated_at')
+            if cached is not None and updated_at is not None and cached.get('updated_at') == updated_at:
+                # Unchanged since the last list: keep the object
+                process = cached
+            processes.append(process)
+        self._entries[PROCESS_LIST] = CacheEntry(processes, response.headers.get('etag'), time.monotonic())
+
+    async def _refresh_process(self, process_id: int):
+        key = ('process', process_id)
+        response, renewed = await self._conditional_get(f"/process/{process_id}/with-relations", key)
+        if renewed is not None:
+            return
+        if response.status_code == 404:
+            self._entries.pop(key, None)
+            return
+        if response.status_code != 200:
+            error = CMSUnavailable if response.status_code == 503 else CMSError
+            raise error(f"Failed to fetch process {process_id}: {response.status_code} - {response.text}")
+
+        process = loads(response.content)
+        cached = self._entries.get(key)
+        if cached is not None and process.get('updated_at') is not None \
+                and cached.value.get('updated_at') == process.get('updated_at'):
+            process = cached.value
+        self._entries[key] = CacheEntry(process, response.headers.get('etag'), time.monotonic())
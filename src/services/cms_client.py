@@ -0,0 +1,181 @@
+"""
+Application-lifetime client for the CMS API with a shared connection pool
+and cached access tokens
+"""
+import asyncio
+import base64
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import httpx
+
+from src.models.json_codec import loads
+
+DEFAULT_CMS_BASE_URL = "https://server-digitaltwin-enterprise-production.up.railway.app"
+
+
+@dataclass
+class CMSConfig:
+    """Connection settings; `from_env` reads the WHATIF_CMS_* variables"""
+    base_url: str = DEFAULT_CMS_BASE_URL
+    email: str = "superadmin@example.com"
+    password: str = "ChangeMe123!"
+    timeout: float = 30.0
+    max_connections: int = 20
+    token_ttl: float = 900.0        # used when the login response carries no expiry
+    refresh_margin: float = 60.0    # refresh this long before a token expires
+
+    @classmethod
+    def from_env(cls) -> 'CMSConfig':
+        defaults = cls()
+        return cls(
+            base_url=os.environ.get("WHATIF_CMS_BASE_URL", defaults.base_url).rstrip('/'),
+            email=os.environ.get("WHATIF_CMS_EMAIL", defaults.email),
+            password=os.environ.get("WHATIF_CMS_PASSWORD", defaults.password),
+            timeout=float(os.environ.get("WHATIF_CMS_TIMEOUT", defaults.timeout)),
+            max_connections=int(os.environ.get("WHATIF_CMS_MAX_CONNECTIONS", defaults.max_connections)),
+            token_ttl=float(os.environ.get("WHATIF_CMS_TOKEN_TTL", defaults.token_ttl))
+        )
+
+
+class CMSError(Exception):
+    """A CMS request failed"""
+
+
+class CMSUnavailable(CMSError):
+    """The CMS could not be reached or answered 503; worth retrying later"""
+
+
+def token_expiry(auth_data: dict, token: str, default_ttl: float) -> float:
+    """
+    Absolute expiry time of a token
+
+    Uses `expires_in` from the login response, then the JWT `exp` claim,
+    then `default_ttl` from now.
+    """
+    now = time.time()
+    if isinstance(auth_data.get('expires_in'), (int, float)):
+        return now + auth_data['expires_in']
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        if isinstance(claims.get('exp'), (int, float)):
+            return float(claims['exp'])
+    except (IndexError, ValueError):
+        pass
+    return now + default_ttl
+
+
+class CMSClient:
+    """
+    Keep-alive HTTP client for the CMS with token reuse
+
+    One `httpx.AsyncClient` (and its connection pool) lives as long as the
+    application. The access token is reused until shortly before it
+    expires; concurrent callers that find it missing or stale share a
+    single login. A 401 drops the token and the request is retried once
+    with a fresh one.
+    """
+
+    def __init__(self, config: Optional[CMSConfig] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.config = config or CMSConfig()
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._login_lock: Optional[asyncio.Lock] = None
+        self.logins = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.config.base_url,
+                timeout=self.config.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_connections
+                ),
+                transport=self._transport
+            )
+            self._login_lock = asyncio.Lock()
+        return self._client
+
+    async def aclose(self):
+        """Close the connection pool; the next request opens a new one"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._login_lock = None
+
+    def _token_valid(self) -> bool:
+        return self._token is not None and time.time() < self._token_expires_at - self.config.refresh_margin
+
+    async def access_token(self) -> str:
+        """Cached token, logging in when there is none or it is about to expire"""
+        if self._token_valid():
+            return self._token
+        self.client  # make sure the lock exists
+        async with self._login_lock:
+            # Another caller may have logged in while this one waited
+            if not self._token_valid():
+                await self._login()
+            return self._token
+
+    async def _login(self):
+        response = await self.client.post(
+            "/auth/login",
+            json={"email": self.config.email, "password": self.config.password}
+        )
+        if response.status_code not in (200, 201):
+            raise CMSError(f"Authentication failed: {response.status_code} - {response.text}")
+        auth_data = response.json()
+        token = auth_data['access_token']
+        self._token = token
+        self._token_expires_at = token_expiry(auth_data, token, self.config.token_ttl)
+        self.logins += 1
+
+    def invalidate_token(self, token: Optional[str] = None):
+        """Forget the cached token (only if it is still `token`, when given)"""
+        if token is None or token == self._token:
+            self._token = None
+            self._token_expires_at = 0.0
+
+    async def get(self, path: str, timeout: Optional[float] = None,
+                  headers: Optional[dict] = None) -> httpx.Response:
+        """Authenticated GET, retried once with a fresh token on 401"""
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        for attempt in range(2):
+            token = await self.access_token()
+            response = await self.client.get(
+                path, headers={**(headers or {}), "Authorization": f"Bearer {token}"}, **kwargs
+            )
+            if response.status_code != 401 or attempt:
+                return response
+            self.invalidate_token(token)
+        return response
+
+    async def get_processes(self) -> Optional[Any]:
+        """All processes with their relations, None on failure"""
+        try:
+            response = await self.get("/process/with-relations", timeout=10.0)
+            if response.status_code == 200:
+                return loads(response.content)
+            print(f"Failed to fetch processes: {response.status_code} - {response.text}")
+        except (httpx.HTTPError, CMSError, KeyError, ValueError) as e:
+            print(f"CMS API error: {e}")
+        return None
+
+    async def get_process(self, process_id: int) -> Optional[Any]:
+        """One process with its relations, None when missing or on failure"""
+        try:
+            response = await self.get(f"/process/{process_id}/with-relations")
+            if response.status_code == 200:
+                return loads(response.content)
+            print(f"Failed to fetch process {process_id}: {response.status_code} - {response.text}")
+        except (httpx.HTTPError, CMSError, KeyError, ValueError) as e:
+            print(f"CMS API error for process {process_id}: {e}")
+        return None
@@ -0,0 +1,280 @@
+"""
+Bounded process pool for CPU-bound optimization work behind the API
+"""
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class ComputePoolBusy(Exception):
+    """Raised when the pool already holds as many jobs as it may queue"""
+
+
+class ComputeTimeout(Exception):
+    """Raised when a job exceeds its time limit"""
+
+
+class TaskCancelled(Exception):
+    """Raised inside a worker when its job was cancelled by the caller"""
+
+
+# Worker-side state, set by the pool initializer and per task
+_cancel_flags = None
+_events = None
+_current_slot: Optional[int] = None
+_current_stream: Optional[int] = None
+
+# Last item a streamed job sends, after everything it published
+_STREAM_END = '__stream_end__'
+
+
+def _init_worker(flags, events, niceness: int):
+    global _cancel_flags, _events
+    _cancel_flags = flags
+    _events = events
+    if niceness and hasattr(os, 'nice'):
+        # Lower priority keeps the serving process responsive on shared cores
+        os.nice(niceness)
+
+
+def _run_task(slot: int, fn: Callable, args: tuple, kwargs: dict, stream: Optional[int] = None):
+    global _current_slot, _current_stream
+    _current_slot, _current_stream = slot, stream
+    try:
+        check_cancelled()  # cancelled while it was queued
+        return fn(*args, **kwargs)
+    finally:
+        if stream is not None:
+            _events.put((stream, _STREAM_END))
+        _current_slot = _current_stream = None
+
+
+def check_cancelled():
+    """
+    Cancellation checkpoint for job functions
+
+    Raises TaskCancelled when the job running in this worker has been
+    cancelled; a no-op outside the pool, so job functions stay callable
+    directly.
+    """
+    if _cancel_flags is not None and _current_slot is not None and _cancel_flags[_current_slot]:
+        raise TaskCancelled()
+
+
+def publish(item):
+    """
+    Hand `item` to the caller iterating the job's `ComputePool.stream`
+
+    A no-op for jobs started with `run` and outside the pool.
+    """
+    if _events is not None and _current_stream is not None:
+        _events.put((_current_stream, item))
+
+
+class ComputePool:
+    """
+    Process pool with a bounded backlog, timeouts and cooperative cancellation
+
+    At most `workers` jobs run at once and `max_queue` more may wait; beyond
+    that `run` raises ComputePoolBusy instead of growing the backlog. Every
+    admitted job holds a slot in a shared flag array. A job that times out
+    or whose client goes away is cancelled: queued jobs never start, and
+    running ones stop at their next `check_cancelled()` call.
+
+    Jobs started with `stream` also send the items they `publish()` back
+    as they go, through one queue the serving process reads in a thread.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 timeout: Optional[float] = None, poll_interval: float = 0.25, niceness: int = 5):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = self.workers * 2 if max_queue is None else max_queue
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.niceness = niceness
+        # Allocated on start, so a server that forks after importing the pool
+        # gives every forked process flags of its own
+        self._flags = None
+        self._events = None
+        self._reader: Optional[threading.Thread] = None
+        self._streams: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = {}
+        self._stream_ids = itertools.count()
+        self._free_slots: List[int] = list(range(self.workers + self.max_queue))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        """Jobs running or waiting"""
+        return self.workers + self.max_queue - len(self._free_slots)
+
+    def start(self):
+        if self._executor is None:
+            self._flags = multiprocessing.Array('b', self.workers + self.max_queue, lock=False)
+            self._events = multiprocessing.Queue()
+            self._reader = threading.Thread(target=self._read_events, daemon=True)
+            self._reader.start()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self._flags, self._events, self.niceness)
+            )
+
+    def shutdown(self):
+        if self._executor is not None:
+            for slot in range(len(self._flags)):
+                self._flags[slot] = 1
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._events.put(None)
+            self._reader.join()
+
+    def _read_events(self):
+        """Route published items to the stream awaiting them; runs in a thread"""
+        while True:
+            message = self._events.get()
+            if message is None:
+                return
+            stream, item = message
+            target = self._streams.get(stream)
+            if target is not None:  # items of abandoned streams are dropped
+                loop, queue = target
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+
+    def _submit(self, fn: Callable, args: tuple, kwargs: dict, stream: Optional[int] = None):
+        """Admit a job and hand it to the executor; returns its slot and future"""
+        if not self._free_slots:
+            raise ComputePoolBusy()
+        self.start()
+
+        slot = self._free_slots.pop()
+        self._flags[slot] = 0
+        try:
+            future = self._executor.submit(_run_task, slot, fn, args, kwargs, stream)
+        except Exception:
+            self._free_slots.append(slot)
+            raise
+        # The slot is reused only once its worker can no longer read the flag
+        future.add_done_callback(lambda _: self._free_slots.append(slot))
+        return slot, future
+
+    def _abandon(self, slot: int, future, waiter):
+        """Cancel a job nobody waits for any more"""
+        # A finished job's slot may already belong to another job
+        if not future.done():
+            self._flags[slot] = 1
+            future.cancel()
+            # Nobody awaits the abandoned job's outcome any more
+            waiter.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    async def run(
+        self,
+        fn: Callable,
+        *args,
+        timeout: Optional[float] = None,
+        disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        **kwargs
+    ):
+        """
+        Run `fn(*args, **kwargs)` in a worker process and await its result
+
+        Args:
+            fn: Picklable module-level function
+            timeout: Seconds before the job is cancelled; defaults to the pool's
+            disconnected: Polled while waiting; a true result cancels the job
+
+        Raises:
+            ComputePoolBusy: the backlog is full
+            ComputeTimeout: the job ran past its timeout
+            TaskCancelled: the client disconnected
+        """
+        slot, future = self._submit(fn, args, kwargs)
+        waiter = asyncio.wrap_future(future)
+
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            while True:
+                wait = self.poll_interval if disconnected is not None else None
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise ComputeTimeout()
+                    wait = remaining if wait is None else min(wait, remaining)
+                done, _ = await asyncio.wait({waiter}, timeout=wait)
+                if done:
+                    return waiter.result()
+                if disconnected is not None and await disconnected():
+                    raise TaskCancelled()
+        except BaseException:
+            # Timeout, disconnect or cancellation of the awaiting request
+            self._abandon(slot, future, waiter)
+            raise
+
+    def stream(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> AsyncIterator[Any]:
+        """
+        Run `fn(*args, **kwargs)` in a worker and iterate what it publishes
+
+        The job is admitted here, so a full backlog raises ComputePoolBusy
+        before the caller commits to a response. The returned iterator
+        yields every `publish()`ed item in order and ends with the job,
+        raising its exception if it failed. Leaving the iterator early
+        (a client disconnect cancels a streaming response) cancels the job.
+
+        Raises:
+            ComputePoolBusy: the backlog is full
+            ComputeTimeout: while iterating, the job ran past its timeout
+        """
+        self.start()
+        stream = next(self._stream_ids)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._streams[stream] = (asyncio.get_running_loop(), queue)
+        try:
+            slot, future = self._submit(fn, args, kwargs, stream)
+        except BaseException:
+            del self._streams[stream]
+            raise
+        return self._iterate(stream, queue, slot, future, self.timeout if timeout is None else timeout)
+
+    async def _iterate(self, stream: int, queue: asyncio.Queue, slot: int, future,
+                       timeout: Optional[float]) -> AsyncIterator[Any]:
+        waiter = asyncio.wrap_future(future)
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        watched = {waiter}
+        try:
+            while True:
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    raise ComputeTimeout()
+                getter = asyncio.ensure_future(queue.get())
+                try:
+                    done, _ = await asyncio.wait(
+                        watched | {getter}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    getter.cancel()
+                if getter in done:
+                    item = getter.result()
+                    if isinstance(item, str) and item == _STREAM_END:
+                        # Everything published has arrived; surface the job's error
+                        await waiter
+                        return
+                    yield item
+                elif waiter in done:
+                    if future.cancelled():
+                        raise TaskCancelled()
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        # The worker died, so the end marker never comes
+                        raise future.exception()
+                    # Finished; wait for the end marker behind its items
+                    watched = set()
+        except BaseException:
+            self._abandon(slot, future, waiter)
+            raise
+        finally:
+            del self._streams[stream]
@@ -0,0 +1,228 @@
+"""
+SQLite-backed store of asynchronous optimization jobs and their results
+"""
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    request TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL
+);
+-- One live job per submission key; failed jobs do not block a resubmission
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_live_key ON jobs (key) WHERE status != 'failed';
+CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at);
+"""
+
+
+@dataclass
+class Job:
+    """Status of one job, without its result"""
+    id: str
+    key: str
+    status: str
+    progress: float
+    message: Optional[str]
+    request: Dict
+    error: Optional[str]
+    submitted_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    expires_at: Optional[float]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'message': self.message,
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'expires_at': self.expires_at
+        }
+
+
+class JobStore:
+    """
+    Jobs and results in one SQLite file
+
+    Every call opens its own short-lived connection, so the store can be
+    used from the event loop, threads and the worker processes that run
+    the jobs. Finished jobs expire `ttl_seconds` after they finish and are
+    removed by `evict_expired`. Submissions are deduplicated on a key: while
+    a job with the same key is queued, running or completed and unexpired,
+    `submit` returns that job instead of creating a new one.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 24 * 3600):
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row['id'],
+            key=row['key'],
+            status=row['status'],
+            progress=row['progress'],
+            message=row['message'],
+            request=json.loads(row['request']),
+            error=row['error'],
+            submitted_at=row['submitted_at'],
+            started_at=row['started_at'],
+            finished_at=row['finished_at'],
+            expires_at=row['expires_at']
+        )
+
+    def submit(self, key: str, request: Dict) -> Tuple[Job, bool]:
+        """
+        Live job for `key`, creating a queued one if there is none
+
+        Returns:
+            (job, created); created is False for a deduplicated submission
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # An expired job must not satisfy the key
+                conn.execute(
+                    "DELETE FROM jobs WHERE key = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                    (key, now)
+                )
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE key = ? AND status != ?", (key, FAILED)
+                ).fetchone()
+                if row is None:
+                    job_id = uuid.uuid4().hex
+                    conn.execute(
+                        "INSERT INTO jobs (id, key, status, request, submitted_at) VALUES (?, ?, ?, ?, ?)",
+                        (job_id, key, QUEUED, json.dumps(request), now)
+                    )
+                    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                    created = True
+                else:
+                    created = False
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self._job(row), created
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job by id, None if unknown or expired"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (job_id, time.time())
+            ).fetchone()
+        return self._job(row) if row is not None else None
+
+    def get_live(self, key: str) -> Optional[Job]:
+        """Queued, running or unexpired completed job for a submission key"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE key = ? AND status != ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, FAILED, time.time())
+            ).fetchone()
+        return self._job(row) if row is not None else None
+
+    def result(self, job_id: str) -> Optional[Any]:
+        """Decoded result of a completed job"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result FROM jobs WHERE id = ? AND status = ? AND expires_at > ?",
+                (job_id, COMPLETED, time.time())
+            ).fetchone()
+        return json.loads(row['result']) if row is not None else None
+
+    def mark_running(self, job_id: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, message = ? WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), 'Started', job_id, QUEUED)
+            )
+
+    def set_progress(self, job_id: str, progress: float, message: Optional[str] = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = ? WHERE id = ? AND status = ?",
+                (min(max(progress, 0.0), 1.0), message, job_id, RUNNING)
+            )
+
+    def complete(self, job_id: str, result: Any):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, progress = 1, message = ?, result = ?, "
+                "finished_at = ?, expires_at = ? WHERE id = ? AND status = ?",
+                (COMPLETED, 'Completed', json.dumps(result), now, now + self.ttl_seconds, job_id, RUNNING)
+            )
+
+    def fail(self, job_id: str, error: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, error = ?, finished_at = ?, expires_at = ? "
+                "WHERE id = ? AND status IN (?, ?)",
+                (FAILED, 'Failed', error, now, now + self.ttl_seconds, job_id, QUEUED, RUNNING)
+            )
+
+    def fail_unfinished(self, error: str) -> int:
+        """Fail every queued or running job, e.g. ones orphaned by a restart"""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, error = ?, finished_at = ?, expires_at = ? "
+                "WHERE status IN (?, ?)",
+                (FAILED, 'Failed', error, now, now + self.ttl_seconds, QUEUED, RUNNING)
+            )
+            return cursor.rowcount
+
+    def evict_expired(self) -> int:
+        """Delete expired jobs and their results"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
@@ -0,0 +1,456 @@
+"""
+Optimization jobs run by the API's compute pool
+
+Every function here is module level and takes and returns plain JSON-like
+data, so it can be pickled into a worker process; the endpoints in
+api/main.py only validate requests and shape errors.
+"""
+import copy
+import hashlib
+import json
+from typing import Dict, Iterator, List, Optional
+
+from src.models.cms_compiler import CMSValidationError, compile_cms_process
+from src.models.data_models import Project
+from src.models.json_codec import load_json_file, load_project_document
+from src.models.scenario_codec import encode_scenario_set
+from src.optimization.monte_carlo import DurationModel
+from src.optimization.parameter_sweep import ParameterSweep, SweepParameter
+from src.optimization.pareto_optimizer import REPORT_SECTIONS, ParetoOptimizer
+from src.optimization.scenario_generator import ScenarioGenerator
+from src.services.compute_pool import check_cancelled, publish
+from src.services.job_store import JobStore
+from src.services.project_registry import preloaded_projects
+
+
+def extract_constraints(project_data: Dict) -> Dict:
+    """Extract current constraints from project data"""
+    return {
+        "resources": {
+            resource["id"]: {
+                "hourly_rate": resource["hourly_rate"],
+                "max_hours_per_day": resource["max_hours_per_day"],
+                "available": True,
+                "skills": resource["skills"]
+            }
+            for resource in project_data["resources"]
+        },
+        "tasks": {
+            task["id"]: {
+                "duration_hours": task["duration_hours"],
+                "priority": 3,  # Default normal priority
+                "allow_parallel": False,
+                "required_skills": task["required_skills"],
+                "order": task["order"]
+            }
+            for task in project_data["tasks"]
+        },
+        "preferences": {
+            "time_priority": 0.33,
+            "cost_priority": 0.33,
+            "quality_priority": 0.34
+        }
+    }
+
+
+def validate_constraints(resources: Dict):
+    """
+    Reject resource edits no schedule can honour
+
+    Raises:
+        ValueError: the edits are not keyed by resource id, or a
+            max_hours_per_day is not a positive number
+    """
+    if not isinstance(resources or {}, dict):
+        raise ValueError("resources must map resource ids to their edits")
+    for resource_id, constraint in (resources or {}).items():
+        if not isinstance(constraint, dict):
+            raise ValueError(f"Edits of '{resource_id}' must be an object")
+        if 'max_hours_per_day' not in constraint:
+            continue
+        hours = constraint['max_hours_per_day']
+        if isinstance(hours, bool) or not isinstance(hours, (int, float)) or not hours > 0:
+            raise ValueError(f"max_hours_per_day of '{resource_id}' must be a positive number")
+
+
+def apply_direct_constraints(project_data, constraint_data):
+    """Apply constraints from direct dictionary format"""
+    # Apply resource constraints
+    resources = constraint_data.get('resources', {})
+    for resource_id, resource_constraint in resources.items():
+        for resource in project_data.get('resources', []):
+            if resource['id'] == resource_id:
+                if 'hourly_rate' in resource_constraint:
+                    resource['hourly_rate'] = resource_constraint['hourly_rate']
+                if 'max_hours_per_day' in resource_constraint:
+                    resource['max_hours_per_day'] = resource_constraint['max_hours_per_day']
+                if 'available' in resource_constraint:
+                    resource['available'] = resource_constraint['available']
+
+    # Apply task constraints
+    tasks = constraint_data.get('tasks', {})
+    for task_id, task_constraint in tasks.items():
+        for task in project_data.get('tasks', []):
+            if task['id'] == task_id:
+                if 'duration_hours' in task_constraint:
+                    task['duration_hours'] = task_constraint['duration_hours']
+                if 'priority' in task_constraint:
+                    task['priority'] = task_constraint['priority']
+
+    return project_data
+
+
+def encode_json(fn, *args) -> bytes:
+    """
+    `fn(*args)` encoded exactly as the API's JSONResponse would encode it,
+    so the worker also takes the serialization off the event loop
+    """
+    return json.dumps(
+        fn(*args), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def optimize_process_file(file_path: str, response_format: str = "full") -> Dict:
+    """Response of POST /optimize/{process_name} for a project file"""
+    # Projects preloaded by the server come compiled; otherwise parse the
+    # file once for the Project and the echoed project data
+    preloaded = preloaded_projects.get(file_path)
+    if preloaded is not None:
+        project, project_data, index = preloaded.project, preloaded.data, preloaded.index
+    else:
+        document = load_project_document(file_path)
+        project, project_data, index = document.project, document.data, None
+
+    # Generate scenarios, stopping early if the request was abandoned
+    generator = ScenarioGenerator(project, index=index)
+    scenarios = []
+    for scenario in generator.iter_scenarios(include_rl=False):
+        check_cancelled()
+        scenarios.append(scenario)
+
+    # Only the entries and the best overall scenario are rendered, so no
+    # other report section is computed
+    report = ParetoOptimizer(project).report(scenarios)
+    pareto_scenarios = report.entries()
+
+    # Select best overall scenario (highest overall score)
+    best_scenario = pareto_scenarios[report.best_position('balanced')]
+
+    if response_format == "compact":
+        encoded = encode_scenario_set(
+            pareto_scenarios[0]['scenario'], [entry['scenario'] for entry in pareto_scenarios]
+        )
+        return {
+            "success": True,
+            "format": encoded['format'],
+            "tasks": encoded['tasks'],
+            "resources": encoded['resources'],
+            "baseline": encoded['baseline'],
+            "all_scenarios": [
+                {'scenario': scenario, 'metrics': entry['metrics']}
+                for scenario, entry in zip(encoded['scenarios'], pareto_scenarios)
+            ],
+            "best_scenario_index": pareto_scenarios.index(best_scenario),
+            "project_data": project_data,
+            "constraints": extract_constraints(project_data)
+        }
+
+    return {
+        "success": True,
+        "best_scenario": best_scenario,
+        "project_data": project_data,
+        "constraints": extract_constraints(project_data),
+        "all_scenarios": pareto_scenarios
+    }
+
+
+def optimize_cms_data(cms_data: Dict, response_format: str = "full") -> Dict:
+    """
+    Scenarios of POST /optimize/cms-process/{process_id} for fetched CMS data
+
+    Raises:
+        CMSValidationError: the CMS data is malformed
+    """
+    compiled = compile_cms_process(cms_data)
+    generator = ScenarioGenerator(compiled.project)
+
+    # Create CMS baseline scenario (preserves existing assignments)
+    cms_baseline = generator.create_cms_baseline_scenario(compiled)
+
+    # Generate optimized scenarios from CMS baseline
+    scenarios = []
+    for scenario in generator.iter_cms_optimization_scenarios(cms_baseline, compiled):
+        check_cancelled()
+        scenarios.append(scenario)
+
+    if response_format == "compact":
+        return encode_scenario_set(
+            cms_baseline.to_dict(), [scenario.to_dict() for scenario in scenarios]
+        )
+    return {
+        "scenarios": [scenario.to_dict() for scenario in scenarios],
+        "baseline": cms_baseline.to_dict()
+    }
+
+
+def publish_scenario_events(scenarios: Iterator, project: Project, start: Dict, summary: Dict):
+    """
+    Publish the Server-Sent Events of a streamed optimization
+
+    Each event is an (event, data) pair: `start`, one `scenario` with its
+    metrics as soon as it is generated, then `summary` with the Pareto
+    frontier and best scenario.
+    """
+    publish(("start", start))
+    optimizer = ParetoOptimizer(project)
+    generated = []
+    all_metrics = []
+    for scenario in scenarios:
+        check_cancelled()
+        metrics = optimizer.evaluate_scenario(scenario)
+        generated.append(scenario)
+        all_metrics.append(metrics)
+        publish(("scenario", {
+            "index": len(generated) - 1,
+            "scenario": scenario.to_dict(),
+            "metrics": metrics.to_dict()
+        }))
+
+    # The summary reuses the metrics already sent instead of re-evaluating
+    report = optimizer.report(generated, metrics=all_metrics)
+    best = report.best_position('balanced')
+    publish(("summary", {
+        **summary,
+        "total_scenarios": len(generated),
+        "pareto_frontier": [scenario.id for scenario in report.pareto],
+        "best_scenario_id": generated[best].id if best is not None else None
+    }))
+
+
+def stream_process_file(file_path: str, process_name: str):
+    """Events of GET /optimize/{process_name}/stream for a project file"""
+    preloaded = preloaded_projects.get(file_path)
+    document = preloaded or load_project_document(file_path)
+    project_data, project = document.data, document.project
+    generator = ScenarioGenerator(project, index=preloaded.index if preloaded else None)
+    publish_scenario_events(
+        generator.iter_scenarios(include_rl=False),
+        project,
+        start={"process_name": process_name, "expected_scenarios": 6},
+        summary={"project_data": project_data, "constraints": extract_constraints(project_data)}
+    )
+
+
+def stream_cms_data(cms_data: Dict):
+    """
+    Events of GET /optimize/cms-process/{process_id}/stream for fetched CMS data
+
+    Raises:
+        CMSValidationError: the CMS data is malformed, before any event
+    """
+    compiled = compile_cms_process(cms_data)
+    generator = ScenarioGenerator(compiled.project)
+    baseline = generator.create_cms_baseline_scenario(compiled)
+    process_info = {
+        "process_id": compiled.process_id,
+        "process_name": compiled.process_name,
+        "company": compiled.company
+    }
+    publish_scenario_events(
+        generator.iter_cms_optimization_scenarios(baseline, compiled),
+        compiled.project,
+        start={"process_info": process_info, "expected_scenarios": 4},
+        summary={"process_info": process_info, "baseline_id": baseline.id}
+    )
+
+
+def optimize_cms_record(cms_data: Dict, response_format: str = "full") -> Dict:
+    """
+    One line of a bulk run: compile and optimize a fetched CMS process
+
+    Malformed processes become an error record instead of raising, so one
+    bad process does not stop the batch.
+    """
+    info = {
+        "process_id": cms_data.get('process_id'),
+        "process_name": cms_data.get('process_name'),
+        "company": (cms_data.get('company') or {}).get('name', 'Unknown')
+    }
+    try:
+        return {**info, "status": "ok", **optimize_cms_data(cms_data, response_format)}
+    except CMSValidationError as e:
+        return {**info, "status": "error", "error": f"Invalid CMS data format: {e}"}
+
+
+def optimize_custom(
+    file_path: str,
+    resources: Dict,
+    tasks: Dict,
+    preferences: Dict,
+    strategy: Optional[str],
+    capacity_aware: bool = False
+) -> Dict:
+    """
+    One-shot /optimize/custom: apply the constraints and run one strategy
+
+    `strategy` None means custom parallel execution of the tasks flagged
+    `allow_parallel`.
+    """
+    project_data = load_json_file(file_path)
+
+    # Apply custom constraints directly from request
+    if resources or tasks:
+        constraint_data = {
+            'resources': resources,
+            'tasks': tasks,
+            'preferences': preferences
+        }
+        project_data = apply_direct_constraints(project_data, constraint_data)
+
+    project = Project.from_json(project_data)
+
+    # Capacity-aware scheduling makes max_hours_per_day edits take effect
+    generator = ScenarioGenerator(project, capacity_aware=capacity_aware)
+    if strategy is None:
+        scenario = generator.generate_custom_parallel_scenario(tasks)
+    elif strategy == 'parallel':
+        scenario = generator.generate_parallel_scenario()
+    elif strategy == 'cost':
+        scenario = generator.generate_cost_optimized_scenario()
+    else:
+        scenario = generator.generate_balanced_scenario()
+
+    metrics = ParetoOptimizer(project).evaluate_scenario(scenario)
+    return {
+        "success": True,
+        "scenario": {
+            'scenario': scenario.to_dict(),
+            'metrics': metrics.to_dict()
+        },
+        "project_data": project_data
+    }
+
+
+def run_parameter_sweep(file_path: str, request: Dict, max_workers: int = 1,
+                        max_variants: Optional[int] = None) -> Dict:
+    """
+    Response of POST /optimize/sweep
+
+    The sweep evaluates its variants in this worker unless the request
+    asks for more `workers`, and never in more than `max_workers`
+    processes, so one sweep does not take over the machine.
+    """
+    parameters = [SweepParameter.from_dict(p) for p in request.get('parameters', [])]
+    project = Project.from_json_file(file_path)
+
+    sweep = ParameterSweep(
+        project,
+        parameters,
+        strategy=request.get('strategy', 'balanced'),
+        capacity_aware=bool(request.get('capacity_aware', False))
+    )
+    result = sweep.run(
+        method=request.get('method', 'grid'),
+        samples=int(request.get('samples', 64)),
+        seed=request.get('seed'),
+        workers=max(1, min(int(request.get('workers', 1)), max_workers)),
+        max_variants=max_variants
+    )
+
+    return {
+        "success": True,
+        "strategy": sweep.strategy,
+        "capacity_aware": sweep.capacity_aware,
+        "sweep": result.to_dict()
+    }
+
+
+def analysis_job_request(project_data: Dict, request: Dict) -> Dict:
+    """Normalized /jobs submission: the project plus every option with its default"""
+    constraints = request.get('constraints') or {}
+    validate_constraints(constraints.get('resources'))
+    return {
+        'project': project_data,
+        'constraints': {
+            'resources': constraints.get('resources') or {},
+            'tasks': constraints.get('tasks') or {}
+        },
+        'include_rl': bool(request.get('include_rl', True)),
+        'capacity_aware': bool(request.get('capacity_aware', False)),
+        'uncertainty_samples': int(request.get('uncertainty_samples', 0)),
+        'report_sections': report_sections(request.get('report_sections'))
+    }
+
+
+def report_sections(sections: Optional[List[str]]) -> List[str]:
+    """
+    Requested report sections in report order, all of them when omitted
+
+    Raises:
+        ValueError: an unknown section is named
+    """
+    if sections is None:
+        return list(REPORT_SECTIONS)
+    if isinstance(sections, str) or not isinstance(sections, list):
+        raise ValueError("report_sections must be a list of section names")
+    unknown = [section for section in sections if section not in REPORT_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown report section(s): {', '.join(map(str, unknown))}")
+    return [section for section in REPORT_SECTIONS if section in sections]
+
+
+def analysis_job_key(job_request: Dict) -> str:
+    """Content hash of a normalized submission; equal submissions share a job"""
+    canonical = json.dumps(job_request, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def cms_request_key(cms_data: Dict, response_format: str) -> str:
+    """Content hash of a CMS optimization request; equal requests share a result"""
+    canonical = json.dumps([cms_data, response_format], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def run_analysis_job(store_path: str, ttl_seconds: float, job_id: str, job_request: Dict):
+    """
+    Full what-if analysis of one job: all scenarios (RL included unless
+    disabled) and the ParetoOptimizer report
+
+    Progress and the result are written to the job store as the job runs,
+    so the result never has to travel back through the pool.
+    """
+    store = JobStore(store_path, ttl_seconds)
+    store.mark_running(job_id)
+
+    project_data = copy.deepcopy(job_request['project'])
+    constraints = job_request['constraints']
+    if constraints['resources'] or constraints['tasks']:
+        project_data = apply_direct_constraints(project_data, constraints)
+    project = Project.from_json(project_data)
+
+    include_rl = job_request['include_rl']
+    expected = 9 if include_rl else 6
+    steps = expected + 1  # plus evaluation and the report
+
+    generator = ScenarioGenerator(project, capacity_aware=job_request['capacity_aware'])
+    scenarios = []
+    store.set_progress(job_id, 0.0, 'Generating scenarios')
+    for scenario in generator.iter_scenarios(include_rl=include_rl):
+        check_cancelled()
+        scenarios.append(scenario)
+        store.set_progress(job_id, len(scenarios) / steps, f"Generated {scenario.name}")
+    generator.scenarios = scenarios
+
+    store.set_progress(job_id, expected / steps, 'Evaluating scenarios')
+    samples = job_request['uncertainty_samples']
+    if samples > 0:
+        optimizer = ParetoOptimizer(project, uncertainty=DurationModel(), uncertainty_samples=samples)
+    else:
+        optimizer = ParetoOptimizer(project)
+    report = optimizer.report(scenarios).to_dict(job_request['report_sections'])
+
+    store.complete(job_id, {
+        'project': {'id': project.id, 'name': project.name},
+        'total_scenarios': len(scenarios),
+        'report': report
+    })
@@ -0,0 +1,81 @@
+"""
+Local project files parsed and compiled once, ahead of requests
+
+The API preloads its project files before it serves or forks anything:
+the pre-forked server (api/server.py) does so in its parent process, and
+the workers, together with the compute pool processes they fork in turn,
+inherit the parsed data and compiled indexes and share their memory
+pages copy-on-write instead of each reading and compiling the same files.
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.models.data_models import Project
+from src.models.json_codec import load_project_document
+from src.models.project_index import ProjectIndex
+
+
+@dataclass
+class PreloadedProject:
+    """A project file's plain data, Project and compiled index; read-only"""
+    data: Dict
+    project: Project
+    index: ProjectIndex
+
+
+class ProjectRegistry:
+    """
+    Preloaded projects by file path
+
+    An entry is served only while its file keeps the mtime and size it was
+    loaded with, so an edited project file takes effect without a restart:
+    `get` returns None and callers load the file as they would without a
+    registry.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, int, PreloadedProject]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def preload(self, paths: Iterable[str]) -> int:
+        """
+        Load and compile every file not loaded yet
+
+        Returns:
+            Number of files loaded by this call
+        """
+        loaded = 0
+        for path in paths:
+            path = os.path.abspath(path)
+            if path in self._entries:
+                continue
+            # Stat before reading, so a write during the load invalidates it
+            stat = os.stat(path)
+            document = load_project_document(path)
+            preloaded = PreloadedProject(
+                document.data, document.project, ProjectIndex.from_project(document.project)
+            )
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, preloaded)
+            loaded += 1
+        return loaded
+
+    def get(self, path: str) -> Optional[PreloadedProject]:
+        """The preloaded project of `path`, or None if absent or out of date"""
+        known = self._entries.get(os.path.abspath(path))
+        if known is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) != known[:2]:
+            return None
+        return known[2]
+
+
+# Filled by the API before it serves; empty in the CLI and in tests, where
+# every lookup misses and projects are loaded from their files
+preloaded_projects = ProjectRegistry()
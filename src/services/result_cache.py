@@ -0,0 +1,179 @@
+"""
+Cache of pre-encoded API responses with a byte-bounded memory tier and an
+optional disk tier
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class FileFingerprints:
+    """
+    Content hashes of project files, re-read only when a file changes
+
+    A file is hashed on first use and again only when its mtime or size
+    differ from the last time, so a lookup normally costs one stat().
+    """
+
+    def __init__(self):
+        self._known: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def digest(self, path: str) -> Tuple[str, Optional[str]]:
+        """
+        Returns:
+            (digest, replaced); replaced is the previous digest when the
+            file changed since it was last seen, else None
+        """
+        stat = os.stat(path)
+        with self._lock:
+            known = self._known.get(path)
+        if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2], None
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with self._lock:
+            self._known[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        replaced = known[2] if known is not None and known[2] != digest else None
+        return digest, replaced
+
+
+class ResultCache:
+    """
+    LRU of encoded responses bounded by total size in bytes
+
+    With `disk_dir` set, entries are also written there (bounded by
+    `max_disk_bytes`, oldest first out) and survive restarts; a memory miss
+    that hits the disk promotes the entry back into memory. Keys should
+    start with the content digest they depend on so `discard_prefix` can
+    drop every entry of a changed file.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._disk_bytes = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(path.stat().st_size for path in self.disk_dir.glob('*.bin'))
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._put_memory(key, value)
+        return value
+
+    def put(self, key: str, value: bytes):
+        self._put_memory(key, value)
+        self._write_disk(key, value)
+
+    def discard_prefix(self, prefix: str):
+        """Drop every entry whose key starts with `prefix`"""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._bytes -= len(self._entries.pop(key))
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob(f"{prefix}*.bin"):
+                self._remove_disk(path)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk_bytes': self._disk_bytes if self.disk_dir is not None else None,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses
+            }
+
+    def _put_memory(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = value
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.bin"
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self.disk_dir is None:
+            return None
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, value: bytes):
+        if self.disk_dir is None or len(value) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        temp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            previous = path.stat().st_size if path.exists() else 0
+            temp.write_bytes(value)
+            os.replace(temp, path)  # readers never see a partial file
+        except OSError as e:
+            print(f"Result cache write failed for {key}: {e}")
+            temp.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._disk_bytes += len(value) - previous
+            over = self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        """Remove the least recently written files until under the bound"""
+        files = []
+        for path in self.disk_dir.glob('*.bin'):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue  # removed meanwhile
+        for _, path in sorted(files):
+            with self._lock:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    return
+            self._remove_disk(path)
+
+    def _remove_disk(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
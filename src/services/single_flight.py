@@ -0,0 +1,115 @@
+"""
+Coalescing of concurrent identical requests into one computation
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+Probe = Callable[[], Awaitable[bool]]
+
+
+class _Flight:
+    """One in-flight computation and the callers waiting on it"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.callers = 0
+        self.anonymous = 0  # callers without a disconnect probe
+        self.probes: List[Probe] = []
+
+    def join(self, disconnected: Optional[Probe]):
+        self.callers += 1
+        if disconnected is None:
+            self.anonymous += 1
+        else:
+            self.probes.append(disconnected)
+
+    def leave(self, disconnected: Optional[Probe]):
+        self.callers -= 1
+        if disconnected is None:
+            self.anonymous -= 1
+        else:
+            self.probes.remove(disconnected)
+
+    async def abandoned(self) -> bool:
+        """True once every caller waiting on the computation has gone away"""
+        if self.callers == 0:
+            return True
+        if self.anonymous:
+            return False
+        for probe in list(self.probes):
+            if not await probe():
+                return False
+        return True
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one in-flight computation
+
+    The first caller of a key starts the computation; callers of the same
+    key arriving before it finishes await it too and get the same result
+    or exception. Nothing is kept after it finishes, so a result cache in
+    front of it (or none) decides what is reused later.
+
+    The computation runs in a task of its own, so one caller going away
+    does not cancel it for the others. It is cancelled once every caller
+    has been cancelled, and `compute` is handed a probe that reports when
+    every caller has either been cancelled or disconnected, to pass on as
+    the compute pool's `disconnected` check.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.computations = 0
+        self.coalesced = 0
+        self.max_callers = 0
+
+    async def run(self, key: str, compute: Callable[[Probe], Awaitable], disconnected: Optional[Probe] = None):
+        """
+        Await `compute(abandoned)`, or the computation already running for `key`
+
+        Args:
+            key: Content hash of everything the result depends on
+            compute: Starts the computation; called once per flight
+            disconnected: This caller's disconnect check, polled through
+                the `abandoned` probe
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            flight.task = asyncio.create_task(compute(flight.abandoned))
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+            self._flights[key] = flight
+            self.computations += 1
+        else:
+            self.coalesced += 1
+
+        flight.join(disconnected)
+        self.max_callers = max(self.max_callers, flight.callers)
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.leave(disconnected)
+            if flight.callers == 0 and not flight.task.done():
+                # Later callers start afresh rather than join a cancelled flight
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _finish(self, key: str, flight: _Flight):
+        self._forget(key, flight)
+        # Retrieve the outcome so a flight nobody awaits any more does not
+        # log "exception was never retrieved"
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': len(self._flights),
+            'computations': self.computations,
+            'coalesced': self.coalesced,
+            'max_callers': self.max_callers
+        }
@@ -0,0 +1,121 @@
+"""
+Test bulk optimization of CMS processes against the stub CMS
+
+Run with: python test_bulk_optimization.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from test_cms_client import STUB, STUB_URL, config, sample_process
+from src.services.bulk_optimization import completed_process_ids, run_bulk
+from src.services.cms_client import CMSClient
+from src.services.compute_pool import ComputePool
+
+PROCESS_IDS = list(range(100, 112))
+
+
+def add_stub_processes():
+    for process_id in PROCESS_IDS:
+        STUB.processes[process_id] = sample_process(process_id)
+
+
+def read_records(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def bulk(output: str, process_ids: list, **kwargs):
+    async def run():
+        client = CMSClient(config())
+        pool = ComputePool(workers=2, niceness=0)
+        try:
+            return await run_bulk(client, pool, process_ids, output, **kwargs)
+        finally:
+            pool.shutdown()
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def test_bulk_writes_one_record_per_process(tmp_path: Path):
+    add_stub_processes()
+    output = str(tmp_path / "all.jsonl")
+    summary = bulk(output, PROCESS_IDS + [999, PROCESS_IDS[0]])
+    records = read_records(output)
+
+    assert summary.total == 13 and summary.succeeded == 12 and summary.failed == 1
+    assert sorted(r["process_id"] for r in records) == sorted(PROCESS_IDS + [999])
+    ok = [r for r in records if r["status"] == "ok"]
+    assert all(r["baseline"] and r["scenarios"] and r["process_name"].startswith("Stub") for r in ok)
+    assert [r for r in records if r["status"] == "error"][0]["process_id"] == 999
+    print(f"✅ {summary.processed} records written at {summary.processes_per_second:.1f} processes/sec")
+
+
+def test_resume_after_crash(tmp_path: Path):
+    add_stub_processes()
+    output = str(tmp_path / "resume.jsonl")
+    bulk(output, PROCESS_IDS[:5], response_format="compact")
+
+    # A crash while writing leaves a torn last line
+    with open(output, "a") as f:
+        f.write('{"process_id": 105, "status": "o')
+    assert completed_process_ids(output) == set(PROCESS_IDS[:5])
+
+    summary = bulk(output, PROCESS_IDS, response_format="compact")
+    records = read_records(output)
+    assert summary.skipped == 5 and summary.succeeded == 7
+    assert sorted(r["process_id"] for r in records) == PROCESS_IDS
+    assert all(r["format"] == "compact-v1" for r in records)
+
+    again = bulk(output, PROCESS_IDS)
+    assert again.skipped == 12 and again.processed == 0
+    print("✅ Resume skips finished processes and drops a torn line")
+
+
+def test_api_streams_bulk_run(tmp_path: Path):
+    add_stub_processes()
+    os.environ["WHATIF_CMS_BASE_URL"] = STUB_URL
+    os.environ["WHATIF_CMS_EMAIL"] = "stub@example.com"
+    os.environ["WHATIF_CMS_PASSWORD"] = "secret"
+    import api.main as api
+    from fastapi.testclient import TestClient
+
+    # Set on the module too, in case another test imported the API first
+    api.BULK_OUTPUT_DIR = tmp_path
+
+    with TestClient(api.app) as client:
+        payload = {"process_ids": PROCESS_IDS[:4], "run_id": "nightly", "format": "compact"}
+        with client.stream("POST", "/optimize/cms-processes/bulk", json=payload) as response:
+            assert response.status_code == 200
+            assert response.headers["x-bulk-run-id"] == "nightly"
+            lines = [json.loads(line) for line in response.iter_lines() if line]
+        assert sorted(line["process_id"] for line in lines[:-1]) == PROCESS_IDS[:4]
+        assert lines[-1]["summary"]["succeeded"] == 4
+
+        response = client.post("/optimize/cms-processes/bulk", json=payload)
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+        assert len(lines) == 1 and lines[0]["summary"]["skipped"] == 4 and lines[0]["summary"]["processed"] == 0
+        assert client.post("/optimize/cms-processes/bulk", json={"run_id": "../x"}).status_code == 400
+
+    # A response whose body is never read does not hold its run id
+    async def unread():
+        await api.optimize_cms_processes_bulk({"process_ids": PROCESS_IDS[:1], "run_id": "unread"})
+        return set(api.BULK_RUNS)
+
+    assert asyncio.run(unread()) == set()
+    assert len(read_records(str(tmp_path / "nightly.jsonl"))) == 4
+    print("✅ API streams records and resumes a run by id")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as workdir:
+        test_bulk_writes_one_record_per_process(Path(workdir))
+        test_resume_after_crash(Path(workdir))
+        test_api_streams_bulk_run(Path(workdir))
+    print("\nAll bulk optimization tests passed")
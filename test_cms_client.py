@@ -0,0 +1,381 @@
+"""
+Test the pooled CMS client against a local stub CMS server
+
+Run with: python test_cms_client.py
+"""
+import asyncio
+import base64
+import json
+import os
+import socket
+import sys
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.services.cms_client import CMSClient, CMSConfig, CMSUnavailable
+from src.services.cms_cache import CMSProcessCache
+
+
+def sample_process(process_id: int) -> dict:
+    """Minimal CMS process with two sequential tasks"""
+    def job(job_id, name, rate):
+        return {"job_id": job_id, "task_id": 0, "job": {
+            "job_id": job_id, "jobCode": f"J-{job_id}", "name": name, "description": name,
+            "hourlyRate": rate, "maxHoursPerDay": 8
+        }}
+
+    def task(task_id, order, minutes, jobs):
+        return {"process_id": process_id, "task_id": task_id, "order": order, "task": {
+            "task_id": task_id, "task_name": f"Task {task_id}", "task_code": f"T-{task_id}",
+            "task_capacity_minutes": minutes, "task_overview": "", "jobTasks": jobs
+        }}
+
+    return {
+        "process_id": process_id,
+        "process_name": f"Stub Process {process_id}",
+        "process_overview": "Served by the stub CMS",
+        "updated_at": "2025-09-08T06:56:35.970Z",
+        "company": {"name": "Stub Company"},
+        "process_tasks": [
+            task(10, 1, 60, [job(11, "Developer", 60)]),
+            task(12, 2, 90, [job(13, "Tester", 45)]),
+        ]
+    }
+
+
+class StubCMS:
+    """
+    CMS stand-in that counts logins, connections and fetches, issues
+    expiring JWTs, sends ETags and can be made slow or unavailable
+    """
+
+    def __init__(self):
+        self.app = FastAPI()
+        self.logins = 0
+        self.list_fetches = 0
+        self.delay = 0.0
+        self.down = False
+        self.token_lifetime = 3600.0
+        self.valid_tokens = {}
+        self.client_ports = set()
+        self.processes = {7: sample_process(7), 8: sample_process(8)}
+        self._routes()
+
+    def issue_token(self) -> str:
+        self.logins += 1
+        claims = {"sub": "superadmin", "n": self.logins, "exp": time.time() + self.token_lifetime}
+        payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip('=')
+        token = f"header.{payload}.signature"
+        self.valid_tokens[token] = claims["exp"]
+        return token
+
+    def revoke_all(self):
+        self.valid_tokens.clear()
+
+    def _check(self, request: Request, authorization: str):
+        self.client_ports.add(request.client.port)
+        token = (authorization or "").removeprefix("Bearer ")
+        if self.valid_tokens.get(token, 0) < time.time():
+            raise HTTPException(status_code=401, detail="Unauthorized")
+
+    def _routes(self):
+        @self.app.post("/auth/login", status_code=201)
+        async def login(body: dict, request: Request):
+            self.client_ports.add(request.client.port)
+            await asyncio.sleep(0.05)  # leave room for concurrent callers to pile up
+            if body.get("email") != "stub@example.com" or body.get("password") != "secret":
+                raise HTTPException(status_code=401, detail="Bad credentials")
+            return {"access_token": self.issue_token()}
+
+        @self.app.get("/process/with-relations")
+        async def processes(request: Request, authorization: str = Header(None),
+                            if_none_match: str = Header(None)):
+            self._check(request, authorization)
+            return await self._conditional(list(self.processes.values()), if_none_match, count=True)
+
+        @self.app.get("/process/{process_id}/with-relations")
+        async def process(process_id: int, request: Request, authorization: str = Header(None),
+                          if_none_match: str = Header(None)):
+            self._check(request, authorization)
+            if process_id not in self.processes:
+                raise HTTPException(status_code=404, detail="Not found")
+            return await self._conditional(self.processes[process_id], if_none_match)
+
+    async def _conditional(self, payload, if_none_match: str, count: bool = False) -> Response:
+        await asyncio.sleep(self.delay)
+        if self.down:
+            raise HTTPException(status_code=503, detail="CMS unavailable")
+        if count:
+            self.list_fetches += 1
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def start_stub() -> tuple:
+    stub = StubCMS()
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(stub.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.02)
+    return stub, f"http://127.0.0.1:{port}"
+
+
+STUB, STUB_URL = start_stub()
+
+
+def reset_stub():
+    """Undo changes earlier tests, here or in modules sharing the stub, made to it"""
+    STUB.processes = {7: sample_process(7), 8: sample_process(8)}
+    STUB.delay = 0.0
+    STUB.down = False
+    STUB.token_lifetime = 3600.0
+
+
+def config(**overrides) -> CMSConfig:
+    return CMSConfig(base_url=STUB_URL, email="stub@example.com", password="secret", **overrides)
+
+
+def test_token_and_connection_reuse():
+    reset_stub()
+    async def run():
+        client = CMSClient(config())
+        logins, ports = STUB.logins, len(STUB.client_ports)
+        for _ in range(20):
+            assert len(await client.get_processes()) == 2
+        await client.aclose()
+        return STUB.logins - logins, len(STUB.client_ports) - ports
+
+    logins, connections = asyncio.run(run())
+    assert logins == 1, f"expected one login, got {logins}"
+    assert connections == 1, f"expected one kept-alive connection, got {connections}"
+    print("✅ 20 sequential requests: 1 login, 1 connection")
+
+
+def test_single_flight_login():
+    reset_stub()
+    async def run():
+        client = CMSClient(config())
+        logins = STUB.logins
+        results = await asyncio.gather(*[client.get_process(7 + i % 2) for i in range(50)])
+        await client.aclose()
+        return results, STUB.logins - logins
+
+    results, logins = asyncio.run(run())
+    assert all(result is not None for result in results)
+    assert logins == 1, f"expected one login for 50 concurrent requests, got {logins}"
+    print("✅ 50 concurrent requests: 1 login")
+
+
+def test_refresh_before_expiry():
+    reset_stub()
+    async def run():
+        # Tokens live 1.5s and are refreshed 1s before they expire
+        STUB.token_lifetime = 1.5
+        client = CMSClient(config(refresh_margin=1.0))
+        logins = STUB.logins
+        await client.get_processes()
+        await client.get_processes()
+        first = STUB.logins - logins
+        await asyncio.sleep(0.6)
+        await client.get_processes()
+        await client.aclose()
+        STUB.token_lifetime = 3600.0
+        return first, STUB.logins - logins
+
+    first, total = asyncio.run(run())
+    assert first == 1 and total == 2, f"expected a refresh near expiry, got logins {first} then {total}"
+    print("✅ Token refreshed before its JWT expiry")
+
+
+def test_retry_after_revocation():
+    reset_stub()
+    async def run():
+        client = CMSClient(config())
+        await client.get_processes()
+        logins = STUB.logins
+        STUB.revoke_all()
+        result = await client.get_process(7)
+        await client.aclose()
+        return result, STUB.logins - logins
+
+    result, logins = asyncio.run(run())
+    assert result is not None and result["process_id"] == 7
+    assert logins == 1
+    print("✅ 401 triggers one re-login and a retry")
+
+
+def test_failures_return_none():
+    reset_stub()
+    async def run():
+        bad = CMSClient(CMSConfig(base_url=STUB_URL, email="stub@example.com", password="wrong"))
+        good = CMSClient(config())
+        results = (await bad.get_processes(), await good.get_process(999))
+        await bad.aclose()
+        await good.aclose()
+        return results
+
+    assert asyncio.run(run()) == (None, None)
+    print("✅ Bad credentials and missing processes return None")
+
+
+def test_cache_fresh_and_conditional_refresh():
+    reset_stub()
+    async def run():
+        cache = CMSProcessCache(CMSClient(config()), ttl=0.3)
+        fetches = STUB.list_fetches
+        first = await cache.get_processes()
+        again = await cache.get_processes()
+        assert again is first and STUB.list_fetches - fetches == 1
+        # Single processes come from their own endpoint, not the list
+        single = await cache.get_process(7)
+        assert single == first[0] and single is not first[0] and cache.misses == 2
+
+        # Stale: served at once, revalidated in the background with a 304
+        await asyncio.sleep(0.35)
+        assert await cache.get_processes() is first
+        await asyncio.sleep(0.1)
+        assert cache.not_modified == 1
+
+        # A changed process replaces only its own object
+        await asyncio.sleep(0.35)
+        STUB.processes[8] = {**STUB.processes[8], "updated_at": "2025-09-09T00:00:00.000Z"}
+        await cache.get_processes()
+        await asyncio.sleep(0.1)
+        refreshed = await cache.get_processes()
+        await cache.close()
+        await cache.client.aclose()
+        STUB.processes[8] = sample_process(8)
+        return first, refreshed, cache.stats()
+
+    first, refreshed, stats = asyncio.run(run())
+    assert refreshed[0] is first[0] and refreshed[1] is not first[1]
+    assert refreshed[1]["updated_at"] == "2025-09-09T00:00:00.000Z"
+    print(f"✅ Fresh hits, 304 revalidation and updated_at reuse ({stats})")
+
+
+def test_cache_serves_stale_when_cms_slow_or_down():
+    reset_stub()
+    async def run():
+        cache = CMSProcessCache(CMSClient(config()), ttl=0.1, retry_backoff=0.2, list_timeout=0.3)
+        warm = await cache.warm_up() or await cache.get_processes()
+        timings = []
+        STUB.delay = 1.0
+        for _ in range(3):
+            await asyncio.sleep(0.15)
+            start = time.perf_counter()
+            assert await cache.get_processes() is warm
+            timings.append(time.perf_counter() - start)
+        STUB.delay = 0.0
+        await asyncio.sleep(1.0)  # let the slow refresh land
+        warm = await cache.get_processes()
+        STUB.down = True
+        failures = cache.stats()['stale_hits']
+        for _ in range(3):
+            await asyncio.sleep(0.15)
+            start = time.perf_counter()
+            assert await cache.get_processes() is warm
+            timings.append(time.perf_counter() - start)
+        assert cache.stats()['stale_hits'] - failures == 3
+        STUB.down = False
+        await cache.close()
+
+        # Nothing cached and a slow CMS: give up after list_timeout
+        STUB.delay = 1.0
+        cold = CMSProcessCache(CMSClient(config()), list_timeout=0.3)
+        start = time.perf_counter()
+        missing = await cold.get_processes()
+        cold_wait = time.perf_counter() - start
+        await cold.close()
+        STUB.delay = 0.0
+        await cache.client.aclose()
+        await cold.client.aclose()
+        return timings, missing, cold_wait
+
+    timings, missing, cold_wait = asyncio.run(run())
+    assert max(timings) < 0.05, timings
+    assert missing is None and cold_wait < 0.5
+    print(f"✅ Stale list served in {max(timings) * 1000:.1f}ms max while the CMS is slow or down")
+
+
+def test_process_fetch_failures():
+    reset_stub()
+
+    async def run():
+        cache = CMSProcessCache(CMSClient(config()), ttl=0.0, retry_backoff=0.0)
+        STUB.down = True
+        try:
+            await cache.get_process(7)
+            raise AssertionError("CMS outage reported as a missing process")
+        except CMSUnavailable:
+            pass
+        STUB.down = False
+        assert await cache.get_process(999) is None
+        cached = await cache.get_process(7)
+
+        # Once cached, an outage serves the stale process instead
+        STUB.down = True
+        assert await cache.get_process(7) is cached
+        await asyncio.sleep(0.05)
+        assert await cache.get_process(7) is cached
+        STUB.down = False
+        await cache.close()
+        await cache.client.aclose()
+
+    asyncio.run(run())
+    print("✅ A CMS outage on an uncached process raises instead of looking like a 404")
+
+
+def test_api_uses_configured_cms():
+    reset_stub()
+    os.environ["WHATIF_CMS_BASE_URL"] = STUB_URL
+    os.environ["WHATIF_CMS_EMAIL"] = "stub@example.com"
+    os.environ["WHATIF_CMS_PASSWORD"] = "secret"
+    import api.main as api
+    from fastapi.testclient import TestClient
+
+    # A fresh client and cache, in case another test used the API's already
+    api.cms_client = CMSClient(CMSConfig.from_env())
+    api.cms_cache = CMSProcessCache(api.cms_client)
+
+    logins = STUB.logins
+    with TestClient(api.app) as client:
+        processes = client.get("/processes").json()["processes"]
+        assert [p["id"] for p in processes if p["type"] == "cms"] == [7, 8]
+        for process_id in (7, 8):
+            response = client.post(f"/optimize/cms-process/{process_id}")
+            assert response.status_code == 200, response.text
+            assert response.json()["process_info"]["process_name"] == f"Stub Process {process_id}"
+        assert client.post("/optimize/cms-process/999").status_code == 404
+        STUB.processes[9] = sample_process(9)
+        STUB.down = True
+        unavailable = client.post("/optimize/cms-process/9")
+        STUB.down = False
+        assert unavailable.status_code == 503, unavailable.text
+    assert STUB.logins - logins == 1
+    print("✅ API endpoints share one CMS login")
+
+
+if __name__ == "__main__":
+    test_token_and_connection_reuse()
+    test_single_flight_login()
+    test_refresh_before_expiry()
+    test_retry_after_revocation()
+    test_failures_return_none()
+    test_cache_fresh_and_conditional_refresh()
+    test_cache_serves_stale_when_cms_slow_or_down()
+    test_process_fetch_failures()
+    test_api_uses_configured_cms()
+    print("\nAll CMS client tests passed")
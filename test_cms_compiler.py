@@ -0,0 +1,92 @@
+"""
+Test the single-pass CMS compiler against the original transformer
+
+Run with: python test_cms_compiler.py
+"""
+import copy
+import pickle
+import random
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.cms_compiler import CMSValidationError, compile_cms_process
+from src.models.cms_transformer import (
+    get_cms_transformation_summary, transform_cms_to_internal, validate_cms_data
+)
+from src.models.data_models import Project
+from src.services.optimization_tasks import optimize_cms_record
+
+
+def random_cms_process(seed: int, n_tasks: int = 40, n_jobs: int = 8) -> dict:
+    """CMS process with shared jobs, repeated orders and out-of-order tasks"""
+    rng = random.Random(seed)
+    jobs = [
+        {"job_id": 100 + j, "jobCode": f"J-{j}", "name": f"Job {j}", "description": f"Job {j}",
+         "hourlyRate": rng.choice([20, 45.5, 60, 90]), "maxHoursPerDay": rng.choice([6, 8])}
+        for j in range(n_jobs)
+    ]
+    return {
+        "process_id": seed,
+        "process_name": f"Process {seed}",
+        "process_overview": "Generated",
+        "company": {"name": "Test Company"},
+        "process_tasks": [
+            {"process_id": seed, "task_id": 10 + i, "order": rng.randint(1, n_tasks // 2), "task": {
+                "task_id": 10 + i, "task_name": f"Task {i}", "task_code": f"T-{i}", "task_overview": "",
+                "task_capacity_minutes": rng.choice([15, 30, 45, 60, 90, 240]),
+                "jobTasks": [{"job": job} for job in rng.sample(jobs, rng.randint(0, 3))]
+            }}
+            for i in range(n_tasks)
+        ]
+    }
+
+
+def test_matches_transformer():
+    for seed in range(10):
+        cms_data = random_cms_process(seed, n_tasks=5 + 10 * seed)
+        compiled = compile_cms_process(cms_data)
+        assert validate_cms_data(cms_data)
+        assert asdict(compiled.project) == asdict(Project.from_json(transform_cms_to_internal(cms_data)))
+        assert compiled.summary == get_cms_transformation_summary(cms_data)
+        expected = [task['task']['task_id'] for task in sorted(cms_data['process_tasks'], key=lambda t: t['order'])]
+        assert [int(task.task_id[5:]) for task in compiled.tasks] == expected
+    print("✅ Project, summary and task order match validate + transform + from_json")
+
+
+def test_error_paths():
+    cms_data = random_cms_process(1, n_tasks=6)
+    cases = [
+        (lambda d: d.pop('process_overview'), "process_overview: missing required field"),
+        (lambda d: d.update(process_tasks={}), "process_tasks: expected a list, got dict"),
+        (lambda d: d['process_tasks'][2].pop('order'), "process_tasks[2].order: missing required field"),
+        (lambda d: d['process_tasks'][3]['task'].update(task_id="12"),
+         "process_tasks[3].task.task_id: expected an integer, got str"),
+        (lambda d: d['process_tasks'][4]['task'].update(jobTasks=[{"job": None}]),
+         "process_tasks[4].task.jobTasks[0].job: expected an object, got NoneType"),
+        (lambda d: d['process_tasks'][5]['task'].update(jobTasks=[{"job": {"job_id": 1, "hourlyRate": 10}}]),
+         "process_tasks[5].task.jobTasks[0].job.maxHoursPerDay: missing required field"),
+    ]
+    for mutate, message in cases:
+        broken = copy.deepcopy(cms_data)
+        mutate(broken)
+        try:
+            compile_cms_process(broken)
+        except CMSValidationError as e:
+            assert str(e) == message, (str(e), message)
+            # Errors cross the compute pool's process boundary intact
+            assert str(pickle.loads(pickle.dumps(e))) == message
+        else:
+            raise AssertionError(f"expected CMSValidationError: {message}")
+
+    record = optimize_cms_record({**cms_data, "process_tasks": [{"task": {}}]})
+    assert record["status"] == "error" and "process_tasks[0].order" in record["error"]
+    print("✅ Malformed processes report the path of the offending value")
+
+
+if __name__ == "__main__":
+    test_matches_transformer()
+    test_error_paths()
+    print("\nAll CMS compiler tests passed")
@@ -0,0 +1,148 @@
+"""
+Test the bounded compute pool: backlog, timeouts, cancellation and streams
+
+Run with: python test_compute_pool.py
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.services.compute_pool import (
+    ComputePool, ComputePoolBusy, ComputeTimeout, TaskCancelled, check_cancelled, publish
+)
+
+
+def spin(seconds: float) -> str:
+    """Busy work that stops at cancellation checkpoints"""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        check_cancelled()
+        time.sleep(0.01)
+    return "done"
+
+
+def count(n: int, fail_at: int = -1, pause: float = 0.0):
+    for i in range(n):
+        check_cancelled()
+        if i == fail_at:
+            raise ValueError(f"failed at {i}")
+        publish(("item", i))
+        time.sleep(pause)
+
+
+def test_run_timeout_and_cancel():
+    async def run():
+        pool = ComputePool(workers=1, max_queue=1, poll_interval=0.02)
+        try:
+            assert await pool.run(spin, 0.0) == "done"
+
+            # A timed-out job stops at its next checkpoint and frees the worker
+            start = time.monotonic()
+            try:
+                await pool.run(spin, 30.0, timeout=0.2)
+                raise AssertionError("no timeout")
+            except ComputeTimeout:
+                pass
+            assert await pool.run(spin, 0.0) == "done"
+            assert time.monotonic() - start < 5
+
+            # A disconnected client cancels its job the same way
+            polls = []
+
+            async def disconnected():
+                polls.append(1)
+                return len(polls) > 3
+
+            try:
+                await pool.run(spin, 30.0, disconnected=disconnected)
+                raise AssertionError("not cancelled")
+            except TaskCancelled:
+                pass
+            assert await pool.run(spin, 0.0) == "done"
+            assert time.monotonic() - start < 10
+
+            # One running and one queued job fill the backlog
+            jobs = [asyncio.ensure_future(pool.run(spin, 0.3)) for _ in range(2)]
+            await asyncio.sleep(0)
+            try:
+                await pool.run(spin, 0.0)
+                raise AssertionError("backlog not bounded")
+            except ComputePoolBusy:
+                pass
+            assert await asyncio.gather(*jobs) == ["done", "done"]
+            assert pool.pending == 0
+        finally:
+            pool.shutdown()
+
+    asyncio.run(run())
+    print("✅ Timeouts and disconnects cancel running jobs; a full backlog is refused")
+
+
+def test_stream_items_and_errors():
+    async def run():
+        pool = ComputePool(workers=1, max_queue=1)
+        try:
+            items = [item async for item in pool.stream(count, 50)]
+            assert items == [("item", i) for i in range(50)]
+
+            received = []
+            try:
+                async for item in pool.stream(count, 10, 4):
+                    received.append(item)
+                raise AssertionError("error not raised")
+            except ValueError as e:
+                assert "failed at 4" in str(e)
+            assert received == [("item", i) for i in range(4)]
+
+            try:
+                async for _ in pool.stream(count, 1000, -1, 0.05, timeout=0.3):
+                    pass
+                raise AssertionError("no timeout")
+            except ComputeTimeout:
+                pass
+        finally:
+            pool.shutdown()
+
+    asyncio.run(run())
+    print("✅ Streams deliver published items in order, then the job's error or timeout")
+
+
+def test_stream_closed_early_cancels_job():
+    async def run():
+        pool = ComputePool(workers=1, max_queue=0)
+        try:
+            events = pool.stream(count, 1000, -1, 0.05)
+            assert await events.__anext__() == ("item", 0)
+            # Admission happens before iteration: the only slot is taken
+            try:
+                pool.stream(count, 1)
+                raise AssertionError("backlog not bounded")
+            except ComputePoolBusy:
+                pass
+
+            start = time.monotonic()
+            await events.aclose()
+            assert [item async for item in await wait_for_slot(pool)] == [("item", 0)]
+            assert time.monotonic() - start < 5
+        finally:
+            pool.shutdown()
+
+    async def wait_for_slot(pool):
+        while True:
+            try:
+                return pool.stream(count, 1)
+            except ComputePoolBusy:
+                await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    print("✅ Closing a stream early cancels its job and frees the worker")
+
+
+if __name__ == "__main__":
+    test_run_timeout_and_cancel()
+    test_stream_items_and_errors()
+    test_stream_closed_early_cancels_job()
+    print("\nAll compute pool tests passed")
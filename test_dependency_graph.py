@@ -0,0 +1,150 @@
+"""
+Test the dependency graph, CPM passes and the critical path scenario
+
+Run with: python test_dependency_graph.py
+"""
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.data_models import Project
+from src.models.dependency_graph import DependencyGraph
+from src.models.project_index import ProjectIndex
+from src.optimization.scenario_generator import ScenarioGenerator
+
+EXAMPLES = Path(__file__).parent / "example"
+
+
+def load(name: str) -> dict:
+    with open(EXAMPLES / f"{name}.json") as f:
+        return json.load(f)
+
+
+def assert_feasible(project: Project, scenario):
+    """No resource runs two tasks at once and no task starts before its predecessors end"""
+    by_resource = {}
+    for assignment in scenario.assignments:
+        by_resource.setdefault(assignment.resource_id, []).append(assignment)
+    for resource_id, assignments in by_resource.items():
+        assignments.sort(key=lambda a: a.start_time)
+        for previous, current in zip(assignments, assignments[1:]):
+            assert current.start_time >= previous.end_time - 1e-9, (
+                f"{previous.task_id} and {current.task_id} overlap on {resource_id}"
+            )
+
+    graph = ProjectIndex.from_project(project).graph
+    position = {task.id: i for i, task in enumerate(project.tasks)}
+    end = {a.task_id: a.end_time for a in scenario.assignments}
+
+    def predecessor_tasks(node):
+        for pred in graph.predecessors[node]:
+            if graph.is_milestone(pred):
+                yield from predecessor_tasks(pred)
+            else:
+                yield pred
+
+    for assignment in scenario.assignments:
+        for pred in predecessor_tasks(position[assignment.task_id]):
+            pred_end = end.get(project.tasks[pred].id, 0.0)
+            assert assignment.start_time >= pred_end - 1e-9, (project.tasks[pred].id, assignment.task_id)
+
+
+def test_order_levels_use_milestones():
+    graph = DependencyGraph.from_orders([1, 1, 2, 3, 3])
+    # One milestone per order level
+    assert graph.n_nodes == 5 + 3 and not graph.explicit
+    assert graph.predecessors[5] == [0, 1] and graph.predecessors[2] == [5]
+    analysis = graph.analyze([4.0, 8.0, 2.0, 1.0, 3.0])
+    assert analysis.earliest_start.tolist() == [0.0, 0.0, 8.0, 10.0, 10.0]
+    assert analysis.makespan == 13.0 and analysis.critical_path == [1, 2, 4]
+    print("✅ Order levels become milestone nodes with the expected CPM times")
+
+
+def test_explicit_dependencies():
+    # 0 -> 1 -> 3 and 0 -> 2 -> 3, with 2 the longer branch
+    graph = DependencyGraph.from_dependencies([[], [0], [0], [1, 2]])
+    analysis = graph.analyze([2.0, 3.0, 5.0, 1.0])
+    assert analysis.earliest_start.tolist() == [0.0, 2.0, 2.0, 7.0]
+    assert analysis.latest_start.tolist() == [0.0, 4.0, 2.0, 7.0]
+    assert analysis.slack.tolist() == [0.0, 2.0, 0.0, 0.0]
+    assert analysis.critical_path == [0, 2, 3] and analysis.critical_tasks.tolist() == [0, 2, 3]
+    assert graph.build([1, 1, 1, 1], [[], [0], [0], [1, 2]]).explicit
+    assert not graph.build([1, 2, 3, 4], [[], [], [], []]).explicit
+    print("✅ Explicit dependencies give CPM earliest/latest starts, slack and the critical path")
+
+
+def test_cycles_and_unknown_dependencies():
+    try:
+        DependencyGraph.from_dependencies([[2], [0], [1]])
+        raise AssertionError("cycle not detected")
+    except ValueError as e:
+        assert "cycle" in str(e)
+
+    data = load("cms_ecommerce_project")
+    data["tasks"][0]["dependencies"] = ["task_015"]
+    try:
+        ProjectIndex.from_project(Project.from_json(data)).graph
+        raise AssertionError("cycle not detected")
+    except ValueError as e:
+        assert "cycle" in str(e)
+
+    data = load("cms_ecommerce_project")
+    data["tasks"][1]["dependencies"] = ["task_999"]
+    try:
+        ProjectIndex.from_project(Project.from_json(data))
+        raise AssertionError("unknown dependency accepted")
+    except ValueError as e:
+        assert "task_999" in str(e)
+    print("✅ Dependency cycles and unknown dependencies are rejected")
+
+
+def test_critical_path_scenario_is_feasible():
+    # task_011 and task_012 both follow task_010 and share resource_006
+    project = Project.from_json(load("cms_ecommerce_project"))
+    scenario = ScenarioGenerator(project).generate_critical_path_scenario()
+    assert_feasible(project, scenario)
+    on_006 = sorted((a.start_time, a.task_id) for a in scenario.assignments if a.resource_id == "resource_006")
+    assert [task_id for _, task_id in on_006] == ["task_012", "task_011"]
+    baseline = ScenarioGenerator(project).generate_baseline_scenario()
+    assert scenario.total_duration_hours >= baseline.total_duration_hours - 1e-9
+
+    for name in ("hospital_project", "software_project", "manufacturing_project"):
+        for capacity_aware in (False, True):
+            project = Project.from_json(load(name))
+            scenario = ScenarioGenerator(project, capacity_aware=capacity_aware).generate_critical_path_scenario()
+            assert len(scenario.assignments) == len(project.tasks)
+            assert_feasible(project, scenario)
+    print("✅ Critical path scenarios never put two tasks on one resource at once")
+
+
+def test_critical_tasks_go_first():
+    # Two independent chains sharing one resource: the long chain's head is
+    # critical and must not wait behind the short one
+    data = load("cms_ecommerce_project")
+    data["resources"] = data["resources"][:1]
+    skills = data["resources"][0]["skills"]
+    for task in data["tasks"]:
+        task["required_skills"] = [{"name": skills[0]["name"], "level": 1}]
+        task["dependencies"] = []
+    data["tasks"] = data["tasks"][:3]
+    data["tasks"][0]["duration_hours"] = 1
+    data["tasks"][1]["duration_hours"] = 5
+    data["tasks"][2]["duration_hours"] = 2
+    data["tasks"][2]["dependencies"] = [data["tasks"][1]["id"]]
+    project = Project.from_json(data)
+    scenario = ScenarioGenerator(project).generate_critical_path_scenario()
+    assert [a.task_id for a in scenario.assignments] == [data["tasks"][1]["id"], data["tasks"][2]["id"], data["tasks"][0]["id"]]
+    assert_feasible(project, scenario)
+    assert scenario.total_duration_hours == 8.0
+    print("✅ Zero-slack tasks are dispatched before tasks that can wait")
+
+
+if __name__ == "__main__":
+    test_order_levels_use_milestones()
+    test_explicit_dependencies()
+    test_cycles_and_unknown_dependencies()
+    test_critical_path_scenario_is_feasible()
+    test_critical_tasks_go_first()
+    print("\nAll dependency graph tests passed")
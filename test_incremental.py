@@ -0,0 +1,201 @@
+"""
+Test incremental /optimize/custom sessions against full recomputation
+
+Run with: python test_incremental.py
+"""
+import asyncio
+import copy
+import json
+import os
+import random
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.data_models import Project
+from src.optimization.incremental import IncrementalSession
+from src.optimization.scenario_generator import ScenarioGenerator
+from test_cms_client import STUB_URL
+
+EXAMPLES = Path(__file__).parent / "example"
+NAMES = ("software_project", "hospital_project", "manufacturing_project", "cms_ecommerce_project")
+STRATEGIES = ("parallel", "cost", "balanced")
+
+
+def load(name: str) -> dict:
+    with open(EXAMPLES / f"{name}.json") as f:
+        return json.load(f)
+
+
+def full_scenario(data: dict, resources: dict, tasks: dict, strategy: str, capacity_aware: bool):
+    """The strategy's scenario for the edited project, compiled from scratch"""
+    data = copy.deepcopy(data)
+    for kind, constraints in (("resources", resources), ("tasks", tasks)):
+        for entity in data[kind]:
+            entity.update(constraints.get(entity["id"], {}))
+    generator = ScenarioGenerator(Project.from_json(data), capacity_aware=capacity_aware)
+    if strategy == "parallel":
+        return generator.generate_parallel_scenario()
+    if strategy == "cost":
+        return generator.generate_cost_optimized_scenario()
+    return generator.generate_balanced_scenario()
+
+
+def random_edit(rng: random.Random, data: dict, resources: dict, tasks: dict):
+    """Add, change or drop one constraint, as a client editing the dashboard would"""
+    choice = rng.random()
+    if choice < 0.15 and (resources or tasks):
+        constraints = resources if resources and (not tasks or rng.random() < 0.5) else tasks
+        del constraints[rng.choice(sorted(constraints))]
+    elif choice < 0.55:
+        task = rng.choice(data["tasks"])
+        tasks.setdefault(task["id"], {})["duration_hours"] = round(task["duration_hours"] * rng.uniform(0.25, 3), 1)
+    else:
+        resource = rng.choice(data["resources"])
+        edit = resources.setdefault(resource["id"], {})
+        field = rng.choice(["hourly_rate", "max_hours_per_day", "available"])
+        if field == "hourly_rate":
+            edit[field] = round(resource["hourly_rate"] * rng.uniform(0.5, 2))
+        elif field == "max_hours_per_day":
+            edit[field] = rng.choice([2, 4, 6, 8])
+        else:
+            edit[field] = rng.random() < 0.6
+
+
+def rows(scenario) -> list:
+    return [(a.task_id, a.resource_id, a.start_time, a.end_time) for a in scenario.assignments]
+
+
+def assert_same(incremental, full, label):
+    actual, expected = rows(incremental), rows(full)
+    assert [row[:2] for row in actual] == [row[:2] for row in expected], label
+    assert np.allclose([row[2:] for row in actual], [row[2:] for row in expected]), label
+    assert np.isclose(incremental.total_cost, full.total_cost), label
+    assert np.isclose(incremental.total_duration_hours, full.total_duration_hours), label
+
+
+def test_random_edit_sequences_match_full_recompute():
+    sequences = 0
+    for name in NAMES:
+        data = load(name)
+        for strategy in STRATEGIES:
+            for capacity_aware in (False, True):
+                for seed in range(12):
+                    rng = random.Random(f"{name}-{strategy}-{capacity_aware}-{seed}")
+                    session = IncrementalSession(data, strategy, capacity_aware)
+                    resources, tasks = {}, {}
+                    for step in range(8):
+                        random_edit(rng, data, resources, tasks)
+                        session.update(copy.deepcopy(resources), copy.deepcopy(tasks))
+                        label = (name, strategy, capacity_aware, seed, step)
+                        assert_same(session.scenario(), full_scenario(data, resources, tasks, strategy, capacity_aware), label)
+                    sequences += 1
+    # The session never edits the caller's project
+    assert data == load(NAMES[-1])
+    print(f"✅ Incremental sessions match full recomputation on {sequences} random edit sequences")
+
+
+def test_resume_position():
+    data = load("software_project")
+    session = IncrementalSession(data, "parallel")
+    assert session.update({}, {})["rescheduled_from"] is None
+
+    # Best-skill assignment ignores rates, so a rate edit recomputes nothing
+    resource_id = data["resources"][0]["id"]
+    summary = session.update({resource_id: {"hourly_rate": 500}}, {})
+    assert summary["edits"] == 1 and summary["rescheduled_from"] is None
+    # Daily hours only matter with calendars
+    summary = session.update({resource_id: {"hourly_rate": 500, "max_hours_per_day": 4}}, {})
+    assert summary["edits"] == 1 and summary["rescheduled_from"] is None
+
+    # Editing the last dispatched task only re-places that task
+    last = session.schedules[0].dispatch_order[-1]
+    task_id = session.generator.index.task_ids[last]
+    summary = session.update({resource_id: {"hourly_rate": 500, "max_hours_per_day": 4}},
+                             {task_id: {"duration_hours": 99}})
+    assert summary["tasks_rescheduled"] == 1, summary
+
+    # Dropping every constraint restores the original scenario
+    session.update({}, {})
+    assert_same(session.scenario(), full_scenario(data, {}, {}, "parallel", False), "reset")
+    print("✅ Sessions resume from the first dispatch position an edit can change")
+
+
+def test_invalid_edits_are_refused():
+    data = load("software_project")
+    session = IncrementalSession(data, "parallel")
+    resource_id, task_id = data["resources"][0]["id"], data["tasks"][0]["id"]
+    session.update({resource_id: {"hourly_rate": 120}}, {})
+    before = rows(session.scenario())
+    for resources, tasks in (
+        ({resource_id: {"hourly_rate": "abc"}}, {}),
+        ({resource_id: {"hourly_rate": -5}}, {}),
+        ({resource_id: {"max_hours_per_day": 0}}, {}),
+        ({resource_id: {"available": "no"}}, {}),
+        ({resource_id: {"hourly_rate": 90}}, {task_id: {"duration_hours": -4}}),
+        ({}, {task_id: {"duration_hours": float("nan")}}),
+    ):
+        try:
+            session.update(resources, tasks)
+            raise AssertionError(f"accepted {resources} {tasks}")
+        except ValueError:
+            pass
+        # A refused update applies none of its edits
+        assert rows(session.scenario()) == before
+    session.update({resource_id: {"hourly_rate": 0, "available": 1}}, {task_id: {"duration_hours": 2}})
+    print("✅ Non-numeric, negative or non-positive edits are refused and leave the session as it was")
+
+
+def test_api_builds_sessions_off_the_event_loop(tmp_path: Path):
+    os.environ["WHATIF_JOB_DB"] = str(tmp_path / "jobs.db")
+    os.environ["WHATIF_CMS_BASE_URL"] = STUB_URL
+    from fastapi.testclient import TestClient
+    from api import main as api
+
+    built = []
+
+    class RecordingSession(IncrementalSession):
+        def __init__(self, *args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                built.append("event loop")
+            except RuntimeError:
+                built.append("worker thread")
+            super().__init__(*args, **kwargs)
+
+    payload = {"session_id": "api-test", "resources": {}, "tasks": {},
+               "preferences": {"time_priority": 0.8, "cost_priority": 0.1, "quality_priority": 0.1}}
+    original = api.IncrementalSession
+    api.IncrementalSession = RecordingSession
+    api.CUSTOM_SESSIONS.clear()
+    try:
+        with TestClient(api.app) as client:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                responses = list(pool.map(lambda _: client.post("/optimize/custom", json=payload), range(4)))
+            resource_id = responses[0].json()["project_data"]["resources"][0]["id"]
+            invalid = [client.post("/optimize/custom", json={**payload, "resources": {resource_id: edit}})
+                       for edit in ({"hourly_rate": "abc"}, {"hourly_rate": -1})]
+    finally:
+        api.IncrementalSession = original
+        api.CUSTOM_SESSIONS.clear()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len({json.dumps(response.json()["scenario"], sort_keys=True) for response in responses}) == 1
+    # Concurrent first requests share one session, built in the threadpool
+    assert built == ["worker thread"], built
+    assert [response.status_code for response in invalid] == [400, 400]
+    print("✅ /optimize/custom builds a client's session once, off the event loop, and refuses invalid edits")
+
+
+if __name__ == "__main__":
+    test_random_edit_sequences_match_full_recompute()
+    test_resume_position()
+    test_invalid_edits_are_refused()
+    with tempfile.TemporaryDirectory() as workdir:
+        test_api_builds_sessions_off_the_event_loop(Path(workdir))
+    print("\nAll incremental session tests passed")
@@ -0,0 +1,113 @@
+"""
+Test the SQLite job store: deduplication, lifecycle and expiry
+
+Run with: python test_job_store.py
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.services.job_store import COMPLETED, FAILED, QUEUED, RUNNING, JobStore
+from src.services.optimization_tasks import analysis_job_key, analysis_job_request, run_analysis_job
+
+EXAMPLE = Path(__file__).parent / "example" / "software_project.json"
+
+
+def load_data() -> dict:
+    with open(EXAMPLE) as f:
+        return json.load(f)
+
+
+def test_submissions_are_deduplicated(tmp_path: Path):
+    store = JobStore(str(tmp_path / "dedup.db"))
+    request = analysis_job_request(load_data(), {'include_rl': False, 'uncertainty_samples': 100})
+    # Option order and defaults do not change the key
+    same = analysis_job_request(load_data(), {'uncertainty_samples': 100, 'include_rl': False,
+                                              'capacity_aware': False})
+    key = analysis_job_key(request)
+    assert key == analysis_job_key(same)
+    assert key != analysis_job_key(analysis_job_request(load_data(), {'include_rl': False}))
+
+    job, created = store.submit(key, request)
+    again, created_again = store.submit(analysis_job_key(same), same)
+    assert created and not created_again and again.id == job.id and job.status == QUEUED
+
+    # Still shared while running and once completed
+    store.mark_running(job.id)
+    assert store.submit(key, request)[0].id == job.id and store.get(job.id).status == RUNNING
+    store.complete(job.id, {'answer': 42})
+    assert store.submit(key, request)[0].id == job.id and store.get_live(key).id == job.id
+
+    # A failed job does not block a resubmission
+    other_key = analysis_job_key(analysis_job_request(load_data(), {}))
+    failed, _ = store.submit(other_key, {})
+    store.fail(failed.id, "boom")
+    assert store.get(failed.id).status == FAILED and store.get_live(other_key) is None
+    retried, created = store.submit(other_key, {})
+    assert created and retried.id != failed.id
+    print("✅ Equal submissions share one job until it fails")
+
+
+def test_lifecycle_and_expiry(tmp_path: Path):
+    store = JobStore(str(tmp_path / "ttl.db"), ttl_seconds=0.3)
+    job, _ = store.submit("key", {'n': 1})
+    assert store.result(job.id) is None
+
+    # Progress only moves while running, and is clamped to [0, 1]
+    store.set_progress(job.id, 0.5)
+    assert store.get(job.id).progress == 0
+    store.mark_running(job.id)
+    store.set_progress(job.id, 7, "Scoring")
+    assert store.get(job.id).progress == 1.0 and store.get(job.id).message == "Scoring"
+
+    store.complete(job.id, {'scenarios': [1, 2, 3]})
+    finished = store.get(job.id)
+    assert finished.status == COMPLETED and finished.finished and finished.expires_at > finished.finished_at
+    assert store.result(job.id) == {'scenarios': [1, 2, 3]}
+    # A finished job cannot be failed or restarted
+    store.fail(job.id, "late")
+    store.mark_running(job.id)
+    assert store.get(job.id).status == COMPLETED
+
+    time.sleep(0.4)
+    assert store.get(job.id) is None and store.result(job.id) is None and store.get_live("key") is None
+    fresh, created = store.submit("key", {'n': 1})
+    assert created and fresh.id != job.id
+    assert store.evict_expired() == 0  # submit already dropped the expired job for its key
+
+    stale, _ = store.submit("stale", {})
+    time.sleep(0.4)
+    store.mark_running(stale.id)
+    assert store.fail_unfinished("restart") == 2  # the fresh queued job and the running one
+    time.sleep(0.4)
+    assert store.evict_expired() == 2
+    print("✅ Jobs move queued -> running -> finished, then expire after their TTL")
+
+
+def test_analysis_job_writes_its_report(tmp_path: Path):
+    path = str(tmp_path / "run.db")
+    store = JobStore(path)
+    request = analysis_job_request(load_data(), {
+        'include_rl': False,
+        'constraints': {'resources': {'senior_backend': {'hourly_rate': 200}}}
+    })
+    job, _ = store.submit(analysis_job_key(request), request)
+    run_analysis_job(path, store.ttl_seconds, job.id, request)
+
+    assert store.get(job.id).status == COMPLETED
+    result = store.result(job.id)
+    assert result['total_scenarios'] == 6 and result['project']['id'] == load_data()['id']
+    assert result['report']
+    print("✅ An analysis job stores its report in the job store")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as workdir:
+        test_submissions_are_deduplicated(Path(workdir))
+        test_lifecycle_and_expiry(Path(workdir))
+        test_analysis_job_writes_its_report(Path(workdir))
+    print("\nAll job store tests passed")
@@ -0,0 +1,112 @@
+"""
+Test that every JSON backend decodes projects exactly like Project.from_json
+
+Run with: python test_json_codec.py
+"""
+import gc
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models import json_codec
+from src.models.data_models import Project
+
+EXAMPLES = sorted(Path(__file__).parent.glob("example/*_project.json"))
+BACKENDS = [name for name in ("msgspec", "orjson") if getattr(json_codec, name) is not None] + ["json"]
+
+
+def with_backend(backend: str, fn):
+    previous = json_codec.JSON_BACKEND
+    json_codec.JSON_BACKEND = backend
+    try:
+        return fn()
+    finally:
+        json_codec.JSON_BACKEND = previous
+
+
+def test_backends_match_from_json():
+    for path in EXAMPLES:
+        data = json.loads(path.read_text())
+        expected = asdict(Project.from_json(data))
+        for backend in BACKENDS:
+            project = with_backend(backend, lambda: json_codec.load_project(str(path)))
+            document = with_backend(backend, lambda: json_codec.load_project_document(str(path)))
+            assert asdict(project) == expected, (path.name, backend)
+            assert asdict(document.project) == expected and document.data == data, (path.name, backend)
+            # Integers stay integers, so responses encode them the same way
+            assert [type(t.duration_hours) for t in project.tasks] == [type(t["duration_hours"]) for t in data["tasks"]]
+    print(f"✅ {len(EXAMPLES)} example projects decode identically with {', '.join(BACKENDS)}")
+
+
+def test_schema_mismatch_falls_back():
+    data = json.loads(EXAMPLES[0].read_text())
+    data["tasks"][0]["dependencies"] = None   # from_json passes this through
+    data["metadata"]["team_size"] = 4.0       # not an int, also accepted before
+    document = json.dumps(data).encode()
+    expected = asdict(Project.from_json(data))
+    for backend in BACKENDS:
+        assert asdict(with_backend(backend, lambda: json_codec.decode_project(document))) == expected, backend
+
+    del data["metadata"]
+    for backend in BACKENDS:
+        try:
+            with_backend(backend, lambda: json_codec.decode_project(json.dumps(data)))
+        except KeyError as e:
+            assert e.args == ("metadata",), backend
+        else:
+            raise AssertionError(f"{backend} accepted a project without metadata")
+    print("✅ Documents the schema rejects behave as with Project.from_json")
+
+
+def test_invalid_json_raises_value_error():
+    for backend in BACKENDS:
+        for document in (b'{"tasks": [', b'not json'):
+            try:
+                with_backend(backend, lambda: json_codec.loads(document))
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{backend} decoded {document!r}")
+    print("✅ Invalid JSON raises ValueError with every backend")
+
+
+def test_gc_pause_is_shared_between_threads():
+    inside = []
+
+    def decode(delay: float):
+        with json_codec.gc_paused():
+            time.sleep(delay)
+            inside.append(gc.isenabled())
+            with json_codec.gc_paused():
+                inside.append(gc.isenabled())
+
+    assert gc.isenabled()
+    threads = [threading.Thread(target=decode, args=(0.01 * (i % 5),)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # No thread re-enabled the collector while another was still decoding
+    assert inside == [False] * 40 and gc.isenabled()
+
+    gc.disable()
+    try:
+        with json_codec.gc_paused():
+            pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+    print("✅ Overlapping gc pauses from several threads restore the collector once, at the end")
+
+
+if __name__ == "__main__":
+    test_backends_match_from_json()
+    test_schema_mismatch_falls_back()
+    test_invalid_json_raises_value_error()
+    test_gc_pause_is_shared_between_threads()
+    print("\nAll JSON codec tests passed")
@@ -0,0 +1,44 @@
+"""
+Test that the API and CLI start without loading RL or plotting libraries
+
+Run with: python test_lazy_imports.py
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+HEAVY_MODULES = ("torch", "gymnasium", "gym", "matplotlib")
+
+
+def loaded_heavy_modules(code: str) -> list:
+    """Heavy modules in sys.modules after running `code` in a fresh interpreter"""
+    probe = f"{code}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT,
+                            check=True, capture_output=True, text=True).stdout
+    return [name for name in output.strip().split(",") if name]
+
+
+def test_entry_points_are_light():
+    for module in ("api.main", "main", "src.optimization.scenario_generator", "src.optimization.pareto_optimizer"):
+        assert loaded_heavy_modules(f"import {module}") == [], module
+    print("✅ API, CLI, scenario generator and optimizer import without torch, gymnasium or matplotlib")
+
+
+def test_heuristic_scenarios_stay_light():
+    code = (
+        "from src.models.json_codec import load_project\n"
+        "from src.optimization.pareto_optimizer import ParetoOptimizer\n"
+        "from src.optimization.scenario_generator import ScenarioGenerator\n"
+        "project = load_project('example/software_project.json')\n"
+        "ParetoOptimizer(project).generate_report(\n"
+        "    ScenarioGenerator(project).generate_all_scenarios(include_rl=False))"
+    )
+    assert loaded_heavy_modules(code) == []
+    print("✅ A full analysis without RL or plots never loads them")
+
+
+if __name__ == "__main__":
+    test_entry_points_are_light()
+    test_heuristic_scenarios_stay_light()
+    print("\nAll lazy import tests passed")
@@ -0,0 +1,159 @@
+"""
+Test that the list scheduling engine reproduces the original heuristics
+
+The reference functions below are the per-task loops the parallel, cost,
+balanced and resource-leveling generators ran before they became rules
+on ListScheduler, reduced to the assignments they produce.
+
+Run with: python test_list_scheduler.py
+"""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from benchmarks.benchmark_list_scheduler import synthetic_project_data
+from src.models.data_models import Project
+from src.optimization.list_scheduler import WeightedScoreRule
+from src.optimization.scenario_generator import ScenarioGenerator
+
+EXAMPLES = Path(__file__).parent / "example"
+
+
+def dependency_time(task, assignments, orders) -> float:
+    """Latest end among assigned tasks of an earlier order"""
+    ends = [end for task_id, _, _, end in assignments if orders[task_id] < task.order]
+    return max(ends, default=0.0)
+
+
+def reference_parallel(project: Project) -> list:
+    assignments, resource_free, orders = [], {r.id: 0.0 for r in project.resources}, {}
+    for task in sorted(project.tasks, key=lambda t: t.order):
+        orders[task.id] = task.order
+        group_start = dependency_time(task, assignments, orders)
+        best, best_start, best_score = None, group_start, 0.0
+        for resource in project.resources:
+            if task.can_be_done_by(resource):
+                score = task.skill_match_score(resource)
+                available = max(resource_free[resource.id], group_start)
+                if score > best_score or (score == best_score and available < best_start):
+                    best, best_start, best_score = resource, available, score
+        if best:
+            assignments.append((task.id, best.id, best_start, best_start + task.duration_hours))
+            resource_free[best.id] = max(resource_free[best.id], best_start + task.duration_hours)
+    return assignments
+
+
+def reference_cost(project: Project) -> list:
+    assignments, resource_free, orders = [], {r.id: 0.0 for r in project.resources}, {}
+    cheapest_first = sorted(project.resources, key=lambda r: r.hourly_rate)
+    for task in sorted(project.tasks, key=lambda t: t.order):
+        orders[task.id] = task.order
+        for resource in cheapest_first:
+            if task.can_be_done_by(resource):
+                start = max(resource_free[resource.id], dependency_time(task, assignments, orders))
+                assignments.append((task.id, resource.id, start, start + task.duration_hours))
+                resource_free[resource.id] = start + task.duration_hours
+                break
+    return assignments
+
+
+def reference_weighted(project: Project, time_weight: float) -> list:
+    assignments, resource_free, orders = [], {r.id: 0.0 for r in project.resources}, {}
+    for task in sorted(project.tasks, key=lambda t: t.order):
+        orders[task.id] = task.order
+        best, best_score, best_start = None, float('-inf'), 0.0
+        for resource in project.resources:
+            if task.can_be_done_by(resource):
+                start = max(resource_free[resource.id], dependency_time(task, assignments, orders))
+                score = (
+                    time_weight * (1.0 / (1.0 + start)) +
+                    (1 - time_weight) * (1.0 / (1.0 + resource.hourly_rate)) +
+                    0.2 * task.skill_match_score(resource)
+                )
+                if score > best_score:
+                    best, best_score, best_start = resource, score, start
+        if best:
+            assignments.append((task.id, best.id, best_start, best_start + task.duration_hours))
+            resource_free[best.id] = max(resource_free[best.id], best_start + task.duration_hours)
+    return assignments
+
+
+def reference_leveling(project: Project) -> list:
+    assignments, resource_free, orders = [], {r.id: 0.0 for r in project.resources}, {}
+    for task in sorted(project.tasks, key=lambda t: t.order):
+        orders[task.id] = task.order
+        best, min_end = None, float('inf')
+        for resource in project.resources:
+            if task.can_be_done_by(resource):
+                start = max(resource_free[resource.id], dependency_time(task, assignments, orders))
+                if start + task.duration_hours < min_end:
+                    min_end = start + task.duration_hours
+                    best = (task.id, resource.id, start, min_end)
+        if best:
+            assignments.append(best)
+            resource_free[best[1]] = max(resource_free[best[1]], best[3])
+    return assignments
+
+
+def rows(assignments) -> list:
+    return [(a.task_id, a.resource_id, a.start_time, a.end_time) for a in assignments]
+
+
+def schedule_rows(generator: ScenarioGenerator, rule) -> list:
+    schedule = generator.scheduler.run(rule)
+    index = generator.index
+    return [
+        (index.task_ids[t], index.resource_ids[r], s, e)
+        for t, r, s, e in zip(schedule.task_indices.tolist(), schedule.resource_indices.tolist(),
+                              schedule.start_times.tolist(), schedule.end_times.tolist())
+    ]
+
+
+def assert_same(actual: list, expected: list, label: str):
+    assert [row[:2] for row in actual] == [row[:2] for row in expected], label
+    assert np.allclose([row[2:] for row in actual], [row[2:] for row in expected]), label
+
+
+def projects():
+    for name in ("software_project", "hospital_project", "manufacturing_project"):
+        with open(EXAMPLES / f"{name}.json") as f:
+            yield name, Project.from_json(json.load(f))
+    for seed in range(12):
+        data = synthetic_project_data(n_tasks=40 + 10 * seed, n_resources=4 + seed % 5, n_levels=3 + seed, seed=seed)
+        yield f"synthetic_{seed}", Project.from_json(data)
+
+
+def test_rules_match_reference_heuristics():
+    checked = 0
+    for name, project in projects():
+        generator = ScenarioGenerator(project)
+        assert_same(rows(generator.generate_parallel_scenario().assignments), reference_parallel(project), name)
+        assert_same(rows(generator.generate_cost_optimized_scenario().assignments), reference_cost(project), name)
+        assert_same(rows(generator.generate_resource_leveling_scenario().assignments),
+                    reference_leveling(project), name)
+        for time_weight in (0.3, 0.5, 0.7):
+            assert_same(schedule_rows(generator, WeightedScoreRule(time_weight, 1 - time_weight)),
+                        reference_weighted(project, time_weight), f"{name} {time_weight}")
+        checked += 1
+    print(f"✅ Parallel, cost, balanced and leveling rules match the original loops on {checked} projects")
+
+
+def test_balanced_picks_one_weighting():
+    for name, project in projects():
+        generator = ScenarioGenerator(project)
+        balanced = rows(generator.generate_balanced_scenario().assignments)
+        candidates = [reference_weighted(project, w) for w in (0.3, 0.5, 0.7)]
+        assert any(
+            [row[:2] for row in balanced] == [row[:2] for row in candidate] for candidate in candidates
+        ), name
+    print("✅ The balanced scenario is one of its three weighted schedules")
+
+
+if __name__ == "__main__":
+    test_rules_match_reference_heuristics()
+    test_balanced_picks_one_weighting()
+    print("\nAll list scheduler tests passed")
@@ -0,0 +1,106 @@
+"""
+Test Monte Carlo re-timing of scenario plans under duration uncertainty
+
+Run with: python test_monte_carlo.py
+"""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.data_models import Project
+from src.optimization.monte_carlo import DurationModel, MonteCarloSimulator
+from src.optimization.pareto_optimizer import ParetoOptimizer
+from src.optimization.scenario_generator import ScenarioGenerator
+
+EXAMPLES = Path(__file__).parent / "example"
+NAMES = ("software_project", "hospital_project", "manufacturing_project", "cms_ecommerce_project")
+
+
+def load(name: str) -> Project:
+    with open(EXAMPLES / f"{name}.json") as f:
+        return Project.from_json(json.load(f))
+
+
+def fixed_model(project: Project, factor: float) -> DurationModel:
+    """Every task takes exactly `factor` times its estimate"""
+    return DurationModel(overrides={
+        task.id: (task.duration_hours * factor,) * 3 for task in project.tasks
+    })
+
+
+def test_zero_variance_reproduces_plans():
+    checked = 0
+    for name in NAMES:
+        project = load(name)
+        for capacity_aware in (False, True):
+            generator = ScenarioGenerator(project, capacity_aware=capacity_aware)
+            simulator = MonteCarloSimulator(generator.index)
+            for scenario in generator.generate_all_scenarios(include_rl=False):
+                for model in (fixed_model(project, 1.0),
+                              DurationModel('triangular', optimistic=1.0, pessimistic=1.0),
+                              DurationModel('lognormal', sigma=0.0)):
+                    result = simulator.simulate(scenario, samples=5, model=model, seed=0)
+                    assert np.allclose(result.makespan_hours, scenario.total_duration_hours), (name, scenario.id)
+                    assert np.allclose(result.cost, scenario.total_cost), (name, scenario.id)
+                checked += 1
+    print(f"✅ Zero-variance simulations reproduce all {checked} plans' duration and cost")
+
+
+def test_percentiles_are_bounded_and_ordered():
+    project = load("software_project")
+    generator = ScenarioGenerator(project)
+    simulator = MonteCarloSimulator(generator.index, chunk_cells=5_000)
+    scenario = generator.generate_parallel_scenario()
+    fastest = simulator.simulate(scenario, 1, fixed_model(project, 0.8)).makespan_hours[0]
+    slowest = simulator.simulate(scenario, 1, fixed_model(project, 1.5)).makespan_hours[0]
+
+    for kind in ('triangular', 'pert'):
+        result = simulator.simulate(scenario, 4000, DurationModel(kind), seed=1)
+        assert len(result.makespan_hours) == 4000
+        # Durations stay inside [0.8, 1.5] x estimate, and so does the plan's makespan
+        assert fastest - 1e-9 <= result.makespan_hours.min() and result.makespan_hours.max() <= slowest + 1e-9
+        makespan = result.makespan_percentiles()
+        cost = result.cost_percentiles()
+        assert makespan[50] <= makespan[80] <= makespan[95]
+        assert cost[50] <= cost[80] <= cost[95]
+        # Right-skewed estimates make the median run late
+        assert makespan[50] > scenario.total_duration_hours
+
+    assert result.to_dict()['samples'] == 4000
+
+    try:
+        DurationModel('uniform')
+        raise AssertionError("unknown distribution accepted")
+    except ValueError:
+        pass
+    print("✅ Sampled makespans stay within the optimistic and pessimistic plans, with ordered percentiles")
+
+
+def test_optimizer_reports_risk_metrics():
+    project = load("software_project")
+    scenario = ScenarioGenerator(project).generate_parallel_scenario()
+    assert "time_p80_days" not in ParetoOptimizer(project).evaluate_scenario(scenario).to_dict()
+
+    exact = ParetoOptimizer(project, uncertainty=fixed_model(project, 1.0), uncertainty_samples=10)
+    metrics = exact.evaluate_scenario(scenario)
+    assert np.isclose(metrics.time_p80_days, metrics.total_time_days)
+    assert np.isclose(metrics.cost_p80, metrics.total_cost)
+
+    risky = ParetoOptimizer(project, uncertainty=DurationModel(), uncertainty_samples=500)
+    metrics = risky.evaluate_scenario(scenario)
+    assert metrics.time_p50_days <= metrics.time_p80_days <= metrics.time_p95_days
+    assert metrics.cost_p50 <= metrics.cost_p80 <= metrics.cost_p95
+    assert metrics.time_p80_days > metrics.total_time_days
+    assert "cost_p95" in metrics.to_dict()
+    print("✅ The optimizer adds P50/P80/P95 time and cost only when uncertainty is given")
+
+
+if __name__ == "__main__":
+    test_zero_variance_reproduces_plans()
+    test_percentiles_are_bounded_and_ordered()
+    test_optimizer_reports_risk_metrics()
+    print("\nAll Monte Carlo tests passed")
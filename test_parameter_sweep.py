@@ -0,0 +1,209 @@
+"""
+Test parameter sweeps and resource availability edits
+
+Run with: python test_parameter_sweep.py
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.data_models import Project
+from src.optimization.parameter_sweep import ParameterSweep, SweepParameter, pareto_front_mask, variant_count
+from src.optimization.scenario_generator import ScenarioGenerator
+from src.services import compute_pool
+from src.services.compute_pool import TaskCancelled
+from src.services.optimization_tasks import analysis_job_request, optimize_custom, run_parameter_sweep, validate_constraints
+from test_cms_client import STUB_URL
+
+EXAMPLE = Path(__file__).parent / "example" / "software_project.json"
+
+
+def load_data() -> dict:
+    with open(EXAMPLE) as f:
+        return json.load(f)
+
+
+def test_variants_match_recompiled_projects():
+    parameters = [
+        SweepParameter('hourly_rate', ids=['senior_backend'], values=[60, 140]),
+        SweepParameter('duration_hours', low=0.5, high=1.5, steps=3, mode='scale'),
+    ]
+    result = ParameterSweep(Project.from_json(load_data()), parameters, strategy='parallel').run(workers=1)
+    assert result.variants.shape == (6, 2) and result.metrics.shape == (6, 4)
+
+    # Every patched variant schedules like the project edited and compiled afresh
+    for values, metrics in zip(result.variants.tolist(), result.metrics.tolist()):
+        data = load_data()
+        for resource in data['resources']:
+            if resource['id'] == 'senior_backend':
+                resource['hourly_rate'] = values[0]
+        for task in data['tasks']:
+            task['duration_hours'] *= values[1]
+        scenario = ScenarioGenerator(Project.from_json(data)).generate_parallel_scenario()
+        assert np.isclose(metrics[0], scenario.total_duration_hours / 8)
+        assert np.isclose(metrics[1], scenario.total_cost)
+    print("✅ Sweep variants schedule like recompiled projects")
+
+
+def test_pareto_mask_matches_optimizer_rule():
+    rng = np.random.default_rng(0)
+    time, cost, quality = rng.integers(1, 6, (3, 200)).astype(float)
+    mask = pareto_front_mask(time, cost, quality)
+    for i in range(200):
+        dominated = any(
+            time[j] <= time[i] and cost[j] <= cost[i] and quality[j] >= quality[i] and
+            (time[j] < time[i] or cost[j] < cost[i] or quality[j] > quality[i])
+            for j in range(200)
+        )
+        assert mask[i] == (not dominated), i
+    print("✅ The vectorized Pareto mask agrees with pairwise dominance")
+
+
+def test_unavailable_resources_are_never_assigned():
+    project = Project.from_json(load_data())
+    used = {a.resource_id for a in ScenarioGenerator(project).generate_baseline_scenario().assignments}
+    for resource_id in sorted(used):
+        disabled = {resource_id: {'available': False}}
+        custom_parallel = optimize_custom(str(EXAMPLE), disabled, {'task_001': {'allow_parallel': True}}, {}, None)
+        assignments = custom_parallel['scenario']['scenario']['assignments']
+        assert resource_id not in {a['resource_id'] for a in assignments}, resource_id
+
+        data = load_data()
+        for resource in data['resources']:
+            resource['available'] = resource['id'] != resource_id
+        generator = ScenarioGenerator(Project.from_json(data))
+        for scenario in generator.iter_scenarios(include_rl=False):
+            assert resource_id not in {a.resource_id for a in scenario.assignments}, (resource_id, scenario.id)
+    print("✅ Resources edited to available=false are left out of every heuristic")
+
+
+def test_sweep_size_is_bounded():
+    parameters = [
+        SweepParameter('hourly_rate', ids=['senior_backend'], low=50, high=150, steps=40),
+        SweepParameter('duration_hours', low=0.5, high=1.5, steps=50, mode='scale'),
+    ]
+    assert variant_count(parameters) == 2000 and variant_count(parameters, 'lhs', 16) == 16
+    sweep = ParameterSweep(Project.from_json(load_data()), parameters)
+    for kwargs in ({'max_variants': 1999}, {'method': 'lhs', 'samples': 0}, {'method': 'random'}):
+        try:
+            sweep.run(**kwargs)
+            raise AssertionError(f"sweep accepted {kwargs}")
+        except ValueError:
+            pass
+
+    # The request's workers are capped by the server's limit
+    request = {'parameters': [p.__dict__ for p in parameters], 'method': 'lhs', 'samples': 4, 'seed': 0, 'workers': 64}
+    result = run_parameter_sweep(str(EXAMPLE), request, max_workers=1, max_variants=4)
+    assert len(result['sweep']['variants']) == 4
+    print("✅ Sweeps above the variant limit are refused and workers are capped")
+
+
+def test_hours_and_availability_edge_cases():
+    for parameter in (
+        {'field': 'max_hours_per_day', 'values': [0, 8]},
+        {'field': 'max_hours_per_day', 'low': -2, 'high': 8},
+        {'field': 'available', 'low': 0, 'high': 1},
+        {'field': 'available', 'values': [0.5]},
+        {'field': 'available', 'values': [0, 1], 'mode': 'scale'},
+        {'field': 'hourly_rate', 'values': [-10, 50]},
+        {'field': 'hourly_rate', 'low': -0.5, 'high': 1.5, 'mode': 'scale'},
+        {'field': 'duration_hours', 'values': [0, 4]},
+        {'field': 'duration_hours', 'low': -1, 'high': 2, 'mode': 'scale'},
+        {'field': 'max_hours_per_day', 'values': [0, 1], 'mode': 'scale'},
+    ):
+        try:
+            SweepParameter.from_dict(parameter)
+            raise AssertionError(f"accepted {parameter}")
+        except ValueError:
+            pass
+
+    available = SweepParameter('available', ids=['senior_backend'], values=[0, 1])
+    try:
+        variant_count([available], 'lhs', 8)
+        raise AssertionError("Latin-hypercube sampling of 'available' accepted")
+    except ValueError:
+        pass
+    assert variant_count([available]) == 2
+
+    # Daily hours only matter on calendars, so sweeping them turns calendars on
+    hours = SweepParameter('max_hours_per_day', low=2, high=8, steps=2)
+    sweep = ParameterSweep(Project.from_json(load_data()), [hours], strategy='parallel')
+    assert sweep.capacity_aware
+    times = sweep.run(workers=1).column('total_time_days')
+    assert times[0] > times[1]
+
+    for resources in ({'senior_backend': {'max_hours_per_day': 0}},
+                      {'senior_backend': {'max_hours_per_day': '8'}},
+                      ['senior_backend']):
+        try:
+            validate_constraints(resources)
+            raise AssertionError(f"accepted {resources}")
+        except ValueError:
+            pass
+        try:
+            analysis_job_request(load_data(), {'constraints': {'resources': resources}})
+            raise AssertionError(f"job accepted {resources}")
+        except ValueError:
+            pass
+    validate_constraints({'senior_backend': {'max_hours_per_day': 4, 'available': False}})
+    # Free resources are a valid what-if
+    SweepParameter('hourly_rate', values=[0, 50])
+    print("✅ Negative rates, non-positive hours or durations, fractional availability "
+          "and LHS over availability are refused")
+
+
+def test_api_refuses_invalid_sweeps(tmp_path: Path):
+    os.environ["WHATIF_JOB_DB"] = str(tmp_path / "jobs.db")
+    os.environ["WHATIF_CMS_BASE_URL"] = STUB_URL
+    from fastapi.testclient import TestClient
+    from api import main as api
+
+    with TestClient(api.app) as client:
+        for parameter in ({'field': 'hourly_rate', 'values': [-10]},
+                          {'field': 'duration_hours', 'low': 0, 'high': 2, 'mode': 'scale'}):
+            response = client.post("/optimize/sweep", json={'parameters': [parameter]})
+            assert response.status_code == 400, (parameter, response.text)
+        valid = [{'field': 'hourly_rate', 'values': [50, 90]}]
+        for workers in (0, -2, "many"):
+            response = client.post("/optimize/sweep", json={'parameters': valid, 'workers': workers})
+            assert response.status_code == 400, (workers, response.text)
+        assert client.post("/optimize/sweep", json={'parameters': valid, 'workers': 8}).status_code == 200
+    print("✅ POST /optimize/sweep answers 400 for out-of-range sweeps and worker counts")
+
+
+def test_cancelled_sweep_stops():
+    stopped = []
+    sweep = ParameterSweep(Project.from_json(load_data()), [SweepParameter('hourly_rate', low=50, high=150, steps=20)])
+    # Stand in for a compute pool worker whose job has just been cancelled
+    compute_pool._cancel_flags, compute_pool._current_slot = [0], 0
+    try:
+        assert len(sweep.run(workers=1).variants) == 20
+        compute_pool._cancel_flags[0] = 1
+        for workers in (1, 2):
+            try:
+                sweep.run(workers=workers)
+                raise AssertionError("cancelled sweep ran to the end")
+            except TaskCancelled:
+                stopped.append(workers)
+    finally:
+        compute_pool._cancel_flags, compute_pool._current_slot = None, None
+    assert stopped == [1, 2]
+    print("✅ A cancelled sweep stops between variants, in nested worker processes too")
+
+
+if __name__ == "__main__":
+    test_variants_match_recompiled_projects()
+    test_pareto_mask_matches_optimizer_rule()
+    test_unavailable_resources_are_never_assigned()
+    test_sweep_size_is_bounded()
+    test_hours_and_availability_edge_cases()
+    with tempfile.TemporaryDirectory() as workdir:
+        test_api_refuses_invalid_sweeps(Path(workdir))
+    test_cancelled_sweep_stops()
+    print("\nAll parameter sweep tests passed")
@@ -0,0 +1,92 @@
+"""
+Test headless Pareto plots
+
+Run with: python test_pareto_plot.py
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.json_codec import load_project
+from src.optimization.pareto_optimizer import ParetoOptimizer
+from src.optimization.pareto_plot import MAX_BARS, ParetoPlotData, render_pareto_plot
+from src.optimization.scenario_generator import ScenarioGenerator
+
+EXAMPLE = Path(__file__).parent / "example" / "software_project.json"
+
+
+def test_matplotlib_is_lazy():
+    # A fresh interpreter, since this one may already have matplotlib loaded
+    code = ("import sys; import src.optimization.pareto_optimizer; "
+            "print('matplotlib' in sys.modules)")
+    output = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent,
+                            check=True, capture_output=True, text=True).stdout
+    assert output.strip() == "False", output
+    print("✅ Importing the optimizer does not import matplotlib")
+
+
+def test_headless_render_reuses_metrics():
+    project = load_project(str(EXAMPLE))
+    scenarios = ScenarioGenerator(project).generate_all_scenarios(include_rl=False)
+    optimizer = ParetoOptimizer(project)
+    report = optimizer.report(scenarios)
+    report.metrics
+
+    def evaluate_again(scenario):
+        raise AssertionError("scenario evaluated again")
+
+    optimizer.evaluate_scenario = evaluate_again
+
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, "pareto.png")
+        fig = optimizer.visualize_pareto_frontier(scenarios, save_path=path, report=report)
+        assert Path(path).read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+        assert len(fig.axes[1].patches) == len(scenarios)
+
+        background = os.path.join(workdir, "background.png")
+        future = optimizer.visualize_pareto_frontier(scenarios, save_path=background, report=report, background=True)
+        assert future.result(timeout=60) is not None and os.path.getsize(background) > 0
+        assert 'matplotlib.pyplot' not in sys.modules
+        assert optimizer.visualize_pareto_frontier([]) is None
+    finally:
+        shutil.rmtree(workdir)
+    print("✅ Plots render headless, in the foreground or background, from the report's metrics")
+
+
+def test_many_points():
+    rng = np.random.default_rng(0)
+    n = 100000
+    times = rng.uniform(10, 60, n)
+    costs = 1e6 / times + rng.normal(0, 2000, n)
+    pareto = np.zeros(n, dtype=bool)
+    pareto[np.argsort(times)[:50]] = True
+    data = ParetoPlotData(times, costs, rng.uniform(0.6, 1.2, n), ['sweep'] * n, pareto)
+
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, "pareto.svg")
+        fig = render_pareto_plot(data, save_path=path)
+        all_points = fig.axes[0].collections[0]
+        assert all_points.get_rasterized() and len(all_points.get_offsets()) == n
+        assert not fig.axes[0].collections[1].get_rasterized()
+        # A histogram, not one bar per scenario
+        assert len(fig.axes[1].patches) < 2 * MAX_BARS
+        assert os.path.getsize(path) < 2_000_000, os.path.getsize(path)
+    finally:
+        shutil.rmtree(workdir)
+    print(f"✅ {n} scenarios render as a rasterized scatter and a quality histogram")
+
+
+if __name__ == "__main__":
+    test_matplotlib_is_lazy()
+    test_headless_render_reuses_metrics()
+    test_many_points()
+    print("\nAll Pareto plot tests passed")
@@ -0,0 +1,111 @@
+"""
+Test preloaded projects and the pre-forked API server
+
+Run with: python test_preforked_server.py
+"""
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.append(str(Path(__file__).parent))
+
+from benchmarks.load_test import free_port
+from src.services.compute_pool import ComputePool
+from src.services.optimization_tasks import encode_json, optimize_process_file
+from src.services.project_registry import ProjectRegistry, preloaded_projects
+
+ROOT = Path(__file__).parent
+EXAMPLE = ROOT / "example" / "software_project.json"
+
+
+def test_registry_follows_file_changes(tmp_path: Path):
+    path = str(tmp_path / "project.json")
+    shutil.copy(EXAMPLE, path)
+    registry = ProjectRegistry()
+    assert registry.preload([path, path]) == 1 and registry.preload([path]) == 0
+    preloaded = registry.get(path)
+    assert preloaded is not None and preloaded.index.n_tasks == len(preloaded.project.tasks)
+
+    with open(path, "a") as f:
+        f.write("\n")
+    assert registry.get(path) is None
+    os.remove(path)
+    assert registry.get(path) is None
+    print("✅ Preloaded projects are served only while their file is unchanged")
+
+
+def test_preloaded_response_is_identical():
+    expected = {fmt: encode_json(optimize_process_file, str(EXAMPLE), fmt) for fmt in ("full", "compact")}
+    preloaded_projects.preload([str(EXAMPLE)])
+    try:
+        for fmt, body in expected.items():
+            assert encode_json(optimize_process_file, str(EXAMPLE), fmt) == body, fmt
+            assert encode_json(optimize_process_file, str(EXAMPLE), fmt) == body, fmt
+    finally:
+        preloaded_projects._entries.clear()
+    print("✅ /optimize responses from preloaded projects match loading the file")
+
+
+def test_pool_flags_are_per_process():
+    pool = ComputePool(workers=1, niceness=0)
+    assert pool._flags is None
+    pool.start()
+    try:
+        assert len(pool._flags) == pool.workers + pool.max_queue
+    finally:
+        pool.shutdown()
+    print("✅ Compute pools allocate their cancellation flags on start, after any fork")
+
+
+def test_preforked_server(tmp_path: Path):
+    port = free_port()
+    env = dict(os.environ, WHATIF_JOB_DB=str(tmp_path / "jobs.db"), WHATIF_CACHE_MAX_BYTES="0")
+    for name in ("OMP_NUM_THREADS", "WHATIF_COMPUTE_WORKERS"):
+        env.pop(name, None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "api.server", "--workers", "2", "--port", str(port),
+         "--host", "127.0.0.1", "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(url + "/", timeout=5).status_code == 200:
+                    break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+
+        expected = encode_json(optimize_process_file, str(EXAMPLE), "full")
+        for _ in range(4):
+            response = httpx.post(url + "/optimize/software_project", timeout=120)
+            assert response.status_code == 200 and response.content == expected
+
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=60) == 0
+        output = server.stdout.read()
+        assert "Preloaded 4 project files" in output and "2 workers, 1 threads each" in output, output
+    finally:
+        if server.poll() is None:
+            server.kill()
+            server.wait()
+    print("✅ Two forked workers serve /optimize on one socket and stop on SIGTERM")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as workdir:
+        test_registry_follows_file_changes(Path(workdir))
+        test_preloaded_response_is_identical()
+        test_pool_flags_are_per_process()
+        test_preforked_server(Path(workdir))
+    print("\nAll pre-forked server tests passed")
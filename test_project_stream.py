@@ -0,0 +1,110 @@
+"""
+Test the streaming project loader against Project.from_json
+
+Run with: python test_project_stream.py
+"""
+import json
+import os
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.data_models import Project
+from src.models.project_index import ProjectIndex
+from src.models.project_stream import TaskTable, stream_project
+
+EXAMPLES = sorted(Path(__file__).parent.glob("example/*_project.json"))
+
+
+def rows(project: Project) -> dict:
+    return {
+        **asdict(project.constraints), **asdict(project.metadata),
+        'id': project.id, 'name': project.name, 'description': project.description,
+        'tasks': [asdict(task) for task in project.tasks],
+        'resources': [asdict(resource) for resource in project.resources]
+    }
+
+
+def write_json(data, **kwargs) -> str:
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, **kwargs)
+    return path
+
+
+def test_matches_from_json():
+    for path in EXAMPLES:
+        data = json.loads(path.read_text())
+        expected = rows(Project.from_json(data))
+        # Tiny chunks put chunk boundaries inside strings, numbers and keys
+        for chunk_size in (1, 7, 4096):
+            project = stream_project(str(path), chunk_size=chunk_size)
+            assert isinstance(project.tasks, TaskTable)
+            assert rows(project) == expected, (path.name, chunk_size)
+        index = ProjectIndex.from_project(project)
+        reference = ProjectIndex.from_project(Project.from_json(data))
+        assert (index.skill_scores == reference.skill_scores).all() and index.task_ids == reference.task_ids
+    print(f"✅ {len(EXAMPLES)} example projects stream identically to Project.from_json")
+
+
+def test_numbers_strings_and_layout():
+    data = json.loads(EXAMPLES[0].read_text())
+    data["name"] = "Ünïcode — 項目"
+    data["tasks"][0]["duration_hours"] = 12.5
+    data["tasks"][1]["order"] = 2 ** 60 + 1
+    data["tasks"][2]["dependencies"] = None
+    data["resources"][0]["available"] = False
+    data["extra"] = {"ignored": [1, 2, 3]}
+    data = {"metadata": data.pop("metadata"), **data}   # arrays need not come last
+    for kwargs in ({}, {"indent": 4}, {"separators": (",", ":")}, {"ensure_ascii": False}):
+        path = write_json(data, **kwargs)
+        try:
+            project = stream_project(path, chunk_size=5)
+        finally:
+            os.unlink(path)
+        assert project.name == data["name"]
+        assert project.tasks[0].duration_hours == 12.5
+        assert project.tasks[1].order == 2 ** 60 + 1 and type(project.tasks[3].order) is int
+        assert project.tasks[2].dependencies == []
+        assert project.resources[0].available is False
+        assert [t.id for t in project.tasks[-2:]] == [t["id"] for t in data["tasks"][-2:]]
+    print("✅ Ints, floats, unicode, formatting and key order survive streaming")
+
+
+def test_errors():
+    data = json.loads(EXAMPLES[0].read_text())
+    text = json.dumps(data)
+    bad_task = json.loads(text)
+    bad_task["tasks"][3]["duration_hours"] = "8"
+    missing = json.loads(text)
+    del missing["resources"][1]["hourly_rate"]
+    cases = [
+        (text[:len(text) // 2], "Invalid project JSON"),
+        (text + "{}", "extra data"),
+        (json.dumps(bad_task), "tasks[3].duration_hours: expected a number, got str"),
+        (json.dumps(missing), "resources[1].hourly_rate: missing required field"),
+        (json.dumps({k: v for k, v in data.items() if k != "metadata"}), "no 'metadata'"),
+    ]
+    for document, message in cases:
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            f.write(document)
+        try:
+            stream_project(path, chunk_size=64)
+        except ValueError as e:
+            assert message in str(e), (str(e), message)
+        else:
+            raise AssertionError(f"expected ValueError: {message}")
+        finally:
+            os.unlink(path)
+    print("✅ Malformed files raise ValueError naming the offending value")
+
+
+if __name__ == "__main__":
+    test_matches_from_json()
+    test_numbers_strings_and_layout()
+    test_errors()
+    print("\nAll streaming loader tests passed")
@@ -0,0 +1,159 @@
+"""
+Test analysis reports: one evaluation per scenario, compact layouts and compression
+
+Run with: python test_report_writer.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models import json_codec
+from src.models.json_codec import load_project
+from src.models.report_writer import (
+    LAYOUTS, compact_report, expand_report, read_report, write_report, zstd
+)
+from src.optimization.monte_carlo import DurationModel
+from src.optimization.pareto_optimizer import ParetoOptimizer
+from src.optimization.scenario_generator import ScenarioGenerator
+
+EXAMPLES = sorted(Path(__file__).parent.glob("example/*_project.json"))
+BACKENDS = [name for name in ("msgspec", "orjson") if getattr(json_codec, name) is not None] + ["json"]
+
+
+def analysed(path: Path, samples: int = 0):
+    project = load_project(str(path))
+    scenarios = ScenarioGenerator(project).generate_all_scenarios(include_rl=False)
+    if samples:
+        optimizer = ParetoOptimizer(project, uncertainty=DurationModel(), uncertainty_samples=samples)
+    else:
+        optimizer = ParetoOptimizer(project)
+    return optimizer, scenarios
+
+
+def legacy_report(optimizer: ParetoOptimizer, scenarios) -> dict:
+    """The report as generate_report built it by evaluating every section anew"""
+    def entry(best):
+        return {'scenario': best[0].to_dict() if best else None, 'metrics': best[1].to_dict() if best else None}
+
+    pareto = optimizer.find_pareto_frontier(scenarios)
+    return {
+        'summary': {
+            'total_scenarios_evaluated': len(scenarios),
+            'pareto_optimal_scenarios': len(pareto),
+            'estimated_budget': optimizer.project.metadata.estimated_budget
+        },
+        'best_scenarios': {
+            key: entry(optimizer.get_best_scenario_by_objective(scenarios, objective))
+            for key, objective in (('fastest', 'time'), ('cheapest', 'cost'),
+                                   ('highest_quality', 'quality'), ('best_balanced', 'balanced'))
+        },
+        'all_scenarios_ranked': [
+            {'rank': i + 1, 'scenario': s.to_dict(), 'metrics': m.to_dict()}
+            for i, (s, m) in enumerate(optimizer.rank_scenarios(scenarios))
+        ],
+        'pareto_frontier': [
+            {'scenario': s.to_dict(), 'metrics': optimizer.evaluate_scenario(s).to_dict()}
+            for s in pareto
+        ]
+    }
+
+
+def test_report_matches_legacy():
+    for path in EXAMPLES:
+        optimizer, scenarios = analysed(path, samples=50)
+        evaluated = []
+        evaluate = optimizer.evaluate_scenario
+        optimizer.evaluate_scenario = lambda s: evaluated.append(s) or evaluate(s)
+        report = optimizer.generate_report(scenarios)
+        assert len(evaluated) == len(scenarios), path.name
+        del optimizer.evaluate_scenario
+        expected = legacy_report(optimizer, scenarios)
+        assert json.dumps(report, indent=2) == json.dumps(expected, indent=2), path.name
+    empty = ParetoOptimizer(load_project(str(EXAMPLES[0]))).generate_report([])
+    assert empty['best_scenarios']['fastest'] == {'scenario': None, 'metrics': None}
+    assert empty['all_scenarios_ranked'] == [] and empty['pareto_frontier'] == []
+    print(f"✅ Reports of {len(EXAMPLES)} projects match the legacy layout with one evaluation per scenario")
+
+
+def test_layouts_round_trip():
+    workdir = tempfile.mkdtemp()
+    try:
+        for path in EXAMPLES:
+            optimizer, scenarios = analysed(path, samples=50)
+            report = optimizer.generate_report(scenarios)
+            expected = json.loads(json.dumps(report))
+            sizes = {}
+            for layout in LAYOUTS:
+                compact = compact_report(report, layout)
+                assert json.loads(json.dumps(expand_report(compact))) == expected, (path.name, layout)
+                assert len(compact.get('scenarios', scenarios)) == len(scenarios)
+                for suffix in ('', '.gz') + (('.zst',) if zstd is not None else ()):
+                    target = os.path.join(workdir, f"report-{layout}.json{suffix}")
+                    sizes[layout + suffix] = write_report(report, target, layout=layout)
+                    assert read_report(target) == expected, (path.name, layout, suffix)
+            assert sizes['columnar'] < sizes['referenced'] < sizes['full'], sizes
+            assert sizes['full.gz'] < sizes['full']
+
+            # The full layout is written exactly as json.dump(report, f, indent=2) did
+            for backend in BACKENDS:
+                previous = json_codec.JSON_BACKEND
+                json_codec.JSON_BACKEND = backend
+                try:
+                    write_report(report, os.path.join(workdir, "report.json"))
+                finally:
+                    json_codec.JSON_BACKEND = previous
+                written = Path(workdir, "report.json").read_text()
+                assert written == json.dumps(report, indent=2), (path.name, backend)
+    finally:
+        shutil.rmtree(workdir)
+    print(f"✅ Every layout and compression round-trips; the full layout is byte-identical with {', '.join(BACKENDS)}")
+
+
+def test_errors_and_values():
+    optimizer, scenarios = analysed(EXAMPLES[0])
+    report = optimizer.generate_report(scenarios)
+
+    # Two different scenarios under one id cannot be referenced by it
+    clash = json.loads(json.dumps(report))
+    clash['pareto_frontier'][0]['scenario']['id'] = clash['all_scenarios_ranked'][1]['scenario']['id']
+    for bad, message in ((lambda: compact_report(clash), "two different scenarios"),
+                         (lambda: compact_report(report, 'xml'), "Unknown report layout"),
+                         (lambda: write_report(report, "report.json", compression='bz2'), "Unknown compression")):
+        try:
+            bad()
+        except ValueError as e:
+            assert message in str(e), str(e)
+        else:
+            raise AssertionError(f"expected ValueError: {message}")
+    if zstd is None:
+        try:
+            write_report(report, "report.json.zst")
+        except ValueError as e:
+            assert "zstandard" in str(e)
+        else:
+            raise AssertionError("zstd without a zstd module must fail")
+
+    # numpy scalars encode as plain numbers with every backend
+    for backend in BACKENDS:
+        previous = json_codec.JSON_BACKEND
+        json_codec.JSON_BACKEND = backend
+        try:
+            encoded = json_codec.dumps({'p80': np.float64(1.25), 'n': np.int64(3), 'name': 'Ünïcode'})
+        finally:
+            json_codec.JSON_BACKEND = previous
+        assert json.loads(encoded) == {'p80': 1.25, 'n': 3, 'name': 'Ünïcode'}, backend
+    print("✅ Clashing ids, unknown layouts and compressions are rejected; numpy scalars encode")
+
+
+if __name__ == "__main__":
+    test_report_matches_legacy()
+    test_layouts_round_trip()
+    test_errors_and_values()
+    print("\nAll report writer tests passed")
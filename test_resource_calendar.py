@@ -0,0 +1,90 @@
+"""
+Test resource calendars against a brute-force earliest-fit search
+
+Run with: python test_resource_calendar.py
+"""
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.optimization.resource_calendar import HOURS_PER_DAY, ResourceCalendar
+
+
+def working_hours(capacity: float, start: float, end: float) -> float:
+    """Working hours between two timeline hours, counted day by day"""
+    total, day = 0.0, int(start // HOURS_PER_DAY)
+    while day * HOURS_PER_DAY < end:
+        window_start = day * HOURS_PER_DAY
+        window_end = window_start + capacity
+        total += max(0.0, min(end, window_end) - max(start, window_start))
+        day += 1
+    return total
+
+
+def brute_force_fit(bookings: list, ready: float, hours: float) -> float:
+    """Earliest work-time start at or after `ready` that overlaps no booking"""
+    candidates = [ready] + [end for _, end in bookings if end >= ready]
+    for start in sorted(candidates):
+        if all(start + hours <= b_start + 1e-9 or start >= b_end - 1e-9 for b_start, b_end in bookings):
+            return start
+    raise AssertionError("no candidate fits")
+
+
+def test_earliest_fit_matches_brute_force():
+    rng = random.Random(0)
+    checked = 0
+    for trial in range(60):
+        capacity = rng.choice([8.0, 6.0, 4.0, 2.5])
+        calendar = ResourceCalendar(capacity, seed=trial)
+        bookings = []  # work-time intervals
+        for _ in range(40):
+            ready = rng.choice([0.0, rng.uniform(0, 120), float(rng.randrange(0, 120))])
+            hours = rng.choice([0.5, 1.0, 2.0, rng.uniform(0.25, 12)])
+            start, end = calendar.earliest_fit(ready, hours)
+
+            expected = brute_force_fit(bookings, calendar.to_work_time(ready), hours)
+            assert abs(calendar.to_work_time(start) - expected) < 1e-6, (trial, ready, hours)
+            assert start >= ready - 1e-9
+            # The slot holds exactly the task's hours inside daily windows
+            assert abs(working_hours(capacity, start, end) - hours) < 1e-6, (trial, start, end, hours)
+
+            calendar.reserve(start, end)
+            bookings.append((expected, expected + hours))
+            checked += 1
+
+        timeline = calendar.bookings()
+        assert len(timeline) == len(calendar) == 40
+        for (_, previous_end), (next_start, _) in zip(timeline, timeline[1:]):
+            assert next_start >= previous_end - 1e-6
+        assert abs(calendar.free_at - max(end for _, end in timeline)) < 1e-6
+    print(f"✅ Earliest fits agree with a brute-force search over {checked} bookings")
+
+
+def test_backfill_and_daily_capacity():
+    calendar = ResourceCalendar(8.0)
+    calendar.reserve(0.0, 2.0)
+    calendar.reserve(6.0, 10.0)
+    # Fits in the idle gap before the second booking...
+    assert calendar.earliest_fit(0.0, 4.0) == (2.0, 6.0)
+    # ...but a longer task goes after it
+    assert calendar.earliest_fit(0.0, 5.0) == (10.0, 15.0)
+
+    half_days = ResourceCalendar(4.0)
+    # Ten hours at four per day: days 0 and 1 in full, two hours of day 2
+    assert half_days.earliest_fit(0.0, 10.0) == (0.0, 18.0)
+    # Ready outside the working window waits for the next day
+    assert half_days.earliest_fit(5.0, 1.0) == (8.0, 9.0)
+    try:
+        ResourceCalendar(0)
+        raise AssertionError("zero capacity accepted")
+    except ValueError:
+        pass
+    print("✅ Tasks backfill idle gaps and spill over days at the resource's daily capacity")
+
+
+if __name__ == "__main__":
+    test_earliest_fit_matches_brute_force()
+    test_backfill_and_daily_capacity()
+    print("\nAll resource calendar tests passed")
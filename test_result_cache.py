@@ -0,0 +1,133 @@
+"""
+Test the response cache: byte bounds, the disk tier and invalidation on file changes
+
+Run with: python test_result_cache.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.services.optimization_tasks import encode_json, optimize_process_file
+from src.services.result_cache import FileFingerprints, ResultCache
+from test_cms_client import STUB_URL
+
+EXAMPLE = Path(__file__).parent / "example" / "software_project.json"
+
+
+def test_fingerprints_follow_file_content(tmp_path: Path):
+    path = tmp_path / "project.json"
+    path.write_text('{"a": 1}')
+    fingerprints = FileFingerprints()
+    digest, replaced = fingerprints.digest(str(path))
+    assert replaced is None and fingerprints.digest(str(path)) == (digest, None)
+
+    # Touching the file re-hashes it, but equal content keeps the digest
+    os.utime(path, ns=(1, 1))
+    assert fingerprints.digest(str(path)) == (digest, None)
+
+    path.write_text('{"a": 2}')
+    os.utime(path, ns=(2, 2))
+    changed, replaced = fingerprints.digest(str(path))
+    assert changed != digest and replaced == digest
+    assert fingerprints.digest(str(path)) == (changed, None)
+    print("✅ File digests change, and report the digest they replace, only when content changes")
+
+
+def test_memory_tier_is_byte_bounded():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"  # now most recently used
+    cache.put("c", b"1234")
+    assert cache.get("b") is None and cache.get("a") == b"1234" and cache.get("c") == b"1234"
+    cache.put("a", b"12")  # replacing an entry releases its old size
+    assert cache.stats()['bytes'] == 6
+
+    cache.put("huge", b"x" * 11)
+    assert cache.get("huge") is None and cache.stats()['entries'] == 2
+
+    cache.put("digest1-full-v1", b"x")
+    cache.put("digest1-compact-v1", b"y")
+    cache.discard_prefix("digest1")
+    assert cache.get("digest1-full-v1") is None and cache.get("digest1-compact-v1") is None
+    assert cache.get("a") == b"12"
+    stats = cache.stats()
+    assert stats['hits'] == 4 and stats['misses'] == 4 and stats['disk_bytes'] is None
+    print("✅ The memory tier evicts least recently used entries to stay under its byte bound")
+
+
+def test_disk_tier(tmp_path: Path):
+    disk = tmp_path / "cache"
+    cache = ResultCache(max_bytes=1024, disk_dir=str(disk), max_disk_bytes=10)
+    cache.put("d1-a", b"1234")
+    cache.put("d1-b", b"1234")
+
+    # A new instance, as after a restart, reads the disk tier and promotes hits
+    restarted = ResultCache(max_bytes=1024, disk_dir=str(disk), max_disk_bytes=10)
+    assert restarted.stats()['disk_bytes'] == 8
+    assert restarted.get("d1-a") == b"1234" and restarted.get("d1-a") == b"1234"
+    assert restarted.stats()['disk_hits'] == 1 and restarted.stats()['hits'] == 1
+
+    # Over the disk bound the oldest files go first
+    os.utime(disk / "d1-a.bin", (1, 1))
+    restarted.put("d2-c", b"1234")
+    assert sorted(path.name for path in disk.glob("*.bin")) == ["d1-b.bin", "d2-c.bin"]
+    assert restarted.stats()['disk_bytes'] == 8
+
+    restarted.discard_prefix("d1")
+    assert [path.name for path in disk.glob("*")] == ["d2-c.bin"]
+    assert restarted.get("d1-b") is None and restarted.stats()['disk_bytes'] == 4
+    print("✅ The disk tier survives restarts, stays under its bound and is discarded by digest")
+
+
+def test_api_invalidates_on_file_change(tmp_path: Path):
+    os.environ["WHATIF_JOB_DB"] = str(tmp_path / "jobs.db")
+    os.environ["WHATIF_CMS_BASE_URL"] = STUB_URL
+    os.environ["WHATIF_CMS_EMAIL"] = "stub@example.com"
+    os.environ["WHATIF_CMS_PASSWORD"] = "secret"
+    from fastapi.testclient import TestClient
+    from api import main as api
+
+    project_file = tmp_path / "cached_project.json"
+    shutil.copy(EXAMPLE, project_file)
+    api.optimize_cache = ResultCache(disk_dir=str(tmp_path / "responses"))
+    api.PROCESS_FILES["cached_project"] = str(project_file)
+    try:
+        with TestClient(api.app) as client:
+            first = client.post("/optimize/cached_project")
+            second = client.post("/optimize/cached_project")
+            compact = client.post("/optimize/cached_project?format=compact")
+
+            data = json.loads(project_file.read_text())
+            data["tasks"][0]["duration_hours"] *= 2
+            project_file.write_text(json.dumps(data))
+            os.utime(project_file, ns=(10**9, 10**9))
+            edited = client.post("/optimize/cached_project")
+            edited_again = client.post("/optimize/cached_project")
+            stats = api.optimize_cache.stats()
+    finally:
+        del api.PROCESS_FILES["cached_project"]
+
+    assert [r.headers["X-Cache"] for r in (first, second, compact, edited, edited_again)] == [
+        "miss", "hit", "miss", "miss", "hit"
+    ]
+    assert first.content == second.content == encode_json(optimize_process_file, str(EXAMPLE), "full")
+    assert edited.content == edited_again.content == encode_json(optimize_process_file, str(project_file), "full")
+    assert edited.content != first.content
+    # The edit dropped both formats of the old content
+    assert stats["entries"] == 1 and len(list((tmp_path / "responses").glob("*.bin"))) == 1
+    print("✅ POST /optimize serves cached bytes until the project file changes")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as workdir:
+        test_fingerprints_follow_file_content(Path(workdir))
+        test_memory_tier_is_byte_bounded()
+        test_disk_tier(Path(workdir))
+        test_api_invalidates_on_file_change(Path(workdir))
+    print("\nAll result cache tests passed")
@@ -0,0 +1,103 @@
+"""
+Test the compact scenario encoding round-trip
+
+Run with: python test_scenario_codec.py
+"""
+import copy
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.data_models import Project
+from src.models.scenario_codec import COMPACT_FORMAT, decode_scenario_set, encode_scenario_set
+from src.optimization.scenario_generator import ScenarioGenerator
+from src.services.optimization_tasks import optimize_process_file
+
+EXAMPLES = Path(__file__).parent / "example"
+NAMES = ("software_project", "hospital_project", "manufacturing_project", "cms_ecommerce_project")
+
+
+def round_trip(baseline: dict, scenarios: list) -> dict:
+    # Through JSON, as the client receives it
+    payload = json.loads(json.dumps(encode_scenario_set(baseline, scenarios)))
+    assert payload["format"] == COMPACT_FORMAT
+    decoded = decode_scenario_set(payload)
+    # Equal values in the same key order (an unchanged 32.0 may come back as the baseline's 32)
+    for actual, expected in zip([decoded["baseline"]] + decoded["scenarios"], [baseline] + scenarios):
+        assert actual == expected
+        assert list(actual) == list(expected)
+    assert len(decoded["scenarios"]) == len(scenarios)
+    return payload
+
+
+def test_example_scenarios_round_trip():
+    deltas = 0
+    for name in NAMES:
+        with open(EXAMPLES / f"{name}.json") as f:
+            project = Project.from_json(json.load(f))
+        for capacity_aware in (False, True):
+            generator = ScenarioGenerator(project, capacity_aware=capacity_aware)
+            scenarios = [scenario.to_dict() for scenario in generator.generate_all_scenarios(include_rl=False)]
+            payload = round_trip(scenarios[0], scenarios)
+            deltas += sum("delta" in s for s in payload["scenarios"])
+            # The baseline against itself is an empty delta
+            assert payload["scenarios"][0]["delta"] == {
+                "changed": {name: [] for name in ("task", "resource", "start", "end", "hours")}, "removed": []
+            }
+    assert deltas > 16
+    print(f"✅ Example scenario sets decode back to their Scenario.to_dict() output ({deltas} as deltas)")
+
+
+def test_edge_cases_round_trip():
+    with open(EXAMPLES / "software_project.json") as f:
+        baseline = ScenarioGenerator(Project.from_json(json.load(f))).generate_baseline_scenario().to_dict()
+    assignments = baseline["assignments"]
+
+    removed = copy.deepcopy(baseline)
+    removed["assignments"] = assignments[1:]
+    added = copy.deepcopy(baseline)
+    added["assignments"] = assignments + [{**assignments[0], "task_id": "task_new", "start_time": 500.0}]
+    reordered = copy.deepcopy(baseline)
+    reordered["assignments"] = [assignments[1], assignments[0]] + assignments[2:]
+    split = copy.deepcopy(baseline)
+    split["assignments"] = assignments + [{**assignments[0], "start_time": 900.0, "end_time": 904.0}]
+    empty = {**copy.deepcopy(baseline), "assignments": [], "num_assignments": 0}
+    retimed = copy.deepcopy(baseline)
+    for assignment in retimed["assignments"]:
+        assignment["start_time"] += 1.5
+
+    payload = round_trip(baseline, [removed, added, reordered, split, empty, retimed])
+    kinds = ["delta" if "delta" in s else "columns" for s in payload["scenarios"]]
+    # Split tasks have no per-task delta; an empty scenario is all removals
+    assert kinds == ["delta", "delta", "delta", "columns", "delta", "columns"], kinds
+    assert "order" in payload["scenarios"][2]["delta"] and "order" not in payload["scenarios"][1]["delta"]
+
+    # A baseline with no assignments still encodes every scenario
+    round_trip(empty, [baseline, empty])
+    print("✅ Removed, added, reordered, split and empty scenarios survive the round trip")
+
+
+def test_compact_response_matches_full():
+    path = str(EXAMPLES / "software_project.json")
+    full = optimize_process_file(path)
+    compact = json.loads(json.dumps(optimize_process_file(path, "compact")))
+    decoded = decode_scenario_set({
+        "tasks": compact["tasks"],
+        "resources": compact["resources"],
+        "baseline": compact["baseline"],
+        "scenarios": [entry["scenario"] for entry in compact["all_scenarios"]]
+    })
+    assert decoded["scenarios"] == [entry["scenario"] for entry in full["all_scenarios"]]
+    assert [e["metrics"] for e in compact["all_scenarios"]] == [e["metrics"] for e in full["all_scenarios"]]
+    assert compact["all_scenarios"][compact["best_scenario_index"]]["metrics"] == full["best_scenario"]["metrics"]
+    assert len(json.dumps(compact)) < len(json.dumps(full))
+    print("✅ The compact /optimize response decodes to the full response")
+
+
+if __name__ == "__main__":
+    test_example_scenarios_round_trip()
+    test_edge_cases_round_trip()
+    test_compact_response_matches_full()
+    print("\nAll scenario codec tests passed")
@@ -0,0 +1,114 @@
+"""
+Test lazily computed report sections
+
+Run with: python test_scenario_report.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.json_codec import load_json_file, load_project
+from src.optimization.pareto_optimizer import REPORT_SECTIONS, ParetoOptimizer
+from src.optimization.scenario_generator import ScenarioGenerator
+from src.services.job_store import JobStore
+from src.services.optimization_tasks import analysis_job_key, analysis_job_request, run_analysis_job
+
+EXAMPLE = Path(__file__).parent / "example" / "software_project.json"
+
+
+class CountingOptimizer(ParetoOptimizer):
+    """Optimizer that counts scenario evaluations"""
+
+    def __init__(self, project):
+        super().__init__(project)
+        self.evaluations = 0
+
+    def evaluate_scenario(self, scenario):
+        self.evaluations += 1
+        return super().evaluate_scenario(scenario)
+
+
+def analysed():
+    project = load_project(str(EXAMPLE))
+    scenarios = ScenarioGenerator(project).generate_all_scenarios(include_rl=False)
+    return CountingOptimizer(project), scenarios
+
+
+def test_sections_are_lazy():
+    optimizer, scenarios = analysed()
+    expected = ParetoOptimizer(optimizer.project).generate_report(scenarios)
+
+    report = optimizer.report(scenarios)
+    assert optimizer.evaluations == 0 and report.to_dict() == {}
+
+    # The best scenario alone needs the metrics but no section
+    best = report.best_position('balanced')
+    assert report.entry(best) == expected['best_scenarios']['best_balanced']
+    assert optimizer.evaluations == len(scenarios)
+    assert report.to_dict() == {} and report.to_json() == b"{}"
+
+    # Sections share the metrics, and only those accessed are serialized
+    assert report['pareto_frontier'] == expected['pareto_frontier']
+    assert report['summary'] == expected['summary']
+    assert list(report.to_dict()) == ['summary', 'pareto_frontier']
+    assert json.loads(report.to_json()) == json.loads(json.dumps(
+        {'summary': expected['summary'], 'pareto_frontier': expected['pareto_frontier']}
+    ))
+    assert report.to_dict(REPORT_SECTIONS) == expected
+    assert optimizer.evaluations == len(scenarios)
+    print("✅ Sections are computed on first access from one evaluation per scenario")
+
+
+def test_precomputed_metrics_and_errors():
+    optimizer, scenarios = analysed()
+    metrics = [optimizer.evaluate_scenario(s) for s in scenarios]
+    report = optimizer.report(scenarios, metrics=metrics)
+    assert report.pareto == ParetoOptimizer(optimizer.project).find_pareto_frontier(scenarios)
+    assert optimizer.evaluations == len(scenarios)
+
+    for bad, error in ((lambda: report['rankings'], KeyError),
+                       (lambda: report.to_dict(['summary', 'charts']), ValueError),
+                       (lambda: analysis_job_request({}, {'report_sections': ['charts']}), ValueError),
+                       (lambda: analysis_job_request({}, {'report_sections': 'summary'}), ValueError)):
+        try:
+            bad()
+        except error:
+            pass
+        else:
+            raise AssertionError(f"expected {error.__name__}")
+
+    empty = ParetoOptimizer(optimizer.project).report([])
+    assert empty.best_position('time') is None and empty.pareto == [] and empty.entries() == []
+    assert empty['best_scenarios']['fastest'] == {'scenario': None, 'metrics': None}
+    print("✅ Precomputed metrics are reused; unknown sections are rejected")
+
+
+def test_job_report_sections():
+    workdir = tempfile.mkdtemp()
+    try:
+        store = JobStore(os.path.join(workdir, "jobs.db"))
+        request = {'include_rl': False, 'report_sections': ['pareto_frontier', 'summary']}
+        job_request = analysis_job_request(load_json_file(str(EXAMPLE)), request)
+        assert job_request['report_sections'] == ['summary', 'pareto_frontier']
+        assert analysis_job_request({}, {})['report_sections'] == list(REPORT_SECTIONS)
+
+        job, _ = store.submit(analysis_job_key(job_request), job_request)
+        run_analysis_job(store.path, store.ttl_seconds, job.id, job_request)
+        report = store.result(job.id)['report']
+        assert list(report) == ['summary', 'pareto_frontier']
+        assert report['summary']['total_scenarios_evaluated'] == 6
+    finally:
+        shutil.rmtree(workdir)
+    print("✅ Jobs store only the requested report sections")
+
+
+if __name__ == "__main__":
+    test_sections_are_lazy()
+    test_precomputed_metrics_and_errors()
+    test_job_report_sections()
+    print("\nAll scenario report tests passed")
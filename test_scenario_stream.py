@@ -0,0 +1,91 @@
+"""
+Test the Server-Sent Events scenario streams
+
+Run with: python test_scenario_stream.py
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from test_cms_client import STUB, STUB_URL, sample_process
+
+
+def parse_events(body: str) -> list:
+    """(event, data) pairs of an SSE body"""
+    events = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def api_module():
+    os.environ["WHATIF_CMS_BASE_URL"] = STUB_URL
+    os.environ["WHATIF_CMS_EMAIL"] = "stub@example.com"
+    os.environ["WHATIF_CMS_PASSWORD"] = "secret"
+    import api.main as api
+    return api
+
+
+def test_process_stream_matches_post():
+    api = api_module()
+    from fastapi.testclient import TestClient
+
+    with TestClient(api.app) as client:
+        response = client.get("/optimize/software_project/stream")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        optimized = client.post("/optimize/software_project").json()
+        rejected = client.get("/optimize/software_project/stream?include_rl=true")
+
+    names = [event for event, _ in events]
+    assert names == ["start"] + ["scenario"] * 6 + ["summary"], names
+    assert events[0][1] == {"process_name": "software_project", "expected_scenarios": 6}
+    scenarios = {data["scenario"]["id"]: data for event, data in events if event == "scenario"}
+    expected = {entry["scenario"]["id"]: entry for entry in optimized["all_scenarios"]}
+    assert scenarios.keys() == expected.keys()
+    for scenario_id, data in scenarios.items():
+        assert data["scenario"]["total_cost"] == expected[scenario_id]["scenario"]["total_cost"]
+        assert data["metrics"] == expected[scenario_id]["metrics"]
+
+    summary = events[-1][1]
+    assert summary["total_scenarios"] == 6
+    assert summary["best_scenario_id"] == optimized["best_scenario"]["scenario"]["id"]
+    assert summary["project_data"] == optimized["project_data"]
+    assert rejected.status_code == 400
+    print("✅ The process stream sends the scenarios of POST /optimize one event at a time")
+
+
+def test_cms_stream():
+    api = api_module()
+    from fastapi.testclient import TestClient
+
+    STUB.processes[310] = sample_process(310)
+    STUB.processes[311] = {**sample_process(311), "process_tasks": [{"task_id": "oops"}]}
+    try:
+        with TestClient(api.app) as client:
+            response = client.get("/optimize/cms-process/310/stream")
+            invalid = client.get("/optimize/cms-process/311/stream")
+            missing = client.get("/optimize/cms-process/999/stream")
+    finally:
+        del STUB.processes[310], STUB.processes[311]
+
+    assert response.status_code == 200
+    events = parse_events(response.text)
+    assert events[0][0] == "start" and events[-1][0] == "summary"
+    assert events[0][1]["process_info"]["process_name"] == "Stub Process 310"
+    assert len(events) == 2 + events[-1][1]["total_scenarios"]
+    # Compilation runs in the compute pool but still fails the request itself
+    assert invalid.status_code == 400 and "Invalid CMS data format" in invalid.json()["detail"]
+    assert missing.status_code == 404
+    print("✅ The CMS stream compiles in the compute pool and reports invalid data as 400")
+
+
+if __name__ == "__main__":
+    test_process_stream_matches_post()
+    test_cms_stream()
+    print("\nAll scenario stream tests passed")
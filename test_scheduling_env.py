@@ -0,0 +1,77 @@
+"""
+Test the event-driven time model of the RL scheduling environment
+
+Run with: python test_scheduling_env.py
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.environment.scheduling_env import TaskSchedulingEnv
+from src.models.json_codec import load_project
+
+EXAMPLES = Path(__file__).parent / "example"
+
+
+def random_episode(env: TaskSchedulingEnv, rng) -> dict:
+    """Run a random policy within the env's limits, as the RL generator does"""
+    env.reset()
+    done, steps, idle = False, 0, 0
+    while not done and steps < env.max_steps:
+        assigned, time_before = len(env.assignments), env.current_time
+        _, _, done, _ = env.step(int(rng.integers(env.action_space.n)))
+        steps += 1
+        # Every step starts a task or moves the clock
+        idle += len(env.assignments) == assigned and env.current_time == time_before
+    return {"done": done, "steps": steps, "idle": idle}
+
+
+def test_random_episodes_finish():
+    project = load_project(str(EXAMPLES / "hospital_project.json"))
+    env = TaskSchedulingEnv(project)
+    rng = np.random.default_rng(0)
+    episodes = [random_episode(env, rng) for _ in range(20)]
+    assert all(episode["done"] for episode in episodes)
+    assert len(env.completed_tasks) == env.n_tasks
+    # Invalid actions start the nearest valid assignment, so episodes stay O(n_tasks)
+    assert all(episode["idle"] == 0 for episode in episodes)
+    assert all(episode["steps"] <= 2 * env.n_tasks for episode in episodes)
+    # One module root: the env builds the same Task class the project was loaded with
+    assert sys.modules[TaskSchedulingEnv.__module__].Task is type(project.tasks[0])
+    print("✅ Random-policy episodes on hospital_project run to completion")
+
+
+def test_resources_never_overlap():
+    for name in ("hospital_project", "software_project", "cms_ecommerce_project"):
+        project = load_project(str(EXAMPLES / f"{name}.json"))
+        env = TaskSchedulingEnv(project)
+        rng = np.random.default_rng(1)
+        for _ in range(10):
+            random_episode(env, rng)
+            by_resource = {}
+            for assignment in env.assignments:
+                by_resource.setdefault(assignment.resource_id, []).append(assignment)
+            for assignments in by_resource.values():
+                assignments.sort(key=lambda a: a.start_time)
+                for previous, current in zip(assignments, assignments[1:]):
+                    assert current.start_time >= previous.end_time - 1e-9, (name, previous, current)
+    print("✅ An event-driven resource holds one task at a time")
+
+
+def test_legacy_daily_ticks():
+    project = load_project(str(EXAMPLES / "software_project.json"))
+    env = TaskSchedulingEnv(project, event_driven=False)
+    env.reset()
+    env.step(env.action_space.n - 1)  # no-op
+    assert env.current_time == 8
+    print("✅ event_driven=False keeps the 8-hour daily tick")
+
+
+if __name__ == "__main__":
+    test_random_episodes_finish()
+    test_resources_never_overlap()
+    test_legacy_daily_ticks()
+    print("\nAll scheduling environment tests passed")
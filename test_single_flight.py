@@ -0,0 +1,179 @@
+"""
+Test coalescing of concurrent identical optimization requests
+
+Run with: python test_single_flight.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.services.optimization_tasks import encode_json, optimize_process_file
+from src.services.result_cache import ResultCache
+from src.services.single_flight import SingleFlight
+from test_cms_client import STUB, STUB_URL, sample_process
+
+EXAMPLE = Path(__file__).parent / "example" / "software_project.json"
+
+
+def test_concurrent_calls_share_one_computation():
+    async def run():
+        flights = SingleFlight()
+        calls = []
+
+        async def compute(abandoned):
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"value": len(calls)}
+
+        results = await asyncio.gather(*(flights.run("a", compute) for _ in range(10)))
+        assert len(calls) == 1 and all(result is results[0] for result in results)
+        assert flights.stats() == {'in_flight': 0, 'computations': 1, 'coalesced': 9, 'max_callers': 10}
+
+        # Other keys, and later calls, compute afresh
+        await asyncio.gather(flights.run("a", compute), flights.run("b", compute))
+        assert len(calls) == 3 and flights.stats()['computations'] == 3
+
+    asyncio.run(run())
+    print("✅ Ten concurrent identical calls run one computation and share its result")
+
+
+def test_errors_are_shared():
+    async def run():
+        flights = SingleFlight()
+
+        async def compute(abandoned):
+            await asyncio.sleep(0.01)
+            raise ValueError("invalid project")
+
+        results = await asyncio.gather(*(flights.run("a", compute) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flights.stats()['computations'] == 1
+
+    asyncio.run(run())
+    print("✅ A failed computation fails every caller waiting on it")
+
+
+def test_cancellation_needs_every_caller():
+    async def run():
+        flights = SingleFlight()
+        finished = asyncio.Event()
+        cancelled = []
+
+        async def compute(abandoned):
+            try:
+                await finished.wait()
+                return "done"
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+
+        first = asyncio.create_task(flights.run("a", compute))
+        second = asyncio.create_task(flights.run("a", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled
+        finished.set()
+        assert await second == "done"
+
+        finished.clear()
+        callers = [asyncio.create_task(flights.run("b", compute)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        assert cancelled == [1] and flights.stats()['in_flight'] == 0
+
+    asyncio.run(run())
+    print("✅ The shared computation is cancelled only when all its callers are")
+
+
+def test_abandoned_when_all_disconnect():
+    async def run():
+        flights = SingleFlight()
+        gone = {"first": False, "second": False}
+        probes = []
+
+        async def compute(abandoned):
+            probes.append(abandoned)
+            await asyncio.sleep(0.05)
+            return "done"
+
+        def probe(name):
+            async def disconnected():
+                return gone[name]
+            return disconnected
+
+        callers = [asyncio.create_task(flights.run("a", compute, disconnected=probe(name))) for name in gone]
+        await asyncio.sleep(0.01)
+        abandoned = probes[0]
+        gone["first"] = True
+        assert not await abandoned()
+        gone["second"] = True
+        assert await abandoned()
+        await asyncio.gather(*callers)
+
+        anonymous = [asyncio.create_task(flights.run("b", compute)),
+                     asyncio.create_task(flights.run("b", compute, disconnected=probe("first")))]
+        await asyncio.sleep(0.01)
+        assert not await probes[1]()
+        await asyncio.gather(*anonymous)
+
+    asyncio.run(run())
+    print("✅ A computation counts as abandoned once every caller has disconnected")
+
+
+def test_api_coalesces_requests(tmp_path: Path):
+    os.environ["WHATIF_JOB_DB"] = str(tmp_path / "jobs.db")
+    os.environ["WHATIF_CMS_BASE_URL"] = STUB_URL
+    os.environ["WHATIF_CMS_EMAIL"] = "stub@example.com"
+    os.environ["WHATIF_CMS_PASSWORD"] = "secret"
+    import httpx
+    from api import main as api
+
+    # Fresh counters and no result cache, even if another test used the API
+    api.optimize_cache = ResultCache(max_bytes=0)
+    api.optimize_flights = SingleFlight()
+    api.cms_flights = SingleFlight()
+
+    STUB.processes[300] = sample_process(300)
+    expected = encode_json(optimize_process_file, str(EXAMPLE), "full")
+
+    async def run():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+            responses = await asyncio.gather(*(client.post("/optimize/software_project") for _ in range(8)))
+            await client.post("/optimize/cms-process/300")  # fetch the process into the CMS cache
+            cms_responses = await asyncio.gather(*(client.post("/optimize/cms-process/300") for _ in range(4)))
+            stats = (await client.get("/stats")).json()
+        await api.cms_client.aclose()
+        return responses, cms_responses, stats
+
+    try:
+        responses, cms_responses, stats = asyncio.run(run())
+    finally:
+        api.compute_pool.shutdown()
+    assert all(response.status_code == 200 and response.content == expected for response in responses)
+    assert stats["coalescing"]["optimize"] == {'in_flight': 0, 'computations': 1, 'coalesced': 7, 'max_callers': 8}
+    # Coalescing works without the cache, which stored nothing
+    assert stats["optimize_cache"]["entries"] == 0
+
+    assert all(response.status_code == 200 and response.json() == cms_responses[0].json() for response in cms_responses)
+    assert cms_responses[0].json()["process_info"]["process_id"] == 300
+    assert stats["coalescing"]["cms_process"] == {'in_flight': 0, 'computations': 2, 'coalesced': 3, 'max_callers': 4}
+    print("✅ Concurrent POST /optimize and /optimize/cms-process requests share one optimization each")
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_computation()
+    test_errors_are_shared()
+    test_cancellation_needs_every_caller()
+    test_abandoned_when_all_disconnect()
+    with tempfile.TemporaryDirectory() as workdir:
+        test_api_coalesces_requests(Path(workdir))
+    print("\nAll single flight tests passed")
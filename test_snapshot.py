@@ -0,0 +1,120 @@
+"""
+Test binary project and scenario snapshots
+
+Run with: python test_snapshot.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.json_codec import load_project
+from src.models.project_stream import stream_project
+from src.models.snapshot import (
+    load_scenarios, load_snapshot, save_scenarios, save_snapshot, snapshot_is_current
+)
+from src.optimization.scenario_generator import ScenarioGenerator
+
+EXAMPLES = sorted(Path(__file__).parent.glob("example/*_project.json"))
+
+
+def rows(items) -> list:
+    return [asdict(item) for item in items]
+
+
+def scenario_json(scenarios) -> str:
+    return json.dumps([scenario.to_dict() for scenario in scenarios])
+
+
+def test_round_trip():
+    workdir = tempfile.mkdtemp()
+    try:
+        for path in EXAMPLES:
+            project = load_project(str(path))
+            generator = ScenarioGenerator(project)
+            scenarios = generator.generate_all_scenarios(include_rl=False)
+            directory = os.path.join(workdir, path.stem)
+            save_snapshot(directory, project, generator.index, source_path=str(path))
+            save_scenarios(directory, "default", scenarios)
+
+            snapshot = load_snapshot(directory)
+            assert rows(snapshot.project.tasks) == rows(project.tasks), path.name
+            assert rows(snapshot.project.resources) == rows(project.resources), path.name
+            assert snapshot.project.constraints == project.constraints
+            assert snapshot.project.metadata == project.metadata
+            for name in ('durations', 'orders', 'hourly_rates', 'capable', 'skill_scores', 'available'):
+                assert np.array_equal(getattr(snapshot.index, name), getattr(generator.index, name)), name
+            assert snapshot.index.task_ids == generator.index.task_ids
+            assert snapshot.index.dependencies == generator.index.dependencies
+
+            # Scenarios come back exactly, and regenerate identically from the snapshot
+            assert scenario_json(load_scenarios(directory, "default")) == scenario_json(scenarios)
+            regenerated = ScenarioGenerator(snapshot.project, index=snapshot.index)
+            assert scenario_json(regenerated.generate_all_scenarios(include_rl=False)) == scenario_json(scenarios)
+            assert load_scenarios(directory, "capacity-no-rl") is None
+    finally:
+        shutil.rmtree(workdir)
+    print(f"✅ {len(EXAMPLES)} projects, their indexes and scenarios round-trip exactly")
+
+
+def test_values_and_sharing():
+    data = json.loads(EXAMPLES[0].read_text())
+    data["name"] = "Ünïcode — 項目"
+    data["tasks"][0]["name"] = "Tâche ✓"
+    data["tasks"][0]["duration_hours"] = 12.5
+    data["tasks"][1]["order"] = 2 ** 60 + 1
+    data["tasks"][2]["dependencies"] = [data["tasks"][0]["id"]]
+    workdir = tempfile.mkdtemp()
+    try:
+        source = os.path.join(workdir, "project.json")
+        with open(source, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        project = stream_project(source)
+        generator = ScenarioGenerator(project)
+        directory = os.path.join(workdir, "snapshot")
+        save_snapshot(directory, project, generator.index, source_path=source)
+        assert snapshot_is_current(directory, source)
+
+        snapshot = load_snapshot(directory)
+        tasks = snapshot.project.tasks
+        assert snapshot.project.name == data["name"] and tasks[0].name == "Tâche ✓"
+        assert tasks[0].duration_hours == 12.5
+        assert [type(task.duration_hours) for task in tasks[1:]] == [type(t["duration_hours"]) for t in data["tasks"][1:]]
+        assert tasks[1].order == 2 ** 60 + 1
+        assert tasks[2].dependencies == [data["tasks"][0]["id"]]
+
+        # Arrays are read-only mappings of the files
+        assert isinstance(snapshot.index.skill_scores.base, np.memmap)
+        try:
+            snapshot.index.durations[0] = 1.0
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("snapshot arrays must be read-only")
+
+        # Replacing the snapshot leaves mapped readers intact
+        save_snapshot(directory, project, generator.index, source_path=source)
+        assert rows(tasks) == rows(load_snapshot(directory).project.tasks)
+
+        # Editing the source makes it stale
+        data["tasks"][0]["duration_hours"] = 13
+        with open(source, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        assert not snapshot_is_current(directory, source)
+        assert not snapshot_is_current(os.path.join(workdir, "missing"), source)
+    finally:
+        shutil.rmtree(workdir)
+    print("✅ Unicode, ints, floats and dependencies survive; arrays are read-only and stale snapshots are detected")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_values_and_sharing()
+    print("\nAll snapshot tests passed")